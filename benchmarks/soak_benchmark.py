@@ -0,0 +1,188 @@
+"""
+Soak and memory-regression harness for the zzv engine.
+
+Runs a Kernel with the in-process LocalTransporter and feeds its MsgManager SnapshotLists at a sustained rate for
+a set duration. Every sample interval it records the process RSS, the memory traced by tracemalloc and the
+queue depths; at the end it fits the memory growth per million messages (least squares over the samples taken
+after the warm-up) and lists the allocation sites that grew most since the warm-up.
+
+The run fails (exit status 1) when the traced growth exceeds --budget MB per million messages, or the RSS
+growth exceeds --rss-budget when given. Unbounded buffers, such as a list keeping every handled message, show
+up as a steady growth of several hundred MB per million messages.
+
+How to Run (from the root of the repository):
+    python benchmarks/soak_benchmark.py --rate 5000 --duration 600
+    python benchmarks/soak_benchmark.py --duration 30 --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+
+from zzv.common.constants import MSG_MANAGER, QUEUE_MANAGER, SECTOR_PARTITION_MAP, SNAPSHOT_LIST  # noqa: E402
+from zzv.engine.kernel import Kernel  # noqa: E402
+
+MB = 1024 * 1024
+DRAIN_TIMEOUT = 5.0  # Seconds the soak waits for in-flight messages after the load stops
+SECTORS = list(SECTOR_PARTITION_MAP)
+SYMBOLS = ['AAPL', 'MSFT', 'NVDA', 'AMZN', 'GOOG', 'META', 'TSLA', 'AVGO']
+
+
+def read_rss() -> int:
+    """Return the resident set size in bytes; the peak RSS where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def make_snapshot_list(seq: int) -> Dict[str, Any]:
+    """Build a fresh SnapshotList, unique by key, as the producers of the engine send them."""
+    sector = SECTORS[seq % len(SECTORS)]
+    return {'topic': 'snapshots', 'key': f'{sector}-{seq}', 'name': sector, 'time': int(time.time() * 1000),
+            'snapshots': [{'Timestamp': '2024-08-23T15:35:06.250Z', 'zb1BarsC9': 5.0, 'zb1SideC10': 1.0,
+                           'zb1MarkC11': 100.0 + (seq % 100) / 10, 'zb1PnLC12': 0.5, 'Symbol': symbol}
+                          for symbol in SYMBOLS]}
+
+
+def growth_per_million(samples: List[Dict[str, Any]], field: str) -> float:
+    """Least-squares slope of `field` (MB) over the messages sent, in MB per million messages."""
+    if len(samples) < 2 or samples[-1]['messages'] == samples[0]['messages']:
+        return 0.0
+    slope, _ = statistics.linear_regression([s['messages'] for s in samples], [s[field] for s in samples])
+    return slope * 1_000_000
+
+
+async def soak(rate: int, duration: float, sample_interval: float = 1.0, warmup: float = 0.2, top: int = 10,
+               config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run the engine under a sustained load and return the memory report.
+
+    Args:
+        rate (int): SnapshotLists per second.
+        duration (float): Seconds of load.
+        sample_interval (float): Seconds between memory samples.
+        warmup (float): Share of the duration excluded from the growth fit, while caches and pools fill up.
+        top (int): Allocation sites listed in the report.
+        config (dict, optional): Engine configuration; defaults to the local transporter.
+    """
+    kernel = Kernel(config or {'kafka_transporter': {'type': 'local', 'poll_interval': 0.001}})
+    await kernel.start()
+    await asyncio.sleep(0.01)
+    msg_manager = kernel.get_service(MSG_MANAGER)
+    queue_manager = kernel.get_service(QUEUE_MANAGER)
+
+    tracemalloc.start()
+    samples: List[Dict[str, Any]] = []
+    baseline = None
+    seq = 0
+    tick = 0.01
+    started = time.perf_counter()
+    next_sample = started
+    warmup_end = started + duration * warmup
+    try:
+        while (now := time.perf_counter()) < started + duration:
+            # Send the messages due by now, at most one tick's worth per iteration so that the engine gets to run;
+            # when it cannot keep up, the reported rate is lower than the target
+            due = min(int((now - started) * rate), seq + max(1, int(rate * tick)))
+            while seq < due:
+                msg_manager.handle_message(SNAPSHOT_LIST, make_snapshot_list(seq))
+                seq += 1
+            if now >= next_sample:
+                traced, _ = tracemalloc.get_traced_memory()
+                samples.append({'elapsed_s': round(now - started, 3), 'messages': seq, 'rss_mb': read_rss() / MB,
+                                'traced_mb': traced / MB, 'queue_depth': queue_manager.get_queue_size(),
+                                'warm': now >= warmup_end})
+                if baseline is None and now >= warmup_end:
+                    baseline = tracemalloc.take_snapshot()
+                next_sample += sample_interval
+            await asyncio.sleep(tick)
+        elapsed = time.perf_counter() - started
+        # Let the messages still in flight be delivered, for a bounded time
+        drain_deadline = time.perf_counter() + DRAIN_TIMEOUT
+        while (queue_manager.kafka_transporter.stats['messages_delivered'] < seq
+               and time.perf_counter() < drain_deadline):
+            await asyncio.sleep(tick)
+        delivered = queue_manager.kafka_transporter.stats['messages_delivered']
+        final = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        await kernel.close()
+
+    warm = [sample for sample in samples if sample['warm']]
+    top_allocators = []
+    if baseline is not None:
+        for stat in final.compare_to(baseline, 'lineno')[:top]:
+            frame = stat.traceback[0]
+            top_allocators.append({'location': f"{os.path.relpath(frame.filename, REPO_ROOT)}:{frame.lineno}",
+                                   'size_diff_kb': round(stat.size_diff / 1024, 1), 'count_diff': stat.count_diff})
+    return {
+        'messages': seq,
+        'delivered': delivered,
+        'duration_s': round(elapsed, 2),
+        'rate': round(seq / elapsed, 1),
+        'traced_mb_per_million': round(growth_per_million(warm, 'traced_mb'), 2),
+        'rss_mb_per_million': round(growth_per_million(warm, 'rss_mb'), 2),
+        'final_queue_depth': samples[-1]['queue_depth'] if samples else 0,
+        'top_allocators': top_allocators,
+        'samples': samples
+    }
+
+
+def check_budget(report: Dict[str, Any], budget: float, rss_budget: Optional[float] = None) -> List[str]:
+    """Return the budget violations of a report, if any."""
+    failures = []
+    if report['traced_mb_per_million'] > budget:
+        failures.append(f"Traced memory grew {report['traced_mb_per_million']} MB per million messages "
+                        f"(budget {budget}).")
+    if rss_budget is not None and report['rss_mb_per_million'] > rss_budget:
+        failures.append(f"RSS grew {report['rss_mb_per_million']} MB per million messages (budget {rss_budget}).")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak the zzv engine and check its memory growth.")
+    parser.add_argument('--rate', type=int, default=5000, help="SnapshotLists per second.")
+    parser.add_argument('--duration', type=float, default=60, help="Seconds of load.")
+    parser.add_argument('--sample-interval', type=float, default=1.0, help="Seconds between memory samples.")
+    parser.add_argument('--warmup', type=float, default=0.2, help="Share of the run excluded from the growth fit.")
+    parser.add_argument('--budget', type=float, default=50.0, help="Traced MB allowed per million messages.")
+    parser.add_argument('--rss-budget', type=float, default=None, help="RSS MB allowed per million messages.")
+    parser.add_argument('--top', type=int, default=10, help="Allocation sites to report.")
+    parser.add_argument('--config', type=json.loads, default=None, help="Engine configuration as JSON.")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    report = asyncio.run(soak(args.rate, args.duration, args.sample_interval, args.warmup, args.top, args.config))
+    failures = check_budget(report, args.budget, args.rss_budget)
+    report['failures'] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['messages']} messages in {report['duration_s']}s ({report['rate']}/s), "
+              f"{report['delivered']} delivered, final queue depth {report['final_queue_depth']}")
+        print(f"Growth per million messages: traced {report['traced_mb_per_million']} MB, "
+              f"RSS {report['rss_mb_per_million']} MB")
+        print("Top allocation sites since the warm-up:")
+        for allocator in report['top_allocators']:
+            print(f"  {allocator['location']:<60} {allocator['size_diff_kb']:>10.1f} KB "
+                  f"{allocator['count_diff']:>8} blocks")
+        for failure in failures:
+            print(f"FAILED: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
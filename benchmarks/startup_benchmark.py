@@ -0,0 +1,108 @@
+"""
+Startup benchmark for the zzv package.
+
+Measures, in fresh interpreter processes:
+1. Import time of the modules that tools, workers and the server load.
+2. Time-to-first-message: from interpreter start until the first SnapshotList handed to the MsgManager has
+   been acknowledged by the transporter. The in-process LocalTransporter is used, so no broker is needed.
+
+How to Run (from the root of the repository):
+    python benchmarks/startup_benchmark.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+DEFAULT_MODULES = [
+    'zzv',
+    'zzv.models.message_types',
+    'zzv.models.snapshot',
+    'zzv.msgcore.flatbuffers_protocol',
+    'zzv.engine.kernel',
+    'zzv.engine.zeta_zen_vm',
+]
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+FIRST_MESSAGE_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import asyncio
+from zzv.common.constants import MSG_MANAGER, QUEUE_MANAGER, SNAPSHOT_LIST
+from zzv.engine.kernel import Kernel
+
+async def first_message():
+    kernel = Kernel({'kafka_transporter': {'type': 'local', 'poll_interval': 0.001}})
+    await kernel.start()
+    kernel.get_service(MSG_MANAGER).handle_message(SNAPSHOT_LIST, {
+        'topic': 'snapshots', 'key': 'XLK', 'name': 'XLK', 'time': 0, 'snapshots': []
+    })
+    transporter = kernel.get_service(QUEUE_MANAGER).kafka_transporter
+    while transporter.stats['messages_delivered'] == 0:
+        await asyncio.sleep(0.0005)
+    elapsed = time.perf_counter() - t0
+    await kernel.close()
+    return elapsed
+
+print(asyncio.run(first_message()))
+"""
+
+
+def _run_snippet(snippet: str) -> float:
+    """Run a snippet in a fresh interpreter and return the float it prints on its last line."""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''),
+               LOG_LEVEL='ERROR')
+    result = subprocess.run([sys.executable, '-c', snippet], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _summarize(samples):
+    return {
+        'median_ms': statistics.median(samples) * 1000,
+        'min_ms': min(samples) * 1000,
+        'max_ms': max(samples) * 1000,
+    }
+
+
+def measure_import(module: str, runs: int) -> dict:
+    """Measure the import time of a module over several fresh interpreters."""
+    return _summarize([_run_snippet(IMPORT_SNIPPET.format(module=module)) for _ in range(runs)])
+
+
+def measure_time_to_first_message(runs: int) -> dict:
+    """Measure interpreter-start to first acknowledged message over several fresh interpreters."""
+    return _summarize([_run_snippet(FIRST_MESSAGE_SNIPPET) for _ in range(runs)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure zzv import time and time-to-first-message.")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per measurement.")
+    parser.add_argument('--modules', nargs='*', default=DEFAULT_MODULES, help="Modules to import.")
+    parser.add_argument('--json', action='store_true', help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    results = {'imports': {}, 'time_to_first_message': None}
+    for module in args.modules:
+        results['imports'][module] = measure_import(module, args.runs)
+    results['time_to_first_message'] = measure_time_to_first_message(args.runs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'module':<40} {'median':>10} {'min':>10} {'max':>10}")
+    for module, summary in results['imports'].items():
+        print(f"{module:<40} {summary['median_ms']:>8.1f}ms {summary['min_ms']:>8.1f}ms {summary['max_ms']:>8.1f}ms")
+    summary = results['time_to_first_message']
+    print(f"{'time-to-first-message':<40} {summary['median_ms']:>8.1f}ms {summary['min_ms']:>8.1f}ms "
+          f"{summary['max_ms']:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
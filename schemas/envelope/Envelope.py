@@ -0,0 +1,102 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: envelope
+
+import flatbuffers
+from flatbuffers.compat import import_numpy
+np = import_numpy()
+
+class Envelope(object):
+    __slots__ = ['_tab']
+
+    @classmethod
+    def GetRootAs(cls, buf, offset=0):
+        n = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, offset)
+        x = Envelope()
+        x.Init(buf, n + offset)
+        return x
+
+    @classmethod
+    def GetRootAsEnvelope(cls, buf, offset=0):
+        """This method is deprecated. Please switch to GetRootAs."""
+        return cls.GetRootAs(buf, offset)
+    # Envelope
+    def Init(self, buf, pos):
+        self._tab = flatbuffers.table.Table(buf, pos)
+
+    # Envelope
+    def Type(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Uint8Flags, o + self._tab.Pos)
+        return 0
+
+    # Envelope
+    def TimestampNs(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Envelope
+    def Payload(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        if o != 0:
+            a = self._tab.Vector(o)
+            return self._tab.Get(flatbuffers.number_types.Uint8Flags, a + flatbuffers.number_types.UOffsetTFlags.py_type(j * 1))
+        return 0
+
+    # Envelope
+    def PayloadAsNumpy(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        if o != 0:
+            return self._tab.GetVectorAsNumpy(flatbuffers.number_types.Uint8Flags, o)
+        return 0
+
+    # Envelope
+    def PayloadLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # Envelope
+    def PayloadIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        return o == 0
+
+def EnvelopeStart(builder):
+    builder.StartObject(3)
+
+def Start(builder):
+    EnvelopeStart(builder)
+
+def EnvelopeAddType(builder, type):
+    builder.PrependUint8Slot(0, type, 0)
+
+def AddType(builder, type):
+    EnvelopeAddType(builder, type)
+
+def EnvelopeAddTimestampNs(builder, timestampNs):
+    builder.PrependInt64Slot(1, timestampNs, 0)
+
+def AddTimestampNs(builder, timestampNs):
+    EnvelopeAddTimestampNs(builder, timestampNs)
+
+def EnvelopeAddPayload(builder, payload):
+    builder.PrependUOffsetTRelativeSlot(2, flatbuffers.number_types.UOffsetTFlags.py_type(payload), 0)
+
+def AddPayload(builder, payload):
+    EnvelopeAddPayload(builder, payload)
+
+def EnvelopeStartPayloadVector(builder, numElems):
+    return builder.StartVector(1, numElems, 1)
+
+def StartPayloadVector(builder, numElems):
+    return EnvelopeStartPayloadVector(builder, numElems)
+
+def EnvelopeEnd(builder):
+    return builder.EndObject()
+
+def End(builder):
+    return EnvelopeEnd(builder)
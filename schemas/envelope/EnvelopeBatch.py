@@ -0,0 +1,74 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: envelope
+
+import flatbuffers
+from flatbuffers.compat import import_numpy
+np = import_numpy()
+
+class EnvelopeBatch(object):
+    __slots__ = ['_tab']
+
+    @classmethod
+    def GetRootAs(cls, buf, offset=0):
+        n = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, offset)
+        x = EnvelopeBatch()
+        x.Init(buf, n + offset)
+        return x
+
+    @classmethod
+    def GetRootAsEnvelopeBatch(cls, buf, offset=0):
+        """This method is deprecated. Please switch to GetRootAs."""
+        return cls.GetRootAs(buf, offset)
+    # EnvelopeBatch
+    def Init(self, buf, pos):
+        self._tab = flatbuffers.table.Table(buf, pos)
+
+    # EnvelopeBatch
+    def Envelopes(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            x = self._tab.Vector(o)
+            x += flatbuffers.number_types.UOffsetTFlags.py_type(j) * 4
+            x = self._tab.Indirect(x)
+            from schemas.envelope.Envelope import Envelope
+            obj = Envelope()
+            obj.Init(self._tab.Bytes, x)
+            return obj
+        return None
+
+    # EnvelopeBatch
+    def EnvelopesLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # EnvelopeBatch
+    def EnvelopesIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        return o == 0
+
+def EnvelopeBatchStart(builder):
+    builder.StartObject(1)
+
+def Start(builder):
+    EnvelopeBatchStart(builder)
+
+def EnvelopeBatchAddEnvelopes(builder, envelopes):
+    builder.PrependUOffsetTRelativeSlot(0, flatbuffers.number_types.UOffsetTFlags.py_type(envelopes), 0)
+
+def AddEnvelopes(builder, envelopes):
+    EnvelopeBatchAddEnvelopes(builder, envelopes)
+
+def EnvelopeBatchStartEnvelopesVector(builder, numElems):
+    return builder.StartVector(4, numElems, 4)
+
+def StartEnvelopesVector(builder, numElems):
+    return EnvelopeBatchStartEnvelopesVector(builder, numElems)
+
+def EnvelopeBatchEnd(builder):
+    return builder.EndObject()
+
+def End(builder):
+    return EnvelopeBatchEnd(builder)
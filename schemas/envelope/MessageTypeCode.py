@@ -0,0 +1,10 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: envelope
+
+class MessageTypeCode(object):
+    Unknown = 0
+    ServerTime = 1
+    Snapshots = 2
+    Alerts = 3
+    Chats = 4
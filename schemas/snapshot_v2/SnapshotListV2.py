@@ -0,0 +1,161 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: snapshot_v2
+
+import flatbuffers
+from flatbuffers.compat import import_numpy
+np = import_numpy()
+
+class SnapshotListV2(object):
+    __slots__ = ['_tab']
+
+    @classmethod
+    def GetRootAs(cls, buf, offset=0):
+        n = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, offset)
+        x = SnapshotListV2()
+        x.Init(buf, n + offset)
+        return x
+
+    @classmethod
+    def GetRootAsSnapshotListV2(cls, buf, offset=0):
+        """This method is deprecated. Please switch to GetRootAs."""
+        return cls.GetRootAs(buf, offset)
+    @classmethod
+    def SnapshotListV2BufferHasIdentifier(cls, buf, offset, size_prefixed=False):
+        return flatbuffers.util.BufferHasIdentifier(buf, offset, b"\x5A\x53\x4C\x32", size_prefixed=size_prefixed)
+
+    # SnapshotListV2
+    def Init(self, buf, pos):
+        self._tab = flatbuffers.table.Table(buf, pos)
+
+    # SnapshotListV2
+    def Key(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            return self._tab.String(o + self._tab.Pos)
+        return None
+
+    # SnapshotListV2
+    def Time(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # SnapshotListV2
+    def Name(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        if o != 0:
+            return self._tab.String(o + self._tab.Pos)
+        return None
+
+    # SnapshotListV2
+    def Symbols(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(10))
+        if o != 0:
+            a = self._tab.Vector(o)
+            return self._tab.String(a + flatbuffers.number_types.UOffsetTFlags.py_type(j * 4))
+        return ""
+
+    # SnapshotListV2
+    def SymbolsLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(10))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # SnapshotListV2
+    def SymbolsIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(10))
+        return o == 0
+
+    # SnapshotListV2
+    def Rows(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        if o != 0:
+            x = self._tab.Vector(o)
+            x += flatbuffers.number_types.UOffsetTFlags.py_type(j) * 32
+            from schemas.snapshot_v2.SnapshotRow import SnapshotRow
+            obj = SnapshotRow()
+            obj.Init(self._tab.Bytes, x)
+            return obj
+        return None
+
+    # SnapshotListV2
+    def RowsLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # SnapshotListV2
+    def RowsIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        return o == 0
+
+    # SnapshotListV2
+    def SymbolDictionaryVersion(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(14))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Uint64Flags, o + self._tab.Pos)
+        return 0
+
+def SnapshotListV2Start(builder):
+    builder.StartObject(6)
+
+def Start(builder):
+    SnapshotListV2Start(builder)
+
+def SnapshotListV2AddKey(builder, key):
+    builder.PrependUOffsetTRelativeSlot(0, flatbuffers.number_types.UOffsetTFlags.py_type(key), 0)
+
+def AddKey(builder, key):
+    SnapshotListV2AddKey(builder, key)
+
+def SnapshotListV2AddTime(builder, time):
+    builder.PrependInt64Slot(1, time, 0)
+
+def AddTime(builder, time):
+    SnapshotListV2AddTime(builder, time)
+
+def SnapshotListV2AddName(builder, name):
+    builder.PrependUOffsetTRelativeSlot(2, flatbuffers.number_types.UOffsetTFlags.py_type(name), 0)
+
+def AddName(builder, name):
+    SnapshotListV2AddName(builder, name)
+
+def SnapshotListV2AddSymbols(builder, symbols):
+    builder.PrependUOffsetTRelativeSlot(3, flatbuffers.number_types.UOffsetTFlags.py_type(symbols), 0)
+
+def AddSymbols(builder, symbols):
+    SnapshotListV2AddSymbols(builder, symbols)
+
+def SnapshotListV2StartSymbolsVector(builder, numElems):
+    return builder.StartVector(4, numElems, 4)
+
+def StartSymbolsVector(builder, numElems):
+    return SnapshotListV2StartSymbolsVector(builder, numElems)
+
+def SnapshotListV2AddRows(builder, rows):
+    builder.PrependUOffsetTRelativeSlot(4, flatbuffers.number_types.UOffsetTFlags.py_type(rows), 0)
+
+def AddRows(builder, rows):
+    SnapshotListV2AddRows(builder, rows)
+
+def SnapshotListV2StartRowsVector(builder, numElems):
+    return builder.StartVector(32, numElems, 8)
+
+def StartRowsVector(builder, numElems):
+    return SnapshotListV2StartRowsVector(builder, numElems)
+
+def SnapshotListV2AddSymbolDictionaryVersion(builder, symbolDictionaryVersion):
+    builder.PrependUint64Slot(5, symbolDictionaryVersion, 0)
+
+def AddSymbolDictionaryVersion(builder, symbolDictionaryVersion):
+    SnapshotListV2AddSymbolDictionaryVersion(builder, symbolDictionaryVersion)
+
+def SnapshotListV2End(builder):
+    return builder.EndObject()
+
+def End(builder):
+    return SnapshotListV2End(builder)
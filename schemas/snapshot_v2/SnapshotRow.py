@@ -0,0 +1,42 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: snapshot_v2
+
+import flatbuffers
+from flatbuffers.compat import import_numpy
+np = import_numpy()
+
+class SnapshotRow(object):
+    __slots__ = ['_tab']
+
+    @classmethod
+    def SizeOf(cls):
+        return 32
+
+    # SnapshotRow
+    def Init(self, buf, pos):
+        self._tab = flatbuffers.table.Table(buf, pos)
+
+    # SnapshotRow
+    def TimestampMs(self): return self._tab.Get(flatbuffers.number_types.Int64Flags, self._tab.Pos + flatbuffers.number_types.UOffsetTFlags.py_type(0))
+    # SnapshotRow
+    def SymbolId(self): return self._tab.Get(flatbuffers.number_types.Uint32Flags, self._tab.Pos + flatbuffers.number_types.UOffsetTFlags.py_type(8))
+    # SnapshotRow
+    def Zb1BarsC9(self): return self._tab.Get(flatbuffers.number_types.Float32Flags, self._tab.Pos + flatbuffers.number_types.UOffsetTFlags.py_type(12))
+    # SnapshotRow
+    def Zb1SideC10(self): return self._tab.Get(flatbuffers.number_types.Float32Flags, self._tab.Pos + flatbuffers.number_types.UOffsetTFlags.py_type(16))
+    # SnapshotRow
+    def Zb1MarkC11(self): return self._tab.Get(flatbuffers.number_types.Float32Flags, self._tab.Pos + flatbuffers.number_types.UOffsetTFlags.py_type(20))
+    # SnapshotRow
+    def Zb1PnlC12(self): return self._tab.Get(flatbuffers.number_types.Float32Flags, self._tab.Pos + flatbuffers.number_types.UOffsetTFlags.py_type(24))
+
+def CreateSnapshotRow(builder, timestampMs, symbolId, zb1BarsC9, zb1SideC10, zb1MarkC11, zb1PnlC12):
+    builder.Prep(8, 32)
+    builder.Pad(4)
+    builder.PrependFloat32(zb1PnlC12)
+    builder.PrependFloat32(zb1MarkC11)
+    builder.PrependFloat32(zb1SideC10)
+    builder.PrependFloat32(zb1BarsC9)
+    builder.PrependUint32(symbolId)
+    builder.PrependInt64(timestampMs)
+    return builder.Offset()
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import unittest
+
+from zzv.analytics.windows import RingBuffer, SectorWindows, WindowSpec, summarize
+from zzv.common.constants import AGGREGATION_MANAGER, MSG_MANAGER, QUEUE_MANAGER
+from zzv.engine.kernel import Kernel
+from zzv.models.message_types import MessageType
+
+START_MS = 1724427300000  # A multiple of one minute
+
+
+def make_snapshot_list(time_ms, name='XLK', rows=(('AAPL', 1.0, 100.0, 10.0), ('MSFT', -1.0, 200.0, -5.0))):
+    return {'key': f'key-{time_ms}', 'time': time_ms, 'name': name,
+            'snapshots': [{'Symbol': symbol, 'zb1SideC10': side, 'zb1MarkC11': mark, 'zb1PnLC12': pnl}
+                          for symbol, side, mark, pnl in rows]}
+
+
+class TestWindows(unittest.TestCase):
+
+    def test_ring_buffer_overwrites_the_oldest_rows(self):
+        ring = RingBuffer(4)
+        for i in range(6):
+            ring.append(i * 1000, float(i), 1.0 if i % 2 else -1.0, 100.0 + i // 2)
+        self.assertEqual(len(ring), 4)
+        self.assertEqual([int(ring.row(i)['time']) for i in range(4)], [2000, 3000, 4000, 5000])
+        self.assertEqual(ring.bisect_left(3500), 2)
+
+        summary = summarize(ring, 2000, 5000)  # Rows 2, 3 and 4
+        self.assertEqual((summary['count'], summary['pnl'], summary['pnl_change']), (3, 4.0, 2.0))
+        self.assertEqual((summary['long_count'], summary['short_count']), (1, 2))
+        self.assertEqual((summary['mark_change'], summary['mark_changes']), (1.0, 1))
+        self.assertIsNone(summarize(ring, 0, 2000))
+
+    def test_tumbling_window_closes_on_event_time(self):
+        spec = WindowSpec('1m', 'tumbling', 60)
+        windows = SectorWindows(capacity=16)
+        results = []
+        for i in range(4):
+            time_ms = START_MS + i * 30000  # Two SnapshotLists per minute
+            for end_ms in windows.due(spec, time_ms):
+                results.append(windows.evaluate(spec, end_ms))
+            windows.add(time_ms, make_snapshot_list(time_ms)['snapshots'])
+        self.assertEqual([r['end'] for r in results], [START_MS + 60000])
+        sector = results[0]['sector']
+        self.assertEqual((sector['symbols'], sector['count'], sector['pnl_total']), (2, 4, 5.0))
+        self.assertEqual((sector['long_symbols'], sector['short_symbols']), (1, 1))
+        self.assertEqual((sector['long_count'], sector['short_count']), (2, 2))
+
+    def test_sliding_window_overlaps(self):
+        spec = WindowSpec('2s', 'sliding', 2, slide=1)
+        windows = SectorWindows(capacity=16)
+        counts = []
+        for i in range(5):
+            time_ms = START_MS + i * 1000
+            counts += [windows.evaluate(spec, end)['sector']['count'] for end in windows.due(spec, time_ms)]
+            windows.add(time_ms, make_snapshot_list(time_ms, rows=(('AAPL', 1.0, 100.0 + i, 0.0),))['snapshots'])
+        self.assertEqual(counts, [1, 2, 2, 2])
+
+    def test_rejects_unknown_window_types(self):
+        with self.assertRaises(ValueError):
+            WindowSpec('x', 'session', 60)
+
+
+class TestAggregationManager(unittest.TestCase):
+
+    def test_publishes_closed_windows(self):
+        async def run():
+            kernel = Kernel({
+                'kafka_transporter': {'type': 'local', 'poll_interval': 0.001},
+                'aggregation': {'enabled': True, 'windows': [{'name': '1m', 'size': 60}],
+                                'publish': {'enabled': True, 'topic': 'aggregates'}}
+            })
+            await kernel.start()
+            await asyncio.sleep(0.01)
+            msg_manager = kernel.get_service(MSG_MANAGER)
+            for i in range(5):
+                msg_manager.handle_message(MessageType.SNAPSHOTS, make_snapshot_list(START_MS + i * 30000))
+            await asyncio.sleep(0.1)
+            producer = kernel.get_service(QUEUE_MANAGER).kafka_transporter.producer
+            aggregation_manager = kernel.get_service(AGGREGATION_MANAGER)
+            latest = aggregation_manager.get_latest('XLK')
+            delivered = [json.loads(m.value()) for m in producer.delivered if m.topic() == 'aggregates']
+            await kernel.close()
+            return aggregation_manager, latest, delivered
+
+        aggregation_manager, latest, delivered = asyncio.run(run())
+        self.assertEqual(aggregation_manager.stats['errors'], 0)
+        self.assertEqual([m['end'] for m in delivered], [START_MS + 60000, START_MS + 120000])
+        self.assertEqual(delivered[0]['key'], 'XLK')
+        self.assertEqual(delivered[0]['symbols']['MSFT']['short_count'], 2)
+        self.assertEqual(latest['1m']['end'], START_MS + 120000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import asyncio
+import importlib.util
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from zzv.common.constants import EXPORT_MANAGER, REPLAY_MANAGER
+from zzv.engine.kernel import Kernel
+from zzv.export.columnar_store import ColumnarReader, ColumnarWriter
+from zzv.replay.snapshot_readers import write_snapshot_recording
+
+DAY_MS = 86400000
+START_MS = 1724427306000  # 2024-08-23 15:35:06 UTC
+
+
+def make_snapshot_list(time_ms, name='XLK', symbols=('AAPL', 'MSFT'), mark=100.0):
+    return {'key': f'key-{time_ms}', 'time': time_ms, 'name': name,
+            'snapshots': [{'Timestamp': '2024-08-23T15:35:06.250Z', 'zb1BarsC9': 5.0, 'zb1SideC10': -1.0,
+                           'zb1MarkC11': mark + i, 'zb1PnLC12': 0.5, 'Symbol': symbol}
+                          for i, symbol in enumerate(symbols)]}
+
+
+class TestColumnarStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_partitions_by_day_and_sector(self):
+        writer = ColumnarWriter(self.root)
+        writer.append(make_snapshot_list(START_MS))
+        writer.append(make_snapshot_list(START_MS, name='XLF'))
+        writer.append(make_snapshot_list(START_MS + DAY_MS))
+        self.assertEqual(writer.flush(), 6)
+
+        reader = ColumnarReader(self.root)
+        self.assertEqual(reader.days(), ['2024-08-23', '2024-08-24'])
+        self.assertEqual(reader.sectors('2024-08-23'), ['XLF', 'XLK'])
+
+    def test_appends_are_memory_mapped_columns(self):
+        writer = ColumnarWriter(self.root)
+        writer.append(make_snapshot_list(START_MS))
+        writer.flush()
+        writer.append(make_snapshot_list(START_MS + 1000, symbols=('NVDA', 'AAPL'), mark=200.0))
+        writer.flush()
+
+        reader = ColumnarReader(self.root)
+        columns = reader.read('2024-08-23', 'XLK')
+        self.assertIsInstance(columns['mark'], np.memmap)
+        self.assertFalse(columns['mark'].flags.writeable)
+        np.testing.assert_array_equal(columns['mark'], [100.0, 101.0, 200.0, 201.0])
+        self.assertEqual([reader.symbols('2024-08-23', 'XLK')[i] for i in columns['symbol']],
+                         ['AAPL', 'MSFT', 'NVDA', 'AAPL'])
+        self.assertEqual(columns['time'][2], np.datetime64(START_MS + 1000, 'ms'))
+        self.assertEqual(columns['timestamp'][0], np.datetime64('2024-08-23T15:35:06.250'))
+
+    def test_ignores_a_partially_appended_row(self):
+        writer = ColumnarWriter(self.root)
+        writer.append(make_snapshot_list(START_MS))
+        writer.flush()
+        with open(os.path.join(self.root, 'day=2024-08-23', 'sector=XLK', 'mark.bin'), 'ab') as file:
+            file.write(b'\x00' * 12)  # A writer caught between columns
+        self.assertEqual(len(ColumnarReader(self.root).read('2024-08-23', 'XLK', ['mark'])['mark']), 2)
+
+    def test_malformed_timestamps_are_exported_as_nat(self):
+        writer = ColumnarWriter(self.root)
+        writer.append(make_snapshot_list(START_MS))
+        bad = make_snapshot_list(START_MS + 1000)
+        bad['snapshots'][1]['Timestamp'] = '10/09/2024'
+        writer.append(bad)
+        self.assertEqual(writer.flush(), 4)  # The other rows of the flush are not lost
+        self.assertEqual((writer.stats['rows_written'], writer.stats['bad_timestamps']), (4, 1))
+        timestamps = ColumnarReader(self.root).read('2024-08-23', 'XLK', ['timestamp'])['timestamp']
+        self.assertEqual(np.isnat(timestamps).tolist(), [False, False, False, True])
+
+    def test_requests_a_flush_when_the_buffer_is_full(self):
+        writer = ColumnarWriter(self.root, flush_rows=4)
+        writer.append(make_snapshot_list(START_MS))
+        self.assertFalse(writer.flush_requested.is_set())
+        for i in range(1, 3):
+            writer.append(make_snapshot_list(START_MS + i))
+        self.assertTrue(writer.flush_requested.is_set())
+        self.assertEqual(writer.stats['rows_written'], 0)  # append never writes
+        self.assertEqual(writer.flush(), 6)
+        self.assertFalse(writer.flush_requested.is_set())
+
+    @unittest.skipUnless(importlib.util.find_spec('pandas'), "pandas is not installed")
+    def test_to_dataframe(self):
+        writer = ColumnarWriter(self.root)
+        writer.append(make_snapshot_list(START_MS))
+        writer.flush()
+        frame = ColumnarReader(self.root).to_dataframe('2024-08-23', 'XLK')
+        self.assertEqual(list(frame['symbol']), ['AAPL', 'MSFT'])
+
+
+class TestExportManager(unittest.TestCase):
+
+    def test_exports_replayed_snapshot_lists(self):
+        with tempfile.TemporaryDirectory() as root:
+            recording = os.path.join(root, 'day.jsonl')
+            write_snapshot_recording(recording, [make_snapshot_list(START_MS + i * 1000) for i in range(50)])
+
+            async def run():
+                kernel = Kernel({
+                    'kafka_transporter': {'type': 'local', 'poll_interval': 0.001},
+                    'replay': {'enabled': True, 'files': [recording]},
+                    'export': {'enabled': True, 'directory': os.path.join(root, 'store'), 'flush_interval': 60}
+                })
+                await kernel.start()
+                replay_manager = kernel.get_service(REPLAY_MANAGER)
+                deadline = time.perf_counter() + 10
+                while not replay_manager.finished and time.perf_counter() < deadline:
+                    await asyncio.sleep(0.005)
+                await asyncio.sleep(0.05)
+                await kernel.close()
+                return kernel.get_service(EXPORT_MANAGER)
+
+            export_manager = asyncio.run(run())
+            self.assertEqual(export_manager.error_count, 0)
+            columns = ColumnarReader(os.path.join(root, 'store')).read('2024-08-23', 'XLK')
+            self.assertEqual(len(columns['mark']), 100)
+
+    def test_full_buffer_is_flushed_before_the_interval(self):
+        with tempfile.TemporaryDirectory() as root:
+            async def run():
+                kernel = Kernel({
+                    'kafka_transporter': {'type': 'local', 'poll_interval': 0.001},
+                    'export': {'enabled': True, 'directory': os.path.join(root, 'store'), 'flush_interval': 60,
+                               'flush_rows': 4}
+                })
+                await kernel.start()
+                await asyncio.sleep(0.01)  # Services start as tasks
+                export_manager = kernel.get_service(EXPORT_MANAGER)
+                for i in range(3):
+                    export_manager.export_snapshot_list(make_snapshot_list(START_MS + i))
+                deadline = time.perf_counter() + 5
+                while export_manager.writer.stats['rows_written'] == 0 and time.perf_counter() < deadline:
+                    await asyncio.sleep(0.005)
+                rows_written = export_manager.writer.stats['rows_written']
+                await kernel.close()
+                return rows_written
+
+            self.assertEqual(asyncio.run(run()), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from zzv.common.constants import CONFIG_SERVICE, PRODUCER_POOL, QUEUE_MANAGER
+from zzv.common.utility import load_config
+from zzv.engine.config_service import ConfigService, freeze
+from zzv.engine.kernel import Kernel
+
+
+class TestConfigService(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'config.yaml')
+        self.write({'kafka_transporter': {'type': 'local', 'max_in_flight': 100}, 'server': {'port': 8000}})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, config):
+        with open(self.path, 'w') as file:
+            yaml.safe_dump(config, file)
+        # Make sure the modification time changes even on coarse-grained file systems
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_load_config_parses_once_per_modification(self):
+        first = load_config(self.path)
+        first['server']['port'] = 1  # Callers get their own copy
+        self.assertEqual(load_config(self.path)['server']['port'], 8000)
+        self.write({'server': {'port': 9000}})
+        self.assertEqual(load_config(self.path)['server']['port'], 9000)
+
+    def test_snapshot_is_read_only(self):
+        snapshot = freeze({'a': {'b': [1, {'c': 2}]}})
+        with self.assertRaises(TypeError):
+            snapshot['a'] = 1
+        with self.assertRaises(TypeError):
+            snapshot['a']['b'][1]['c'] = 3
+        self.assertEqual(snapshot['a']['b'][1]['c'], 2)
+
+    def test_changed_sections_are_applied_to_subscribers(self):
+        service = ConfigService(load_config(self.path), self.path)
+        applied = []
+        service.subscribe('kafka_transporter', applied.append, name='transporter')
+        service.subscribe('server', lambda section: applied.append('server'), name='server')
+
+        self.write({'kafka_transporter': {'type': 'local', 'max_in_flight': 50}, 'server': {'port': 8000}})
+        changed = asyncio.run(service.reload())
+        self.assertEqual(changed, ['kafka_transporter'])
+        self.assertEqual([section['max_in_flight'] for section in applied], [50])
+        self.assertEqual((service.version, service.get('kafka_transporter')['max_in_flight']), (2, 50))
+        self.assertEqual(asyncio.run(service.reload()), [])  # Unchanged file
+
+    def test_rejected_reload_keeps_the_previous_snapshot(self):
+        service = ConfigService(load_config(self.path), self.path)
+        applied = []
+
+        def validate(section):
+            if section['max_in_flight'] <= 0:
+                raise ValueError("max_in_flight must be positive")
+
+        service.subscribe('kafka_transporter', applied.append, validate=validate)
+        service.subscribe('server', applied.append)
+        self.write({'kafka_transporter': {'type': 'local', 'max_in_flight': 0}, 'server': {'port': 9000}})
+        self.assertEqual(asyncio.run(service.reload()), [])
+        self.assertEqual(applied, [])  # Nothing applied, not even the valid server section
+        self.assertEqual(service.get('server')['port'], 8000)
+        self.assertIn("max_in_flight must be positive", service.last_error)
+
+        with open(self.path, 'w') as file:
+            file.write("server: [unbalanced")
+        self.assertEqual(asyncio.run(service.reload()), [])
+        self.assertEqual(service.rejected, 2)
+
+    def test_kernel_hot_reloads_opted_in_managers(self):
+        self.write({'kafka_transporter': {'type': 'local', 'max_in_flight': 100},
+                    'config_reload': {'poll_interval': 0.01}, 'logging': {'loggers': {'zzv.test': 'DEBUG'}}})
+
+        async def run():
+            kernel = Kernel(load_config(self.path), config_path=self.path)
+            await kernel.start()
+            await asyncio.sleep(0.05)
+            transporter = kernel.get_service(QUEUE_MANAGER).kafka_transporter
+            before = transporter.max_in_flight
+            self.write({'kafka_transporter': {'type': 'local', 'max_in_flight': 7, 'offload_min_bytes': 10},
+                        'config_reload': {'poll_interval': 0.01}, 'logging': {'loggers': {'zzv.test': 'WARNING'}}})
+            await asyncio.sleep(0.1)
+            after = transporter.max_in_flight, transporter.offload_min_bytes
+            status = kernel.get_service(CONFIG_SERVICE).get_status()
+            await kernel.close()
+            return before, after, status
+
+        before, after, status = asyncio.run(run())
+        self.assertEqual((before, after), (100, (7, 10)))
+        self.assertEqual(status['version'], 2)
+        self.assertIn(QUEUE_MANAGER, status['subscribers']['kafka_transporter'])
+        self.assertEqual(logging.getLogger('zzv.test').level, logging.WARNING)
+
+    def test_pooled_producer_poll_interval_is_reloaded(self):
+        self.write({'kafka_transporter': {'type': 'local'}, 'producer_pool': {'poll_interval': 0.05},
+                    'config_reload': {'poll_interval': 0.01}})
+
+        async def run():
+            kernel = Kernel(load_config(self.path), config_path=self.path)
+            await kernel.start()
+            await asyncio.sleep(0.05)
+            self.write({'kafka_transporter': {'type': 'local', 'poll_interval': 0.5},
+                        'producer_pool': {'poll_interval': 0.01}, 'config_reload': {'poll_interval': 0.01}})
+            await asyncio.sleep(0.1)
+            transporter = kernel.get_service(QUEUE_MANAGER).kafka_transporter
+            entry = transporter._lease._entry
+            status = kernel.get_service(CONFIG_SERVICE).get_status()
+            await kernel.close()
+            return entry.poll_interval, transporter.poll_interval, status
+
+        pooled, transporter, status = asyncio.run(run())
+        self.assertEqual(pooled, 0.01)  # The interval the transporter's deliveries are actually polled at
+        self.assertEqual(transporter, 0.1)  # Not applied: the transporter has no poller of its own
+        self.assertIn(PRODUCER_POOL, status['subscribers']['producer_pool'])
+
+
+if __name__ == '__main__':
+    unittest.main()
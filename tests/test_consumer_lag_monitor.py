@@ -0,0 +1,123 @@
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+
+from confluent_kafka import TopicPartition
+
+from zzv.common.constants import MSG_MANAGER
+from zzv.common.custom_datetime import CustomDateTime
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+from zzv.msgcore.consumer_lag_monitor import ConsumerLagMonitor
+
+
+class FakeOffsetsConsumer:
+    """Consumer reporting fixed committed offsets and high watermarks."""
+
+    def __init__(self, committed, high):
+        self.committed_offsets = committed  # partition -> offset
+        self.high = high  # partition -> high watermark
+        self.closed = False
+
+    def list_topics(self, topic, timeout=None):
+        partitions = {partition: None for partition in self.high}
+        return SimpleNamespace(topics={topic: SimpleNamespace(error=None, partitions=partitions)})
+
+    def committed(self, partitions, timeout=None):
+        return [TopicPartition(tp.topic, tp.partition, self.committed_offsets[tp.partition]) for tp in partitions]
+
+    def get_watermark_offsets(self, partition, timeout=None, cached=False):
+        return 0, self.high[partition.partition]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeMsgManager:
+    def __init__(self):
+        self.handlers = {}
+
+    def register_handler(self, message_type, callback, kind=None, name=None):
+        self.handlers[name] = callback
+
+    def unregister_handler(self, message_type, name):
+        self.handlers.pop(name)
+
+
+class FakeKernel:
+    def __init__(self):
+        self.config = {}
+        self.clock = CustomDateTime()
+        self.msg_manager = FakeMsgManager()
+
+    def get_service(self, name, **kwargs):
+        assert name == MSG_MANAGER
+        return self.msg_manager
+
+
+class TestConsumerLagMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.kernel = FakeKernel()
+        self.consumer = FakeOffsetsConsumer(committed={0: 100, 1: -1001}, high={0: 150, 1: 40})
+        self.monitor = ConsumerLagMonitor(self.kernel, {
+            'groups': [{'group_id': 'traders', 'topics': ['snapshots']}],
+            'max_lag': 60, 'max_latency_ms': 500
+        }, consumer_factory=lambda conf: self.consumer)
+
+    def test_reports_lag_rate_and_skew(self):
+        self.monitor.sample()
+        self.monitor.last_sample -= 2  # Pretend the previous sample was two seconds ago
+        self.consumer.committed_offsets[0] = 120
+        self.monitor.sample()
+
+        topic = self.monitor.get_lag()['traders']['snapshots']
+        self.assertEqual(topic['partitions'][0], {"committed": 120, "high": 150, "lag": 30,
+                                                  "rate": topic['partitions'][0]['rate']})
+        self.assertAlmostEqual(topic['partitions'][0]['rate'], 10.0, delta=0.5)
+        self.assertIsNone(topic['partitions'][1]['committed'])  # Nothing committed: the whole partition lags
+        self.assertEqual((topic['total_lag'], topic['max_lag'], topic['skew']), (70, 40, 10))
+
+    def test_thresholds_turn_health_to_warning(self):
+        async def run():
+            await self.monitor.start()
+            await asyncio.sleep(0.05)
+            health = [self.monitor.get_health().status]
+            self.consumer.high[0] = 200  # Lag of 100 on partition 0
+            self.monitor.sample()
+            health.append(self.monitor.get_health().status)
+            await self.monitor.close()
+            return health
+
+        self.assertEqual(asyncio.run(run()), [Status.OK, Status.WARNING])
+        self.assertTrue(self.consumer.closed)
+
+    def test_records_end_to_end_latency_per_sector(self):
+        now_ms = int(time.time() * 1000)
+        self.monitor.record_latency({'name': 'XLK', 'time': now_ms - 2000, 'snapshots': []})
+        self.monitor.record_latency({'name': 'XLK', 'time': now_ms - 20, 'snapshots': []})
+        self.kernel.clock.simulate(self.kernel.clock.now())
+        self.monitor.record_latency({'name': 'XLF', 'time': now_ms - 20, 'snapshots': []})  # Ignored in replay
+
+        latency = self.monitor.get_latency()
+        self.assertEqual(list(latency), ['XLK'])
+        self.assertEqual(latency['XLK']['count'], 2)
+        self.assertEqual(latency['XLK']['histogram']['le_25'] + latency['XLK']['histogram']['le_50'], 1)
+        self.assertEqual(latency['XLK']['histogram']['le_2500'], 1)
+        self.monitor._running = True
+        self.assertEqual(self.monitor.get_health().status, Status.WARNING)
+
+    def test_combined_health_keeps_the_most_severe_status(self):
+        report = HealthReport(manager_name="Kernel", status=Status.OK)
+        report.combine(HealthReport(manager_name="A", status=Status.WARNING, details=["slow"]))
+        self.assertEqual(report.status, Status.WARNING)
+        report.combine(HealthReport(manager_name="B", status=Status.OK))
+        self.assertEqual(report.status, Status.WARNING)
+        report.combine(HealthReport(manager_name="C", status="ERROR"))
+        self.assertEqual(report.status, Status.ERROR)
+        self.assertEqual(report.details, ["slow"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import time
+import unittest
+
+from zzv.engine.kernel import Kernel
+from zzv.models.snapshot import SnapshotList
+from zzv.msgcore.dedup import BloomFilter, Deduplicator, RotatingBloomFilter, build_deduplicator
+from zzv.msgcore.handler_registry import HandlerKind
+from zzv.msgcore.kafka_consumer_manager import KafkaConsumerManager
+from zzv.msgcore.transporters.kafka_transporter import KafkaTransporter
+
+
+class TestBloomFilters(unittest.TestCase):
+
+    def test_bloom_filter_has_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(capacity=10000, error_rate=0.01)
+        for i in range(10000):
+            bloom.add(f"key-{i}")
+        self.assertTrue(all(f"key-{i}" in bloom for i in range(10000)))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_rotation_forgets_keys_after_two_generations(self):
+        bloom = RotatingBloomFilter(capacity=2, error_rate=0.001, window_seconds=3600)
+        bloom.add('a')
+        bloom.add('b')
+        bloom.add('c')  # Rotates: a and b move to the previous generation
+        self.assertIn('a', bloom)
+        bloom.add('d')
+        bloom.add('e')  # Rotates again: a and b are dropped
+        self.assertNotIn('a', bloom)
+        self.assertIn('c', bloom)
+        self.assertEqual(bloom.rotations, 2)
+
+
+class TestDeduplicator(unittest.TestCase):
+
+    def test_exact_and_probable_duplicates(self):
+        dedup = Deduplicator(exact_window_seconds=0.05, drop_probable=True)
+        self.assertFalse(dedup.is_duplicate('k1'))
+        self.assertTrue(dedup.is_duplicate('k1'))
+        self.assertFalse(dedup.is_duplicate(None))
+        time.sleep(0.06)
+        self.assertTrue(dedup.is_duplicate('k1'))  # Out of the exact window, still in the Bloom filter
+        stats = dedup.get_stats()
+        self.assertEqual((stats['checked'], stats['duplicates'], stats['probable_duplicates']), (3, 1, 1))
+
+    def test_probable_duplicates_are_let_through_by_default(self):
+        dedup = Deduplicator(exact_window_seconds=0)
+        dedup.is_duplicate('k1')
+        time.sleep(0.01)
+        self.assertFalse(dedup.is_duplicate('k1'))
+        self.assertEqual(dedup.get_stats()['probable_duplicates'], 1)
+
+    def test_exact_window_is_capped(self):
+        dedup = Deduplicator(max_exact=10)
+        for i in range(100):
+            dedup.is_duplicate(i)
+        self.assertEqual(dedup.get_stats()['exact_keys'], 10)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(build_deduplicator(None))
+        self.assertIsNone(build_deduplicator({'enabled': False}))
+        self.assertIsInstance(build_deduplicator({'enabled': True}), Deduplicator)
+
+
+class TestDedupStages(unittest.TestCase):
+
+    def test_msg_manager_drops_duplicate_keys(self):
+        kernel = Kernel({'kafka_transporter': {'type': 'local'}, 'msg_manager': {'dedup': {'enabled': True}}})
+        msg_manager = kernel.get_service('msg_manager')
+        msg_manager.unregister_handler('SnapshotList', 'handle_snapshot_list_message')
+        handled = []
+        msg_manager.register_handler('SnapshotList', handled.append, HandlerKind.SYNC, name='collect')
+
+        for key in ['a', 'b', 'a', None, None]:
+            msg_manager.handle_message('SnapshotList', {'key': key, 'name': 'XLK', 'snapshots': []})
+        self.assertEqual([message['key'] for message in handled], ['a', 'b', None, None])
+        self.assertEqual(msg_manager.stats['duplicates_dropped'], 1)
+
+    def test_consumer_drops_redelivered_messages(self):
+        kernel = Kernel({'kafka_transporter': {'type': 'local'}})
+        manager = KafkaConsumerManager(kernel, {'dedup': {'enabled': True}})
+        manager._loop = type('Loop', (), {'call_soon_threadsafe': lambda self, fn, batch: routed.extend(batch)})()
+        routed = []
+
+        class Message:
+            def __init__(self, key, offset):
+                self.key, self._offset = key, offset
+
+            def error(self):
+                return None
+
+            def value(self):
+                return json.dumps({'key': self.key}).encode()
+
+            def offset(self):
+                return self._offset
+
+            def partition(self):
+                return 0
+
+            def topic(self):
+                return 'snapshots'
+
+        manager.consumer = type('Consumer', (), {
+            'consume': lambda self, num_messages, timeout: [Message('a', 0), Message('b', 1), Message('a', 2)]})()
+        manager._fetch_batch()
+        self.assertEqual([data['key'] for data in routed], ['a', 'b'])
+        self.assertEqual(manager.stats['duplicates_dropped'], 1)
+        self.assertEqual(manager._offsets_to_commit, {('snapshots', 0): 3})
+
+    def test_producer_idempotence_option(self):
+        self.assertNotIn('enable.idempotence', KafkaTransporter('localhost:9092').producer_conf)
+        conf = KafkaTransporter('localhost:9092', enable_idempotence=True).producer_conf
+        self.assertTrue(conf['enable.idempotence'])
+
+    def test_snapshot_list_keeps_given_key_time_and_name(self):
+        snapshot_list = SnapshotList(snapshots=[], key='k1', time=123, name='XLF')
+        self.assertEqual((snapshot_list.key, snapshot_list.time, snapshot_list.name), ('k1', 123, 'XLF'))
+        generated = SnapshotList(snapshots=[])
+        self.assertEqual(generated.name, 'XLK')
+        self.assertNotEqual(generated.key, SnapshotList(snapshots=[]).key)
+
+
+if __name__ == '__main__':
+    unittest.main()
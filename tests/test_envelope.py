@@ -0,0 +1,48 @@
+import json
+import unittest
+from datetime import datetime
+
+from zzv.models.message_types import Message, MessageType
+from zzv.msgcore.codecs.envelope_flatbuffers import decode_envelope, datetime_to_epoch_ns, encode_envelope, \
+    encode_messages, decode_messages, epoch_ns_to_datetime, iter_envelope_batch
+
+
+class TestMessageEnvelope(unittest.TestCase):
+
+    def test_round_trip(self):
+        message = Message(MessageType.SERVER_TIME, {'time': 1724427306000},
+                          timestamp=datetime(2024, 8, 23, 15, 35, 6, 123456))
+        decoded = Message.from_bytes(message.to_bytes())
+        self.assertEqual(decoded.to_json(), message.to_json())
+
+    def test_smaller_than_json_envelope(self):
+        message = Message(MessageType.ALERTS, {'name': 'XLK', 'level': 2})
+        self.assertLess(len(message.to_bytes()), len(json.dumps(message.to_json()).encode('utf-8')))
+
+    def test_type_codes_are_stable(self):
+        self.assertEqual([t.to_code() for t in MessageType], [1, 2, 3, 4, 0])
+        self.assertEqual(MessageType.from_code(200), MessageType.UNKNOWN)
+
+    def test_epoch_nanoseconds(self):
+        value = datetime(2024, 8, 23, 15, 35, 6, 999999)
+        self.assertEqual(epoch_ns_to_datetime(datetime_to_epoch_ns(value)), value)
+
+    def test_batch_payloads_are_zero_copy_views(self):
+        messages = [Message(MessageType.CHATS, {'seq': i}, timestamp=datetime(2024, 8, 23, 15, 35, i))
+                    for i in range(10)]
+        frame = encode_messages(messages, size_prefixed=True)
+        views = list(iter_envelope_batch(frame, offset=4))
+        self.assertEqual(len(views), 10)
+        self.assertIs(views[3].payload.obj, frame)
+        self.assertEqual(bytes(views[3].payload), b'{"seq":3}')
+        self.assertEqual([m.to_json() for m in decode_messages(frame, offset=4)], [m.to_json() for m in messages])
+
+    def test_raw_payload(self):
+        view = decode_envelope(encode_envelope(MessageType.SNAPSHOTS, 42, b'\x00\x01binary'))
+        self.assertEqual(view.message_type, MessageType.SNAPSHOTS)
+        self.assertEqual(view.timestamp_ns, 42)
+        self.assertEqual(view.payload.tobytes(), b'\x00\x01binary')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import operator
+import threading
+import unittest
+
+from zzv.common.constants import QUEUE_MANAGER
+from zzv.engine.executor_manager import ExecutorManager
+from zzv.engine.kernel import Kernel
+from zzv.health.status import Status
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+class TestExecutorManager(unittest.TestCase):
+
+    def _run(self, scenario, config=None):
+        async def run():
+            manager = ExecutorManager(config or {'pools': {'codec': {'type': 'thread', 'workers': 2}}})
+            await manager.start()
+            try:
+                return await scenario(manager)
+            finally:
+                await manager.close()
+        return asyncio.run(run())
+
+    def test_runs_in_a_named_thread_pool(self):
+        async def scenario(manager):
+            name = await manager.run('codec', lambda: threading.current_thread().name)
+            return name, manager.get_stats()['codec']
+
+        name, stats = self._run(scenario)
+        self.assertTrue(name.startswith('pool-codec'))
+        self.assertEqual((stats['submitted'], stats['completed'], stats['failed']), (1, 1, 0))
+        self.assertEqual(stats['latency_ms']['count'], 1)
+
+    def test_failures_and_unknown_pools(self):
+        async def scenario(manager):
+            with self.assertRaises(ValueError):
+                await manager.run('codec', fail, 'boom')
+            with self.assertRaises(KeyError):
+                await manager.run('missing', len, 'x')
+            return manager.get_stats()['codec']['failed']
+
+        self.assertEqual(self._run(scenario), 1)
+
+    def test_reports_queue_depth_and_utilization(self):
+        release = threading.Event()
+
+        async def scenario(manager):
+            tasks = [asyncio.ensure_future(manager.run('codec', release.wait, 5)) for _ in range(7)]
+            await asyncio.sleep(0.05)
+            stats = manager.get_stats()['codec']
+            health = manager.get_health()
+            release.set()
+            await asyncio.gather(*tasks)
+            return stats, health
+
+        stats, health = self._run(scenario)
+        self.assertEqual((stats['active'], stats['queued'], stats['utilization']), (2, 5, 1.0))
+        self.assertEqual(health.status, Status.WARNING)
+
+    def test_process_pool(self):
+        async def scenario(manager):
+            return await manager.run('cpu', operator.mul, 6, 7)
+
+        self.assertEqual(self._run(scenario, {'pools': {'cpu': {'type': 'process', 'workers': 1}}}), 42)
+
+    def test_rejects_invalid_pools(self):
+        with self.assertRaises(ValueError):
+            ExecutorManager({'pools': {'gpu': {'type': 'fiber', 'workers': 1}}})
+
+
+class TestKernelOffload(unittest.TestCase):
+
+    def test_large_snapshot_lists_are_serialized_in_the_codec_pool(self):
+        async def run():
+            kernel = Kernel({'kafka_transporter': {'type': 'local', 'poll_interval': 0.001, 'offload_pool': 'codec',
+                                                   'offload_min_snapshots': 100}})
+            await kernel.start()
+            await asyncio.sleep(0.01)  # Let the QueueManager start its transporter
+            queue_manager = kernel.get_service(QUEUE_MANAGER)
+            small = {'topic': 'snapshots', 'key': 'small', 'snapshots': [{'Symbol': 'AAPL'}]}
+            large = {'topic': 'snapshots', 'key': 'large', 'snapshots': [{'Symbol': 'AAPL'}] * 100}
+            for message in (small, large):
+                await (await queue_manager.route_message(message))
+            stats = kernel.executors.get_stats()['codec']
+            await kernel.close()
+            return stats
+
+        self.assertEqual(asyncio.run(run())['completed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,248 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from zzv.common.constants import KAFKA_CONSUMER_MANAGER, MSG_MANAGER, QUEUE_MANAGER
+from zzv.engine.kernel import Kernel
+from zzv.health.status import Status
+from tests.test_snapshot_delta import make_sector_stream
+from zzv.msgcore.codecs.snapshot_delta import SnapshotDeltaEncoder
+from zzv.msgcore.kafka_consumer_manager import KafkaConsumerManager
+
+
+class FakeMessage:
+    def __init__(self, value, offset, partition=0, topic='snapshots'):
+        self._value, self._offset, self._partition, self._topic = value, offset, partition, topic
+
+    def error(self):
+        return None
+
+    def value(self):
+        return self._value
+
+    def offset(self):
+        return self._offset
+
+    def partition(self):
+        return self._partition
+
+    def topic(self):
+        return self._topic
+
+
+class FakeConsumer:
+    """Consumer returning queued batches, recording commits and pauses."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.commits = []
+        self.paused = []
+        self.resumed = []
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def subscribe(self, topics, on_revoke=None):
+        self.topics = topics
+
+    def consume(self, num_messages=1, timeout=-1):
+        with self.lock:
+            if self.batches:
+                return self.batches.pop(0)[:num_messages]
+        time.sleep(min(timeout, 0.01))
+        return []
+
+    def commit(self, offsets=None, asynchronous=True):
+        self.commits.append({(tp.topic, tp.partition): tp.offset for tp in offsets})
+
+    def assignment(self):
+        return ['assigned']
+
+    def pause(self, partitions):
+        self.paused.append(partitions)
+
+    def resume(self, partitions):
+        self.resumed.append(partitions)
+
+    def position(self, partitions):
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+class FakeMsgManager:
+    def __init__(self):
+        self.messages = []
+        self.pending = 0
+
+    def handle_message(self, message_type, data, key=None):
+        self.messages.append((message_type, data))
+
+    def get_pending_count(self):
+        return self.pending
+
+
+class FakeQueueManager:
+    def get_queue_size(self):
+        return 0
+
+
+class FakeKernel:
+    def __init__(self):
+        self.config = {}
+        self.services = {MSG_MANAGER: FakeMsgManager(), QUEUE_MANAGER: FakeQueueManager()}
+
+    def get_service(self, name, **kwargs):
+        return self.services[name]
+
+
+class TestKafkaConsumerManager(unittest.TestCase):
+
+    def _run(self, consumer, scenario, **config):
+        kernel = FakeKernel()
+        manager = KafkaConsumerManager(kernel, {'topics': ['snapshots'], 'commit_interval': 0, 'poll_timeout': 0.01,
+                                                **config},
+                                       consumer_factory=lambda conf: consumer)
+
+        async def run():
+            await manager.start()
+            try:
+                return await scenario(manager, kernel.services[MSG_MANAGER])
+            finally:
+                await manager.close()
+        return asyncio.run(run()), manager
+
+    def test_routes_batches_and_commits_offsets(self):
+        batch = [FakeMessage(json.dumps({'name': 'XLK', 'n': i}).encode(), offset=10 + i) for i in range(3)]
+        consumer = FakeConsumer([batch, [FakeMessage(b'not json', offset=13)]])
+
+        async def scenario(manager, msg_manager):
+            await asyncio.sleep(0.2)
+            return list(msg_manager.messages)
+
+        messages, manager = self._run(consumer, scenario)
+        self.assertEqual([data['n'] for _, data in messages], [0, 1, 2])
+        self.assertEqual({message_type for message_type, _ in messages}, {'SnapshotList'})
+        self.assertEqual(consumer.commits[-1], {('snapshots', 0): 14})
+        self.assertEqual(manager.stats['decode_errors'], 1)
+        self.assertEqual(manager.stats['messages_consumed'], 4)
+        self.assertTrue(consumer.closed)
+
+    def test_decodes_delta_encoded_values(self):
+        encoder = SnapshotDeltaEncoder(keyframe_interval=10)
+        snapshot_list = {'time': 1, 'name': 'XLK', 'snapshots': [
+            {'Symbol': 'AAPL', 'Timestamp': '2024-01-01T00:00:00Z', 'zb1BarsC9': 1.0, 'zb1SideC10': 1.0,
+             'zb1MarkC11': 1.0, 'zb1PnLC12': 1.0}]}
+        consumer = FakeConsumer([[FakeMessage(encoder.encode(snapshot_list), offset=0)]])
+
+        async def scenario(manager, msg_manager):
+            await asyncio.sleep(0.1)
+            return msg_manager.messages
+
+        messages, _ = self._run(consumer, scenario)
+        self.assertEqual(messages[0][1]['snapshots'][0]['Symbol'], 'AAPL')
+
+    def test_pauses_and_resumes_on_backpressure(self):
+        consumer = FakeConsumer([])
+
+        async def scenario(manager, msg_manager):
+            msg_manager.pending = 100
+            await asyncio.sleep(0.1)
+            paused = manager.paused, manager.get_health().status
+            msg_manager.pending = 0
+            await asyncio.sleep(0.1)
+            return paused, manager.paused
+
+        ((paused, status), resumed), manager = self._run(consumer, scenario, max_pending=50, resume_pending=10)
+        self.assertTrue(paused)
+        self.assertEqual(status, Status.WARNING)
+        self.assertFalse(resumed)
+        self.assertEqual((len(consumer.paused), len(consumer.resumed)), (1, 1))
+        self.assertEqual(manager.get_health().status, Status.ERROR)  # Closed
+
+    def test_gap_requests_a_keyframe_from_the_producer(self):
+        encoder = SnapshotDeltaEncoder(keyframe_interval=1000)
+        requested = []
+
+        class ResyncHandler(BaseHTTPRequestHandler):  # Stands in for the producer's /QueueManager/resync
+            def do_POST(self):
+                sector = self.path.rsplit('/', 1)[-1]
+                requested.append(sector)
+                encoder.request_keyframe(sector)
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), ResyncHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        stream = make_sector_stream(6)
+        values = [encoder.encode(snapshot_list) for snapshot_list in stream[:4]]
+        consumer = FakeConsumer([[FakeMessage(values[i], offset=i) for i in (0, 2, 3)]])  # values[1] was lost
+
+        async def scenario(manager, msg_manager):
+            await asyncio.sleep(0.1)
+            with consumer.lock:  # Produced after the request: a keyframe, then deltas again
+                consumer.batches.append([FakeMessage(encoder.encode(stream[i]), offset=i) for i in (4, 5)])
+            await asyncio.sleep(0.1)
+            return [data for _, data in msg_manager.messages]
+
+        routed, manager = self._run(consumer, scenario,
+                                    resync_url=f'http://127.0.0.1:{server.server_port}/QueueManager/resync')
+        self.assertEqual(requested, ['XLK'])  # Once, although two deltas of the sector were dropped
+        self.assertEqual(routed, [stream[0], stream[4], stream[5]])
+        self.assertEqual((manager.stats['resync_requests'], manager.stats['resync_errors']), (1, 0))
+
+
+class EndlessConsumer(FakeConsumer):
+    """Consumer that always has another batch of SnapshotLists, so it is still fetching when the Kernel stops."""
+
+    def __init__(self, batch_size=5):
+        super().__init__([])
+        self.batch_size = batch_size
+        self.next_offset = 0
+
+    def consume(self, num_messages=1, timeout=-1):
+        time.sleep(0.001)
+        batch = [FakeMessage(json.dumps({'topic': 'out', 'key': f'key-{offset}', 'name': 'XLK',
+                                         'snapshots': []}).encode(), offset=offset)
+                 for offset in range(self.next_offset, self.next_offset + self.batch_size)]
+        self.next_offset += self.batch_size
+        return batch
+
+
+class TestKernelShutdown(unittest.TestCase):
+
+    def test_committed_offsets_were_delivered(self):
+        consumer = EndlessConsumer()
+
+        async def run():
+            kernel = Kernel({'kafka_transporter': {'type': 'local', 'poll_interval': 0.001},
+                             'producer_pool': {'clusters': {'default': {'type': 'local', 'max_retained': 100000}},
+                                               'poll_interval': 0.001},
+                             'kafka_consumer': {'enabled': True, 'topics': ['snapshots'], 'commit_interval': 0.01,
+                                                'poll_timeout': 0.001}})
+            kernel.get_service(KAFKA_CONSUMER_MANAGER)._consumer_factory = lambda conf: consumer
+            await kernel.start()
+            await asyncio.sleep(0.3)
+            transporter = kernel.get_service(QUEUE_MANAGER).kafka_transporter
+            producer = transporter.producer
+            await kernel.close()
+            return {message.key() for message in producer.delivered}
+
+        delivered = asyncio.run(run())
+        committed = consumer.commits[-1][('snapshots', 0)]
+        self.assertGreater(committed, 0)
+        # At least once: every message below the committed offset reached the broker
+        self.assertEqual([offset for offset in range(committed) if f'key-{offset}'.encode() not in delivered], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
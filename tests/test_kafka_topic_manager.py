@@ -0,0 +1,116 @@
+import unittest
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from zzv.msgcore.kafka_topic_manager import KafkaTopicManager, TopicSpec, recommend_partitions, \
+    topic_specs_from_config
+
+
+def done(result=None, error=None):
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+class FakeAdminClient:
+    """Admin client over an in-memory cluster that records every request."""
+
+    def __init__(self, topics):
+        self.topics = topics  # name -> {'partitions': int, 'config': dict}
+        self.calls = []
+
+    def list_topics(self, topic=None, timeout=None):
+        self.calls.append('list_topics')
+        return SimpleNamespace(topics={
+            name: SimpleNamespace(error=None, partitions={
+                i: SimpleNamespace(replicas=[1]) for i in range(state['partitions'])})
+            for name, state in self.topics.items()})
+
+    def describe_configs(self, resources):
+        self.calls.append('describe_configs')
+        return {resource: done({key: SimpleNamespace(name=key, value=value)
+                                for key, value in self.topics[resource.name]['config'].items()})
+                for resource in resources}
+
+    def create_topics(self, new_topics, operation_timeout=None):
+        self.calls.append('create_topics')
+        results = {}
+        for new_topic in new_topics:
+            if new_topic.topic == 'forbidden':
+                results[new_topic.topic] = done(error=RuntimeError("authorization failed"))
+                continue
+            self.topics[new_topic.topic] = {'partitions': new_topic.num_partitions, 'config': dict(new_topic.config)}
+            results[new_topic.topic] = done()
+        return results
+
+    def create_partitions(self, new_partitions, operation_timeout=None):
+        self.calls.append('create_partitions')
+        for new_partition in new_partitions:
+            self.topics[new_partition.topic]['partitions'] = new_partition.new_total_count
+        return {new_partition.topic: done() for new_partition in new_partitions}
+
+    def incremental_alter_configs(self, resources):
+        self.calls.append('incremental_alter_configs')
+        for resource in resources:
+            for entry in resource.incremental_configs:
+                self.topics[resource.name]['config'][entry.name] = entry.value
+        return {resource: done() for resource in resources}
+
+
+class TestKafkaTopicManager(unittest.TestCase):
+
+    def setUp(self):
+        self.admin = FakeAdminClient({
+            'snapshots.XLK': {'partitions': 1, 'config': {'retention.ms': '86400000'}},
+            'snapshots.XLF': {'partitions': 4, 'config': {'retention.ms': '3600000'}},
+        })
+        self.manager = KafkaTopicManager('unused', admin_client=self.admin)
+        self.specs = topic_specs_from_config({
+            'defaults': {'partitions': 2, 'config': {'retention.ms': 86400000}},
+            'topics': [{'name': 'snapshots.{sector}', 'sectors': ['XLK', 'XLF', 'XLE'],
+                        'sector_partitions': {'XLF': 3}},
+                       {'name': 'alerts', 'partitions': 1, 'config': {'cleanup.policy': 'compact'}}]
+        })
+
+    def test_specs_from_config(self):
+        self.assertEqual([(s.name, s.num_partitions) for s in self.specs],
+                         [('snapshots.XLK', 2), ('snapshots.XLF', 3), ('snapshots.XLE', 2), ('alerts', 1)])
+        self.assertEqual(self.specs[3].config, {'retention.ms': '86400000', 'cleanup.policy': 'compact'})
+
+    def test_plan_uses_one_metadata_and_one_describe_request(self):
+        plan = self.manager.plan(self.specs)
+        self.assertEqual(self.admin.calls, ['list_topics', 'describe_configs'])
+        self.assertEqual([spec.name for spec in plan.creates], ['snapshots.XLE', 'alerts'])
+        self.assertEqual(plan.partition_increases, {'snapshots.XLK': 2})
+        self.assertEqual(plan.config_changes, {'snapshots.XLF': {'retention.ms': '86400000'}})
+        self.assertEqual(len(plan.warnings), 1)  # snapshots.XLF cannot shrink from 4 to 3 partitions
+
+    def test_provision_applies_batched_changes_and_converges(self):
+        report = self.manager.provision(self.specs)
+        self.assertEqual(self.admin.calls.count('create_topics'), 1)
+        self.assertEqual(self.admin.calls.count('create_partitions'), 1)
+        self.assertEqual(self.admin.calls.count('incremental_alter_configs'), 1)
+        self.assertEqual(sorted(report['results']['created']), ['alerts', 'snapshots.XLE'])
+        self.assertEqual(report['results']['errors'], {})
+        self.assertTrue(self.manager.plan(self.specs).is_empty())
+
+    def test_dry_run_and_errors(self):
+        report = self.manager.provision([TopicSpec('forbidden', 1)], dry_run=True)
+        self.assertNotIn('results', report)
+        report = self.manager.provision([TopicSpec('forbidden', 1)])
+        self.assertEqual(report['results']['errors'], {'created:forbidden': 'authorization failed'})
+
+    def test_recommend_partitions(self):
+        recommendation = recommend_partitions([900, 800, 1000, 950], target_rate_per_partition=500)
+        self.assertEqual(recommendation['recommended'], 11)
+        recommendation = recommend_partitions([10, 10, 400, 10], target_rate_per_partition=300)
+        self.assertEqual(recommendation['recommended'], 4)
+        self.assertIn('hot keys', recommendation['reason'])
+        self.assertEqual(self.manager.recommend_partitions('snapshots.XLF', [1.0], 100)['recommended'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import unittest
+
+from zzv.common.latency import LatencyTracker
+from zzv.msgcore.transporters.kafka_transporter import KafkaTransporter, DeliveryError
+
+
+class FakeMessage:
+    def __init__(self, topic, partition, offset):
+        self._topic = topic
+        self._partition = partition
+        self._offset = offset
+
+    def topic(self):
+        return self._topic
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+
+class FakeProducer:
+    """Stand-in for confluent_kafka.Producer that acknowledges messages on poll()."""
+
+    def __init__(self, fail_keys=()):
+        self.fail_keys = set(fail_keys)
+        self.pending = []
+        self.lock = threading.Lock()
+        self.offset = 0
+
+    def produce(self, topic, key, value, partition, callback):
+        with self.lock:
+            self.pending.append((topic, key, partition, callback))
+
+    def poll(self, timeout):
+        with self.lock:
+            pending, self.pending = self.pending, []
+        for topic, key, partition, callback in pending:
+            self.offset += 1
+            err = "broker unavailable" if key.decode('utf-8') in self.fail_keys else None
+            callback(err, FakeMessage(topic, partition, self.offset))
+        threading.Event().wait(min(timeout, 0.001))
+        return len(pending)
+
+    def flush(self, timeout):
+        self.poll(0)
+
+
+class TestKafkaTransporterDelivery(unittest.TestCase):
+
+    def setUp(self):
+        self.transporter = KafkaTransporter('localhost:9092', max_in_flight=2, poll_interval=0.001)
+        self.transporter.producer = FakeProducer(fail_keys=['bad'])
+        self.transporter._start_poller()
+
+    def tearDown(self):
+        self.transporter.stop()
+
+    def test_delivery_future_resolves_after_acknowledgement(self):
+        async def run():
+            delivery = await self.transporter.route_message({'topic': 'snapshots', 'key': 'XLK'})
+            return await delivery
+
+        report = asyncio.run(run())
+        self.assertEqual(report['topic'], 'snapshots')
+        self.assertEqual(report['partition'], 0)
+        stats = self.transporter.get_stats()
+        self.assertEqual(stats['messages_delivered'], 1)
+        self.assertEqual(stats['messages_failed'], 0)
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertEqual(stats['delivery_latency_ms']['count'], 1)
+
+    def test_failed_delivery_raises(self):
+        async def run():
+            delivery = await self.transporter.route_message({'topic': 'snapshots', 'key': 'bad'})
+            with self.assertRaises(DeliveryError):
+                await delivery
+
+        asyncio.run(run())
+        self.assertEqual(self.transporter.get_stats()['messages_failed'], 1)
+
+    def test_invalid_message_fails_without_producing(self):
+        async def run():
+            delivery = await self.transporter.route_message({'key': 'XLK'})
+            with self.assertRaises(DeliveryError):
+                await delivery
+
+        asyncio.run(run())
+        self.assertEqual(self.transporter.get_stats()['messages_produced'], 0)
+
+    def test_in_flight_window_is_bounded(self):
+        async def run():
+            deliveries = []
+            for i in range(10):
+                deliveries.append(await self.transporter.route_message({'topic': 'snapshots', 'key': f'k{i}'}))
+                self.assertLessEqual(self.transporter.in_flight, 2)
+            await asyncio.gather(*deliveries)
+
+        asyncio.run(run())
+        self.assertEqual(self.transporter.get_stats()['messages_delivered'], 10)
+
+
+class TestLatencyTracker(unittest.TestCase):
+
+    def test_percentiles(self):
+        tracker = LatencyTracker(max_samples=100)
+        for value in range(1, 101):
+            tracker.record(float(value))
+        percentiles = tracker.percentiles((50, 99))
+        self.assertAlmostEqual(percentiles['p50'], 51.0, delta=1.0)
+        self.assertAlmostEqual(percentiles['p99'], 99.0, delta=1.0)
+        self.assertEqual(tracker.summary()['max'], 100.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+import unittest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ['fastapi', 'uvicorn', 'opentelemetry', 'confluent_kafka', 'requests']
+
+
+def loaded_heavy_modules(statement):
+    """Run an import statement in a fresh interpreter and return the heavy modules it loaded."""
+    snippet = (f"import sys; {statement}; "
+               f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', snippet], cwd=REPO_ROOT, capture_output=True, text=True,
+                            check=True)
+    return [m for m in result.stdout.strip().split(',') if m]
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_package_import_is_side_effect_free(self):
+        self.assertEqual(loaded_heavy_modules("import zzv"), [])
+
+    def test_models_do_not_load_server_or_kafka(self):
+        self.assertEqual(loaded_heavy_modules("import zzv.models.message_types"), [])
+
+    def test_engine_modules_defer_heavy_imports(self):
+        self.assertEqual(loaded_heavy_modules("import zzv.engine.kernel, zzv.engine.zeta_zen_vm"), [])
+
+    def test_lazy_attribute_access(self):
+        self.assertEqual(loaded_heavy_modules("import zzv; zzv.Kernel; zzv.models"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
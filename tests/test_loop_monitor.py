@@ -0,0 +1,99 @@
+import asyncio
+import time
+import unittest
+
+from zzv.common.constants import LOOP_MONITOR
+from zzv.engine.kernel import Kernel
+from zzv.engine.loop_monitor import LoopMonitor
+from zzv.engine.manager import Manager
+from zzv.health.status import Status
+
+
+class BlockingManager(Manager):
+    """Manager doing synchronous work in a coroutine, as process_messages used to."""
+
+    def __init__(self):
+        super().__init__(name="BlockingManager")
+
+    async def start(self):
+        self._running = True
+
+    async def close(self):
+        self._running = False
+
+    async def process(self, seconds):
+        time.sleep(seconds)
+
+    def get_health(self):
+        return None
+
+    def register_endpoints(self, app):
+        pass
+
+
+class FakeKernel:
+    def __init__(self, services):
+        self._services = services
+
+
+class TestLoopMonitor(unittest.TestCase):
+
+    def test_stall_is_captured_and_attributed(self):
+        blocker = BlockingManager()
+        monitor = LoopMonitor(FakeKernel({'blocking_manager': blocker}),
+                              {'interval': 0.01, 'slow_threshold_ms': 50, 'max_lag_ms': 20})
+
+        async def run():
+            await monitor.start()
+            await asyncio.sleep(0.1)
+            await blocker.process(0.3)
+            await asyncio.sleep(0.1)
+            health = monitor.get_health()
+            await monitor.close()
+            return health
+
+        health = asyncio.run(run())
+        self.assertEqual(len(monitor.stalls), 1)
+        stall = monitor.stalls[0]
+        self.assertGreaterEqual(stall['duration_ms'], 250)
+        self.assertEqual(stall['manager'], 'blocking_manager')
+        self.assertIn('time.sleep(seconds)', '\n'.join(stall['stack']))
+        self.assertGreaterEqual(monitor.get_blocking()['blocking_manager']['blocking_ms'], 250)
+        self.assertEqual(health.status, Status.WARNING)
+        self.assertGreaterEqual(monitor.get_lag()['max'], 250)
+        self.assertEqual(sum(monitor.get_lag()['histogram'].values()), monitor.get_lag()['count'])
+
+    def test_idle_loop_has_no_stalls(self):
+        monitor = LoopMonitor(FakeKernel({}), {'interval': 0.01, 'slow_threshold_ms': 100})
+
+        async def run():
+            await monitor.start()
+            await asyncio.sleep(0.2)
+            health = monitor.get_health()
+            await monitor.close()
+            return health
+
+        health = asyncio.run(run())
+        self.assertEqual(health.status, Status.OK)
+        self.assertEqual(list(monitor.stalls), [])
+        self.assertGreater(monitor.get_lag()['count'], 5)
+
+    def test_kernel_registers_the_monitor_when_enabled(self):
+        async def run():
+            kernel = Kernel({'kafka_transporter': {'type': 'local'},
+                             'loop_monitor': {'enabled': True, 'interval': 0.01}})
+            await kernel.start()
+            await asyncio.sleep(0.1)
+            monitor = kernel.get_service(LOOP_MONITOR)
+            owners = set(monitor._module_owners.values())
+            await kernel.close()
+            return monitor, owners
+
+        monitor, owners = asyncio.run(run())
+        self.assertGreater(monitor.get_lag()['count'], 0)
+        self.assertIn('queue_manager', owners)
+        self.assertFalse(monitor._running)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from zzv.common.custom_datetime import CustomDateTime
+from zzv.models.message_types import MessageType
+from zzv.msgcore.handler_registry import HandlerKind, HandlerRegistry
+from zzv.msgcore.msg_manager import MsgManager
+from zzv.msgcore.sharded_dispatcher import ShardedDispatcher
+
+
+def square_value(message):
+    return message['value'] ** 2
+
+
+class FakeKernel:
+    def __init__(self):
+        self.clock = CustomDateTime()
+
+
+class TestHandlerRegistry(unittest.TestCase):
+
+    def test_resolves_legacy_snapshot_list_name(self):
+        registry = HandlerRegistry()
+        registry.register('SnapshotList', square_value)
+        self.assertEqual(len(registry.get_handlers(MessageType.SNAPSHOTS)), 1)
+        self.assertEqual(len(registry.get_handlers('snapshots')), 1)
+
+    def test_detects_kind_and_rejects_duplicates(self):
+        async def on_alert(message):
+            return message
+
+        registry = HandlerRegistry()
+        handler = registry.register(MessageType.ALERTS, on_alert)
+        self.assertEqual(handler.kind, HandlerKind.ASYNC)
+        with self.assertRaises(ValueError):
+            registry.register(MessageType.ALERTS, on_alert)
+        self.assertTrue(registry.unregister(MessageType.ALERTS, handler.name))
+        self.assertEqual(registry.get_handlers(MessageType.ALERTS), ())
+
+
+class TestMsgManagerDispatch(unittest.TestCase):
+
+    def _run(self, scenario, config=None):
+        async def run():
+            manager = MsgManager(FakeKernel(), config or {'dispatch': {'num_shards': 4}})
+            await manager.start()
+            try:
+                return await scenario(manager)
+            finally:
+                await manager.close()
+        return asyncio.run(run())
+
+    def test_messages_with_the_same_key_are_handled_in_order(self):
+        seen = {}
+
+        async def on_chat(message):
+            await asyncio.sleep(0.001 * (message['seq'] % 3))
+            seen.setdefault(message['name'], []).append(message['seq'])
+
+        async def scenario(manager):
+            manager.register_handler(MessageType.CHATS, on_chat)
+            for seq in range(30):
+                for name in ('XLK', 'XLF', 'XLE'):
+                    manager.handle_message(MessageType.CHATS, {'name': name, 'seq': seq})
+            while manager.get_pending_count():
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(0.01)
+
+        self._run(scenario)
+        self.assertEqual(set(seen), {'XLK', 'XLF', 'XLE'})
+        for sequence in seen.values():
+            self.assertEqual(sequence, list(range(30)))
+
+    def test_runs_every_handler_and_counts_failures(self):
+        calls = []
+
+        def first(message):
+            calls.append(('first', message['seq']))
+
+        def failing(message):
+            raise RuntimeError("boom")
+
+        async def scenario(manager):
+            manager.register_handler(MessageType.ALERTS, first)
+            manager.register_handler(MessageType.ALERTS, failing)
+            manager.handle_message('alerts', {'name': 'XLK', 'seq': 1})
+            await asyncio.sleep(0.02)
+            return manager.dispatcher.get_stats()
+
+        stats = self._run(scenario)
+        self.assertEqual(calls, [('first', 1)])
+        self.assertEqual(sum(shard['errors'] for shard in stats['shards']), 1)
+        self.assertEqual(sum(shard['processed'] for shard in stats['shards']), 1)
+
+    def test_dispatch_from_another_thread(self):
+        received = []
+
+        async def scenario(manager):
+            manager.register_handler(MessageType.CHATS, lambda message: received.append(message['seq']),
+                                     name='collect')
+            thread = threading.Thread(target=lambda: [
+                manager.handle_message(MessageType.CHATS, {'name': 'XLK', 'seq': i}) for i in range(50)])
+            thread.start()
+            thread.join()
+            for _ in range(100):
+                if len(received) == 50:
+                    break
+                await asyncio.sleep(0.005)
+
+        self._run(scenario)
+        self.assertEqual(received, list(range(50)))
+
+    def test_counts_dispatches_from_many_threads(self):
+        async def scenario(manager):
+            manager.register_handler(MessageType.CHATS, lambda message: None, name='noop')
+            threads = [threading.Thread(target=lambda: [
+                manager.handle_message(MessageType.CHATS, {'name': 'XLK', 'seq': i}) for i in range(1000)])
+                for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            await asyncio.sleep(0.01)  # Let the loop queue what the threads handed over
+            while manager.get_pending_count():
+                await asyncio.sleep(0.005)
+            return manager.dispatcher.get_stats()
+
+        stats = self._run(scenario)
+        self.assertEqual(sum(shard['dispatched'] for shard in stats['shards']), 8000)
+        self.assertEqual(sum(shard['processed'] for shard in stats['shards']), 8000)
+
+    def test_unknown_message_type_counts_an_error(self):
+        async def scenario(manager):
+            manager.handle_message('no-such-type', {'name': 'XLK'})
+            return manager.stats
+
+        stats = self._run(scenario)
+        self.assertEqual(stats['error_count'], 1)
+        self.assertEqual(stats['messages_handled'], 0)
+
+    def test_cpu_bound_handler_runs_in_executor(self):
+        async def scenario(manager):
+            dispatcher = ShardedDispatcher(num_shards=2, cpu_executor=ThreadPoolExecutor(max_workers=2))
+            await dispatcher.start()
+            handler = HandlerRegistry().register(MessageType.CHATS, square_value, kind=HandlerKind.CPU_BOUND)
+            result = await dispatcher.run_handler(handler, {'value': 12})
+            await dispatcher.stop()
+            return result
+
+        self.assertEqual(self._run(scenario), 144)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import sys
+import threading
+import unittest
+
+from zzv.msgcore.partitioners.consistent_hash_partitioner import murmur2, ConsistentHashPartitioner
+from zzv.msgcore.partitioners.explicit_map_partitioner import ExplicitMapPartitioner
+from zzv.msgcore.partitioners.hot_key_partitioner import HotKeySplittingPartitioner
+from zzv.msgcore.partitioners.partitioner_factory import build_partitioner
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMurmur2(unittest.TestCase):
+
+    def test_matches_kafka_java_client(self):
+        # Reference values from Kafka's UtilsTest.testMurmur2
+        cases = {
+            b'21': -973932308,
+            b'foobar': -790332482,
+            b'a-little-bit-long-string': -985981536,
+            b'a-little-bit-longer-string': -1486304829,
+            b'lkjh234lh9fiuh90y23oiuhsafujhadof229phr9h19h89h8': -58897971,
+            b'abc': 479470107,
+        }
+        for data, expected in cases.items():
+            self.assertEqual(murmur2(data), expected)
+
+    def test_consistent_hash_is_stable_and_in_range(self):
+        partitioner = ConsistentHashPartitioner(11)
+        for key in ['NVDA', 'SMCI', 'AAPL', 'XLK']:
+            partition = partitioner.get_partition(key)
+            self.assertTrue(0 <= partition < 11)
+            self.assertEqual(partition, ConsistentHashPartitioner(11).get_partition(key))
+
+
+class TestExplicitMapPartitioner(unittest.TestCase):
+
+    def test_mapped_and_fallback_keys(self):
+        partitioner = ExplicitMapPartitioner(11, {'XLK': 0, 'XLV': 1})
+        self.assertEqual(partitioner.get_partition('XLK'), 0)
+        self.assertEqual(partitioner.get_partition('XLV'), 1)
+        self.assertEqual(partitioner.get_partition('NVDA'), ConsistentHashPartitioner(11).get_partition('NVDA'))
+
+    def test_rejects_out_of_range_partition(self):
+        with self.assertRaises(ValueError):
+            ExplicitMapPartitioner(4, {'XLRE': 10})
+
+
+class TestHotKeySplittingPartitioner(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.partitioner = HotKeySplittingPartitioner(
+            ExplicitMapPartitioner(11, {'XLK': 0, 'XLV': 1, 'XLF': 2}),
+            split_factor=4, share_threshold=0.5, window_seconds=1.0, min_messages=10,
+            ordered_keys=['XLF'], clock=self.clock
+        )
+
+    def _send_window(self, counts):
+        partitions = {}
+        for key, count in counts.items():
+            partitions[key] = {self.partitioner.get_partition(key) for _ in range(count)}
+        self.clock.now += 1.0
+        return partitions
+
+    def test_hot_key_is_spread_over_sub_partitions(self):
+        self._send_window({'XLK': 90, 'XLV': 10})
+        partitions = self._send_window({'XLK': 90, 'XLV': 10})
+        self.assertEqual(partitions['XLK'], {0, 1, 2, 3})
+        self.assertEqual(partitions['XLV'], {1})
+        self.assertIn('XLK', self.partitioner.get_stats()['hot_keys'])
+
+    def test_ordered_key_is_never_split(self):
+        self._send_window({'XLF': 90, 'XLV': 10})
+        partitions = self._send_window({'XLF': 90, 'XLV': 10})
+        self.assertEqual(partitions['XLF'], {2})
+
+    def test_skew_drops_after_splitting(self):
+        self._send_window({'XLK': 100})
+        skew_before = self.partitioner.get_skew()
+        self.partitioner.reset_stats()
+        self._send_window({'XLK': 100})
+        self.assertLess(self.partitioner.get_skew(), skew_before)
+
+    def test_concurrent_callers_keep_the_round_robin_exact(self):
+        self._send_window({'XLK': 90, 'XLV': 10})
+        self.partitioner.reset_stats()
+        self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+        sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+
+        def send():
+            for _ in range(10000):
+                self.partitioner.get_partition('XLK')
+
+        threads = [threading.Thread(target=send) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.partitioner.partition_counts[:4], [20000] * 4)
+        self.assertEqual(self.partitioner.split_messages, 60000)
+
+
+class TestPartitionerFactory(unittest.TestCase):
+
+    def test_default_uses_sector_map(self):
+        partitioner = build_partitioner(None, 11, default_map={'XLK': 0})
+        self.assertIsInstance(partitioner, ExplicitMapPartitioner)
+        self.assertEqual(partitioner.get_partition('XLK'), 0)
+
+    def test_hot_keys_wraps_partitioner(self):
+        partitioner = build_partitioner({'type': 'consistent_hash', 'hot_keys': {'enabled': True}}, 11)
+        self.assertIsInstance(partitioner, HotKeySplittingPartitioner)
+        self.assertIsInstance(partitioner.inner, ConsistentHashPartitioner)
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            build_partitioner({'type': 'round_robin'}, 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+from zzv.common.constants import PRODUCER_POOL, QUEUE_MANAGER
+from zzv.engine.kernel import Kernel
+from zzv.msgcore.producer_pool import ProducerPool
+from zzv.msgcore.transporters.local_transporter import LocalTransporter
+
+LOCAL_CLUSTERS = {'clusters': {'default': {'type': 'local'}, 'backup': {'type': 'local'}},
+                  'poll_interval': 0.01}
+
+
+class TestProducerPool(unittest.TestCase):
+
+    def test_transporters_share_one_producer_per_cluster_and_profile(self):
+        pool = ProducerPool(LOCAL_CLUSTERS)
+        first, second = (LocalTransporter(producer_pool=pool) for _ in range(2))
+        backup = LocalTransporter(producer_pool=pool, cluster='backup')
+
+        async def run():
+            for transporter in (first, second, backup):
+                transporter.start()
+            deliveries = [await transporter.route_message({'topic': 'snapshots', 'key': 'XLK', 'seq': i})
+                          for i, transporter in enumerate((first, second, backup))]
+            return [(await asyncio.wait_for(delivery, 1))['partition'] for delivery in deliveries]
+
+        self.assertEqual(asyncio.run(run()), [0, 0, 0])
+        self.assertIs(first.producer, second.producer)
+        self.assertIsNot(first.producer, backup.producer)
+        self.assertEqual(len(first.producer.delivered), 2)
+        self.assertEqual(pool.stats['producers_created'], 2)
+        self.assertEqual(sorted(p['borrowers'] for p in pool.get_stats()['producers']), [1, 2])
+
+        first.stop()
+        self.assertEqual(pool.stats['producers_closed'], 0)  # Still borrowed by the second transporter
+        second.stop()
+        backup.stop()
+        self.assertEqual((pool.stats['producers_closed'], pool.get_stats()['producers']), (2, []))
+
+    def test_different_settings_get_different_producers(self):
+        pool = ProducerPool(LOCAL_CLUSTERS)
+        plain = pool.acquire(settings={'acks': 'all'})
+        idempotent = pool.acquire(settings={'acks': 'all', 'enable.idempotence': True})
+        self.assertIsNot(plain.producer, idempotent.producer)
+        plain.release()
+        plain.release()  # Releasing twice is harmless
+        idempotent.release()
+        self.assertEqual(pool.stats['producers_closed'], 2)
+
+    def test_unknown_cluster_or_profile(self):
+        pool = ProducerPool(LOCAL_CLUSTERS)
+        with self.assertRaises(KeyError):
+            pool.acquire(cluster='missing')
+        with self.assertRaises(KeyError):
+            pool.acquire(profile='missing')
+
+    def test_kernel_transporter_borrows_from_the_pool(self):
+        async def run():
+            kernel = Kernel({'kafka_transporter': {'type': 'local', 'poll_interval': 0.001}})
+            await kernel.start()
+            await asyncio.sleep(0.01)
+            pool = kernel.get_service(PRODUCER_POOL)
+            transporter = kernel.get_service(QUEUE_MANAGER).kafka_transporter
+            lease = pool.acquire(settings=transporter.producer_conf, borrower='test')
+            shared = lease.producer is transporter.producer
+            lease.release()
+            stats = pool.get_stats()
+            await kernel.close()
+            return shared, stats, pool.stats
+
+        shared, stats, closed_stats = asyncio.run(run())
+        self.assertTrue(shared)
+        self.assertEqual([(p['cluster'], p['borrowers']) for p in stats['producers']], [('default', 1)])
+        self.assertEqual(closed_stats['producers_closed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from zzv.common.constants import PROFILING_MANAGER
+from zzv.common.profiling import task_stacks
+from zzv.engine.kernel import Kernel
+from zzv.engine.profiling_manager import ProfilerBusyError, ProfilingManager
+
+
+def spin_until(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def build_sorted_lists(count):
+    return [sorted(range(200, 0, -1)) for _ in range(count)]
+
+
+class TestProfilingManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = ProfilingManager({'max_seconds': 5, 'sample_interval': 0.001})
+
+    def tearDown(self):
+        self.manager.stop_tracemalloc()
+
+    def test_sampled_profile_covers_other_threads(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=spin_until, args=(stop,), name='spinner')
+        worker.start()
+        try:
+            collapsed = asyncio.run(self.manager.profile_cpu(0.2))
+        finally:
+            stop.set()
+            worker.join()
+        spinner = [line for line in collapsed.splitlines() if line.startswith('spinner;')]
+        self.assertTrue(spinner)
+        self.assertIn('test_profiling.py:spin_until', spinner[0])
+        self.assertGreater(int(spinner[0].rsplit(' ', 1)[1]), 10)
+
+    def test_pstats_profile_of_the_event_loop(self):
+        async def run():
+            async def busy():
+                deadline = time.perf_counter() + 0.2
+                while time.perf_counter() < deadline:
+                    build_sorted_lists(10)
+                    await asyncio.sleep(0)
+            task = asyncio.create_task(busy())
+            output = await self.manager.profile_cpu(0.1, 'pstats', limit=20)
+            await task
+            return output
+
+        output = asyncio.run(run())
+        self.assertIn('cumulative', output)
+        self.assertIn('build_sorted_lists', output)
+
+    def test_one_cpu_profile_at_a_time(self):
+        async def run():
+            first = asyncio.create_task(self.manager.profile_cpu(0.1))
+            await asyncio.sleep(0.01)
+            with self.assertRaises(ProfilerBusyError):
+                await self.manager.profile_cpu(0.1)
+            await first
+
+        asyncio.run(run())
+        with self.assertRaises(ValueError):
+            asyncio.run(self.manager.profile_cpu(10))
+
+    def test_tracemalloc_snapshot_diff(self):
+        with self.assertRaises(RuntimeError):
+            self.manager.take_snapshot()
+        self.manager.start_tracemalloc()
+        first = self.manager.take_snapshot()
+        kept = build_sorted_lists(500)
+        second = self.manager.take_snapshot()
+        diff = self.manager.diff_snapshots(limit=5)
+        self.assertEqual((first['id'], second['id']), (1, 2))
+        self.assertIn('test_profiling.py', diff[0]['location'])
+        self.assertGreater(diff[0]['size_diff_kb'], 100)
+        self.assertEqual(len(kept), 500)
+        self.assertFalse(self.manager.stop_tracemalloc()['tracing'])
+
+    def test_dumps_task_stacks(self):
+        async def run():
+            async def waiter():
+                await asyncio.sleep(10)
+            task = asyncio.create_task(waiter(), name='waiter-task')
+            await asyncio.sleep(0)
+            stacks = task_stacks()
+            task.cancel()
+            return stacks
+
+        waiter = next(task for task in asyncio.run(run()) if task['name'] == 'waiter-task')
+        self.assertIn('waiter', waiter['coroutine'])
+        self.assertIn('await asyncio.sleep(10)', waiter['stack'][-1])
+
+
+class TestProfilingEndpoints(unittest.TestCase):
+
+    def test_guarded_by_host_and_token(self):
+        manager = ProfilingManager({'allowed_hosts': ['testclient'], 'token': 'secret', 'max_seconds': 1})
+        app = FastAPI()
+        manager.register_endpoints(app)
+        client = TestClient(app)
+
+        self.assertEqual(client.get('/ProfilingManager/tasks').status_code, 403)
+        headers = {'X-Debug-Token': 'secret'}
+        self.assertEqual(client.get('/ProfilingManager/tasks', headers=headers).status_code, 200)
+        response = client.post('/ProfilingManager/cpu?seconds=0.05', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/plain', response.headers['content-type'])
+        self.assertEqual(client.post('/ProfilingManager/cpu?seconds=5', headers=headers).status_code, 400)
+        self.assertEqual(client.get('/ProfilingManager/tracemalloc/diff', headers=headers).status_code, 404)
+        self.assertEqual(manager.stats['rejected'], 1)
+
+        other_host = ProfilingManager({'allowed_hosts': ['10.0.0.1']})
+        app = FastAPI()
+        other_host.register_endpoints(app)
+        self.assertEqual(TestClient(app).get('/ProfilingManager/tasks').status_code, 403)
+
+    def test_only_registered_when_enabled(self):
+        with self.assertRaises(SystemExit):  # get_service exits for unregistered services
+            Kernel({'kafka_transporter': {'type': 'local'}}).get_service(PROFILING_MANAGER)
+        kernel = Kernel({'kafka_transporter': {'type': 'local'}, 'profiling': {'enabled': True}})
+        self.assertIsInstance(kernel.get_service(PROFILING_MANAGER), ProfilingManager)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import queue
+import threading
+import unittest
+
+from zzv.msgcore.conflating_queue import ConflatingQueue, field_key
+from zzv.msgcore.queue_manager import PrioritizedMessage, QueueManager
+
+
+def drain(sending_queue):
+    items = []
+    while not sending_queue.empty():
+        items.append(sending_queue.get().message_data)
+    return items
+
+
+class TestConflatingQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = ConflatingQueue(field_key('name'))
+        self.sequence = 0
+
+    def put(self, message, priority=0):
+        self.sequence += 1
+        self.queue.put(PrioritizedMessage(priority, message, self.sequence))
+
+    def test_latest_message_keeps_the_original_position(self):
+        self.put({'name': 'XLK', 'v': 1})
+        self.put({'name': 'XLF', 'v': 1})
+        self.put({'name': 'XLK', 'v': 2})
+        self.put({'name': 'XLE', 'v': 1})
+        self.put({'name': 'XLK', 'v': 3})
+        self.assertEqual(self.queue.qsize(), 3)
+        self.assertEqual(self.queue.conflated, 2)
+        self.assertEqual(drain(self.queue), [{'name': 'XLK', 'v': 3}, {'name': 'XLF', 'v': 1},
+                                             {'name': 'XLE', 'v': 1}])
+
+    def test_key_is_queued_again_once_sent(self):
+        self.put({'name': 'XLK', 'v': 1})
+        self.assertEqual(drain(self.queue), [{'name': 'XLK', 'v': 1}])
+        self.put({'name': 'XLK', 'v': 2})
+        self.put({'name': 'XLK', 'v': 3})
+        self.assertEqual(drain(self.queue), [{'name': 'XLK', 'v': 3}])
+
+    def test_messages_without_key_are_not_conflated(self):
+        self.put('raw')
+        self.put('raw')
+        self.put({'v': 1})
+        self.assertEqual(drain(self.queue), ['raw', 'raw', {'v': 1}])
+
+    def test_concurrent_producers(self):
+        def produce(offset):
+            for i in range(1000):
+                self.queue.put(PrioritizedMessage(0, {'name': f'S{i % 10}', 'v': offset + i}, offset + i))
+
+        threads = [threading.Thread(target=produce, args=(n * 1000,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.queue.qsize(), 10)
+        self.assertEqual(self.queue.conflated, 3990)
+        self.assertEqual(len(drain(self.queue)), 10)
+        with self.assertRaises(queue.Empty):
+            self.queue.get_nowait()
+
+
+class TestQueueManagerConflation(unittest.TestCase):
+
+    def test_fifo_without_conflation(self):
+        manager = QueueManager(None, 'local', {'type': 'local'})
+        for i in range(20):
+            manager.handle_message('SnapshotList', {'name': 'XLK', 'seq': i})
+        self.assertEqual([m['seq'] for m in drain(manager.sending_queue)], list(range(20)))
+        self.assertEqual(manager.get_conflation_stats()['conflation_ratio'], 1.0)
+
+    def test_conflation_ratio(self):
+        manager = QueueManager(None, 'local', {'type': 'local'}, {'conflation': {'enabled': True}})
+        for i in range(100):
+            manager.handle_message('SnapshotList', {'name': ['XLK', 'XLF', 'XLE', 'XLU'][i % 4], 'seq': i})
+        self.assertEqual(manager.get_queue_size(), 4)
+        stats = manager.get_conflation_stats()
+        self.assertEqual(stats['messages_conflated'], 96)
+        self.assertEqual(stats['conflation_ratio'], 25.0)
+        self.assertEqual([m['seq'] for m in drain(manager.sending_queue)], [96, 97, 98, 99])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import unittest
+
+from zzv.msgcore.queue_manager import QueueManager
+from zzv.msgcore.transporters.local_transporter import LocalProducer
+
+
+class StalledPartitionProducer(LocalProducer):
+    """LocalProducer that never acknowledges messages for one partition, like a slow partition leader."""
+
+    def __init__(self, stalled_partition):
+        super().__init__()
+        self.stalled_partition = stalled_partition
+        self.stalled = []
+
+    def produce(self, topic, key=None, value=None, partition=0, callback=None):
+        if partition == self.stalled_partition:
+            self.stalled.append(value)
+        else:
+            super().produce(topic, key=key, value=value, partition=partition, callback=callback)
+
+
+def message(key, seq):
+    return {'topic': 'snapshots', 'key': key, 'seq': seq}
+
+
+class TestQueueSharding(unittest.TestCase):
+
+    def _run(self, scenario, sharding, **transporter_config):
+        manager = QueueManager(None, 'local', {'type': 'local', **transporter_config},
+                               {'sharding': {'enabled': True, **sharding}, 'close_timeout': 0.1})
+
+        async def run():
+            task = asyncio.create_task(manager.start())
+            await asyncio.sleep(0.01)
+            try:
+                return await scenario(manager)
+            finally:
+                await manager.close()
+                await asyncio.wait_for(task, 1)
+        return asyncio.run(run()), manager
+
+    def test_slow_partition_does_not_stall_the_others(self):
+        async def scenario(manager):
+            manager.kafka_transporter.producer = StalledPartitionProducer(stalled_partition=0)  # XLK
+            for seq in range(10):
+                manager.handle_message('SnapshotList', message('XLK', seq))
+                manager.handle_message('SnapshotList', message('XLF', seq))
+            await asyncio.sleep(0.3)
+            return manager.get_shard_stats(), manager.kafka_transporter.producer
+
+        (stats, producer), _ = self._run(scenario, {'max_in_flight_per_shard': 3})
+        xlk, xlf = stats[0], stats[2]
+        self.assertEqual((xlk['in_flight'], xlk['depth'], xlk['sent']), (3, 7, 0))
+        self.assertEqual((xlf['in_flight'], xlf['depth'], xlf['sent']), (0, 0, 10))
+        self.assertEqual(xlf['latency_ms']['count'], 10)
+        self.assertEqual([m.key() for m in producer.delivered], [b'XLF'] * 10)
+        self.assertEqual([json.loads(value)['seq'] for value in producer.stalled], [0, 1, 2])
+
+    def test_order_is_kept_within_a_partition(self):
+        async def scenario(manager):
+            for seq in range(100):
+                manager.handle_message('SnapshotList', message(['XLK', 'XLF', 'XLE'][seq % 3], seq))
+            await asyncio.sleep(0.3)
+            return list(manager.kafka_transporter.producer.delivered)
+
+        delivered, manager = self._run(scenario, {'quantum': 4})
+        self.assertEqual(len(delivered), 100)
+        self.assertEqual(manager.get_queue_size(), 0)
+        for key in (b'XLK', b'XLF', b'XLE'):
+            sequence = [json.loads(m.value())['seq'] for m in delivered if m.key() == key]
+            self.assertEqual(sequence, sorted(sequence))
+            self.assertEqual(len(sequence), 34 if key == b'XLK' else 33)
+        self.assertEqual({m.partition() for m in delivered if m.key() == b'XLF'}, {2})
+        self.assertEqual(manager.stats['messages_enqueued'], 100)
+
+    def test_shard_windows_follow_max_in_flight_on_reload(self):
+        async def scenario(manager):
+            manager.kafka_transporter.producer = StalledPartitionProducer(stalled_partition=0)  # XLK
+            for seq in range(10):
+                manager.handle_message('SnapshotList', message('XLK', seq))
+            await asyncio.sleep(0.1)
+            in_flight = [manager.get_shard_stats()[0]['in_flight']]
+            for max_in_flight in (55, 22, 44):  # 5, then 2 and 4 per shard
+                manager.apply_config({'max_in_flight': max_in_flight})
+                await asyncio.sleep(0.1)
+                in_flight.append(manager.get_shard_stats()[0]['in_flight'])
+            return in_flight
+
+        in_flight, manager = self._run(scenario, {}, max_in_flight=33)
+        self.assertEqual(in_flight, [3, 5, 5, 5])  # Shrinking retires slots as deliveries complete
+        self.assertEqual([shard.max_in_flight for shard in manager.shards], [4] * 11)
+
+    def test_delta_encoded_sectors_stay_on_one_shard(self):
+        transporter_config = {'type': 'local', 'snapshot_encoding': {'mode': 'delta'}}
+        manager = QueueManager(None, 'local', transporter_config, {'sharding': {'enabled': True}})
+        self.assertEqual(manager.shard_key_field, 'name')
+        with self.assertRaises(ValueError):
+            QueueManager(None, 'local', transporter_config, {'sharding': {'enabled': True, 'key_field': 'key'}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+from zzv.common.constants import MSG_MANAGER, QUEUE_MANAGER, REPLAY_MANAGER
+from zzv.engine.kernel import Kernel
+from zzv.replay.replay_manager import parse_replay_speed
+from zzv.replay.snapshot_readers import write_snapshot_recording, read_snapshot_recording
+
+START_MS = 1724427306000  # 2024-08-23 15:35:06 UTC
+
+
+def make_snapshot_lists(count, step_ms=1000):
+    return [{
+        'topic': 'snapshots',
+        'key': f'key-{i}',
+        'time': START_MS + i * step_ms,
+        'name': 'XLK',
+        'snapshots': [{'Timestamp': '2024-08-23T15:35:06.000Z', 'zb1BarsC9': 5.0, 'zb1SideC10': -1.0,
+                       'zb1MarkC11': 134.5, 'zb1PnLC12': 0.5, 'Symbol': 'NVDA'}]
+    } for i in range(count)]
+
+
+async def run_replay(files, speed):
+    kernel = Kernel({
+        'kafka_transporter': {'type': 'local', 'poll_interval': 0.001},
+        'replay': {'enabled': True, 'files': files, 'speed': speed}
+    })
+    await kernel.start()
+    replay_manager = kernel.get_service(REPLAY_MANAGER)
+    transporter = kernel.get_service(QUEUE_MANAGER).kafka_transporter
+    expected = sum(1 for path in files for _ in read_snapshot_recording(path))
+    deadline = time.perf_counter() + 10
+    while (not replay_manager.finished or transporter.stats['messages_delivered'] < expected) \
+            and time.perf_counter() < deadline:
+        await asyncio.sleep(0.005)
+    await kernel.close()
+    return kernel, replay_manager, transporter
+
+
+class TestReplayManager(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name, snapshot_lists):
+        path = os.path.join(self.directory.name, name)
+        write_snapshot_recording(path, snapshot_lists)
+        return path
+
+    def test_flatbuffers_round_trip(self):
+        snapshot_lists = make_snapshot_lists(3)
+        path = self._write('day.fb', snapshot_lists)
+        decoded = list(read_snapshot_recording(path))
+        self.assertEqual([s['key'] for s in decoded], [s['key'] for s in snapshot_lists])
+        self.assertEqual(decoded[2]['snapshots'][0]['Symbol'], 'NVDA')
+
+    def test_full_speed_replay_drives_pipeline_and_clock(self):
+        files = [self._write('part1.jsonl', make_snapshot_lists(200, step_ms=60000)),
+                 self._write('part2.fb', make_snapshot_lists(50, step_ms=60000)[-1:])]
+        kernel, replay_manager, transporter = asyncio.run(run_replay(files, 'max'))
+
+        self.assertTrue(replay_manager.finished)
+        self.assertEqual(replay_manager.stats['messages_replayed'], 201)
+        self.assertEqual(transporter.stats['messages_delivered'], 201)
+        # The shared clock follows the recorded time, and MsgManager timestamps use it
+        last_time = datetime.fromtimestamp((START_MS + 199 * 60000) / 1000)
+        self.assertEqual(kernel.clock.now(), last_time)
+        self.assertTrue(kernel.clock.is_simulated())
+        self.assertEqual(kernel.get_service(MSG_MANAGER).last_message_time, last_time)
+        # 199 minutes of recorded time replay far faster than real time
+        self.assertGreater(replay_manager.get_speedup(), 1000)
+
+    def test_paced_replay(self):
+        files = [self._write('paced.jsonl', make_snapshot_lists(3, step_ms=1000))]
+        started = time.perf_counter()
+        _, replay_manager, _ = asyncio.run(run_replay(files, '20x'))
+        elapsed = time.perf_counter() - started
+        self.assertGreaterEqual(elapsed, 0.1)  # 2 seconds of recorded time at 20x
+        self.assertAlmostEqual(replay_manager.get_speedup(), 20, delta=5)
+
+    def test_parse_replay_speed(self):
+        self.assertIsNone(parse_replay_speed('max'))
+        self.assertEqual(parse_replay_speed('realtime'), 1.0)
+        self.assertEqual(parse_replay_speed('60x'), 60.0)
+        self.assertEqual(parse_replay_speed(10), 10.0)
+        with self.assertRaises(ValueError):
+            parse_replay_speed(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
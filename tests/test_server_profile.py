@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from zzv.engine.responses import OrjsonResponse
+from zzv.engine.server_profile import ServerProfile
+from zzv.engine.zeta_zen_vm import ZetaZenVm
+
+
+def only_h11_installed(module):
+    return module == 'h11'
+
+
+class TestServerProfile(unittest.TestCase):
+
+    def test_auto_prefers_the_fast_stack(self):
+        profile = ServerProfile({}, available=lambda module: True)
+        self.assertEqual((profile.loop, profile.http, profile.json_response), ('uvloop', 'httptools', 'orjson'))
+        self.assertEqual(profile.warnings, [])
+
+    def test_falls_back_when_not_installed(self):
+        profile = ServerProfile({'loop': 'uvloop', 'http': 'auto', 'json_response': 'auto'},
+                                available=only_h11_installed)
+        self.assertEqual((profile.loop, profile.http, profile.json_response), ('asyncio', 'h11', 'default'))
+        self.assertEqual(len(profile.warnings), 1)  # Only the explicit request is worth a warning
+        self.assertIn("server.loop 'uvloop' is not installed", profile.warnings[0])
+        self.assertEqual(profile.report()[-1][0], logging.WARNING)
+
+    def test_uvicorn_options(self):
+        profile = ServerProfile({'loop': 'asyncio', 'http': 'h11', 'access_log': True, 'timeout_keep_alive': 30,
+                                 'backlog': 4096, 'limit_concurrency': 500})
+        self.assertEqual(profile.uvicorn_options(), {
+            'loop': 'asyncio', 'http': 'h11', 'access_log': True, 'log_level': 'info', 'timeout_keep_alive': 30,
+            'backlog': 4096, 'limit_concurrency': 500})
+        with self.assertRaises(ValueError):
+            ServerProfile({'loop': 'trio'})
+
+    def test_orjson_response_renders_numpy_and_non_string_keys(self):
+        body = OrjsonResponse({0: np.float64(1.5), 'values': np.arange(3)}).body
+        self.assertEqual(body, b'{"0":1.5,"values":[0,1,2]}')
+
+    def test_endpoints_use_the_profile_response_class(self):
+        engine = ZetaZenVm(config={'tracing': {'enabled': False}, 'kafka_transporter': {'type': 'local'},
+                                   'server': {'json_response': 'orjson', 'loop': 'asyncio', 'http': 'h11'}})
+        self.assertIs(engine.app.router.default_response_class, OrjsonResponse)
+        client = TestClient(engine.app)
+        profile = client.get('/server/profile').json()
+        self.assertEqual((profile['loop'], profile['json_response'], profile['access_log']),
+                         ('asyncio', 'orjson', False))
+        self.assertIn('messages_enqueued', client.get('/QueueManager/stats').json())
+
+    def test_run_uses_the_profile_loop(self):
+        class UvloopLoop(asyncio.SelectorEventLoop):  # Stands in for uvloop.Loop, which may not be installed
+            __module__ = 'uvloop'
+
+        loops = []
+
+        async def serve(server, sockets=None):
+            loops.append(asyncio.get_running_loop())
+
+        engine = ZetaZenVm(config={'tracing': {'enabled': False}, 'kafka_transporter': {'type': 'local'}})
+        engine.server_profile = ServerProfile({'loop': 'uvloop', 'http': 'h11'}, available=lambda module: True)
+        with mock.patch.dict('sys.modules', uvloop=SimpleNamespace(new_event_loop=UvloopLoop)), \
+                mock.patch('uvicorn.Server.serve', serve):
+            engine.run('127.0.0.1', 0)
+            self.assertIsInstance(loops[-1], UvloopLoop)
+            self.assertEqual((engine.server_profile.loop, engine.server_profile.warnings), ('uvloop', []))
+
+            # Awaited on the caller's loop, the profile reports that loop instead
+            asyncio.run(engine.run_async('127.0.0.1', 0))
+        self.assertNotIsInstance(loops[-1], UvloopLoop)
+        self.assertEqual(engine.server_profile.to_dict()['loop'], 'asyncio')
+        self.assertIn("server.loop 'uvloop' was not applied", engine.server_profile.warnings[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
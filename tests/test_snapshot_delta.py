@@ -0,0 +1,156 @@
+import asyncio
+import json
+import random
+import struct
+import sys
+import threading
+import unittest
+import uuid
+
+from zzv.msgcore.codecs.snapshot_delta import DeltaDecodeError, KIND_DELTA, KIND_KEYFRAME, SnapshotDeltaDecoder, \
+    SnapshotDeltaEncoder, is_delta_encoded
+from zzv.msgcore.transporters.local_transporter import LocalTransporter
+
+SYMBOLS = ['AAPL', 'MSFT', 'NVDA', 'AVGO', 'ORCL', 'CRM', 'ADBE', 'AMD', 'CSCO', 'ACN', 'INTC']
+
+
+def make_sector_stream(count, changes_per_tick=1, seed=7):
+    rng = random.Random(seed)
+    rows = [{'Timestamp': '2024-08-23T15:35:00.000Z', 'zb1BarsC9': 5.0, 'zb1SideC10': -1.0,
+             'zb1MarkC11': 100.0 + i, 'zb1PnLC12': 0.5, 'Symbol': symbol} for i, symbol in enumerate(SYMBOLS)]
+    stream = []
+    for tick in range(count):
+        for _ in range(changes_per_tick):
+            row = rng.choice(rows)
+            row['zb1MarkC11'] = round(row['zb1MarkC11'] + rng.uniform(-1, 1), 2)
+            if tick % 10 == 0:
+                row['Timestamp'] = f'2024-08-23T15:{36 + tick // 10:02d}:00.000Z'
+        stream.append({'key': f'key-{tick}', 'time': 1724427306000 + tick * 1000, 'name': 'XLK',
+                       'snapshots': [dict(row) for row in rows]})
+    return stream
+
+
+def kind_of(value):
+    return value[2]
+
+
+class TestSnapshotDeltaCodec(unittest.TestCase):
+
+    def test_reconstructs_every_message(self):
+        encoder = SnapshotDeltaEncoder(keyframe_interval=20)
+        decoder = SnapshotDeltaDecoder()
+        for snapshot_list in make_sector_stream(100):
+            value = encoder.encode(snapshot_list)
+            self.assertTrue(is_delta_encoded(value))
+            self.assertEqual(decoder.decode(value), snapshot_list)
+        self.assertEqual(encoder.stats['keyframes'], 5)
+        self.assertEqual(decoder.stats['deltas'], 95)
+
+    def test_deltas_are_much_smaller_than_json(self):
+        encoder = SnapshotDeltaEncoder(keyframe_interval=100)
+        stream = make_sector_stream(100)
+        encoded = sum(len(encoder.encode(snapshot_list)) for snapshot_list in stream)
+        as_json = sum(len(json.dumps(snapshot_list)) for snapshot_list in stream)
+        self.assertLess(encoded * 10, as_json)
+
+    def test_symbol_change_forces_a_keyframe(self):
+        encoder = SnapshotDeltaEncoder()
+        first, second = make_sector_stream(2)
+        second['snapshots'] = second['snapshots'][:-1]
+        self.assertEqual(kind_of(encoder.encode(first)), KIND_KEYFRAME)
+        self.assertEqual(kind_of(encoder.encode(second)), KIND_KEYFRAME)
+
+    def test_gap_triggers_resync_until_keyframe(self):
+        resyncs = []
+        encoder = SnapshotDeltaEncoder(keyframe_interval=1000)
+        decoder = SnapshotDeltaDecoder(on_resync=resyncs.append)
+        stream = make_sector_stream(6)
+        values = [encoder.encode(snapshot_list) for snapshot_list in stream[:4]]
+
+        self.assertEqual(decoder.decode(values[0]), stream[0])
+        self.assertIsNone(decoder.decode(values[2]))  # values[1] was lost
+        self.assertIsNone(decoder.decode(values[3]))
+        self.assertEqual(resyncs, ['XLK'])
+
+        for sector in resyncs:
+            encoder.request_keyframe(sector)
+        keyframe = encoder.encode(stream[4])
+        self.assertEqual(kind_of(keyframe), KIND_KEYFRAME)
+        self.assertEqual(decoder.decode(keyframe), stream[4])
+        delta = encoder.encode(stream[5])
+        self.assertEqual(kind_of(delta), KIND_DELTA)
+        self.assertEqual(decoder.decode(delta), stream[5])
+        self.assertEqual(decoder.stats['gaps'], 1)
+        self.assertEqual(decoder.stats['dropped'], 2)
+
+    def test_concurrent_encodes_of_a_sector_are_serialized(self):
+        encoder = SnapshotDeltaEncoder(keyframe_interval=10000)
+        stream = make_sector_stream(2000)
+        values = []
+        self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+        sys.setswitchinterval(1e-6)  # Switch threads as often as possible, mid-encode included
+
+        def encode(snapshot_lists):
+            values.extend(encoder.encode(snapshot_list) for snapshot_list in snapshot_lists)
+
+        threads = [threading.Thread(target=encode, args=(stream[i::8],)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # In sequence order, every delta applies to the rows of the message encoded just before it
+        values.sort(key=lambda value: struct.unpack_from('<I', value, 3)[0])
+        decoder = SnapshotDeltaDecoder()
+        decoded = [decoder.decode(value) for value in values]
+        self.assertEqual((decoder.stats['gaps'], encoder.stats['keyframes']), (0, 1))
+        decoded.sort(key=lambda snapshot_list: snapshot_list['time'])
+        self.assertEqual(sum(d != s for d, s in zip(decoded, stream)), 0)
+
+    def test_rejects_other_values(self):
+        with self.assertRaises(DeltaDecodeError):
+            SnapshotDeltaDecoder().decode(b'{"key": "x"}')
+        value = SnapshotDeltaEncoder().encode(make_sector_stream(1)[0])
+        with self.assertRaises(DeltaDecodeError):
+            SnapshotDeltaDecoder().decode(value[:30])
+
+    def test_transporter_sends_delta_values(self):
+        async def run():
+            transporter = LocalTransporter(poll_interval=0.001, snapshot_encoding={'mode': 'delta'})
+            transporter.start()
+            for snapshot_list in make_sector_stream(3):
+                delivery = await transporter.route_message(dict(snapshot_list, topic='snapshots'))
+                await delivery
+            transporter.stop()
+            return [message.value() for message in transporter.producer.delivered]
+
+        values = asyncio.run(run())
+        self.assertEqual([kind_of(value) for value in values], [KIND_KEYFRAME, KIND_DELTA, KIND_DELTA])
+
+    def test_transporter_partitions_delta_values_by_sector(self):
+        sectors = {}
+
+        async def run():
+            transporter = LocalTransporter(poll_interval=0.001, snapshot_encoding={'mode': 'delta'})
+            transporter.start()
+            for _ in range(20):
+                for sector in ('XLK', 'XLF'):
+                    key = str(uuid.uuid4())  # Unique per list, like SnapshotList.key
+                    sectors[key.encode()] = sector
+                    snapshot_list = dict(make_sector_stream(1)[0], topic='snapshots', name=sector, key=key)
+                    await (await transporter.route_message(snapshot_list))
+            transporter.stop()
+            return transporter.producer.delivered
+
+        partitions = {}
+        for message in asyncio.run(run()):
+            partitions.setdefault(sectors[message.key()], set()).add(message.partition())
+        self.assertEqual(partitions, {'XLK': {0}, 'XLF': {2}})  # The sector map's partitions
+    def test_transporter_rejects_hot_key_splitting(self):
+        with self.assertRaises(ValueError):
+            LocalTransporter(snapshot_encoding={'mode': 'delta'}, partitioner_config={'hot_keys': {'enabled': True}})
+        LocalTransporter(partitioner_config={'hot_keys': {'enabled': True}})  # JSON values can be split
+
+
+if __name__ == '__main__':
+    unittest.main()
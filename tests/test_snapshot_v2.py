@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from schemas.snapshot_v2.SnapshotListV2 import SnapshotListV2
+from zzv.msgcore.codecs.snapshot_flatbuffers import encode_snapshot_list
+from zzv.msgcore.codecs.snapshot_v2_flatbuffers import ROW_DTYPE, convert_v1_to_v2, decode_snapshot_list_v2, \
+    encode_snapshot_list_v2, epoch_ms_to_timestamp, is_snapshot_list_v2, timestamp_to_epoch_ms
+from zzv.replay.snapshot_readers import read_snapshot_recording, write_snapshot_recording
+
+
+def make_snapshot_list(count, name='XLK'):
+    return {'key': f'{name}-1', 'time': 1728462526968, 'name': name,
+            'snapshots': [{'Timestamp': '2024-10-09T08:28:46.968Z', 'zb1BarsC9': 5.0, 'zb1SideC10': -1.0,
+                           'zb1MarkC11': 100.0 + i / 4, 'zb1PnLC12': 0.5, 'Symbol': f'S{i % 50}'}
+                          for i in range(count)]}
+
+
+class TestSnapshotListV2(unittest.TestCase):
+
+    def test_round_trip(self):
+        snapshot_list = make_snapshot_list(200)
+        view = decode_snapshot_list_v2(encode_snapshot_list_v2(snapshot_list))
+        self.assertEqual(view.to_dict(), snapshot_list)
+        self.assertEqual(len(view.symbols), 50)  # Each symbol is stored once
+        self.assertEqual(view.symbol_column()[51], 'S1')
+
+    def test_rows_are_a_view_of_the_buffer(self):
+        buf = bytearray(encode_snapshot_list_v2(make_snapshot_list(3000)))
+        view = decode_snapshot_list_v2(buf)
+        self.assertEqual(view.rows.dtype, ROW_DTYPE)
+        self.assertEqual(ROW_DTYPE.itemsize, 32)
+        self.assertTrue(np.shares_memory(view.rows, np.frombuffer(buf, dtype=np.uint8)))
+        self.assertAlmostEqual(float(view.rows['zb1MarkC11'].mean()), 100.0 + 2999 / 8)
+        # The generated bindings read the same rows
+        row = SnapshotListV2.GetRootAs(buf, 0).Rows(7)
+        self.assertEqual((row.TimestampMs(), row.SymbolId(), row.Zb1MarkC11()),
+                         (1728462526968, 7, float(view.rows['zb1MarkC11'][7])))
+
+    def test_convert_from_v1(self):
+        snapshot_list = make_snapshot_list(20)
+        v1 = encode_snapshot_list(snapshot_list, size_prefixed=True)
+        self.assertFalse(is_snapshot_list_v2(v1, 4))
+        v2 = convert_v1_to_v2(v1, offset=4)
+        self.assertTrue(is_snapshot_list_v2(v2))
+        self.assertEqual(v2, encode_snapshot_list_v2(snapshot_list))
+        self.assertLess(len(v2), len(v1))
+        with self.assertRaises(ValueError):
+            decode_snapshot_list_v2(v1, 4)
+
+    def test_timestamps(self):
+        self.assertEqual(timestamp_to_epoch_ms('2024-10-09T08:28:46.968Z'), 1728462526968)
+        self.assertEqual(timestamp_to_epoch_ms('2024-10-09T08:28:46.968'), 1728462526968)  # Taken as UTC
+        self.assertEqual(epoch_ms_to_timestamp(1728462526968), '2024-10-09T08:28:46.968Z')
+        self.assertEqual((timestamp_to_epoch_ms(None), epoch_ms_to_timestamp(0)), (0, None))
+
+    def test_recordings_convert_to_v2(self):
+        with tempfile.TemporaryDirectory() as directory:
+            v1_path = os.path.join(directory, 'session.fb')
+            v2_path = os.path.join(directory, 'session_v2.fb')
+            snapshot_lists = [make_snapshot_list(10, name) for name in ('XLK', 'XLF', 'XLE')]
+            write_snapshot_recording(v1_path, snapshot_lists)
+            write_snapshot_recording(v2_path, read_snapshot_recording(v1_path), format='flatbuffers_v2')
+            self.assertEqual(list(read_snapshot_recording(v2_path)), snapshot_lists)
+            self.assertLess(os.path.getsize(v2_path), os.path.getsize(v1_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SOAK_BENCHMARK = os.path.join(REPO_ROOT, 'benchmarks', 'soak_benchmark.py')
+
+
+def run_soak(config=None, duration=3, budget=1000):
+    """Run a short soak in a fresh interpreter and return its exit status and report."""
+    command = [sys.executable, SOAK_BENCHMARK, '--rate', '5000', '--duration', str(duration),
+               '--sample-interval', '0.2', '--budget', str(budget), '--json']
+    if config is not None:
+        command += ['--config', json.dumps(config)]
+    result = subprocess.run(command, cwd=REPO_ROOT, env=dict(os.environ, LOG_LEVEL='ERROR'),
+                            capture_output=True, text=True, timeout=120)
+    return result.returncode, json.loads(result.stdout)
+
+
+class TestSoak(unittest.TestCase):
+    """
+    Short soaks with a loose budget: they catch buffers that keep every message, which grow by thousands of MB per
+    million messages. Run benchmarks/soak_benchmark.py for long soaks against the default budget.
+    """
+
+    def test_engine_memory_stays_flat(self):
+        status, report = run_soak()
+        self.assertEqual(status, 0, report['failures'])
+        self.assertEqual(report['delivered'], report['messages'])
+        self.assertGreater(len(report['samples']), 5)
+
+    def test_unbounded_buffer_fails_the_budget(self):
+        config = {'kafka_transporter': {'type': 'local', 'poll_interval': 0.001},
+                  'msg_manager': {'recent_messages': 10 ** 9}}  # As good as the former unbounded list
+        status, report = run_soak(config)
+        self.assertEqual(status, 1)
+        self.assertIn("Traced memory grew", report['failures'][0])
+        self.assertTrue(any('soak_benchmark.py' in allocator['location'] for allocator in report['top_allocators']))
+
+
+if __name__ == '__main__':
+    unittest.main()
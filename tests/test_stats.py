@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+
+from zzv.common import stats as stats_module
+from zzv.common.stats import StatsCounters
+from zzv.msgcore.msg_manager import MsgManager
+
+
+def wait_for_next_second():
+    """Return right after the coarse clock moved to a new second."""
+    second = stats_module._current_second
+    while stats_module._current_second == second:
+        time.sleep(0.01)
+    return stats_module._current_second
+
+
+class FakeClock:
+    def now(self):
+        return None
+
+
+class FakeKernel:
+    clock = FakeClock()
+
+    def get_service(self, name, caller=None):
+        return None
+
+
+class TestStatsCounters(unittest.TestCase):
+
+    def test_no_increment_is_lost_across_threads(self):
+        stats = StatsCounters(["handled", "unused"])
+        snapshots = []
+
+        def increment():
+            for _ in range(20000):
+                stats.incr("handled")
+
+        threads = [threading.Thread(target=increment) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            snapshots.append(stats.snapshot())
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(stats.snapshot(), {"handled": 160000, "unused": 0})
+        self.assertEqual(stats["handled"], 160000)
+        counts = [snapshot["handled"] for snapshot in snapshots]
+        self.assertEqual(counts, sorted(counts))  # Totals never go backwards
+
+    def test_reads_as_a_mapping(self):
+        stats = StatsCounters(["declared"])
+        stats.incr("undeclared", 3)
+        self.assertEqual({**stats}, {"declared": 0, "undeclared": 3})
+        self.assertEqual(len(stats), 2)
+        with self.assertRaises(KeyError):
+            stats["missing"]
+        with self.assertRaises(TypeError):
+            stats["declared"] += 1  # Updates must go through incr
+
+    def test_counts_of_exited_threads_are_kept(self):
+        stats = StatsCounters(horizon=0)  # Shards of exited threads retire as soon as possible
+        for _ in range(5):
+            thread = threading.Thread(target=stats.incr, args=("handled", 2))
+            thread.start()
+            thread.join()
+        wait_for_next_second()
+        stats.incr("handled")  # A new shard retires the others
+        self.assertEqual(len(stats._shards), 1)
+        self.assertEqual(stats["handled"], 11)
+
+    def test_rates_over_sliding_windows(self):
+        stats = StatsCounters(["sent"])
+        wait_for_next_second()
+        stats.incr("sent", 50)
+        wait_for_next_second()
+        rates = stats.rates(windows=(1, 10))
+        self.assertEqual(rates["sent"], {"1s": 50.0, "10s": 5.0})
+        wait_for_next_second()
+        self.assertEqual(stats.rates(windows=(1,))["sent"], {"1s": 0.0})
+
+    def test_timings_combine_threads(self):
+        stats = StatsCounters()
+        threads = [threading.Thread(target=stats.observe, args=("latency", value)) for value in (1.0, 2.0, 3.0)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        stats.observe("latency", 10.0)
+        latency = stats.timings()["latency"]
+        self.assertEqual((latency["count"], latency["max"], latency["mean"]), (4, 10.0, 4.0))
+
+    def test_managers_count_from_any_thread(self):
+        msg_manager = MsgManager(FakeKernel())
+        msg_manager.register_handler("Tick", lambda message: None)
+        threads = [threading.Thread(target=lambda: [msg_manager.handle_message("Tick", {"name": "x"})
+                                                    for _ in range(1000)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = msg_manager.stats.to_dict()
+        self.assertEqual(stats["messages_handled"], 4000)
+        self.assertEqual(stats["error_count"], 0)
+        self.assertIn("1s", stats["rates"]["messages_handled"])
+
+
+if __name__ == '__main__':
+    unittest.main()
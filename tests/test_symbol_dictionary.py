@@ -0,0 +1,253 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+from tests.test_kafka_consumer_manager import FakeConsumer, FakeKernel, FakeMessage
+from tests.test_snapshot_delta import make_sector_stream
+from tests.test_snapshot_v2 import make_snapshot_list
+from zzv.common.constants import MSG_MANAGER, QUEUE_MANAGER, SYMBOL_DICTIONARY
+from zzv.engine.kernel import Kernel
+from zzv.msgcore.codecs.snapshot_delta import SnapshotDeltaDecoder, SnapshotDeltaEncoder
+from zzv.msgcore.codecs.snapshot_v2_flatbuffers import decode_snapshot_list_v2, encode_snapshot_list_v2
+from zzv.msgcore.kafka_consumer_manager import KafkaConsumerManager
+from zzv.msgcore.symbol_dictionary import SymbolDictionary, SymbolDictionaryError, SymbolDictionaryVersionError
+
+
+class TestSymbolDictionary(unittest.TestCase):
+
+    def test_ids_are_assigned_once_and_published_in_order(self):
+        published = []
+        dictionary = SymbolDictionary(['AAPL', 'MSFT'])
+        dictionary.subscribe(published.extend)
+        self.assertEqual([dictionary.id_of(symbol) for symbol in ('MSFT', 'NVDA', 'AAPL', 'AMD')], [1, 2, 0, 3])
+        self.assertEqual(dictionary.version, 4)
+        self.assertEqual(published, [(2, 'NVDA'), (3, 'AMD')])
+        self.assertEqual(dictionary.entries_since(2), published)
+        self.assertEqual((dictionary.lookup('ORCL'), dictionary.symbol(2)), (None, 'NVDA'))
+        with self.assertRaises(SymbolDictionaryVersionError):
+            dictionary.symbol(4)
+
+    def test_ids_are_handed_out_after_the_listeners_run(self):
+        dictionary = SymbolDictionary()
+        in_listener, release = threading.Event(), threading.Event()
+        published = []
+
+        def listener(entries):
+            in_listener.set()
+            release.wait(5)
+            published.extend(entries)
+
+        dictionary.subscribe(listener)
+        first = threading.Thread(target=dictionary.id_of, args=('AAPL',))
+        first.start()
+        self.assertTrue(in_listener.wait(5))
+        self.assertIsNone(dictionary.lookup('AAPL'))  # The entry is not published yet
+        ids = []
+        second = threading.Thread(target=lambda: ids.append(dictionary.id_of('AAPL')))
+        second.start()
+        second.join(0.05)
+        self.assertEqual(ids, [])  # Waits for the first assignment instead of taking the id early
+        release.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual((ids, published, dictionary.version), ([0], [(0, 'AAPL')], 1))
+
+    def test_consumers_catch_up_with_entries(self):
+        producer = SymbolDictionary(['AAPL', 'MSFT', 'NVDA'])
+        consumer = SymbolDictionary(['AAPL'])
+        self.assertEqual(consumer.apply(reversed(producer.entries_since(0))), 2)  # Known entries are skipped
+        self.assertEqual(consumer.symbols, producer.symbols)
+        with self.assertRaises(SymbolDictionaryError):
+            consumer.apply([(1, 'ORCL')])  # Ids are never reassigned
+        with self.assertRaises(SymbolDictionaryError):
+            consumer.apply([(5, 'ORCL')])  # Ids 3 and 4 are missing
+        with self.assertRaises(SymbolDictionaryError):
+            consumer.apply([(3, 'AAPL')])
+        self.assertEqual(consumer.version, 3)
+
+    def test_save_and_reload(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'symbols.json')
+            self.assertEqual(SymbolDictionary.load(path).version, 0)
+            producer = SymbolDictionary(['AAPL', 'MSFT'])
+            producer.save(path)
+            consumer = SymbolDictionary.load(path)
+            producer.id_of('NVDA')
+            producer.save(path)
+            self.assertEqual(consumer.reload(path), 1)
+            self.assertEqual(consumer.symbols, ['AAPL', 'MSFT', 'NVDA'])
+            self.assertEqual(os.listdir(directory), ['symbols.json'])  # No temporary file left behind
+
+
+class TestSymbolIdCodecs(unittest.TestCase):
+
+    def test_delta_keyframes_carry_symbol_ids(self):
+        stream = make_sector_stream(30)
+        dictionary = SymbolDictionary()
+        encoder = SnapshotDeltaEncoder(keyframe_interval=10, symbol_dictionary=dictionary)
+        decoder = SnapshotDeltaDecoder(symbol_dictionary=SymbolDictionary())
+        values = [encoder.encode(snapshot_list) for snapshot_list in stream]
+
+        # The consumer's dictionary is behind: the keyframe is kept undecoded until it catches up
+        with self.assertRaises(SymbolDictionaryVersionError) as raised:
+            decoder.decode(values[0])
+        self.assertEqual(raised.exception.required, 11)
+        decoder.symbol_dictionary.apply(dictionary.entries_since(0))
+        self.assertEqual([decoder.decode(value) for value in values], stream)
+
+        plain_keyframe = SnapshotDeltaEncoder().encode(stream[0])
+        self.assertLess(len(values[0]), len(plain_keyframe))
+        self.assertEqual(len(plain_keyframe) - len(values[0]), sum(len(s) - 2 for s in dictionary.symbols) - 4)
+
+    def test_flatbuffers_v2_carries_symbol_ids(self):
+        snapshot_list = make_snapshot_list(200)
+        dictionary = SymbolDictionary(['SPY'])
+        buf = encode_snapshot_list_v2(snapshot_list, symbol_dictionary=dictionary)
+        self.assertEqual(dictionary.version, 51)
+        self.assertLess(len(buf), len(encode_snapshot_list_v2(snapshot_list)))
+
+        view = decode_snapshot_list_v2(buf, symbol_dictionary=dictionary)
+        self.assertEqual(view.to_dict(), snapshot_list)
+        self.assertEqual(view.symbol_column()[51], 'S1')
+        with self.assertRaises(ValueError):
+            decode_snapshot_list_v2(buf)
+        with self.assertRaises(SymbolDictionaryVersionError):
+            decode_snapshot_list_v2(buf, symbol_dictionary=SymbolDictionary(dictionary.symbols[:50]))
+        # Lists with their own symbols table decode with or without a dictionary
+        self.assertEqual(decode_snapshot_list_v2(encode_snapshot_list_v2(snapshot_list),
+                                                 symbol_dictionary=dictionary).to_dict(), snapshot_list)
+
+
+class TestSymbolDictionaryManager(unittest.TestCase):
+
+    def test_kernel_publishes_and_saves_the_entries_of_its_keyframes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'symbols.json')
+            SymbolDictionary(['SPY']).save(path)
+            consumer = KafkaConsumerManager(SimpleNamespace(config={}), {'symbol_dictionary_path': path})
+            config = {'kafka_transporter': {'type': 'local', 'poll_interval': 0.001,
+                                            'snapshot_encoding': {'mode': 'delta'}},
+                      'symbol_dictionary': {'enabled': True, 'path': path, 'topic': 'symbols'}}
+            stream = make_sector_stream(3)
+
+            async def run():
+                kernel = Kernel(config)
+                await kernel.start()
+                await asyncio.sleep(0.01)
+                transporter = kernel.get_service(QUEUE_MANAGER).kafka_transporter
+                manager = kernel.get_service(SYMBOL_DICTIONARY)
+                for snapshot_list in stream:
+                    delivery = await transporter.route_message({'topic': 'snapshots', **snapshot_list})
+                    await asyncio.wait_for(delivery, 1)
+                producer = manager._lease.producer
+                producer.flush()
+                entries = [(message.topic(), message.key(), message.value()) for message in producer.delivered]
+                values = [message.value() for message in transporter.producer.delivered]
+                await kernel.close()
+                return entries, values, manager.get_stats()
+
+            entries, values, stats = asyncio.run(run())
+            self.assertEqual(len(entries), 12)  # SPY on start, then the sector's symbols
+            self.assertEqual(entries[:2], [('symbols', b'0', b'SPY'), ('symbols', b'1', b'AAPL')])
+            self.assertEqual((stats['version'], stats['saved_version'], stats['publish_errors']), (12, 12, 0))
+
+            # The consumer reloads the saved dictionary when a keyframe needs a newer version
+            self.assertEqual([consumer._decode(value) for value in values], stream)
+            self.assertEqual((consumer.stats['symbol_dictionary_reloads'], consumer.stats['decode_errors']), (1, 0))
+
+
+class EntriesHandler(BaseHTTPRequestHandler):
+    """Serve a dictionary like the `/SymbolDictionaryManager/entries` endpoint."""
+    dictionary = None
+
+    def do_GET(self):
+        since = int(parse_qs(urlparse(self.path).query)['since'][0])
+        entries = self.dictionary.entries_since(since)
+        body = json.dumps({'version': self.dictionary.version, 'entries': [list(entry) for entry in entries]})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConsumerCatchUp(unittest.TestCase):
+    """The consumer's dictionary lags the producer's: keyframes wait for their symbols instead of being dropped."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'symbols.json')
+        self.producer_dictionary = SymbolDictionary(['SPY'])
+        self.producer_dictionary.save(self.path)  # Saved before the producer assigned the sector's ids
+        encoder = SnapshotDeltaEncoder(keyframe_interval=10, symbol_dictionary=self.producer_dictionary)
+        self.stream = make_sector_stream(3)
+        self.messages = [FakeMessage(encoder.encode(snapshot_list), offset=offset)
+                         for offset, snapshot_list in enumerate(self.stream)]
+
+    def _run(self, consumer, config, scenario):
+        kernel = FakeKernel()
+        manager = KafkaConsumerManager(kernel, {'topics': ['snapshots'], 'commit_interval': 0, 'poll_timeout': 0.01,
+                                                'symbol_dictionary_retry': 0.02, **config},
+                                       consumer_factory=lambda conf: consumer)
+
+        async def run():
+            await manager.start()
+            try:
+                await scenario()
+            finally:
+                await manager.close()
+        asyncio.run(run())
+        return manager, [data for _, data in kernel.services[MSG_MANAGER].messages]
+
+    def test_fetches_entries_from_the_producer(self):
+        EntriesHandler.dictionary = self.producer_dictionary
+        server = HTTPServer(('127.0.0.1', 0), EntriesHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        consumer = FakeConsumer([self.messages])
+
+        manager, routed = self._run(consumer, {'symbol_dictionary_url': f'http://127.0.0.1:{server.server_port}/'},
+                                    lambda: asyncio.sleep(0.2))
+        self.assertEqual(routed, self.stream)
+        self.assertEqual(manager.decoder.symbol_dictionary.symbols, self.producer_dictionary.symbols)
+        self.assertEqual((manager.stats['symbol_dictionary_reloads'], manager.stats['symbol_dictionary_waits'],
+                          manager.stats['decode_errors']), (1, 0, 0))
+        self.assertEqual(consumer.commits[-1], {('snapshots', 0): 3})
+
+    def test_waits_for_the_next_save(self):
+        consumer = FakeConsumer([self.messages])
+
+        async def scenario():
+            await asyncio.sleep(0.2)
+            self.producer_dictionary.save(self.path)
+            await asyncio.sleep(0.2)
+
+        manager, routed = self._run(consumer, {'symbol_dictionary_path': self.path}, scenario)
+        self.assertEqual(routed, self.stream)
+        self.assertGreater(manager.stats['symbol_dictionary_waits'], 0)
+        self.assertEqual((manager.stats['symbol_dictionary_reloads'], manager.stats['decode_errors']), (1, 0))
+        self.assertEqual(consumer.commits[-1], {('snapshots', 0): 3})
+
+    def test_offset_of_a_waiting_keyframe_is_not_committed(self):
+        batch = [FakeMessage(json.dumps({'name': 'XLF', 'snapshots': []}).encode(), offset=0),
+                 *(FakeMessage(message.value(), offset=message.offset() + 1) for message in self.messages)]
+        consumer = FakeConsumer([batch])
+
+        manager, routed = self._run(consumer, {'symbol_dictionary_path': self.path}, lambda: asyncio.sleep(0.2))
+        self.assertEqual(routed, [{'name': 'XLF', 'snapshots': []}])  # Decoded before the keyframe
+        self.assertEqual(manager.stats['decode_errors'], 0)
+        self.assertEqual(consumer.commits[-1], {('snapshots', 0): 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+"""
+Zeta-Zen VM package.
+
+Subpackages and the main entry points are resolved lazily on first attribute access, so `import zzv`
+does not load FastAPI, uvicorn, OpenTelemetry or librdkafka. Import the module you need directly
+(for example `zzv.models.message_types`) to pay only for what you use.
+"""
+import importlib
+
+_SUBPACKAGES = {'common', 'engine', 'examples', 'health', 'models', 'msgcore'}
+
+_LAZY_ATTRIBUTES = {
+    'ZetaZenVm': 'zzv.engine.zeta_zen_vm',
+    'Kernel': 'zzv.engine.kernel',
+    'Manager': 'zzv.engine.manager',
+    'KernelAwareManager': 'zzv.engine.kernel_aware_manager',
+}
+
+
+def __getattr__(name):
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f'{__name__}.{name}')
+
+    module_path = _LAZY_ATTRIBUTES.get(name)
+    if module_path is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+    value = getattr(importlib.import_module(module_path), name)
+    globals()[name] = value  # Cache so __getattr__ is not consulted again
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBPACKAGES | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,168 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from zzv.analytics.windows import SectorWindows, WindowSpec
+from zzv.common.constants import AGGREGATION_MANAGER, MSG_MANAGER, QUEUE_MANAGER
+from zzv.engine.manager import Manager
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+from zzv.models.message_types import MessageType
+from zzv.msgcore.handler_registry import HandlerKind
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+AGGREGATION_HANDLER_NAME = 'windowed_aggregation'
+AGGREGATES = 'Aggregates'
+
+DEFAULT_WINDOWS = [{'name': '1m', 'type': 'tumbling', 'size': 60}]
+
+
+class AggregationManager(Manager):
+    """
+    Incremental tumbling and sliding windows over the routed SnapshotLists.
+
+    Every SnapshotList appends one row per symbol to that symbol's ring buffer (see SectorWindows). Windows are
+    driven by event time: when a SnapshotList's time passes the end of a window of its sector, the window is
+    evaluated per symbol and per sector and the result is kept for the endpoints and, when publishing is
+    enabled, queued for Kafka as an Aggregates message keyed by the sector.
+    """
+
+    def __init__(self, kernel, aggregation_config: Dict[str, Any]):
+        """
+        Initialize the AggregationManager.
+
+        Args:
+            kernel (Kernel): The kernel providing the MsgManager and the QueueManager.
+            aggregation_config (dict): The 'aggregation' configuration section:
+                windows (list): Windows as {name, type: tumbling|sliding, size, slide} with sizes in seconds.
+                    Defaults to a single one-minute tumbling window.
+                capacity (int): Rows kept per symbol. Defaults to 4096.
+                publish (dict): {enabled, topic}; queues every evaluated window on `topic`. Disabled by default.
+        """
+        super().__init__(name="AggregationManager")
+        self.kernel = kernel
+        self.windows = [WindowSpec.from_config(window)
+                        for window in aggregation_config.get('windows', DEFAULT_WINDOWS)]
+        self.capacity = aggregation_config.get('capacity', 4096)
+        publish_config = aggregation_config.get('publish', {})
+        self.publish_enabled = publish_config.get('enabled', False)
+        self.publish_topic = publish_config.get('topic', 'aggregates')
+        self.sectors: Dict[str, SectorWindows] = {}
+        self.stats.declare(
+            "snapshot_lists",  # SnapshotLists aggregated
+            "rows",  # Symbol rows appended to the ring buffers
+            "evaluations",  # Windows evaluated
+            "published",  # Evaluations queued for Kafka
+            "errors"
+        )
+
+    async def start(self):
+        """Register the aggregation handler."""
+        logger.info(f"Starting {AGGREGATION_MANAGER} with windows {[spec.name for spec in self.windows]}...")
+        self.kernel.get_service(MSG_MANAGER, caller=self).register_handler(
+            MessageType.SNAPSHOTS, self.aggregate_snapshot_list, HandlerKind.SYNC, name=AGGREGATION_HANDLER_NAME)
+        self._running = True
+
+    async def close(self):
+        """Unregister the aggregation handler."""
+        logger.info(f"Stopping {AGGREGATION_MANAGER}...")
+        self._running = False
+        self.kernel.get_service(MSG_MANAGER, caller=self).unregister_handler(MessageType.SNAPSHOTS,
+                                                                            AGGREGATION_HANDLER_NAME)
+
+    def aggregate_snapshot_list(self, message_data: Any) -> List[Dict[str, Any]]:
+        """
+        Add a SnapshotList (dictionary, JSON string or SnapshotList model) to its sector's windows and return
+        the windows it closed.
+        """
+        try:
+            if isinstance(message_data, str):
+                message_data = json.loads(message_data)
+            elif not isinstance(message_data, dict):
+                message_data = message_data.model_dump()
+            sector, time_ms = message_data.get('name'), message_data.get('time')
+            if not sector or time_ms is None:
+                return []
+            time_ms = int(time_ms)
+            windows = self.sectors.get(sector)
+            if windows is None:
+                windows = self.sectors[sector] = SectorWindows(self.capacity)
+
+            # Close the windows ending before this SnapshotList first, so that it belongs to the next ones
+            results = []
+            for spec in self.windows:
+                for end_ms in windows.due(spec, time_ms):
+                    results.append(windows.evaluate(spec, end_ms))
+            self.stats.incr("rows", windows.add(time_ms, message_data.get('snapshots') or []))
+            self.stats.incr("snapshot_lists")
+            self.stats.incr("evaluations", len(results))
+            for result in results:
+                self._publish(sector, result)
+            return results
+        except Exception as e:
+            self.stats.incr("errors")
+            logger.error(f"Error aggregating SnapshotList: {e}")
+            return []
+
+    def _publish(self, sector: str, result: Dict[str, Any]):
+        if not self.publish_enabled:
+            return
+        message = {'topic': self.publish_topic, 'key': sector, 'name': f"{sector}.{result['window']}",
+                   'time': result['end'], 'type': AGGREGATES, **result}
+        self.kernel.get_service(QUEUE_MANAGER, caller=self).handle_message(AGGREGATES, message)
+        self.stats.incr("published")
+
+    def get_latest(self, sector: Optional[str] = None) -> Dict[str, Any]:
+        """Return the last evaluation of every window, per sector, or of one sector's windows."""
+        if sector is not None:
+            windows = self.sectors.get(sector)
+            return dict(windows.latest) if windows is not None else {}
+        return {name: dict(windows.latest) for name, windows in self.sectors.items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the aggregation counters and the tracked symbols per sector."""
+        return {**self.stats.snapshot(), "windows": [spec.name for spec in self.windows],
+                "symbols": {name: len(windows.symbols) for name, windows in self.sectors.items()}}
+
+    def get_health(self):
+        """
+        Return the health status of the AggregationManager as a HealthReport object.
+        """
+        status = Status.OK if self._running and not self.stats["errors"] else Status.ERROR
+        return HealthReport(
+            manager_name=self.name,
+            status=status,
+            details=[f"AggregationManager is {'running' if self._running else 'not running'}",
+                     f"Sectors: {len(self.sectors)}",
+                     f"Windows evaluated: {self.stats['evaluations']}",
+                     f"Errors: {self.stats['errors']}"]
+        )
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the AggregationManager.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+
+        @app.get(f"/{self.name}/windows")
+        async def aggregation_windows() -> Dict[str, Any]:
+            """Get the last evaluation of every window of every sector."""
+            return self.get_latest()
+
+        @app.get(f"/{self.name}/sectors/{{sector}}")
+        async def aggregation_sector(sector: str) -> Dict[str, Any]:
+            """Get the last evaluation of every window of one sector."""
+            return self.get_latest(sector)
+
+        @app.get(f"/{self.name}/stats")
+        async def aggregation_stats() -> Dict[str, Any]:
+            """Get the aggregation counters."""
+            return self.get_stats()
+
+        print(f"Registered endpoints for {self.name}.")
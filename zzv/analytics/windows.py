@@ -0,0 +1,201 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+WINDOW_TUMBLING = 'tumbling'
+WINDOW_SLIDING = 'sliding'
+
+# One row per symbol per SnapshotList. longs, shorts and mark_changes are running totals since the symbol was
+# first seen, so the count over any range of rows is a difference of two rows instead of a scan
+ROW_DTYPE = np.dtype([
+    ('time', '<i8'),  # SnapshotList time in milliseconds
+    ('pnl', '<f8'),  # zb1PnLC12
+    ('side', '<f8'),  # zb1SideC10: positive long, negative short
+    ('mark', '<f8'),  # zb1MarkC11
+    ('longs', '<i8'),
+    ('shorts', '<i8'),
+    ('mark_changes', '<i8'),
+])
+
+
+class WindowSpec:
+    """A named window: `size` seconds long, evaluated every `slide` seconds (equal to size when tumbling)."""
+
+    def __init__(self, name: str, window_type: str = WINDOW_TUMBLING, size: float = 60.0,
+                 slide: Optional[float] = None):
+        if window_type not in (WINDOW_TUMBLING, WINDOW_SLIDING):
+            raise ValueError(f"Unsupported window type '{window_type}' for window '{name}'. "
+                             f"Supported types: '{WINDOW_TUMBLING}', '{WINDOW_SLIDING}'.")
+        if size <= 0:
+            raise ValueError(f"Window '{name}' needs a positive size, got {size}.")
+        self.name = name
+        self.window_type = window_type
+        self.size_ms = int(size * 1000)
+        self.slide_ms = self.size_ms if window_type == WINDOW_TUMBLING else int((slide or size / 4) * 1000)
+        if self.slide_ms <= 0:
+            raise ValueError(f"Window '{name}' needs a positive slide, got {slide}.")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'WindowSpec':
+        return cls(config['name'], config.get('type', WINDOW_TUMBLING), config.get('size', 60.0),
+                   config.get('slide'))
+
+    def first_end(self, time_ms: int) -> int:
+        """Return the end of the first evaluation after `time_ms`, aligned on multiples of the slide."""
+        return (time_ms // self.slide_ms + 1) * self.slide_ms
+
+
+class RingBuffer:
+    """
+    Fixed-capacity ring of ROW_DTYPE rows in time order, backed by a NumPy structured array.
+
+    Appending overwrites the oldest row once the ring is full. Rows are addressed by logical index, 0 being the
+    oldest, and located by time with a binary search.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"Ring buffer capacity must be positive, got {capacity}.")
+        self.capacity = capacity
+        self.rows = np.zeros(capacity, dtype=ROW_DTYPE)
+        self.start = 0  # Physical index of the oldest row
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, time_ms: int, pnl: float, side: float, mark: float):
+        last = self.rows[self._physical(self.size - 1)] if self.size else None
+        longs = int(last['longs']) if last is not None else 0
+        shorts = int(last['shorts']) if last is not None else 0
+        mark_changes = int(last['mark_changes']) if last is not None else 0
+        if side > 0:
+            longs += 1
+        elif side < 0:
+            shorts += 1
+        if last is not None and mark != last['mark']:
+            mark_changes += 1
+
+        if self.size < self.capacity:
+            index = self._physical(self.size)
+            self.size += 1
+        else:
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.rows[index] = (time_ms, pnl, side, mark, longs, shorts, mark_changes)
+
+    def row(self, index: int) -> np.void:
+        return self.rows[self._physical(index)]
+
+    def bisect_left(self, time_ms: int) -> int:
+        """Return the logical index of the first row at or after `time_ms`."""
+        low, high = 0, self.size
+        times = self.rows['time']
+        while low < high:
+            middle = (low + high) // 2
+            if times[self._physical(middle)] < time_ms:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _physical(self, index: int) -> int:
+        return (self.start + index) % self.capacity
+
+
+def summarize(ring: RingBuffer, start_ms: int, end_ms: int) -> Optional[Dict[str, Any]]:
+    """
+    Summarize the rows of one symbol with `start_ms <= time < end_ms`, or return None if there are none.
+
+    Counts come from the running totals of the first and last rows, so the cost does not depend on how many
+    rows the window holds.
+    """
+    first_index = ring.bisect_left(start_ms)
+    last_index = ring.bisect_left(end_ms) - 1
+    if last_index < first_index:
+        return None
+    first, last = ring.row(first_index), ring.row(last_index)
+    return {
+        "count": last_index - first_index + 1,
+        "pnl": float(last['pnl']),
+        "pnl_change": float(last['pnl'] - first['pnl']),
+        "side": float(last['side']),
+        "long_count": int(last['longs'] - first['longs']) + (1 if first['side'] > 0 else 0),
+        "short_count": int(last['shorts'] - first['shorts']) + (1 if first['side'] < 0 else 0),
+        "mark": float(last['mark']),
+        "mark_change": float(last['mark'] - first['mark']),
+        "mark_changes": int(last['mark_changes'] - first['mark_changes'])
+    }
+
+
+def combine_sector(symbols: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-symbol summaries into sector totals."""
+    summaries: List[Dict[str, Any]] = list(symbols.values())
+    return {
+        "symbols": len(summaries),
+        "count": sum(s["count"] for s in summaries),
+        "pnl_total": sum(s["pnl"] for s in summaries),  # Latest PnL of every symbol
+        "pnl_change": sum(s["pnl_change"] for s in summaries),
+        "long_symbols": sum(1 for s in summaries if s["side"] > 0),  # By latest side
+        "short_symbols": sum(1 for s in summaries if s["side"] < 0),
+        "long_count": sum(s["long_count"] for s in summaries),  # Long observations in the window
+        "short_count": sum(s["short_count"] for s in summaries),
+        "mark_changes": sum(s["mark_changes"] for s in summaries)
+    }
+
+
+class SectorWindows:
+    """Ring buffers of one sector's symbols and the next evaluation time of every window."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.symbols: Dict[str, RingBuffer] = {}
+        self.next_end: Dict[str, int] = {}  # Window name -> end of its next evaluation
+        self.latest: Dict[str, Dict[str, Any]] = {}  # Window name -> last evaluation
+        self.last_time: Optional[int] = None
+
+    def add(self, time_ms: int, snapshots: List[Dict[str, Any]]) -> int:
+        """Append a SnapshotList's rows; rows older than a symbol's latest row are dropped."""
+        added = 0
+        for snapshot in snapshots:
+            symbol = snapshot.get('Symbol')
+            if not symbol:
+                continue
+            ring = self.symbols.get(symbol)
+            if ring is None:
+                ring = self.symbols[symbol] = RingBuffer(self.capacity)
+            elif len(ring) and ring.row(len(ring) - 1)['time'] > time_ms:
+                continue  # Out of order; the buffers must stay sorted by time
+            ring.append(time_ms, snapshot.get('zb1PnLC12') or 0.0, snapshot.get('zb1SideC10') or 0.0,
+                        snapshot.get('zb1MarkC11') or 0.0)
+            added += 1
+        self.last_time = time_ms if self.last_time is None else max(self.last_time, time_ms)
+        return added
+
+    def evaluate(self, spec: WindowSpec, end_ms: int) -> Dict[str, Any]:
+        """Summarize the window ending at `end_ms` for every symbol and the sector."""
+        start_ms = end_ms - spec.size_ms
+        symbols = {}
+        for symbol, ring in self.symbols.items():
+            summary = summarize(ring, start_ms, end_ms)
+            if summary is not None:
+                symbols[symbol] = summary
+        result = {"window": spec.name, "type": spec.window_type, "start": start_ms, "end": end_ms,
+                  "sector": combine_sector(symbols), "symbols": symbols}
+        self.latest[spec.name] = result
+        return result
+
+    def due(self, spec: WindowSpec, time_ms: int) -> List[int]:
+        """
+        Return the window ends passed by event time `time_ms` (the windows closed by this SnapshotList), and
+        schedule the next one. At most the latest closed end is returned after a gap.
+        """
+        next_end = self.next_end.get(spec.name)
+        if next_end is None:
+            self.next_end[spec.name] = spec.first_end(time_ms)
+            return []
+        if time_ms < next_end:
+            return []
+        last_closed = (time_ms // spec.slide_ms) * spec.slide_ms
+        self.next_end[spec.name] = last_closed + spec.slide_ms
+        return [last_closed]
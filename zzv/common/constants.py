@@ -1,6 +1,23 @@
 HEALTH_REPORT = "health_report"
 KERNEL = "zeta_zen_vm"
+CONFIG_SERVICE = "config_service"
 QUEUE_MANAGER = "queue_manager"
 MSG_MANAGER = "msg_manager"
+REPLAY_MANAGER = "replay_manager"
+EXPORT_MANAGER = "export_manager"
+EXECUTOR_MANAGER = "executor_manager"
+PRODUCER_POOL = "producer_pool"
+KAFKA_CONSUMER_MANAGER = "kafka_consumer_manager"
+CONSUMER_LAG_MONITOR = "consumer_lag_monitor"
+AGGREGATION_MANAGER = "aggregation_manager"
+PROFILING_MANAGER = "profiling_manager"
+LOOP_MONITOR = "loop_monitor"
+SYMBOL_DICTIONARY = "symbol_dictionary"
 
 SNAPSHOT_LIST = "SnapshotList"
+
+# Default partition of each sector ETF on the snapshot topics
+SECTOR_PARTITION_MAP = {
+    'XLK': 0, 'XLV': 1, 'XLF': 2, 'XLY': 3, 'XLI': 4,
+    'XLP': 5, 'XLE': 6, 'XLU': 7, 'XLB': 8, 'XLC': 9, 'XLRE': 10
+}
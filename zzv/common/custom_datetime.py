@@ -39,3 +39,32 @@ class CustomDateTime:
             self.simulated_datetime += delta
         else:
             raise ValueError("Time can only be advanced in SIMULATED mode with a valid simulated_datetime.")
+
+    def set_time(self, new_datetime: datetime):
+        """
+        Set the simulated time to a given datetime.
+
+        :param new_datetime: The datetime the simulated clock should report from now on.
+        """
+        if self.mode != KERNEL_MODE_SIMULATED:
+            raise ValueError("Time can only be set in SIMULATED mode.")
+        self.simulated_datetime = new_datetime
+
+    def simulate(self, start_datetime: datetime):
+        """
+        Switch to SIMULATED mode, starting at the given datetime.
+
+        Every component holding this instance sees the switch, which is how a replay takes over a shared clock.
+
+        :param start_datetime: The initial simulated datetime.
+        """
+        self.mode = KERNEL_MODE_SIMULATED
+        self.simulated_datetime = start_datetime
+
+    def is_simulated(self) -> bool:
+        """
+        Check whether the clock is currently running in SIMULATED mode.
+
+        :return: True if the mode is 'SIMULATED'.
+        """
+        return self.mode == KERNEL_MODE_SIMULATED
@@ -0,0 +1,122 @@
+import bisect
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List
+
+
+class LatencyTracker:
+    """
+    Track latency samples in a bounded window and compute percentiles on read.
+
+    Recording is cheap (an append under a lock); sorting only happens when a summary is requested,
+    so the tracker can sit on hot paths such as delivery callbacks.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        """
+        Initialize the LatencyTracker.
+
+        Args:
+            max_samples (int): Number of most recent samples kept for percentile computation.
+        """
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self.count = 0  # Total number of samples ever recorded
+        self.total = 0.0  # Sum of all recorded samples
+        self.max = 0.0  # Largest sample ever recorded
+
+    def record(self, value: float):
+        """
+        Record a latency sample.
+
+        Args:
+            value (float): The latency sample, usually in milliseconds.
+        """
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def percentiles(self, percentiles: Iterable[float] = (50, 90, 99)) -> Dict[str, float]:
+        """
+        Compute percentiles over the samples currently in the window.
+
+        Args:
+            percentiles (Iterable[float]): Percentiles to compute, between 0 and 100.
+
+        Returns:
+            dict: Mapping such as {'p50': 1.2, 'p99': 8.7}. Values are 0.0 when no samples exist.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        return _percentiles(samples, percentiles)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Return count, mean, max and the default percentiles in a single dictionary.
+        """
+        with self._lock:
+            count = self.count
+            mean = self.total / count if count else 0.0
+            maximum = self.max
+        summary = {"count": count, "mean": mean, "max": maximum}
+        summary.update(self.percentiles())
+        return summary
+
+    def reset(self):
+        """Discard all samples and totals."""
+        with self._lock:
+            self._samples.clear()
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+
+def _percentiles(samples: List[float], percentiles: Iterable[float]) -> Dict[str, float]:
+    """Pick percentiles from sorted samples, 0.0 when there are none."""
+    result = {}
+    for p in percentiles:
+        label = f"p{p:g}"
+        if not samples:
+            result[label] = 0.0
+            continue
+        index = min(len(samples) - 1, max(0, int(round(p / 100.0 * (len(samples) - 1)))))
+        result[label] = samples[index]
+    return result
+
+
+def summarize_trackers(trackers: Iterable[LatencyTracker],
+                       percentiles: Iterable[float] = (50, 90, 99)) -> Dict[str, float]:
+    """
+    Return the summary of several trackers as if their samples had been recorded by a single one: count, mean
+    and max over all samples ever recorded, percentiles over the samples currently in their windows.
+    """
+    count, total, maximum, samples = 0, 0.0, 0.0, []
+    for tracker in trackers:
+        with tracker._lock:
+            count += tracker.count
+            total += tracker.total
+            maximum = max(maximum, tracker.max)
+            samples.extend(tracker._samples)
+    summary = {"count": count, "mean": total / count if count else 0.0, "max": maximum}
+    summary.update(_percentiles(sorted(samples), percentiles))
+    return summary
+
+
+class LatencyHistogram:
+    """Bucketed latency counts with a LatencyTracker for percentiles."""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.tracker = LatencyTracker(max_samples=2000)
+
+    def record(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.tracker.record(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound:g}" for bound in self.buckets] + ["inf"]
+        return {"histogram": dict(zip(labels, self.counts)), **self.tracker.summary()}
@@ -1,11 +1,23 @@
-from opentelemetry import trace
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
-from opentelemetry.instrumentation.logging import LoggingInstrumentor
+_tracer = None
 
 
 def setup_tracing(service_name="zzv-vm"):
+    """
+    Configure OpenTelemetry tracing and logging instrumentation.
+
+    OpenTelemetry is imported here rather than at module level so that importing zzv stays cheap;
+    repeated calls return the tracer created by the first call.
+    """
+    global _tracer
+    if _tracer is not None:
+        return _tracer
+
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.instrumentation.logging import LoggingInstrumentor
+
     resource = Resource.create({"service.name": service_name})
     provider = TracerProvider(resource=resource)
     processor = BatchSpanProcessor(ConsoleSpanExporter())
@@ -13,4 +25,5 @@ def setup_tracing(service_name="zzv-vm"):
     trace.set_tracer_provider(provider)
 
     LoggingInstrumentor().instrument(set_logging_format=True)
-    return trace.get_tracer(__name__)
+    _tracer = trace.get_tracer(__name__)
+    return _tracer
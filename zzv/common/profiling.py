@@ -0,0 +1,91 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import traceback
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    """Return a frame's stack as 'file:function' labels from the outermost call to `frame`, joined by ';'."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler for a running process.
+
+    A background thread reads the stack of every other thread (sys._current_frames) at a fixed interval and counts
+    the collapsed stacks, in the format read by flame graph tools. Nothing is instrumented, so the profiled code
+    runs at full speed; the cost is one stack walk per thread and interval, paid by the sampling thread.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize the SamplingProfiler.
+
+        Args:
+            interval (float): Seconds between two samples.
+        """
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def run(self, seconds: float) -> Counter:
+        """Sample every thread but the calling one for `seconds` and return the collapsed stack counts."""
+        own_thread = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_thread:
+                    self.stacks[f"{names.get(thread_id, thread_id)};{collapse_stack(frame)}"] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+        return self.stacks
+
+    def collapsed(self) -> str:
+        """Return the samples as 'thread;outer;...;inner count' lines, most frequent first."""
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+def snapshot_statistics(snapshot: tracemalloc.Snapshot, limit: int = 25, key_type: str = 'lineno') -> List[Dict]:
+    """Return the `limit` largest allocation sites of a tracemalloc snapshot."""
+    return [{"location": str(stat.traceback[0]), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+            for stat in snapshot.statistics(key_type)[:limit]]
+
+
+def snapshot_diff(base: tracemalloc.Snapshot, target: tracemalloc.Snapshot, limit: int = 25,
+                  key_type: str = 'lineno') -> List[Dict]:
+    """Return the `limit` allocation sites that changed most from `base` to `target`."""
+    return [{"location": str(stat.traceback[0]), "size_diff_kb": round(stat.size_diff / 1024, 1),
+             "size_kb": round(stat.size / 1024, 1), "count_diff": stat.count_diff}
+            for stat in target.compare_to(base, key_type)[:limit]]
+
+
+def task_stacks(loop: Optional[asyncio.AbstractEventLoop] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """Return every pending asyncio task of the loop with its coroutine stack, innermost frame last."""
+    tasks = []
+    for task in asyncio.all_tasks(loop):
+        frames = task.get_stack(limit=limit)
+        tasks.append({
+            "name": task.get_name(),
+            "coroutine": getattr(task.get_coro(), '__qualname__', repr(task.get_coro())),
+            "done": task.done(),
+            "stack": [line.rstrip() for line in traceback.format_list(
+                [(frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name, None) for frame in frames])]
+        })
+    return sorted(tasks, key=lambda task: task["name"])
@@ -0,0 +1,247 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from zzv.common.latency import LatencyTracker, summarize_trackers
+
+DEFAULT_RATE_WINDOWS = (1, 10, 60)
+MAX_RETIRED_TIMINGS = 16  # Latency trackers kept per name from threads that have exited
+CLOCK_RESOLUTION = 0.1  # Seconds between two updates of the coarse clock
+
+# Whole seconds of time.monotonic(), kept up to date by a daemon thread: reading the clock on every increment
+# would cost more than the increment itself
+_current_second = int(time.monotonic())
+_clock_thread: Optional[threading.Thread] = None
+_clock_lock = threading.Lock()
+
+
+def _tick():
+    global _current_second
+    while True:
+        _current_second = int(time.monotonic())
+        time.sleep(CLOCK_RESOLUTION)
+
+
+def _start_clock():
+    global _clock_thread
+    with _clock_lock:
+        if _clock_thread is None or not _clock_thread.is_alive():
+            _clock_thread = threading.Thread(target=_tick, name="stats-clock", daemon=True)
+            _clock_thread.start()
+
+
+def _reset_clock():
+    """Forget the clock thread in a forked child, which has none; the next StatsCounters restarts it."""
+    global _clock_thread, _clock_lock
+    _clock_thread, _clock_lock = None, threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_clock)
+
+
+class _Shard:
+    """
+    Counters updated by a single thread; other threads only read them.
+
+    `state` is (second, counts of that second, totals of the seconds before), replaced as a whole when the second
+    changes, so that a reader taking it once sees a consistent view of the shard.
+    """
+
+    __slots__ = ('thread', 'state', 'history', 'timings')
+
+    def __init__(self, thread: threading.Thread, horizon: int):
+        self.thread = thread
+        self.state: Tuple[int, Dict[str, int], Dict[str, int]] = (_current_second, {}, {})
+        self.history: Deque[Tuple[int, Dict[str, int]]] = deque(maxlen=horizon)  # Counts of the past seconds
+        self.timings: Dict[str, LatencyTracker] = {}
+
+    def roll(self, second: int) -> Tuple[int, Dict[str, int], Dict[str, int]]:
+        """Close the current second, folding its counts into the totals; called by the owner thread."""
+        previous, counts, base = self.state
+        self.history.append((previous, counts))
+        base = dict(base)
+        for name, count in counts.items():
+            base[name] = base.get(name, 0) + count
+        self.state = (second, {}, base)
+        return self.state
+
+    def totals(self) -> Dict[str, int]:
+        _, counts, base = self.state
+        totals = dict(base)
+        for name, count in counts.copy().items():  # The copy is taken at once, under the GIL
+            totals[name] = totals.get(name, 0) + count
+        return totals
+
+
+class StatsCounters(Mapping[str, int]):
+    """
+    Counters that any thread can increment without losing counts or contending with the others.
+
+    Each thread increments its own shard, created on its first increment, so that `+= 1` races between the event
+    loop, the Kafka poller threads and the threads calling handle_message are impossible and no lock is taken
+    on the hot path. Reads add the shards up: `stats["name"]` for one counter, snapshot() for all of them, each
+    shard being read at once so that a snapshot never shows half of a thread's update. Shards also keep their
+    counts per second for the last `horizon` seconds, from which rates() computes messages per second over
+    sliding windows.
+
+    The class reads as a mapping of counter name to total, so `stats["name"]` and `{**stats}` keep working for
+    code written against the former plain dictionaries; updates go through incr().
+    """
+
+    def __init__(self, names: Iterable[str] = (), horizon: int = max(DEFAULT_RATE_WINDOWS)):
+        """
+        Initialize the StatsCounters.
+
+        Args:
+            names (Iterable[str]): Counters reported even before their first increment.
+            horizon (int): Seconds of per-second counts kept for rates.
+        """
+        self.horizon = horizon
+        self._names: Dict[str, None] = dict.fromkeys(names)  # Ordered set of the declared counters
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._retired: Dict[str, int] = {}  # Totals of the shards whose thread has exited
+        self._retired_timings: Dict[str, Deque[LatencyTracker]] = {}  # Latest trackers of the exited threads
+        self._lock = threading.Lock()  # Guards the shard list, not the counters
+        _start_clock()
+
+    def declare(self, *names: str):
+        """Declare counters, reported as 0 until they are incremented."""
+        for name in names:
+            self._names.setdefault(name)
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = _Shard(threading.current_thread(), self.horizon)
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def incr(self, name: str, amount: int = 1):
+        """Add `amount` to a counter from the calling thread."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        state = shard.state
+        second = _current_second
+        if state[0] != second:
+            state = shard.roll(second)
+        counts = state[1]
+        counts[name] = counts.get(name, 0) + amount
+
+    def observe(self, name: str, value: float):
+        """Record a latency sample, usually in milliseconds, from the calling thread."""
+        shard = self._shard()
+        tracker = shard.timings.get(name)
+        if tracker is None:
+            tracker = shard.timings[name] = LatencyTracker(max_samples=2000)
+        tracker.record(value)
+
+    def _retire_dead_shards(self):
+        """
+        Fold the shards of exited threads into the retired totals once their per-second counts are past the
+        horizon; called with the lock held.
+        """
+        kept = []
+        now = _current_second
+        for shard in self._shards:
+            if shard.thread.is_alive() or now - shard.state[0] <= self.horizon:
+                kept.append(shard)
+                continue
+            for name, count in shard.totals().items():
+                self._retired[name] = self._retired.get(name, 0) + count
+            for name, tracker in shard.timings.items():
+                self._retired_timings.setdefault(name, deque(maxlen=MAX_RETIRED_TIMINGS)).append(tracker)
+        self._shards = kept
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return the totals of all counters, the declared ones first."""
+        with self._lock:
+            shards = list(self._shards)
+            totals = dict.fromkeys(self._names, 0)
+            for name, count in self._retired.items():
+                totals[name] = totals.get(name, 0) + count
+        for shard in shards:
+            for name, count in shard.totals().items():
+                totals[name] = totals.get(name, 0) + count
+        return totals
+
+    def __getitem__(self, name: str) -> int:
+        with self._lock:
+            shards = list(self._shards)
+            total = self._retired.get(name, 0)
+        known = name in self._names or name in self._retired
+        for shard in shards:
+            _, counts, base = shard.state
+            if name in base or name in counts:
+                known = True
+                total += base.get(name, 0) + counts.get(name, 0)
+        if not known:
+            raise KeyError(name)
+        return total
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.snapshot())
+
+    def __len__(self) -> int:
+        return len(self.snapshot())
+
+    def rates(self, windows: Iterable[int] = DEFAULT_RATE_WINDOWS,
+              names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Return the per-second rate of each counter over sliding windows of whole seconds, the current second
+        being excluded as it is still filling up.
+
+        Args:
+            windows (Iterable[int]): Window lengths in seconds, at most `horizon`.
+            names (Iterable[str], optional): Counters to report; all of them by default.
+
+        Returns:
+            dict: Mapping such as {'messages_sent': {'1s': 980.0, '10s': 1012.4, '60s': 1003.1}}.
+        """
+        windows = [max(1, min(window, self.horizon)) for window in windows]
+        now = _current_second
+        with self._lock:
+            shards = list(self._shards)
+        per_second: Dict[int, Dict[str, int]] = {}
+        for shard in shards:
+            # The state is read before the history: if the owner rolls it over in between, its second shows up in
+            # both and is counted once
+            current, counts, _ = shard.state
+            seconds = dict(list(shard.history))
+            seconds.setdefault(current, counts)
+            for second, counts in seconds.items():
+                if now - max(windows) <= second < now:
+                    merged = per_second.setdefault(second, {})
+                    for name, count in counts.copy().items():
+                        merged[name] = merged.get(name, 0) + count
+
+        names = list(names) if names is not None else list(self.snapshot())
+        rates = {}
+        for name in names:
+            rates[name] = {f"{window}s": sum(counts.get(name, 0) for second, counts in per_second.items()
+                                             if second >= now - window) / window
+                           for window in windows}
+        return rates
+
+    def timings(self) -> Dict[str, Dict[str, float]]:
+        """Return count, mean, max and percentiles of every observed latency, all threads combined."""
+        with self._lock:
+            shards = list(self._shards)
+            trackers = {name: list(retired) for name, retired in self._retired_timings.items()}
+        for shard in shards:
+            for name, tracker in list(shard.timings.items()):
+                trackers.setdefault(name, []).append(tracker)
+        return {name: summarize_trackers(name_trackers) for name, name_trackers in trackers.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the totals, the rates and the latencies, as served by the stats endpoints."""
+        return {**self.snapshot(), "rates": self.rates(), "latency_ms": self.timings()}
@@ -1,3 +1,4 @@
+import copy
 import csv
 import io
 import json
@@ -6,20 +7,45 @@ import os
 import re
 import shutil
 import socket
+import threading
 import time
 from io import BytesIO
 
-import requests  # Add requests for HTTP operations
 import yaml  # Add yaml for configuration handling
-from packaging import version
+
+# `requests` and `packaging` are imported inside the functions that use them to keep `import zzv` cheap
 
 logger = logging.getLogger(__name__)
 
 # Assuming COMMON_ROOT is defined somewhere globally, or you can define it here
 COMMON_ROOT = os.path.dirname(os.path.abspath(__file__))
 
+# Parsed configuration files by absolute path, with the (mtime_ns, size) they were parsed at
+_config_cache = {}
+_config_cache_lock = threading.Lock()
+
+
+def _load_cached(config_path, parse):
+    """
+    Parse a configuration file once per modification and return a deep copy of the result, so callers may
+    modify what they get without affecting later calls.
+    """
+    path = os.path.abspath(config_path)
+    stat = os.stat(path)
+    state = (stat.st_mtime_ns, stat.st_size)
+    with _config_cache_lock:
+        cached = _config_cache.get(path)
+    if cached is None or cached[0] != state:
+        with open(path, 'r') as file:
+            cached = (state, parse(file))
+        with _config_cache_lock:
+            _config_cache[path] = cached
+    return copy.deepcopy(cached[1])
+
 
 def clean_requirements(file_path):
+    from packaging import version
+
     with open(file_path, 'r') as f:
         content = f.read()
 
@@ -119,9 +145,7 @@ def load_agent_config(tag_name=None, config_path=None):
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
 
-    with open(config_path, 'r') as file:
-        config = json.load(file)
-
+    config = _load_cached(config_path, json.load)
     config['config_path'] = config_path
     return config
 
@@ -143,8 +167,7 @@ def load_logger_config(config_path=None):
         config_path = '../../config/logger_config.json'
 
     if os.path.exists(config_path):
-        with open(config_path, 'r') as file:
-            config = json.load(file)
+        config = _load_cached(config_path, json.load)
     else:
         config = {
             'log_level': os.getenv('LOG_LEVEL', 'INFO'),
@@ -185,10 +208,8 @@ def format_elapsed_time(start_time_ns: int) -> (str, float):
 # New Utility Functions for Server Control
 
 def load_config(config_path='config/config.yaml'):
-    """Load the server configuration from a YAML file."""
-    with open(config_path, 'r') as file:
-        config = yaml.safe_load(file)
-    return config
+    """Load the server configuration from a YAML file. The file is only parsed again once it has changed."""
+    return _load_cached(config_path, yaml.safe_load)
 
 
 def translate_host_for_requests(host):
@@ -200,6 +221,8 @@ def start_server_request(host, port):
     """
     Function to send a request to start the Virtual Voyage Server.
     """
+    import requests
+
     host_for_request = translate_host_for_requests(host)
     try:
         response = requests.post(f"http://{host_for_request}:{port}/start")
@@ -215,6 +238,8 @@ def check_health(host, port):
     """
     Function to check the health of the server.
     """
+    import requests
+
     host_for_request = translate_host_for_requests(host)
     try:
         response = requests.get(f"http://{host_for_request}:{port}/health")
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import os
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
+
+from zzv.common.constants import CONFIG_SERVICE
+from zzv.common.utility import load_config
+from zzv.engine.manager import Manager
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+LOGGING_SECTION = 'logging'
+
+
+def freeze(value: Any) -> Any:
+    """Return a read-only copy of a parsed configuration: mappings become MappingProxyType, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ConfigService(Manager):
+    """
+    Hold the engine configuration as an immutable snapshot and reload it without a restart.
+
+    The file is parsed once; `snapshot` is a read-only view that is replaced, never modified. When the engine was
+    started from a file, the service polls its modification time and reloads it when it changes. A reload is
+    applied atomically: the new file is parsed off the event loop, every subscriber of a changed section
+    validates it, and only if all of them accept it is the snapshot swapped and the subscribers called, one
+    after the other without yielding to the event loop. A file that fails to parse or validate is rejected and
+    the previous snapshot stays in force.
+
+    Managers opt in by implementing ReconfigurableManager; settings a manager does not re-read (such as producer
+    settings of a running librdkafka client) still need a restart. The 'logging' section (`level` and per-logger
+    `loggers` levels) is applied by the service itself.
+    """
+
+    def __init__(self, config: Mapping[str, Any], config_path: Optional[str] = None,
+                 reload_config: Optional[Mapping[str, Any]] = None):
+        """
+        Initialize the ConfigService.
+
+        Args:
+            config (Mapping): The configuration the engine was started with.
+            config_path (str, optional): The file it was loaded from. Without it, the configuration is not watched.
+            reload_config (Mapping, optional): The 'config_reload' configuration section: `enabled` (default
+                True) and `poll_interval` in seconds between modification time checks (default 2).
+        """
+        super().__init__(name="ConfigService")
+        reload_config = reload_config or {}
+        self.config_path = os.path.abspath(config_path) if config_path else None
+        self.watch = self.config_path is not None and reload_config.get('enabled', True)
+        self.poll_interval = reload_config.get('poll_interval', 2.0)
+        self._snapshot: Mapping[str, Any] = freeze(config or {})
+        self.version = 1
+        self.loaded_at = time.time()
+        self._file_state = self._stat()
+        self._subscribers: Dict[str, List[Tuple[str, Callable, Optional[Callable]]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.reloads = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self.subscribe(LOGGING_SECTION, apply_logging_config, name=CONFIG_SERVICE)
+
+    @property
+    def snapshot(self) -> Mapping[str, Any]:
+        """The current configuration, read-only."""
+        return self._snapshot
+
+    def get(self, section: str, default: Any = None) -> Any:
+        """Return a read-only configuration section."""
+        return self._snapshot.get(section, default)
+
+    def subscribe(self, section: str, callback: Callable[[Mapping[str, Any]], Any], name: Optional[str] = None,
+                  validate: Optional[Callable[[Mapping[str, Any]], Any]] = None):
+        """
+        Call `callback(new_section)` whenever a reload changes `section`.
+
+        Args:
+            section (str): Top-level configuration section.
+            callback (callable): Applies the new section; runs on the event loop and must not block.
+            name (str, optional): Subscriber name used in logs and the status endpoint.
+            validate (callable, optional): Raises ValueError to reject a new section before anything is applied.
+        """
+        name = name or getattr(callback, '__qualname__', repr(callback))
+        self._subscribers.setdefault(section, []).append((name, callback, validate))
+
+    async def start(self):
+        """Apply the logging section and start watching the configuration file."""
+        logger.info(f"Starting {CONFIG_SERVICE}" + (f", watching {self.config_path}..." if self.watch else "..."))
+        if self.get(LOGGING_SECTION):
+            apply_logging_config(self.get(LOGGING_SECTION))
+        self._running = True
+        if self.watch:
+            self._task = asyncio.create_task(self._watch())
+
+    async def close(self):
+        """Stop watching the configuration file."""
+        logger.info(f"Stopping {CONFIG_SERVICE}...")
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        if self.config_path is None:
+            return None
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def _watch(self):
+        while self._running:
+            await asyncio.sleep(self.poll_interval)
+            state = self._stat()
+            if state is not None and state != self._file_state:
+                self._file_state = state
+                await self.reload()
+
+    async def reload(self) -> List[str]:
+        """
+        Re-read the configuration file and apply the changed sections.
+
+        Returns:
+            list: The changed sections, empty if nothing changed or the new configuration was rejected.
+        """
+        if self.config_path is None:
+            raise ValueError(f"{CONFIG_SERVICE} was not started from a configuration file.")
+        try:
+            config = await asyncio.to_thread(load_config, self.config_path)
+        except Exception as e:
+            return self._reject(f"Failed to load {self.config_path}: {e}")
+        if not isinstance(config, Mapping):
+            return self._reject(f"{self.config_path} does not contain a configuration mapping.")
+        return self.apply(config)
+
+    def apply(self, config: Mapping[str, Any]) -> List[str]:
+        """
+        Replace the configuration and notify the subscribers of the changed sections, all or nothing.
+
+        Returns:
+            list: The changed sections, empty if nothing changed or the new configuration was rejected.
+        """
+        new_snapshot = freeze(config)
+        changed = sorted(section for section in set(self._snapshot) | set(new_snapshot)
+                         if self._snapshot.get(section) != new_snapshot.get(section))
+        if not changed:
+            return []
+
+        for section in changed:
+            for name, _, validate in self._subscribers.get(section, []):
+                if validate is None:
+                    continue
+                try:
+                    validate(new_snapshot.get(section) or MappingProxyType({}))
+                except Exception as e:
+                    return self._reject(f"{name} rejected section '{section}': {e}")
+
+        self._snapshot = new_snapshot
+        self.version += 1
+        self.loaded_at = time.time()
+        self.reloads += 1
+        self.last_error = None
+        for section in changed:
+            for name, callback, _ in self._subscribers.get(section, []):
+                try:
+                    callback(new_snapshot.get(section) or MappingProxyType({}))
+                except Exception as e:
+                    self.last_error = f"{name} failed to apply section '{section}': {e}"
+                    logger.error(self.last_error)
+        logger.info(f"Configuration version {self.version} applied; changed sections: {', '.join(changed)}.")
+        return changed
+
+    def _reject(self, error: str) -> List[str]:
+        self.rejected += 1
+        self.last_error = error
+        logger.error(f"Configuration reload rejected: {error}")
+        return []
+
+    def get_status(self) -> Dict[str, Any]:
+        """Return the snapshot version, reload counters and subscribers per section."""
+        return {
+            "config_path": self.config_path,
+            "watching": self.watch and self._running,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+            "subscribers": {section: [name for name, _, _ in subscribers]
+                            for section, subscribers in self._subscribers.items()}
+        }
+
+    def get_health(self):
+        """
+        Return the health status of the ConfigService as a HealthReport object. A rejected or partially applied
+        reload is reported as a warning until the next successful one.
+        """
+        if not self._running:
+            status = Status.ERROR
+        elif self.last_error:
+            status = Status.WARNING
+        else:
+            status = Status.OK
+        details = [f"ConfigService is {'running' if self._running else 'not running'}",
+                   f"Configuration version: {self.version}"]
+        if self.last_error:
+            details.append(f"Last error: {self.last_error}")
+        return HealthReport(manager_name=self.name, status=status, details=details)
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the ConfigService.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+        from fastapi import HTTPException
+
+        @app.get(f"/{self.name}/status")
+        async def config_status() -> Dict[str, Any]:
+            """Get the configuration version, reload counters and subscribers."""
+            return self.get_status()
+
+        @app.post(f"/{self.name}/reload")
+        async def reload_config() -> Dict[str, Any]:
+            """Reload the configuration file now."""
+            if self.config_path is None:
+                raise HTTPException(status_code=400, detail="The engine was not started from a configuration file")
+            changed = await self.reload()
+            return {"version": self.version, "changed_sections": changed, "error": self.last_error}
+
+        print(f"Registered endpoints for {self.name}.")
+
+
+def apply_logging_config(logging_config: Mapping[str, Any]):
+    """Set the root log level (`level`) and per-logger levels (`loggers`)."""
+    if logging_config.get('level'):
+        logging.getLogger().setLevel(str(logging_config['level']).upper())
+    for name, level in (logging_config.get('loggers') or {}).items():
+        logging.getLogger(name).setLevel(str(level).upper())
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
+
+from zzv.common.constants import EXECUTOR_MANAGER
+from zzv.common.latency import LatencyTracker
+from zzv.engine.manager import Manager
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+POOL_THREAD = 'thread'
+POOL_PROCESS = 'process'
+
+# Pools available when the configuration does not define them
+DEFAULT_POOLS = {
+    'codec': {'type': POOL_THREAD, 'workers': min(4, os.cpu_count() or 1)},  # Serialization and I/O-bound work
+    'cpu': {'type': POOL_PROCESS, 'workers': max(1, (os.cpu_count() or 2) - 1)},  # CPU-bound pure functions
+}
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: Dict[str, Any]):
+    """Run `fn` in the worker and return its result with the time spent running it."""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+class ExecutorPool:
+    """A named executor with its counters."""
+
+    def __init__(self, name: str, pool_type: str, workers: int):
+        if pool_type not in (POOL_THREAD, POOL_PROCESS):
+            raise ValueError(f"Unsupported pool type '{pool_type}' for pool '{name}'. "
+                             f"Supported types: '{POOL_THREAD}', '{POOL_PROCESS}'.")
+        if workers <= 0:
+            raise ValueError(f"Pool '{name}' needs at least one worker, got {workers}.")
+        self.name = name
+        self.pool_type = pool_type
+        self.workers = workers
+        self.executor: Optional[Executor] = None  # Created on first use; process pools are slow to start
+        self.created_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0  # Time spent running tasks, summed over workers
+        self.latency = LatencyTracker()  # Submit-to-result time in milliseconds, including queueing
+
+    def get_executor(self) -> Executor:
+        with self._lock:
+            if self.executor is None:
+                if self.pool_type == POOL_THREAD:
+                    self.executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                       thread_name_prefix=f"pool-{self.name}")
+                else:
+                    self.executor = ProcessPoolExecutor(max_workers=self.workers)
+                self.created_at = time.perf_counter()
+            return self.executor
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the pool's counters: `queued` tasks wait for a worker, `active` ones are running. `utilization` is
+        active/workers right now, `average_utilization` the share of worker time spent running tasks since the
+        pool was created.
+        """
+        in_flight = self.submitted - self.completed - self.failed
+        active = min(in_flight, self.workers)
+        uptime = time.perf_counter() - self.created_at if self.created_at is not None else 0.0
+        return {
+            "type": self.pool_type,
+            "workers": self.workers,
+            "started": self.executor is not None,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "active": active,
+            "queued": in_flight - active,
+            "utilization": active / self.workers,
+            "average_utilization": min(1.0, self.busy_seconds / (uptime * self.workers)) if uptime else 0.0,
+            "latency_ms": self.latency.summary()
+        }
+
+
+class ExecutorManager(Manager):
+    """
+    Named thread and process pools that managers use to keep blocking or CPU-heavy work off the event loop.
+
+    `await kernel.offload('codec', fn, *args)` runs `fn` in the 'codec' pool and returns its result. Thread pools
+    keep the loop responsive during serialization and I/O: the loop gets the GIL back at every switch interval
+    instead of waiting for the whole call. Process pools run CPU-bound work in parallel but need picklable,
+    module-level functions and arguments.
+    """
+
+    def __init__(self, executors_config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the ExecutorManager.
+
+        Args:
+            executors_config (dict, optional): The 'executors' configuration section. Its `pools` mapping
+                gives each pool's `type` ('thread' or 'process') and `workers`, and is merged over DEFAULT_POOLS.
+        """
+        super().__init__(name="ExecutorManager")
+        pools_config = {**DEFAULT_POOLS, **(executors_config or {}).get('pools', {})}
+        self.pools: Dict[str, ExecutorPool] = {
+            name: ExecutorPool(name, pool.get('type', POOL_THREAD), pool.get('workers', 1))
+            for name, pool in pools_config.items()
+        }
+
+    async def start(self):
+        """Pools are created on first use."""
+        logger.info(f"Starting {EXECUTOR_MANAGER} with pools: {', '.join(self.pools)}...")
+        self._running = True
+
+    async def close(self):
+        """Wait for running tasks and shut the pools down."""
+        logger.info(f"Stopping {EXECUTOR_MANAGER}...")
+        self._running = False
+        for pool in self.pools.values():
+            if pool.executor is not None:
+                await asyncio.to_thread(pool.executor.shutdown, True, cancel_futures=True)
+                pool.executor = None
+
+    def get_pool(self, name: str) -> ExecutorPool:
+        pool = self.pools.get(name)
+        if pool is None:
+            raise KeyError(f"Unknown executor pool '{name}'. Configured pools: {', '.join(self.pools)}.")
+        return pool
+
+    async def run(self, pool_name: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` in the named pool and return its result.
+
+        Raises:
+            KeyError: If the pool is not configured.
+            Exception: Whatever `fn` raised.
+        """
+        pool = self.get_pool(pool_name)
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+        pool.submitted += 1
+        try:
+            result, busy = await loop.run_in_executor(pool.get_executor(), partial(_timed_call, fn, args, kwargs))
+        except BaseException:
+            pool.failed += 1
+            raise
+        pool.completed += 1
+        pool.busy_seconds += busy
+        pool.latency.record((time.perf_counter() - submitted_at) * 1000)
+        return result
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the stats of every pool."""
+        return {name: pool.get_stats() for name, pool in self.pools.items()}
+
+    def get_health(self):
+        """
+        Return the health status of the ExecutorManager as a HealthReport object. Pools with more queued tasks
+        than workers are reported as a warning.
+        """
+        if not self._running:
+            return HealthReport(manager_name=self.name, status=Status.ERROR,
+                                details=["ExecutorManager is not running."])
+        details = []
+        status = Status.OK
+        for name, stats in self.get_stats().items():
+            details.append(f"Pool {name}: {stats['active']}/{stats['workers']} active, {stats['queued']} queued")
+            if stats['queued'] > stats['workers']:
+                status = Status.WARNING
+        return HealthReport(manager_name=self.name, status=status, details=details)
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the ExecutorManager.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+
+        @app.get(f"/{self.name}/stats")
+        async def executor_stats() -> Dict[str, Dict[str, Any]]:
+            """Get queue depth, utilization and latency of every pool."""
+            return self.get_stats()
+
+        print(f"Registered endpoints for {self.name}.")
@@ -1,47 +1,176 @@
 import asyncio
 import logging
 import sys
-from typing import Optional, List, Dict
-
-from fastapi import FastAPI
+from datetime import datetime
+from typing import Any, Callable, Optional, List, Dict, TYPE_CHECKING
 
+from zzv.common.custom_datetime import CustomDateTime, KERNEL_MODE_REALTIME
 from zzv.engine.kernel_aware_manager import KernelAwareManager
-from zzv.common.constants import QUEUE_MANAGER, MSG_MANAGER
+from zzv.common.constants import (CONFIG_SERVICE, QUEUE_MANAGER, MSG_MANAGER, REPLAY_MANAGER, EXPORT_MANAGER,
+                                  EXECUTOR_MANAGER, KAFKA_CONSUMER_MANAGER, CONSUMER_LAG_MONITOR,
+                                  AGGREGATION_MANAGER, PRODUCER_POOL, PROFILING_MANAGER, LOOP_MONITOR,
+                                  SYMBOL_DICTIONARY)
+from zzv.engine.config_service import ConfigService
+from zzv.engine.executor_manager import ExecutorManager
 from zzv.engine.manager import Manager
+from zzv.engine.reconfigurable_manager import ReconfigurableManager
 from zzv.health.health_report import HealthReport
 from zzv.health.status import Status
 from zzv.msgcore.msg_manager import MsgManager
+from zzv.msgcore.producer_pool import ProducerPool
 from zzv.msgcore.queue_manager import QueueManager
 
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
 logger = logging.getLogger(__name__)
 
+# Services closed before the others, in this order: the configuration watcher, then the sources feeding messages
+# into the MsgManager, then the pipeline from the MsgManager to the QueueManager. Sources must stop before the
+# pipeline, or what they fetch during shutdown is acknowledged (consumer offsets committed) and then dropped
+_CLOSE_FIRST = (CONFIG_SERVICE, KAFKA_CONSUMER_MANAGER, REPLAY_MANAGER, MSG_MANAGER, QUEUE_MANAGER)
+
 
 class Kernel(Manager):
-    def __init__(self, config, additional_managers: Optional[List[Dict]] = None):
+    def __init__(self, config, additional_managers: Optional[List[Dict]] = None, config_path: Optional[str] = None):
         """
         Initialize the Kernel with configuration and additional managers.
 
         Args:
             config (dict): Configuration dictionary.
             additional_managers (list, optional): List of additional manager configurations.
+            config_path (str, optional): File the configuration was loaded from; when given, the ConfigService
+                watches it and applies changes to the managers that support it.
         """
         self._services = {}
         self.is_running = False  # Track running status
         self._service_access_rules = {}  # Dictionary to hold access rules for services
         self.config = config  # Store the configuration for use in services
         self._additional_managers = additional_managers or []  # List of additional managers
+        self._kernel_aware_managers = set()  # Names of additional managers started and stopped by name below
+
+        # Immutable configuration snapshot, reloaded from config_path without a restart. Registered first so that
+        # it stops watching before the managers it notifies are closed
+        self.config_service = ConfigService(config, config_path, self.config.get('config_reload', {}))
+        self._register_service(CONFIG_SERVICE, self.config_service, allowed_callers=["*"])
+
+        # Shared clock used by every manager, so that replayed and live timestamps stay consistent
+        self.clock = self._create_clock(self.config.get('clock', {}))
 
         # Load Kafka broker information from config
         kafka_brokers = self.config.get('kafka_brokers',
                                         '31.220.102.46:29092,31.220.102.46:29094')  # Default to localhost if not set
 
+        # Delivery tracking settings for the KafkaTransporter (in-flight window, poll interval)
+        transporter_config = self.config.get('kafka_transporter', {})
+
+        # Producers shared by the transporters and managers, one per cluster and profile. Created before the
+        # managers that borrow from it, registered after them below so that it is closed once they have flushed
+        self.producers = ProducerPool(self.config.get('producer_pool', {}),
+                                      default_cluster={'type': transporter_config.get('type', 'kafka'),
+                                                       'bootstrap.servers': kafka_brokers})
+
+        # Symbol ids shared by the snapshot codecs, when enabled. Created before the transporter that encodes with
+        # it, registered after the managers below so that the entries of their last messages are saved
+        self.symbols = None
+        symbol_config = self.config.get('symbol_dictionary', {})
+        if symbol_config.get('enabled', False):
+            from zzv.msgcore.symbol_dictionary_manager import SymbolDictionaryManager
+            self.symbols = SymbolDictionaryManager(self, symbol_config)
+
         # Register core services
-        self._register_service(QUEUE_MANAGER, QueueManager(self, kafka_brokers), allowed_callers=["*"])
-        self._register_service(MSG_MANAGER, MsgManager(self), allowed_callers=["*"])
+        self._register_service(QUEUE_MANAGER, QueueManager(self, kafka_brokers, transporter_config,
+                                                           self.config.get('queue_manager', {})),
+                               allowed_callers=["*"])
+        self._register_service(MSG_MANAGER, MsgManager(self, self.config.get('msg_manager', {})),
+                               allowed_callers=["*"])
+
+        # Register the replay engine when enabled; imported lazily because it pulls in the FlatBuffers codecs
+        replay_config = self.config.get('replay', {})
+        if replay_config.get('enabled', False):
+            from zzv.replay.replay_manager import ReplayManager
+            self._register_service(REPLAY_MANAGER, ReplayManager(self, replay_config), allowed_callers=["*"])
+
+        # Register the columnar export when enabled; imported lazily because it pulls in NumPy
+        export_config = self.config.get('export', {})
+        if export_config.get('enabled', False):
+            from zzv.export.export_manager import ExportManager
+            self._register_service(EXPORT_MANAGER, ExportManager(self, export_config), allowed_callers=["*"])
+
+        # Register the Kafka consumer when enabled; imported lazily because it loads librdkafka on start
+        consumer_config = self.config.get('kafka_consumer', {})
+        if consumer_config.get('enabled', False):
+            from zzv.msgcore.kafka_consumer_manager import KafkaConsumerManager
+            self._register_service(KAFKA_CONSUMER_MANAGER, KafkaConsumerManager(self, consumer_config),
+                                   allowed_callers=["*"])
+
+        # Register the consumer lag and latency monitor when enabled
+        monitor_config = self.config.get('lag_monitor', {})
+        if monitor_config.get('enabled', False):
+            from zzv.msgcore.consumer_lag_monitor import ConsumerLagMonitor
+            self._register_service(CONSUMER_LAG_MONITOR, ConsumerLagMonitor(self, monitor_config),
+                                   allowed_callers=["*"])
+
+        # Register the windowed aggregation when enabled; imported lazily because it pulls in NumPy
+        aggregation_config = self.config.get('aggregation', {})
+        if aggregation_config.get('enabled', False):
+            from zzv.analytics.aggregation_manager import AggregationManager
+            self._register_service(AGGREGATION_MANAGER, AggregationManager(self, aggregation_config),
+                                   allowed_callers=["*"])
+
+        # Register the debug endpoints (CPU profiles, tracemalloc, task stacks) only when enabled
+        profiling_config = self.config.get('profiling', {})
+        if profiling_config.get('enabled', False):
+            from zzv.engine.profiling_manager import ProfilingManager
+            self._register_service(PROFILING_MANAGER, ProfilingManager(profiling_config), allowed_callers=["*"])
+
+        # Register the event loop lag monitor when enabled
+        loop_monitor_config = self.config.get('loop_monitor', {})
+        if loop_monitor_config.get('enabled', False):
+            from zzv.engine.loop_monitor import LoopMonitor
+            self._register_service(LOOP_MONITOR, LoopMonitor(self, loop_monitor_config), allowed_callers=["*"])
+
+        if self.symbols is not None:
+            self._register_service(SYMBOL_DICTIONARY, self.symbols, allowed_callers=["*"])
+
+        # Named thread and process pools for offloading work from the event loop. Registered after the managers
+        # that use them, so that it is closed after they have drained
+        self.executors = ExecutorManager(self.config.get('executors', {}))
+        self._register_service(EXECUTOR_MANAGER, self.executors, allowed_callers=["*"])
+        self._register_service(PRODUCER_POOL, self.producers, allowed_callers=["*"])
 
         # Register additional managers provided in the configuration
         self._register_additional_managers()
 
+        # Let the managers that support it pick up configuration changes while they run
+        for name, service in self._services.items():
+            if isinstance(service, ReconfigurableManager) and service.config_section:
+                self.config_service.subscribe(service.config_section, service.apply_config, name=name,
+                                              validate=service.validate_config)
+
+    @staticmethod
+    def _create_clock(clock_config: Dict) -> CustomDateTime:
+        """
+        Create the shared clock from the 'clock' configuration section.
+
+        Args:
+            clock_config (dict): Mode ('REAL-TIME' or 'SIMULATED') and optional 'start' datetime.
+        """
+        start = clock_config.get('start')
+        if isinstance(start, str):
+            start = datetime.fromisoformat(start)
+        return CustomDateTime(mode=clock_config.get('mode', KERNEL_MODE_REALTIME), simulated_datetime=start)
+
+    async def offload(self, pool: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` in a named executor pool and return its result.
+
+        Args:
+            pool (str): Pool name from the 'executors' configuration, e.g. 'codec' or 'cpu'.
+            fn (callable): The function; must be picklable for process pools.
+        """
+        return await self.executors.run(pool, fn, *args, **kwargs)
+
     def _register_additional_managers(self):
         """
         Register additional managers based on the provided configuration.
@@ -55,6 +184,7 @@ class Kernel(Manager):
                 # Set the kernel reference if the manager implements KernelAwareManager
                 if isinstance(instance, KernelAwareManager):
                     instance.set_kernel(self)
+                    self._kernel_aware_managers.add(name)
                     logger.info(f"Kernel reference set for manager '{name}'.")
 
                 self._register_service(name, instance, allowed_callers=allowed_callers)
@@ -103,9 +233,9 @@ class Kernel(Manager):
         logger.info("Starting all registered services asynchronously...")
         self.is_running = True  # Set running status to True when starting
 
-        # Start core services
+        # Start core services (kernel-aware additional managers are awaited below instead)
         for name, service in self._services.items():
-            if isinstance(service, Manager):
+            if isinstance(service, Manager) and name not in self._kernel_aware_managers:
                 try:
                     # Start each service asynchronously without waiting
                     asyncio.create_task(service.start())
@@ -133,9 +263,12 @@ class Kernel(Manager):
         logger.info("Stopping all registered services asynchronously...")
         self.is_running = False  # Set running status to False when stopping
 
-        # Stop core services
-        for name, service in self._services.items():
-            if isinstance(service, Manager):
+        # Stop core services (kernel-aware additional managers are closed below). The sources and the pipeline
+        # close first (see _CLOSE_FIRST), the other services in registration order
+        close_order = {name: index for index, name in enumerate(_CLOSE_FIRST)}
+        for name in sorted(self._services, key=lambda name: close_order.get(name, len(close_order))):
+            service = self._services[name]
+            if isinstance(service, Manager) and name not in self._kernel_aware_managers:
                 try:
                     await service.close()
                     logger.info(f"{name} stopped successfully.")
@@ -172,7 +305,7 @@ class Kernel(Manager):
                 details=[f"Error: {str(e)}"]
             )
 
-    def register_endpoints(self, app: FastAPI):
+    def register_endpoints(self, app: 'FastAPI'):
         """
         Register custom endpoints for the Kernel and all managed managers.
 
@@ -1,8 +1,5 @@
 from abc import abstractmethod
 from zzv.engine.manager import Manager  # Import the existing Manager class
-from typing import Optional, Dict, Any
-from zzv.msgcore.kafka_topic_manager import KafkaTopicManager
-from zzv.msgcore.protocol_interface import ProtocolInterface
 
 class KernelAwareManager(Manager):
     """
@@ -0,0 +1,234 @@
+import asyncio
+import inspect
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, TYPE_CHECKING
+
+from zzv.common.constants import LOOP_MONITOR
+from zzv.common.latency import LatencyHistogram
+from zzv.engine.manager import Manager
+from zzv.engine.reconfigurable_manager import ReconfigurableManager
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+UNATTRIBUTED = 'unattributed'
+
+# Upper bounds in milliseconds of the scheduling lag histogram buckets; the last bucket is unbounded
+DEFAULT_LAG_BUCKETS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+class LoopMonitor(ReconfigurableManager):
+    """
+    Measure how long the event loop is blocked and find out by what.
+
+    A probe task sleeps for `interval` seconds in a loop; how late it wakes up is the scheduling lag every other
+    coroutine suffered at that moment, recorded in a histogram. A watchdog thread checks the probe's heartbeat:
+    while the loop has been blocked for more than `slow_threshold_ms`, it captures the stack of the loop thread
+    and attributes the sample to the manager whose module is executing (the innermost frame in the source file
+    of a registered manager's class). When the probe wakes up, the stall is recorded with its duration, its
+    first captured stack and its blocking time split between the managers seen.
+
+    The p99 lag above `max_lag_ms` turns the health status to WARNING.
+    """
+
+    config_section = 'loop_monitor'
+
+    def __init__(self, kernel, monitor_config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the LoopMonitor.
+
+        Args:
+            kernel (Kernel): The kernel whose services blocking time is attributed to.
+            monitor_config (dict, optional): The 'loop_monitor' configuration section:
+                interval (float): Seconds between two probes. Defaults to 0.05.
+                slow_threshold_ms (float): Blocking time from which stacks are captured. Defaults to 100.
+                max_lag_ms (float): p99 scheduling lag above which health is WARNING. Defaults to 50.
+                max_stalls (int): Stalls kept with their stacks. Defaults to 50.
+                stack_limit (int): Innermost frames kept per stack. Defaults to 30.
+                lag_buckets (list): Histogram bucket upper bounds in milliseconds.
+                asyncio_debug (bool): Also run the loop in asyncio debug mode, which logs every callback slower
+                    than the threshold. Costly; off by default.
+        """
+        super().__init__(name="LoopMonitor")
+        monitor_config = monitor_config or {}
+        self.kernel = kernel
+        self.apply_config(monitor_config)
+        self.max_stalls = monitor_config.get('max_stalls', 50)
+        self.stack_limit = monitor_config.get('stack_limit', 30)
+        self.asyncio_debug = monitor_config.get('asyncio_debug', False)
+        self.lag = LatencyHistogram(monitor_config.get('lag_buckets', DEFAULT_LAG_BUCKETS))
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=self.max_stalls)
+        self.blocking_ms: Counter = Counter()  # Manager -> time it kept the loop blocked beyond the threshold
+        self.stall_counts: Counter = Counter()  # Manager -> stalls it was seen in
+        self._module_owners: Dict[str, str] = {}  # Source file -> manager name
+        self._lock = threading.Lock()
+        self._stall: Optional[Dict[str, Any]] = None  # Stall in progress, filled by the watchdog
+        self._heartbeat = time.perf_counter()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def apply_config(self, section_config: Mapping[str, Any]):
+        """Apply the probe interval and thresholds."""
+        self.interval = section_config.get('interval', 0.05)
+        self.slow_threshold_ms = section_config.get('slow_threshold_ms', 100.0)
+        self.max_lag_ms = section_config.get('max_lag_ms', 50.0)
+
+    async def start(self):
+        """Start the probe task and the watchdog thread."""
+        logger.info(f"Starting {LOOP_MONITOR}...")
+        loop = asyncio.get_running_loop()
+        if self.asyncio_debug:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.slow_threshold_ms / 1000
+        self._loop_thread_id = threading.get_ident()
+        self._module_owners = self._map_modules()
+        self._heartbeat = time.perf_counter()
+        self._running = True
+        self._stop.clear()
+        self._task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def close(self):
+        """Stop the probe and the watchdog."""
+        logger.info(f"Stopping {LOOP_MONITOR}...")
+        self._running = False
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+            self._watchdog = None
+
+    def _map_modules(self) -> Dict[str, str]:
+        """Map the source file of every registered manager's classes (but the base classes) to its name."""
+        owners = {}
+        services = dict(getattr(self.kernel, '_services', {}))
+        for name, service in services.items():
+            for cls in type(service).__mro__:
+                if cls in (Manager, ReconfigurableManager, object) or cls.__module__.startswith('abc'):
+                    continue
+                try:
+                    owners.setdefault(inspect.getsourcefile(cls), name)
+                except TypeError:  # Built-in class
+                    continue
+        return owners
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self._heartbeat = time.perf_counter()
+            self.lag.record(lag_ms)
+            with self._lock:
+                stall, self._stall = self._stall, None
+            if stall is not None:
+                self._record_stall(stall, lag_ms)
+
+    def _watch(self):
+        """Capture the loop thread's stack while the loop is blocked; runs on the watchdog thread."""
+        while not self._stop.wait(max(0.001, self.slow_threshold_ms / 4000)):
+            blocked_ms = (time.perf_counter() - self._heartbeat - self.interval) * 1000
+            if blocked_ms < self.slow_threshold_ms:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            manager = self.attribute(frame)
+            with self._lock:
+                if self._stall is None:
+                    self._stall = {
+                        "time": time.time(),
+                        "manager": manager,
+                        "stack": [line.rstrip() for line in traceback.format_stack(frame)[-self.stack_limit:]],
+                        "samples": Counter()
+                    }
+                self._stall["samples"][manager] += 1
+            del frame
+
+    def attribute(self, frame) -> str:
+        """Return the manager owning the innermost frame of the stack that is in a manager's module."""
+        while frame is not None:
+            owner = self._module_owners.get(frame.f_code.co_filename)
+            if owner is not None:
+                return owner
+            frame = frame.f_back
+        return UNATTRIBUTED
+
+    def _record_stall(self, stall: Dict[str, Any], lag_ms: float):
+        """Record a finished stall and split its duration between the managers sampled during it."""
+        samples: Counter = stall.pop("samples")
+        total = sum(samples.values())
+        stall["duration_ms"] = round(lag_ms, 1)
+        stall["managers"] = {manager: round(lag_ms * count / total, 1) for manager, count in samples.items()}
+        for manager, blocked_ms in stall["managers"].items():
+            self.blocking_ms[manager] += blocked_ms
+            self.stall_counts[manager] += 1
+        self.stalls.append(stall)
+        logger.warning(f"Event loop blocked for {lag_ms:.0f} ms, mostly by {samples.most_common(1)[0][0]}.")
+
+    def get_lag(self) -> Dict[str, Any]:
+        """Return the scheduling lag histogram and percentiles in milliseconds."""
+        return self.lag.to_dict()
+
+    def get_blocking(self) -> Dict[str, Dict[str, Any]]:
+        """Return the blocking time and number of stalls per manager, most blocking first."""
+        return {manager: {"blocking_ms": round(blocked_ms, 1), "stalls": self.stall_counts[manager]}
+                for manager, blocked_ms in self.blocking_ms.most_common()}
+
+    def get_health(self):
+        """
+        Return the health status of the LoopMonitor as a HealthReport object. A p99 scheduling lag above
+        `max_lag_ms` is reported as a warning.
+        """
+        if not self._running:
+            return HealthReport(manager_name=self.name, status=Status.ERROR, details=["LoopMonitor is not running."])
+        lag = self.get_lag()
+        details = [f"Event loop lag p50 {lag['p50']:.1f} ms, p99 {lag['p99']:.1f} ms, max {lag['max']:.1f} ms",
+                   f"Stalls over {self.slow_threshold_ms:g} ms: {sum(self.stall_counts.values())}"]
+        details += [f"{manager} blocked the loop for {blocking['blocking_ms']:.0f} ms"
+                    for manager, blocking in list(self.get_blocking().items())[:3]]
+        status = Status.WARNING if lag['p99'] > self.max_lag_ms else Status.OK
+        return HealthReport(manager_name=self.name, status=status, details=details)
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the LoopMonitor.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+
+        @app.get(f"/{self.name}/lag")
+        async def loop_lag() -> Dict[str, Any]:
+            """Get the event loop scheduling lag histogram and percentiles."""
+            return self.get_lag()
+
+        @app.get(f"/{self.name}/stalls")
+        async def loop_stalls() -> List[Dict[str, Any]]:
+            """Get the recent stalls with their duration, blocking managers and captured stack."""
+            return list(self.stalls)
+
+        @app.get(f"/{self.name}/blocking")
+        async def loop_blocking() -> Dict[str, Dict[str, Any]]:
+            """Get the blocking time per manager."""
+            return self.get_blocking()
+
+        print(f"Registered endpoints for {self.name}.")
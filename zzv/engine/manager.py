@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from zzv.common.stats import StatsCounters
 from zzv.health.health_report import HealthReport
 from zzv.health.status import Status  # Import the Status enumeration
 from zzv.health.health import Health  # Import the Health base class
@@ -20,6 +21,7 @@ class Manager(Health, ABC):
         self.name = name  # Store the name of the manager
         self._running = False  # Attribute to track if the manager is currently running
         self._services = {}  # Initialize a dictionary to hold registered services
+        self.stats = StatsCounters()  # Counters any thread can increment; managers declare theirs with stats.declare
 
     @abstractmethod
     def start(self):
@@ -0,0 +1,268 @@
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from zzv.common.constants import PROFILING_MANAGER
+from zzv.common.profiling import SamplingProfiler, snapshot_diff, snapshot_statistics, task_stacks
+from zzv.engine.manager import Manager
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+FORMAT_COLLAPSED = 'collapsed'
+FORMAT_PSTATS = 'pstats'
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a CPU profile is requested while another one is running."""
+
+
+class ProfilingManager(Manager):
+    """
+    On-demand diagnostics of a running engine: CPU profiles, tracemalloc snapshots and asyncio task stacks.
+
+    CPU profiles are either sampled (collapsed stacks of every thread, no instrumentation) or deterministic
+    (cProfile on the event loop thread, returned as pstats text, with a noticeable overhead while it runs). Only
+    one CPU profile runs at a time. The endpoints are only registered when the 'profiling' section enables the
+    manager, and answer only the allowed client hosts and, when a token is configured, requests carrying it in
+    the X-Debug-Token header.
+    """
+
+    def __init__(self, profiling_config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the ProfilingManager.
+
+        Args:
+            profiling_config (dict, optional): The 'profiling' configuration section:
+                allowed_hosts (list): Client addresses allowed to call the endpoints. Defaults to the loopback.
+                token (str): Value required in the X-Debug-Token header, if set.
+                max_seconds (float): Longest CPU profile. Defaults to 60.
+                sample_interval (float): Seconds between two samples of the sampling profiler. Defaults to 0.005.
+                tracemalloc_frames (int): Frames kept per allocation once tracing is started. Defaults to 10.
+                max_snapshots (int): tracemalloc snapshots kept for diffs. Defaults to 10.
+        """
+        super().__init__(name="ProfilingManager")
+        profiling_config = profiling_config or {}
+        self.allowed_hosts = set(profiling_config.get('allowed_hosts', ['127.0.0.1', '::1']))
+        self.token = profiling_config.get('token')
+        self.max_seconds = profiling_config.get('max_seconds', 60.0)
+        self.sample_interval = profiling_config.get('sample_interval', 0.005)
+        self.tracemalloc_frames = profiling_config.get('tracemalloc_frames', 10)
+        self.max_snapshots = profiling_config.get('max_snapshots', 10)
+        self.snapshots: "OrderedDict[int, tracemalloc.Snapshot]" = OrderedDict()
+        self._snapshot_ids = 0
+        self._cpu_lock = asyncio.Lock()
+        self._started_tracemalloc = False  # Whether tracing was started here, so that close() stops it
+        self.stats.declare(
+            "cpu_profiles",  # CPU profiles taken
+            "snapshots",  # tracemalloc snapshots taken
+            "rejected"  # Requests refused by the host or token guard
+        )
+
+    async def start(self):
+        logger.info(f"Starting {PROFILING_MANAGER}...")
+        self._running = True
+
+    async def close(self):
+        """Stop tracing allocations if it was started here, and drop the snapshots."""
+        logger.info(f"Stopping {PROFILING_MANAGER}...")
+        self._running = False
+        self.stop_tracemalloc()
+
+    def authorize(self, client_host: Optional[str], token: Optional[str]) -> bool:
+        """Return whether a client may use the endpoints."""
+        allowed = client_host in self.allowed_hosts and (self.token is None or token == self.token)
+        if not allowed:
+            self.stats.incr("rejected")
+            logger.warning(f"Refused a profiling request from {client_host}.")
+        return allowed
+
+    async def profile_cpu(self, seconds: float, output_format: str = FORMAT_COLLAPSED, limit: int = 50) -> str:
+        """
+        Profile for `seconds` while the engine keeps running and return the profile as text.
+
+        Args:
+            seconds (float): Duration of the profile, at most `max_seconds`.
+            output_format (str): 'collapsed' for sampled stacks of every thread, or 'pstats' for cProfile
+                statistics of the event loop thread sorted by cumulative time.
+            limit (int): Functions listed in pstats output.
+
+        Raises:
+            ValueError: If the duration or the format is invalid.
+            ProfilerBusyError: If a CPU profile is already running.
+        """
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"The profile duration must be in (0, {self.max_seconds}] seconds, got {seconds}.")
+        if output_format not in (FORMAT_COLLAPSED, FORMAT_PSTATS):
+            raise ValueError(f"Unsupported profile format '{output_format}'. "
+                             f"Supported formats: '{FORMAT_COLLAPSED}', '{FORMAT_PSTATS}'.")
+        if self._cpu_lock.locked():
+            raise ProfilerBusyError("A CPU profile is already running.")
+
+        async with self._cpu_lock:
+            self.stats.incr("cpu_profiles")
+            logger.info(f"Profiling CPU for {seconds}s ({output_format})...")
+            if output_format == FORMAT_COLLAPSED:
+                profiler = SamplingProfiler(self.sample_interval)
+                await asyncio.to_thread(profiler.run, seconds)
+                return profiler.collapsed()
+
+            # cProfile traces the thread that enables it: the event loop, where the managers run
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+            output = io.StringIO()
+            pstats.Stats(profile, stream=output).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+            return output.getvalue()
+
+    def start_tracemalloc(self, frames: Optional[int] = None) -> Dict[str, Any]:
+        """Start tracing allocations, if not already traced."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or self.tracemalloc_frames)
+            self._started_tracemalloc = True
+        return self.get_tracemalloc_status()
+
+    def stop_tracemalloc(self) -> Dict[str, Any]:
+        """Stop tracing allocations (if started here) and drop the snapshots."""
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracemalloc = False
+        self.snapshots.clear()
+        return self.get_tracemalloc_status()
+
+    def take_snapshot(self, limit: int = 25) -> Dict[str, Any]:
+        """
+        Take a tracemalloc snapshot, keep it for diffs and return its largest allocation sites.
+
+        Raises:
+            RuntimeError: If allocations are not traced.
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing; start it first.")
+        snapshot = tracemalloc.take_snapshot()
+        self._snapshot_ids += 1
+        self.snapshots[self._snapshot_ids] = snapshot
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+        self.stats.incr("snapshots")
+        return {"id": self._snapshot_ids, "time": time.time(), "top": snapshot_statistics(snapshot, limit)}
+
+    def diff_snapshots(self, base: Optional[int] = None, target: Optional[int] = None,
+                       limit: int = 25) -> List[Dict[str, Any]]:
+        """
+        Return the allocation sites that changed most between two kept snapshots, by default the oldest and the
+        latest.
+
+        Raises:
+            KeyError: If a snapshot is not kept.
+            ValueError: If fewer than two snapshots are kept and none are given.
+        """
+        if base is None or target is None:
+            if len(self.snapshots) < 2:
+                raise ValueError("At least two snapshots are needed for a diff.")
+            ids = list(self.snapshots)
+            base = ids[0] if base is None else base
+            target = ids[-1] if target is None else target
+        for snapshot_id in (base, target):
+            if snapshot_id not in self.snapshots:
+                raise KeyError(f"Unknown snapshot {snapshot_id}. Kept snapshots: {list(self.snapshots)}.")
+        return snapshot_diff(self.snapshots[base], self.snapshots[target], limit)
+
+    def get_tracemalloc_status(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {"tracing": tracemalloc.is_tracing(), "frames": tracemalloc.get_traceback_limit(),
+                "traced_kb": round(current / 1024, 1), "peak_kb": round(peak / 1024, 1),
+                "snapshots": list(self.snapshots)}
+
+    def get_health(self):
+        """
+        Return the health status of the ProfilingManager as a HealthReport object.
+        """
+        return HealthReport(
+            manager_name=self.name,
+            status=Status.OK if self._running else Status.ERROR,
+            details=[f"ProfilingManager is {'running' if self._running else 'not running'}",
+                     f"CPU profile running: {self._cpu_lock.locked()}",
+                     f"Tracing allocations: {tracemalloc.is_tracing()}"]
+        )
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register the debug endpoints of the ProfilingManager.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+        from fastapi import Header, HTTPException, Request
+        from fastapi.responses import PlainTextResponse
+
+        def guard(request: Request, token: Optional[str]):
+            if not self.authorize(request.client.host if request.client else None, token):
+                raise HTTPException(status_code=403, detail="Profiling is not allowed from this client.")
+
+        @app.post(f"/{self.name}/cpu", response_class=PlainTextResponse)
+        async def profile_cpu(request: Request, seconds: float = 10.0, format: str = FORMAT_COLLAPSED,
+                              limit: int = 50, x_debug_token: Optional[str] = Header(None)) -> str:
+            """Profile the engine for `seconds`; collapsed stacks of every thread or pstats of the event loop."""
+            guard(request, x_debug_token)
+            try:
+                return await self.profile_cpu(seconds, format, limit)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except ProfilerBusyError as e:
+                raise HTTPException(status_code=409, detail=str(e))
+
+        @app.post(f"/{self.name}/tracemalloc/start")
+        async def tracemalloc_start(request: Request, frames: Optional[int] = None,
+                                    x_debug_token: Optional[str] = Header(None)) -> Dict[str, Any]:
+            """Start tracing allocations."""
+            guard(request, x_debug_token)
+            return self.start_tracemalloc(frames)
+
+        @app.post(f"/{self.name}/tracemalloc/stop")
+        async def tracemalloc_stop(request: Request, x_debug_token: Optional[str] = Header(None)) -> Dict[str, Any]:
+            """Stop tracing allocations and drop the snapshots."""
+            guard(request, x_debug_token)
+            return self.stop_tracemalloc()
+
+        @app.post(f"/{self.name}/tracemalloc/snapshot")
+        async def tracemalloc_snapshot(request: Request, limit: int = 25,
+                                       x_debug_token: Optional[str] = Header(None)) -> Dict[str, Any]:
+            """Take a snapshot and return its largest allocation sites."""
+            guard(request, x_debug_token)
+            try:
+                return await asyncio.to_thread(self.take_snapshot, limit)
+            except RuntimeError as e:
+                raise HTTPException(status_code=409, detail=str(e))
+
+        @app.get(f"/{self.name}/tracemalloc/diff")
+        async def tracemalloc_diff(request: Request, base: Optional[int] = None, target: Optional[int] = None,
+                                   limit: int = 25, x_debug_token: Optional[str] = Header(None)) -> List[Dict]:
+            """Compare two snapshots, by default the oldest and the latest kept."""
+            guard(request, x_debug_token)
+            try:
+                return await asyncio.to_thread(self.diff_snapshots, base, target, limit)
+            except (KeyError, ValueError) as e:
+                raise HTTPException(status_code=404, detail=str(e))
+
+        @app.get(f"/{self.name}/tasks")
+        async def asyncio_tasks(request: Request, limit: int = 20,
+                                x_debug_token: Optional[str] = Header(None)) -> List[Dict[str, Any]]:
+            """Dump the stack of every pending asyncio task."""
+            guard(request, x_debug_token)
+            return task_stacks(limit=limit)
+
+        print(f"Registered endpoints for {self.name}.")
@@ -0,0 +1,34 @@
+from abc import abstractmethod
+from typing import Any, Mapping
+
+from zzv.engine.manager import Manager
+
+
+class ReconfigurableManager(Manager):
+    """
+    Interface for managers whose settings can be changed while they run.
+
+    The Kernel subscribes these managers to the ConfigService, which calls `apply_config` with the new, read-only
+    `config_section` whenever a reload changes it.
+    """
+
+    config_section: str = ''  # Top-level configuration section the manager reads its settings from
+
+    def validate_config(self, section_config: Mapping[str, Any]):
+        """
+        Check a new configuration section before any manager applies it.
+
+        Raises:
+            ValueError: If the section cannot be applied; the whole reload is then rejected.
+        """
+
+    @abstractmethod
+    def apply_config(self, section_config: Mapping[str, Any]):
+        """
+        Apply a changed configuration section. Runs on the event loop, right after the other managers of the same
+        reload, and must not block.
+
+        Args:
+            section_config (Mapping): The new section, read-only.
+        """
+        pass
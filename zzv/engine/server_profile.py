@@ -0,0 +1,129 @@
+import importlib.util
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import asyncio
+
+logger = logging.getLogger(__name__)
+
+AUTO = 'auto'
+
+# Implementation -> module it needs installed (None for the standard library one)
+LOOP_OPTIONS = {'uvloop': 'uvloop', 'asyncio': None}
+HTTP_OPTIONS = {'httptools': 'httptools', 'h11': 'h11'}
+JSON_OPTIONS = {'orjson': 'orjson', 'default': None}
+
+
+def is_installed(module: str) -> bool:
+    """Return whether a module can be imported, without importing it."""
+    return importlib.util.find_spec(module) is not None
+
+
+class ServerProfile:
+    """
+    The HTTP server settings of ZetaZenVm, resolved from the 'server' configuration section.
+
+    'auto' picks the fast implementation when its package is installed (uvloop, httptools, orjson) and the
+    standard one otherwise. An implementation that is requested explicitly but not installed falls back the same
+    way, with a warning in the report.
+
+    uvicorn only creates its event loop from the 'loop' option when it runs the loop itself; ZetaZenVm.run
+    creates it with `loop_factory` instead, and `observe_loop` corrects the profile when the server ends up on
+    another loop, so that the report always names the loop in use.
+    """
+
+    def __init__(self, server_config: Optional[Dict[str, Any]] = None,
+                 available: Callable[[str], bool] = is_installed):
+        """
+        Initialize the ServerProfile.
+
+        Args:
+            server_config (dict, optional): The 'server' configuration section:
+                loop (str): 'auto', 'uvloop' or 'asyncio'. Defaults to 'auto'.
+                http (str): 'auto', 'httptools' or 'h11'. Defaults to 'auto'.
+                json_response (str): 'auto', 'orjson' or 'default' for the endpoints' response class.
+                    Defaults to 'auto'.
+                access_log (bool): Log every request. Defaults to False.
+                log_level (str): uvicorn log level. Defaults to 'info'.
+                timeout_keep_alive (int): Seconds an idle keep-alive connection is kept open. Defaults to 5.
+                backlog (int): Pending connections the listening socket queues. Defaults to 2048.
+                limit_concurrency (int, optional): Connections above which requests are answered 503.
+            available (callable): Whether a module is installed; replaceable for tests.
+        """
+        server_config = server_config or {}
+        self._available = available
+        self.warnings: List[str] = []
+        self.loop = self._select('loop', server_config.get('loop', AUTO), LOOP_OPTIONS, 'uvloop', 'asyncio')
+        self.http = self._select('http', server_config.get('http', AUTO), HTTP_OPTIONS, 'httptools', 'h11')
+        self.json_response = self._select('json_response', server_config.get('json_response', AUTO), JSON_OPTIONS,
+                                          'orjson', 'default')
+        self.access_log = server_config.get('access_log', False)
+        self.log_level = server_config.get('log_level', 'info')
+        self.timeout_keep_alive = server_config.get('timeout_keep_alive', 5)
+        self.backlog = server_config.get('backlog', 2048)
+        self.limit_concurrency = server_config.get('limit_concurrency')
+
+    def _select(self, option: str, requested: str, choices: Dict[str, Optional[str]], preferred: str,
+                fallback: str) -> str:
+        if requested != AUTO and requested not in choices:
+            raise ValueError(f"Unsupported server {option} '{requested}'. "
+                             f"Supported values: '{AUTO}', {', '.join(repr(choice) for choice in choices)}.")
+        wanted = preferred if requested == AUTO else requested
+        module = choices[wanted]
+        if module is None or self._available(module):
+            return wanted
+        if requested != AUTO:
+            self.warnings.append(f"server.{option} '{requested}' is not installed; using '{fallback}'.")
+        return fallback
+
+    def loop_factory(self) -> Optional[Callable[[], 'asyncio.AbstractEventLoop']]:
+        """Return the event loop factory of the profile, or None for asyncio's default loop."""
+        if self.loop == 'uvloop':
+            import uvloop
+            return uvloop.new_event_loop
+        return None
+
+    def observe_loop(self, loop: 'asyncio.AbstractEventLoop'):
+        """Record the loop the server actually runs on, with a warning if it is not the profile's."""
+        running = 'uvloop' if type(loop).__module__.split('.')[0] == 'uvloop' else 'asyncio'
+        if running != self.loop:
+            self.warnings.append(f"server.loop '{self.loop}' was not applied: the server runs on the caller's "
+                                 f"'{running}' loop.")
+            self.loop = running
+
+    def response_class(self):
+        """Return the default response class of the FastAPI application."""
+        if self.json_response == 'orjson':
+            from zzv.engine.responses import OrjsonResponse
+            return OrjsonResponse
+        from fastapi.responses import JSONResponse
+        return JSONResponse
+
+    def uvicorn_options(self) -> Dict[str, Any]:
+        """Return the uvicorn.Config keyword arguments of the profile."""
+        return {
+            'loop': self.loop,
+            'http': self.http,
+            'access_log': self.access_log,
+            'log_level': self.log_level,
+            'timeout_keep_alive': self.timeout_keep_alive,
+            'backlog': self.backlog,
+            'limit_concurrency': self.limit_concurrency
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.uvicorn_options(), 'json_response': self.json_response, 'warnings': list(self.warnings)}
+
+    def report(self) -> List[Tuple[int, str]]:
+        """Return the startup report as (logging level, line) pairs."""
+        lines = [(logging.INFO, f"Server profile: loop={self.loop}, http={self.http}, "
+                                f"json_response={self.json_response}, access_log={self.access_log}, "
+                                f"log_level={self.log_level}"),
+                 (logging.INFO, f"Server connections: timeout_keep_alive={self.timeout_keep_alive}s, "
+                                f"backlog={self.backlog}, limit_concurrency={self.limit_concurrency}")]
+        return lines + [(logging.WARNING, warning) for warning in self.warnings]
+
+    def log_report(self):
+        for level, line in self.report():
+            logger.log(level, line)
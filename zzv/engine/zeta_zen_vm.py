@@ -2,18 +2,13 @@ import asyncio
 import logging
 import os
 
-import uvicorn
-from fastapi import FastAPI, HTTPException
 from zzv.common.constants import KERNEL
 from zzv.common.utility import load_config, start_server_request, check_health
 from zzv.engine.kernel import Kernel
+from zzv.engine.server_profile import ServerProfile
 
-from zzv.common.observability import setup_tracing
-
-tracer = setup_tracing("zzv-engine")
-
-from opentelemetry.trace import get_tracer
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+# uvicorn, FastAPI and OpenTelemetry are imported where they are used so that importing this module
+# has no side effects and stays cheap for tools that only need the models or codecs.
 
 logger = logging.getLogger(__name__)
 
@@ -37,19 +32,35 @@ class ZetaZenVm:
         """
 
         config_path = os.path.abspath(config_path)
+        watched_config_path = None  # A configuration passed in directly cannot be reloaded
         if config is None:
             config = load_config(config_path)
+            watched_config_path = config_path
 
         self.config = config
         self.additional_managers = (
             additional_managers or []
         )  # Set default to empty list if not provided
 
+        # Set up tracing unless it is disabled in the configuration
+        tracing_config = self.config.get('tracing', {})
+        self.tracer = None
+        if tracing_config.get('enabled', True):
+            from zzv.common.observability import setup_tracing
+            self.tracer = setup_tracing(tracing_config.get('service_name', "zzv-engine"))
+
         # Initialize the Kernel instance
-        self.kernel = Kernel(self.config, additional_managers=self.additional_managers)
+        self.kernel = Kernel(self.config, additional_managers=self.additional_managers,
+                             config_path=watched_config_path)
+
+        # Event loop, HTTP parser, response class and connection settings of the server
+        self.server_profile = ServerProfile(self.config.get('server', {}))
+
+        from fastapi import FastAPI
 
         # Initialize FastAPI app with metadata and set up endpoints
         self.app = FastAPI(
+            default_response_class=self.server_profile.response_class(),
             title="Zeta Zen Vm",
             description="Zeta Zen Vm is a server-side base implementation designed to serve as the foundation for various projects within the zzv ecosystem.",
             version="1.0.0",
@@ -65,7 +76,9 @@ class ZetaZenVm:
             },
         )
 
-        FastAPIInstrumentor.instrument_app(self.app)
+        if self.tracer is not None:
+            from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+            FastAPIInstrumentor.instrument_app(self.app)
 
         # Register endpoints for the kernel and all its managers
         self.kernel.register_endpoints(self.app)  # Invoke register_endpoints on kernel
@@ -75,6 +88,7 @@ class ZetaZenVm:
 
     def _setup_endpoints(self):
         """Define custom REST API endpoints for controlling the server and its services."""
+        from fastapi import HTTPException
 
         @self.app.post("/start")
         async def start_all():
@@ -142,6 +156,10 @@ class ZetaZenVm:
                 )
             }
 
+        @self.app.get("/server/profile")
+        async def server_profile():
+            return self.server_profile.to_dict()
+
         @self.app.get("/health")
         async def health():
             try:
@@ -154,17 +172,20 @@ class ZetaZenVm:
                 )
 
     async def run_async(self, host, port):
-        """Run the server asynchronously."""
+        """Run the server asynchronously, on the running loop whatever the profile's loop."""
+        import uvicorn
+
         logger.info(f"Starting ZetaZenVm asynchronously on {host}:{port}")
-        config = uvicorn.Config(
-            self.app, host=host, port=port, loop="asyncio", log_level="info"
-        )
+        self.server_profile.observe_loop(asyncio.get_running_loop())
+        self.server_profile.log_report()
+        config = uvicorn.Config(self.app, host=host, port=port, **self.server_profile.uvicorn_options())
         server = uvicorn.Server(config)
         await server.serve()
 
     def run(self, host, port):
-        """Run the server synchronously."""
-        asyncio.run(self.run_async(host, port))
+        """Run the server synchronously, on a new event loop of the profile's type."""
+        with asyncio.Runner(loop_factory=self.server_profile.loop_factory()) as runner:
+            runner.run(self.run_async(host, port))
 
     @staticmethod
     def start_server_request(host, port):
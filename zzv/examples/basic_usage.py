@@ -51,8 +51,9 @@ def main():
     # Step 3: Create an instance of the ExampleManager
     example_manager_instance = ExampleManager()
 
-    # Step 4: Create an instance of ZetaZenVm with the loaded configuration and the ExampleManager
-    engine = ZetaZenVm(config=config,
+    # Step 4: Create an instance of ZetaZenVm from the configuration file, so that changes to it are applied
+    # without a restart, and the ExampleManager
+    engine = ZetaZenVm(config_path=config_path,
                        additional_managers=[{"name": "ExampleManager", "instance": example_manager_instance}])
 
     # Step 5: Check if the server should start automatically based on the configuration
@@ -0,0 +1,292 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_FILE = 'schema.json'
+SYMBOLS_FILE = 'symbols.json'
+COLUMN_SUFFIX = '.bin'
+
+_NAT_MS = int(np.datetime64('NaT', 'ms').view('<i8'))  # Epoch-millisecond value of a missing timestamp
+
+# Column name -> (NumPy dtype, source field of the Snapshot or SnapshotList)
+COLUMNS = {
+    'time': ('<M8[ms]', 'time'),  # SnapshotList time
+    'timestamp': ('<M8[ms]', 'Timestamp'),  # Snapshot Timestamp
+    'symbol': ('<i4', 'Symbol'),  # Index into the partition's symbols.json
+    'bars': ('<f8', 'zb1BarsC9'),
+    'side': ('<f8', 'zb1SideC10'),
+    'mark': ('<f8', 'zb1MarkC11'),
+    'pnl': ('<f8', 'zb1PnLC12'),
+}
+
+
+def partition_path(root: str, day: str, sector: str) -> str:
+    """Return the directory of one day/sector partition."""
+    return os.path.join(root, f"day={day}", f"sector={sector}")
+
+
+def day_of(time_ms: int) -> str:
+    """Return the UTC day (YYYY-MM-DD) of an epoch-millisecond time."""
+    return datetime.fromtimestamp(time_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def timestamp_ms(timestamp: Optional[str]) -> Optional[int]:
+    """
+    Parse a Snapshot 'Timestamp' such as '2024-08-23T15:35:06.250Z' to epoch milliseconds. A missing timestamp
+    is NaT; a malformed one returns None.
+    """
+    if not timestamp:
+        return _NAT_MS
+    try:
+        return int(np.datetime64(timestamp.rstrip('Z'), 'ms').view('<i8'))
+    except ValueError:
+        return None
+
+
+class _PartitionBuffer:
+    """Rows of one partition waiting to be appended."""
+
+    __slots__ = ('times', 'timestamps', 'symbols', 'values')
+
+    def __init__(self):
+        self.times: List[int] = []
+        self.timestamps: List[int] = []  # Epoch milliseconds, parsed by ColumnarWriter.append
+        self.symbols: List[str] = []
+        self.values: List[Tuple[float, float, float, float]] = []
+
+
+class ColumnarWriter:
+    """
+    Append SnapshotLists to columnar files partitioned by day and sector.
+
+    Each partition is a directory `day=YYYY-MM-DD/sector=XXX` with one raw little-endian file per column (see
+    COLUMNS), a schema.json describing them and a symbols.json dictionary for the symbol column. Files are only
+    ever appended to, so readers can memory-map them while the writer is running and a crash loses at most the
+    rows that were not flushed yet.
+
+    Rows are buffered in memory and appended in bulk by `flush`. `append` never touches the files: once
+    `flush_rows` rows are buffered it sets `flush_requested`, and the owner runs `flush` from a worker thread.
+    Appending and flushing are thread-safe. Timestamps are parsed on append, so that a malformed one
+    is stored as NaT (and counted in `bad_timestamps`) instead of failing the flush of every buffered row.
+    """
+
+    def __init__(self, root: str, flush_rows: int = 50000):
+        """
+        Initialize the ColumnarWriter.
+
+        Args:
+            root (str): Root directory of the store.
+            flush_rows (int): Number of buffered rows that sets `flush_requested`.
+        """
+        self.root = root
+        self.flush_rows = flush_rows
+        self._buffers: Dict[Tuple[str, str], _PartitionBuffer] = {}
+        self._buffered_rows = 0
+        self._symbols: Dict[Tuple[str, str], Dict[str, int]] = {}  # Symbol dictionaries of open partitions
+        self._lock = threading.Lock()  # Guards the buffers
+        self._flush_lock = threading.Lock()  # Serializes flushes, which touch the files
+        self.flush_requested = threading.Event()  # Set once flush_rows rows are buffered, cleared by flush
+        self.stats = {"rows_buffered": 0, "rows_written": 0, "flushes": 0, "bad_timestamps": 0}
+
+    def append(self, snapshot_list: Dict[str, Any]) -> int:
+        """
+        Buffer the rows of a SnapshotList dictionary (the JSON form used on Kafka).
+
+        Args:
+            snapshot_list (dict): Dictionary with 'time', 'name' and 'snapshots'.
+
+        Returns:
+            int: The number of rows buffered.
+        """
+        snapshots = snapshot_list.get('snapshots') or []
+        if not snapshots:
+            return 0
+        time_ms = int(snapshot_list.get('time') or 0)
+        partition = (day_of(time_ms), snapshot_list.get('name') or 'UNKNOWN')
+
+        parsed: Dict[Optional[str], Optional[int]] = {}  # Rows of a list share a few timestamps; parse each once
+        row_timestamps = []
+        bad_timestamps = 0
+        for snapshot in snapshots:
+            timestamp = snapshot.get('Timestamp')
+            if timestamp not in parsed:
+                parsed[timestamp] = timestamp_ms(timestamp)
+                if parsed[timestamp] is None:
+                    logger.warning(f"Malformed Timestamp {timestamp!r} in SnapshotList '{partition[1]}', "
+                                   f"exported as NaT.")
+            value = parsed[timestamp]
+            if value is None:
+                bad_timestamps += 1
+                value = _NAT_MS
+            row_timestamps.append(value)
+
+        with self._lock:
+            buffer = self._buffers.get(partition)
+            if buffer is None:
+                buffer = self._buffers[partition] = _PartitionBuffer()
+            buffer.timestamps.extend(row_timestamps)
+            for snapshot in snapshots:
+                buffer.times.append(time_ms)
+                buffer.symbols.append(snapshot.get('Symbol') or '')
+                buffer.values.append((snapshot.get('zb1BarsC9') or 0.0, snapshot.get('zb1SideC10') or 0.0,
+                                      snapshot.get('zb1MarkC11') or 0.0, snapshot.get('zb1PnLC12') or 0.0))
+            self._buffered_rows += len(snapshots)
+            self.stats["rows_buffered"] += len(snapshots)
+            self.stats["bad_timestamps"] += bad_timestamps
+            if self._buffered_rows >= self.flush_rows:
+                self.flush_requested.set()
+        return len(snapshots)
+
+    def flush(self) -> int:
+        """
+        Append all buffered rows to their partitions' column files.
+
+        Returns:
+            int: The number of rows written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                buffers, self._buffers = self._buffers, {}
+                self._buffered_rows = 0
+                self.flush_requested.clear()
+
+            written = 0
+            for (day, sector), buffer in buffers.items():
+                written += self._write_partition(day, sector, buffer)
+            self.stats["rows_written"] += written
+            self.stats["flushes"] += 1
+            return written
+
+    def _write_partition(self, day: str, sector: str, buffer: _PartitionBuffer) -> int:
+        path = partition_path(self.root, day, sector)
+        os.makedirs(path, exist_ok=True)
+        symbols = self._load_symbols((day, sector), path)
+        symbol_count = len(symbols)
+
+        values = np.array(buffer.values, dtype='<f8').reshape(-1, 4)
+        columns = {
+            'time': np.array(buffer.times, dtype='<i8').view('<M8[ms]'),
+            'timestamp': np.array(buffer.timestamps, dtype='<i8').view('<M8[ms]'),
+            'symbol': np.array([symbols.setdefault(s, len(symbols)) for s in buffer.symbols], dtype='<i4'),
+            'bars': values[:, 0],
+            'side': values[:, 1],
+            'mark': values[:, 2],
+            'pnl': values[:, 3],
+        }
+
+        if not os.path.exists(os.path.join(path, SCHEMA_FILE)):
+            with open(os.path.join(path, SCHEMA_FILE), 'w') as file:
+                json.dump({name: dtype for name, (dtype, _) in COLUMNS.items()}, file)
+        if len(symbols) != symbol_count:
+            # Written before the rows that use the new ids, so readers never see an unknown id
+            self._write_json(os.path.join(path, SYMBOLS_FILE), sorted(symbols, key=symbols.get))
+        for name, (dtype, _) in COLUMNS.items():
+            with open(os.path.join(path, name + COLUMN_SUFFIX), 'ab') as file:
+                file.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        return len(buffer.times)
+
+    def _load_symbols(self, partition: Tuple[str, str], path: str) -> Dict[str, int]:
+        symbols = self._symbols.get(partition)
+        if symbols is None:
+            symbols_path = os.path.join(path, SYMBOLS_FILE)
+            if os.path.exists(symbols_path):
+                with open(symbols_path) as file:
+                    symbols = {symbol: i for i, symbol in enumerate(json.load(file))}
+            else:
+                symbols = {}
+            self._symbols[partition] = symbols
+        return symbols
+
+    @staticmethod
+    def _write_json(path: str, value: Any):
+        """Replace a JSON file atomically."""
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'w') as file:
+            json.dump(value, file)
+        os.replace(temporary_path, path)
+
+
+class ColumnarReader:
+    """
+    Read partitions written by ColumnarWriter as memory-mapped NumPy arrays.
+
+    Arrays are read-only views on the column files: nothing is copied or parsed, and the operating system's page
+    cache is shared between processes reading the same partitions. Only complete rows are exposed, so a
+    partition can be read while it is being appended to.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the ColumnarReader.
+
+        Args:
+            root (str): Root directory of the store.
+        """
+        self.root = root
+
+    def days(self) -> List[str]:
+        """Return the days present in the store, in order."""
+        return sorted(name[len('day='):] for name in self._list(self.root) if name.startswith('day='))
+
+    def sectors(self, day: str) -> List[str]:
+        """Return the sectors present for a day, in order."""
+        return sorted(name[len('sector='):] for name in self._list(os.path.join(self.root, f"day={day}"))
+                      if name.startswith('sector='))
+
+    def symbols(self, day: str, sector: str) -> List[str]:
+        """Return the symbol dictionary of a partition; the symbol column holds indexes into it."""
+        with open(os.path.join(partition_path(self.root, day, sector), SYMBOLS_FILE)) as file:
+            return json.load(file)
+
+    def read(self, day: str, sector: str, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Map the columns of a partition.
+
+        Args:
+            day (str): Day as YYYY-MM-DD.
+            sector (str): Sector name.
+            columns (Iterable[str], optional): Columns to map. Defaults to all of them.
+
+        Returns:
+            dict: Column name -> read-only NumPy view of equal length.
+        """
+        path = partition_path(self.root, day, sector)
+        with open(os.path.join(path, SCHEMA_FILE)) as file:
+            schema = json.load(file)
+        names = list(columns) if columns is not None else list(schema)
+
+        dtypes = {name: np.dtype(dtype) for name, dtype in schema.items()}
+        sizes = {name: os.path.getsize(os.path.join(path, name + COLUMN_SUFFIX)) for name in schema}
+        rows = min(sizes[name] // dtypes[name].itemsize for name in schema)  # Ignore a partially appended row
+
+        arrays = {}
+        for name in names:
+            if rows == 0:
+                arrays[name] = np.empty(0, dtype=dtypes[name])
+            else:
+                arrays[name] = np.memmap(os.path.join(path, name + COLUMN_SUFFIX), dtype=dtypes[name], mode='r',
+                                         shape=(rows,))
+        return arrays
+
+    def to_dataframe(self, day: str, sector: str, columns: Optional[Iterable[str]] = None):
+        """
+        Return a partition as a pandas DataFrame backed by the mapped arrays, with the symbol column as a
+        Categorical over the partition's symbol dictionary. Requires pandas.
+        """
+        import pandas as pd
+
+        arrays = self.read(day, sector, columns)
+        if 'symbol' in arrays:
+            arrays['symbol'] = pd.Categorical.from_codes(arrays['symbol'], categories=self.symbols(day, sector))
+        return pd.DataFrame(arrays, copy=False)
+
+    @staticmethod
+    def _list(path: str) -> List[str]:
+        return os.listdir(path) if os.path.isdir(path) else []
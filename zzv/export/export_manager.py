@@ -0,0 +1,140 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from zzv.common.constants import EXPORT_MANAGER, MSG_MANAGER
+from zzv.engine.manager import Manager
+from zzv.export.columnar_store import ColumnarReader, ColumnarWriter
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+from zzv.models.message_types import MessageType
+from zzv.msgcore.handler_registry import HandlerKind
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+EXPORT_HANDLER_NAME = 'columnar_export'
+
+
+class ExportManager(Manager):
+    """
+    Export routed SnapshotLists to the memory-mapped columnar store (see ColumnarWriter).
+
+    The manager registers a MsgManager handler for SnapshotLists, so every routed SnapshotList is buffered, and
+    appends the buffered rows to the day/sector partitions from a worker thread every `flush_interval` seconds,
+    or as soon as the writer requests a flush because `flush_rows` rows are buffered.
+    """
+
+    def __init__(self, kernel, export_config: Dict[str, Any]):
+        """
+        Initialize the ExportManager.
+
+        Args:
+            kernel (Kernel): The kernel providing the MsgManager.
+            export_config (dict): The 'export' configuration section:
+                directory (str): Root directory of the columnar store. Defaults to 'data/columnar'.
+                flush_interval (float): Seconds between flushes. Defaults to 5.
+                flush_rows (int): Buffered rows that trigger an immediate flush. Defaults to 50000.
+        """
+        super().__init__(name="ExportManager")
+        self.kernel = kernel
+        self.directory = export_config.get('directory', 'data/columnar')
+        self.flush_interval = export_config.get('flush_interval', 5.0)
+        self.writer = ColumnarWriter(self.directory, flush_rows=export_config.get('flush_rows', 50000))
+        self.reader = ColumnarReader(self.directory)
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_due: Optional[asyncio.Event] = None  # Wakes the flush task before its interval
+        self.error_count = 0
+
+    async def start(self):
+        """Register the export handler and start the periodic flush."""
+        logger.info(f"Starting {EXPORT_MANAGER} into {self.directory}...")
+        msg_manager = self.kernel.get_service(MSG_MANAGER, caller=self)
+        msg_manager.register_handler(MessageType.SNAPSHOTS, self.export_snapshot_list, HandlerKind.SYNC,
+                                     name=EXPORT_HANDLER_NAME)
+        self._running = True
+        self._loop = asyncio.get_running_loop()
+        self._flush_due = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_periodically())
+
+    async def close(self):
+        """Unregister the export handler and flush the remaining rows."""
+        logger.info(f"Stopping {EXPORT_MANAGER}...")
+        self._running = False
+        self.kernel.get_service(MSG_MANAGER, caller=self).unregister_handler(MessageType.SNAPSHOTS,
+                                                                            EXPORT_HANDLER_NAME)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self.writer.flush)
+
+    def export_snapshot_list(self, message_data: Any):
+        """Buffer a SnapshotList (dictionary, JSON string or SnapshotList model) for export."""
+        try:
+            if isinstance(message_data, str):
+                message_data = json.loads(message_data)
+            elif not isinstance(message_data, dict):
+                message_data = message_data.model_dump()
+            self.writer.append(message_data)
+            if self.writer.flush_requested.is_set() and self._flush_due is not None and not self._flush_due.is_set():
+                self._loop.call_soon_threadsafe(self._flush_due.set)  # Handlers may run off the loop's thread
+        except Exception as e:
+            self.error_count += 1
+            logger.error(f"Error exporting SnapshotList: {e}")
+
+    async def _flush_periodically(self):
+        while self._running:
+            try:
+                await asyncio.wait_for(self._flush_due.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_due.clear()
+            try:
+                await asyncio.to_thread(self.writer.flush)
+            except Exception as e:
+                self.error_count += 1
+                logger.error(f"Error flushing the columnar store: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the writer counters and the export error count."""
+        return {"directory": self.directory, "error_count": self.error_count, **self.writer.stats}
+
+    def get_health(self):
+        """
+        Return the health status of the ExportManager as a HealthReport object.
+        """
+        status = Status.OK if self._running and not self.error_count else Status.ERROR
+        return HealthReport(
+            manager_name=self.name,
+            status=status,
+            details=[f"ExportManager is {'running' if self._running else 'not running'}",
+                     f"Rows written: {self.writer.stats['rows_written']}",
+                     f"Errors: {self.error_count}"]
+        )
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the ExportManager.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+
+        @app.get(f"/{self.name}/stats")
+        async def export_stats() -> Dict[str, Any]:
+            """Get the export counters."""
+            return self.get_stats()
+
+        @app.get(f"/{self.name}/partitions")
+        async def export_partitions() -> Dict[str, Any]:
+            """List the exported days and their sectors."""
+            return {day: self.reader.sectors(day) for day in self.reader.days()}
+
+        print(f"Registered endpoints for {self.name}.")
@@ -1,6 +1,9 @@
 from typing import List
 from zzv.health.status import Status  # Import the Status enumeration
 
+# Severity of each status when reports are combined; the combined report takes the most severe one
+_SEVERITY = {Status.OK: 0, Status.WARNING: 1, Status.UNKNOWN: 2, Status.ERROR: 3}
+
 class HealthReport:
     """
     Class representing the health status of a service or manager.
@@ -45,18 +48,16 @@ class HealthReport:
 
     def combine(self, other_report):
         """
-        Combine this health report with another health report.
+        Combine this health report with another health report. The combined status is the most severe of the
+        two (OK < WARNING < UNKNOWN < ERROR), so a warning is not reported as an error.
 
         Args:
             other_report (HealthReport): Another health report to combine with.
-
-        Raises:
-            ValueError: If the health status of the other report is not OK.
         """
         # Ensure the other_report's status is of type Status
         if isinstance(other_report.status, str):
             other_report.status = Status[other_report.status]
 
-        if other_report.status != Status.OK:
-            self.status = Status.ERROR  # Update status to ERROR if any combined report has an issue
+        if _SEVERITY[other_report.status] > _SEVERITY[self.status]:
+            self.status = other_report.status
         self.details.extend(other_report.details)  # Merge the details lists
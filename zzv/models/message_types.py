@@ -4,6 +4,8 @@ from enum import Enum
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+from zzv.common.constants import SNAPSHOT_LIST
+
 class MessageType(Enum):
     SERVER_TIME = "server_time"
     SNAPSHOTS = "snapshots"  
@@ -21,6 +23,34 @@ class MessageType(Enum):
         except ValueError:
             return cls.UNKNOWN
 
+    @classmethod
+    def resolve(cls, value) -> "MessageType":
+        """Resolve a MessageType, its value, or the legacy 'SnapshotList' type name to a MessageType."""
+        if isinstance(value, cls):
+            return value
+        if value == SNAPSHOT_LIST:
+            return cls.SNAPSHOTS
+        return cls.from_json(value)
+
+    def to_code(self) -> int:
+        """Return the one-byte code used by the binary envelope."""
+        return _MESSAGE_TYPE_CODES[self]
+
+    @classmethod
+    def from_code(cls, code: int) -> "MessageType":
+        """Return the MessageType for a binary envelope code, UNKNOWN for unassigned codes."""
+        return _MESSAGE_TYPES_BY_CODE.get(code, cls.UNKNOWN)
+
+# One-byte codes of the binary envelope (schemas/envelope.fbs); never reuse or renumber a code
+_MESSAGE_TYPE_CODES = {
+    MessageType.UNKNOWN: 0,
+    MessageType.SERVER_TIME: 1,
+    MessageType.SNAPSHOTS: 2,
+    MessageType.ALERTS: 3,
+    MessageType.CHATS: 4,
+}
+_MESSAGE_TYPES_BY_CODE = {code: message_type for message_type, code in _MESSAGE_TYPE_CODES.items()}
+
 class Message:
     def __init__(
         self,
@@ -45,4 +75,20 @@ class Message:
             type=MessageType.from_json(data.get("type", "")),
             payload=data.get("payload", {}),
             timestamp=datetime.fromisoformat(data.get("timestamp")) if data.get("timestamp") else None
-        )
\ No newline at end of file
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the message as a binary FlatBuffers envelope (see zzv.msgcore.codecs.envelope_flatbuffers).
+
+        The envelope carries a one-byte type code, the timestamp in epoch nanoseconds and the compact JSON
+        payload, which makes it much smaller than `to_json` for small messages.
+        """
+        from zzv.msgcore.codecs.envelope_flatbuffers import encode_message
+        return encode_message(self)
+
+    @classmethod
+    def from_bytes(cls, buf) -> "Message":
+        """Decode a message encoded by `to_bytes`."""
+        from zzv.msgcore.codecs.envelope_flatbuffers import decode_message
+        return decode_message(buf)
\ No newline at end of file
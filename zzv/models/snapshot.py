@@ -16,9 +16,10 @@ class SnapshotList(BaseModel):
     time: int  # Timestamp in milliseconds for the SnapshotList
     name: str  # Default name, set to "XLK"
 
-    # Initialize default values for key, time, and name at the list level
+    # Initialize default values for key, time, and name at the list level. Given values are kept, so a
+    # SnapshotList parsed from a message keeps the key that deduplication relies on
     def __init__(self, **data):
-        data['key'] = str(uuid.uuid4())  # Generate a UUID for the entire SnapshotList
-        data['time'] = int(time.time() * 1000)  # Current time in milliseconds
-        data['name'] = "XLK"  # Default name
+        data.setdefault('key', str(uuid.uuid4()))  # Generate a UUID for the entire SnapshotList
+        data.setdefault('time', int(time.time() * 1000))  # Current time in milliseconds
+        data.setdefault('name', "XLK")  # Default name
         super().__init__(**data)
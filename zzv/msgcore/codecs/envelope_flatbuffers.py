@@ -0,0 +1,186 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+import flatbuffers
+
+from schemas.envelope.Envelope import Envelope, EnvelopeStart, EnvelopeAddType, EnvelopeAddTimestampNs, \
+    EnvelopeAddPayload, EnvelopeEnd
+from schemas.envelope.EnvelopeBatch import EnvelopeBatch, EnvelopeBatchStart, EnvelopeBatchAddEnvelopes, \
+    EnvelopeBatchStartEnvelopesVector, EnvelopeBatchEnd
+from zzv.models.message_types import Message, MessageType
+
+NANOSECONDS_PER_SECOND = 1_000_000_000
+
+# Envelope vtable offset of the payload field, see schemas/envelope/Envelope.py
+_PAYLOAD_FIELD = 8
+
+
+def datetime_to_epoch_ns(value: datetime) -> int:
+    """
+    Convert a datetime to integer epoch nanoseconds without going through a float.
+
+    Naive datetimes are interpreted as local time, like `datetime.timestamp`.
+    """
+    seconds = int(value.replace(microsecond=0).timestamp())
+    return seconds * NANOSECONDS_PER_SECOND + value.microsecond * 1000
+
+
+def epoch_ns_to_datetime(timestamp_ns: int) -> datetime:
+    """Convert epoch nanoseconds to a naive local datetime, the form produced by `datetime.now()`."""
+    seconds, nanoseconds = divmod(timestamp_ns, NANOSECONDS_PER_SECOND)
+    return datetime.fromtimestamp(seconds).replace(microsecond=nanoseconds // 1000)
+
+
+def serialize_payload(payload: Union[Dict[str, Any], bytes, bytearray, memoryview]) -> bytes:
+    """Serialize a payload as compact JSON; bytes-like payloads are taken as already serialized."""
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return bytes(payload)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+class EnvelopeView:
+    """
+    A decoded envelope whose payload is a memoryview into the original buffer.
+
+    Nothing is copied until the payload is parsed, so a consumer can route or forward envelopes by type and
+    time and only deserialize the payloads it needs. The view is only valid while the buffer is alive.
+    """
+
+    __slots__ = ('message_type', 'timestamp_ns', 'payload')
+
+    def __init__(self, message_type: MessageType, timestamp_ns: int, payload: memoryview):
+        self.message_type = message_type
+        self.timestamp_ns = timestamp_ns
+        self.payload = payload
+
+    def payload_json(self) -> Dict[str, Any]:
+        """Parse the payload as JSON."""
+        return json.loads(self.payload.tobytes()) if len(self.payload) else {}
+
+    def to_message(self) -> Message:
+        """Build a Message, parsing the payload."""
+        return Message(type=self.message_type, payload=self.payload_json(),
+                       timestamp=epoch_ns_to_datetime(self.timestamp_ns))
+
+
+def _build_envelope(builder: flatbuffers.Builder, message_type: MessageType, timestamp_ns: int,
+                    payload: bytes) -> int:
+    payload_vector = builder.CreateByteVector(payload)
+    EnvelopeStart(builder)
+    EnvelopeAddType(builder, message_type.to_code())
+    EnvelopeAddTimestampNs(builder, timestamp_ns)
+    EnvelopeAddPayload(builder, payload_vector)
+    return EnvelopeEnd(builder)
+
+
+def _finish(builder: flatbuffers.Builder, root: int, size_prefixed: bool) -> bytes:
+    if size_prefixed:
+        builder.FinishSizePrefixed(root)
+    else:
+        builder.Finish(root)
+    return bytes(builder.Output())
+
+
+def encode_envelope(message_type: MessageType, timestamp_ns: int, payload: bytes,
+                    size_prefixed: bool = False) -> bytes:
+    """
+    Encode a single Envelope.
+
+    Args:
+        message_type (MessageType): Type of the message, stored as its one-byte code.
+        timestamp_ns (int): Epoch nanoseconds.
+        payload (bytes): The serialized payload.
+        size_prefixed (bool): Prepend the 4-byte little-endian buffer size, for streams of buffers.
+
+    Returns:
+        bytes: The encoded buffer.
+    """
+    builder = flatbuffers.Builder(32 + len(payload))
+    return _finish(builder, _build_envelope(builder, message_type, timestamp_ns, payload), size_prefixed)
+
+
+def encode_envelope_batch(envelopes: Iterable[Tuple[MessageType, int, bytes]],
+                          size_prefixed: bool = False) -> bytes:
+    """
+    Encode many envelopes into one EnvelopeBatch frame.
+
+    Args:
+        envelopes (Iterable[tuple]): (message_type, timestamp_ns, payload bytes) tuples.
+        size_prefixed (bool): Prepend the 4-byte little-endian buffer size, for streams of buffers.
+
+    Returns:
+        bytes: The encoded frame.
+    """
+    envelopes = list(envelopes)
+    builder = flatbuffers.Builder(64 + sum(32 + len(payload) for _, _, payload in envelopes))
+    offsets = [_build_envelope(builder, message_type, timestamp_ns, payload)
+               for message_type, timestamp_ns, payload in envelopes]
+
+    EnvelopeBatchStartEnvelopesVector(builder, len(offsets))
+    for offset in reversed(offsets):
+        builder.PrependUOffsetTRelative(offset)
+    envelopes_vector = builder.EndVector()
+
+    EnvelopeBatchStart(builder)
+    EnvelopeBatchAddEnvelopes(builder, envelopes_vector)
+    return _finish(builder, EnvelopeBatchEnd(builder), size_prefixed)
+
+
+def _view(envelope: Envelope, buf: memoryview) -> EnvelopeView:
+    """Wrap a decoded Envelope table, slicing its payload out of `buf` without copying."""
+    o = envelope._tab.Offset(_PAYLOAD_FIELD)
+    if o != 0:
+        start = envelope._tab.Vector(o)
+        payload = buf[start:start + envelope._tab.VectorLen(o)]
+    else:
+        payload = buf[0:0]
+    return EnvelopeView(MessageType.from_code(envelope.Type()), envelope.TimestampNs(), payload)
+
+
+def decode_envelope(buf, offset: int = 0) -> EnvelopeView:
+    """
+    Decode a single Envelope.
+
+    Args:
+        buf (bytes or bytearray or memoryview): Buffer holding the Envelope.
+        offset (int): Position of the root table offset inside `buf` (4 for size-prefixed buffers).
+    """
+    buf = memoryview(buf)
+    return _view(Envelope.GetRootAs(buf, offset), buf)
+
+
+def iter_envelope_batch(buf, offset: int = 0) -> Iterator[EnvelopeView]:
+    """
+    Iterate over the envelopes of an EnvelopeBatch frame without copying their payloads.
+
+    Args:
+        buf (bytes or bytearray or memoryview): Buffer holding the EnvelopeBatch.
+        offset (int): Position of the root table offset inside `buf` (4 for size-prefixed buffers).
+    """
+    buf = memoryview(buf)
+    batch = EnvelopeBatch.GetRootAs(buf, offset)
+    for i in range(batch.EnvelopesLength()):
+        yield _view(batch.Envelopes(i), buf)
+
+
+def encode_message(message: Message, size_prefixed: bool = False) -> bytes:
+    """Encode a Message as a single Envelope."""
+    return encode_envelope(message.type, datetime_to_epoch_ns(message.timestamp), serialize_payload(message.payload),
+                           size_prefixed)
+
+
+def decode_message(buf, offset: int = 0) -> Message:
+    """Decode a Message encoded by `encode_message`."""
+    return decode_envelope(buf, offset).to_message()
+
+
+def encode_messages(messages: Iterable[Message], size_prefixed: bool = False) -> bytes:
+    """Encode many Messages into one EnvelopeBatch frame."""
+    return encode_envelope_batch(((message.type, datetime_to_epoch_ns(message.timestamp),
+                                   serialize_payload(message.payload)) for message in messages), size_prefixed)
+
+
+def decode_messages(buf, offset: int = 0) -> List[Message]:
+    """Decode all Messages of an EnvelopeBatch frame."""
+    return [view.to_message() for view in iter_envelope_batch(buf, offset)]
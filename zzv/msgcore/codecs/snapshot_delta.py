@@ -0,0 +1,341 @@
+import logging
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, TYPE_CHECKING
+
+from zzv.common.stats import StatsCounters
+
+if TYPE_CHECKING:
+    from zzv.msgcore.symbol_dictionary import SymbolDictionary
+
+logger = logging.getLogger(__name__)
+
+# First byte of every delta-codec value; JSON values start with '{' so both can share a topic
+DELTA_MAGIC = 0xD5
+DELTA_VERSION = 1
+DELTA_VERSION_SYMBOL_IDS = 2  # Keyframes carry SymbolDictionary ids instead of symbol strings
+
+SECTOR_FIELD = 'name'  # SnapshotList field the encoder keeps its per-sector state by
+
+KIND_KEYFRAME = 1  # Full SnapshotList, resets the consumer's sector state
+KIND_DELTA = 2  # Only the rows and fields that changed since the previous message of the sector
+
+# Float columns of a Snapshot, in wire order; bit i of a row's field mask refers to FLOAT_FIELDS[i]
+FLOAT_FIELDS = ('zb1BarsC9', 'zb1SideC10', 'zb1MarkC11', 'zb1PnLC12')
+TIMESTAMP_BIT = len(FLOAT_FIELDS)  # Bit of the field mask for the 'Timestamp' string
+
+_HEADER = struct.Struct('<BBBIq')  # magic, version, kind, seq, time
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_F64 = struct.Struct('<d')
+_FLOATS = struct.Struct('<' + 'd' * len(FLOAT_FIELDS))
+
+
+class DeltaDecodeError(Exception):
+    """Raised when a value is not a valid delta-codec message."""
+
+
+def is_delta_encoded(value) -> bool:
+    """Return True if a Kafka value was produced by SnapshotDeltaEncoder."""
+    return len(value) > 0 and value[0] == DELTA_MAGIC
+
+
+def _write_str(out: bytearray, value: Optional[str]):
+    data = (value or '').encode('utf-8')
+    out += _U16.pack(len(data))
+    out += data
+
+
+def _read_str(buf: memoryview, pos: int) -> (str, int):
+    (length,) = _U16.unpack_from(buf, pos)
+    pos += _U16.size
+    return bytes(buf[pos:pos + length]).decode('utf-8'), pos + length
+
+
+def _to_row(snapshot: Dict[str, Any]) -> tuple:
+    """Reduce a Snapshot dictionary to (Symbol, Timestamp, *floats)."""
+    return (snapshot.get('Symbol') or '', snapshot.get('Timestamp') or '') + \
+        tuple(float(snapshot.get(field) or 0.0) for field in FLOAT_FIELDS)
+
+
+def _from_row(row: tuple) -> Dict[str, Any]:
+    snapshot = {'Timestamp': row[1]}
+    snapshot.update(zip(FLOAT_FIELDS, row[2:]))
+    snapshot['Symbol'] = row[0]
+    return snapshot
+
+
+class _SectorState:
+    __slots__ = ('seq', 'rows', 'since_keyframe', 'lock')
+
+    def __init__(self):
+        self.seq = -1
+        self.rows: List[tuple] = []
+        self.since_keyframe = 0
+        self.lock = threading.Lock()  # Serializes the encoding of the sector's messages
+
+
+class SnapshotDeltaEncoder:
+    """
+    Encode consecutive SnapshotLists of each sector as keyframes and deltas.
+
+    State is kept per sector (the SnapshotList 'name'). A sector's first message, every `keyframe_interval`-th
+    message, any message whose symbols differ from the previous one, and the message following
+    `request_keyframe` are sent in full. The others carry a bitmap of changed rows and, for each changed row,
+    a bitmap of changed fields followed by the new values. Every message carries a per-sector sequence number
+    so that consumers can detect gaps.
+
+    Only the Snapshot columns known to the FlatBuffers schema are carried. Floats are sent as float64, so
+    decoding is lossless for values that came from JSON.
+
+    With a SymbolDictionary, messages have version DELTA_VERSION_SYMBOL_IDS: keyframe rows carry the 4-byte id
+    of their symbol instead of the string, and keyframes carry the dictionary version they need.
+    """
+
+    def __init__(self, keyframe_interval: int = 100, symbol_dictionary: Optional['SymbolDictionary'] = None):
+        """
+        Initialize the SnapshotDeltaEncoder.
+
+        Args:
+            keyframe_interval (int): Maximum number of messages per sector between two keyframes.
+            symbol_dictionary (SymbolDictionary, optional): Dictionary assigning the symbol ids of keyframes.
+        """
+        if keyframe_interval <= 0:
+            raise ValueError(f"keyframe_interval must be positive, got {keyframe_interval}.")
+        self.keyframe_interval = keyframe_interval
+        self.symbol_dictionary = symbol_dictionary
+        self.version = DELTA_VERSION if symbol_dictionary is None else DELTA_VERSION_SYMBOL_IDS
+        self._sectors: Dict[str, _SectorState] = {}
+        self._sectors_lock = threading.Lock()
+        self._keyframe_requests: Set[str] = set()
+        # Incremented from every thread encoding, the event loop and the offload pool
+        self.stats = StatsCounters(["keyframes", "deltas", "bytes_encoded"])
+
+    def request_keyframe(self, sector: str):
+        """Send the next message of `sector` as a keyframe, typically after a consumer asked to resync."""
+        self._keyframe_requests.add(sector)
+        logger.info(f"Keyframe requested for sector '{sector}'.")
+
+    def encode(self, snapshot_list: Dict[str, Any]) -> bytes:
+        """
+        Encode a SnapshotList dictionary (the JSON form used on Kafka). Thread-safe: messages of one sector are
+        encoded one at a time, in the order the calls take the sector's lock, which must be the order they are
+        produced in for consumers to see no gaps.
+
+        Args:
+            snapshot_list (dict): Dictionary with 'key', 'time', 'name' and 'snapshots'.
+
+        Returns:
+            bytes: A keyframe or a delta.
+        """
+        sector = snapshot_list.get(SECTOR_FIELD) or ''
+        state = self._sectors.get(sector)
+        if state is None:
+            with self._sectors_lock:
+                state = self._sectors.setdefault(sector, _SectorState())
+
+        rows = [_to_row(snapshot) for snapshot in snapshot_list.get('snapshots', [])]
+        with state.lock:
+            return self._encode_rows(snapshot_list, sector, state, rows)
+
+    def _encode_rows(self, snapshot_list: Dict[str, Any], sector: str, state: _SectorState, rows: List[tuple]) -> bytes:
+        """Encode the rows of a SnapshotList against the sector's previous rows; the sector's lock is held."""
+        keyframe = (state.seq < 0 or state.since_keyframe + 1 >= self.keyframe_interval
+                    or sector in self._keyframe_requests or len(rows) != len(state.rows)
+                    or any(row[0] != previous[0] for row, previous in zip(rows, state.rows)))
+
+        state.seq = (state.seq + 1) & 0xFFFFFFFF
+        out = bytearray(_HEADER.pack(DELTA_MAGIC, self.version, KIND_KEYFRAME if keyframe else KIND_DELTA,
+                                     state.seq, int(snapshot_list.get('time') or 0)))
+        _write_str(out, snapshot_list.get('key'))
+        _write_str(out, sector)
+        out += _U16.pack(len(rows))
+
+        if keyframe:
+            if self.symbol_dictionary is not None:
+                self._write_keyframe_ids(out, rows)
+            else:
+                for row in rows:
+                    _write_str(out, row[0])
+                    _write_str(out, row[1])
+                    out += _FLOATS.pack(*row[2:])
+            self._keyframe_requests.discard(sector)
+            state.since_keyframe = 0
+            self.stats.incr("keyframes")
+        else:
+            self._write_delta(out, state.rows, rows)
+            state.since_keyframe += 1
+            self.stats.incr("deltas")
+
+        state.rows = rows
+        self.stats.incr("bytes_encoded", len(out))
+        return bytes(out)
+
+    def _write_keyframe_ids(self, out: bytearray, rows: List[tuple]):
+        """Append the dictionary version, then each row with the id of its symbol."""
+        id_of = self.symbol_dictionary.id_of
+        symbol_ids = [id_of(row[0]) for row in rows]  # Assigns new symbols before their version is written
+        out += _U32.pack(self.symbol_dictionary.version)
+        for symbol_id, row in zip(symbol_ids, rows):
+            out += _U32.pack(symbol_id)
+            _write_str(out, row[1])
+            out += _FLOATS.pack(*row[2:])
+
+    @staticmethod
+    def _write_delta(out: bytearray, previous_rows: List[tuple], rows: List[tuple]):
+        """Append the changed-row bitmap, then a field mask and the changed values for each changed row."""
+        row_bitmap = bytearray((len(rows) + 7) // 8)
+        changes = bytearray()
+        for index, (row, previous) in enumerate(zip(rows, previous_rows)):
+            if row == previous:
+                continue
+            row_bitmap[index >> 3] |= 1 << (index & 7)
+            mask = 0
+            values = bytearray()
+            for bit, (value, previous_value) in enumerate(zip(row[2:], previous[2:])):
+                if value != previous_value:
+                    mask |= 1 << bit
+                    values += _F64.pack(value)
+            if row[1] != previous[1]:
+                mask |= 1 << TIMESTAMP_BIT
+                _write_str(values, row[1])
+            changes.append(mask)
+            changes += values
+        out += row_bitmap
+        out += changes
+
+
+class SnapshotDeltaDecoder:
+    """
+    Rebuild full SnapshotLists from the keyframes and deltas of SnapshotDeltaEncoder.
+
+    State is kept per sector. When a delta does not follow the last message of its sector (a gap, a reordering,
+    or no keyframe seen yet), the sector is marked for resync: `on_resync(sector)` is called once, typically to
+    ask the producer for a keyframe (see SnapshotDeltaEncoder.request_keyframe), and the sector's deltas are
+    dropped until the next keyframe arrives.
+
+    Keyframes with symbol ids need the producer's SymbolDictionary, at least at the version they carry.
+    """
+
+    def __init__(self, on_resync: Optional[Callable[[str], None]] = None,
+                 symbol_dictionary: Optional['SymbolDictionary'] = None):
+        """
+        Initialize the SnapshotDeltaDecoder.
+
+        Args:
+            on_resync (callable, optional): Called with the sector name when the sector needs a keyframe.
+            symbol_dictionary (SymbolDictionary, optional): Dictionary resolving the symbol ids of keyframes.
+        """
+        self.on_resync = on_resync
+        self.symbol_dictionary = symbol_dictionary
+        self._sectors: Dict[str, _SectorState] = {}
+        self.pending_resyncs: Set[str] = set()
+        self.stats = StatsCounters(["keyframes", "deltas", "gaps", "dropped"])
+
+    def decode(self, value) -> Optional[Dict[str, Any]]:
+        """
+        Decode a keyframe or delta.
+
+        Args:
+            value (bytes or bytearray or memoryview): The Kafka message value.
+
+        Returns:
+            dict or None: The full SnapshotList dictionary, or None if the sector is waiting for a keyframe.
+
+        Raises:
+            DeltaDecodeError: If the value is not a delta-codec message.
+            SymbolDictionaryVersionError: If a keyframe needs a newer symbol dictionary. The decoder's state is
+                unchanged, so the value can be decoded again once the dictionary has caught up.
+        """
+        buf = memoryview(value)
+        try:
+            magic, version, kind, seq, time_ms = _HEADER.unpack_from(buf, 0)
+            if magic != DELTA_MAGIC or version not in (DELTA_VERSION, DELTA_VERSION_SYMBOL_IDS) \
+                    or kind not in (KIND_KEYFRAME, KIND_DELTA):
+                raise DeltaDecodeError(f"Unsupported header: magic={magic:#x}, version={version}, kind={kind}.")
+            key, pos = _read_str(buf, _HEADER.size)
+            sector, pos = _read_str(buf, pos)
+            (count,) = _U16.unpack_from(buf, pos)
+            pos += _U16.size
+
+            state = self._sectors.get(sector)
+            if kind == KIND_KEYFRAME:
+                if version == DELTA_VERSION_SYMBOL_IDS:
+                    rows = self._read_keyframe_ids(buf, pos, count)
+                else:
+                    rows = self._read_keyframe(buf, pos, count)
+                if state is None:
+                    state = self._sectors[sector] = _SectorState()
+                state.rows = rows
+                self.pending_resyncs.discard(sector)
+                self.stats.incr("keyframes")
+            else:
+                if state is None or sector in self.pending_resyncs or seq != (state.seq + 1) & 0xFFFFFFFF \
+                        or count != len(state.rows):
+                    self._request_resync(sector)
+                    return None
+                state.rows = self._read_delta(buf, pos, state.rows)
+                self.stats.incr("deltas")
+        except (struct.error, UnicodeDecodeError, IndexError) as e:
+            raise DeltaDecodeError(f"Truncated or corrupt delta-codec message: {e}") from e
+
+        state.seq = seq
+        return {'key': key, 'time': time_ms, 'name': sector, 'snapshots': [_from_row(row) for row in state.rows]}
+
+    def _request_resync(self, sector: str):
+        self.stats.incr("dropped")
+        if sector in self.pending_resyncs:
+            return
+        self.stats.incr("gaps")
+        self.pending_resyncs.add(sector)
+        logger.warning(f"Gap in delta stream of sector '{sector}', waiting for a keyframe.")
+        if self.on_resync is not None:
+            self.on_resync(sector)
+
+    @staticmethod
+    def _read_keyframe(buf: memoryview, pos: int, count: int) -> List[tuple]:
+        rows = []
+        for _ in range(count):
+            symbol, pos = _read_str(buf, pos)
+            timestamp, pos = _read_str(buf, pos)
+            rows.append((symbol, timestamp) + _FLOATS.unpack_from(buf, pos))
+            pos += _FLOATS.size
+        return rows
+
+    def _read_keyframe_ids(self, buf: memoryview, pos: int, count: int) -> List[tuple]:
+        (dictionary_version,) = _U32.unpack_from(buf, pos)
+        pos += _U32.size
+        if self.symbol_dictionary is None:
+            raise DeltaDecodeError("Keyframe carries symbol ids but the decoder has no symbol dictionary.")
+        self.symbol_dictionary.require(dictionary_version)
+        symbols = self.symbol_dictionary.symbols
+        rows = []
+        for _ in range(count):
+            (symbol_id,) = _U32.unpack_from(buf, pos)
+            timestamp, pos = _read_str(buf, pos + _U32.size)
+            if symbol_id >= dictionary_version:
+                raise DeltaDecodeError(f"Symbol id {symbol_id} is beyond dictionary version {dictionary_version}.")
+            rows.append((symbols[symbol_id], timestamp) + _FLOATS.unpack_from(buf, pos))
+            pos += _FLOATS.size
+        return rows
+
+    @staticmethod
+    def _read_delta(buf: memoryview, pos: int, previous_rows: List[tuple]) -> List[tuple]:
+        bitmap_size = (len(previous_rows) + 7) // 8
+        row_bitmap = buf[pos:pos + bitmap_size]
+        pos += bitmap_size
+        rows = list(previous_rows)
+        for index in range(len(rows)):
+            if not row_bitmap[index >> 3] & (1 << (index & 7)):
+                continue
+            mask = buf[pos]
+            pos += 1
+            row = list(rows[index])
+            for bit in range(len(FLOAT_FIELDS)):
+                if mask & (1 << bit):
+                    (row[2 + bit],) = _F64.unpack_from(buf, pos)
+                    pos += _F64.size
+            if mask & (1 << TIMESTAMP_BIT):
+                row[1], pos = _read_str(buf, pos)
+            rows[index] = tuple(row)
+        return rows
@@ -0,0 +1,95 @@
+from typing import Any, Dict
+
+import flatbuffers
+
+from schemas.snapshot.Snapshot import SnapshotStart, SnapshotAddTimestamp, SnapshotAddZb1BarsC9, \
+    SnapshotAddZb1SideC10, SnapshotAddZb1MarkC11, SnapshotAddZb1PnlC12, SnapshotAddSymbol, SnapshotEnd
+from schemas.snapshot.SnapshotList import SnapshotList, SnapshotListStart, SnapshotListAddKey, SnapshotListAddTime, \
+    SnapshotListAddName, SnapshotListAddSnapshots, SnapshotListEnd, SnapshotListStartSnapshotsVector
+
+
+def encode_snapshot_list(snapshot_list: Dict[str, Any], size_prefixed: bool = False) -> bytes:
+    """
+    Encode a SnapshotList dictionary (the JSON form used on Kafka) as a FlatBuffers SnapshotList.
+
+    Args:
+        snapshot_list (dict): Dictionary with 'key', 'time', 'name' and 'snapshots'.
+        size_prefixed (bool): Prepend the 4-byte little-endian buffer size, for streams of buffers.
+
+    Returns:
+        bytes: The encoded buffer.
+    """
+    snapshots = snapshot_list.get('snapshots', [])
+    builder = flatbuffers.Builder(256 + 64 * len(snapshots))
+
+    snapshot_offsets = []
+    for snapshot in snapshots:
+        timestamp = builder.CreateString(snapshot.get('Timestamp', ''))
+        symbol = builder.CreateString(snapshot.get('Symbol', ''))
+
+        SnapshotStart(builder)
+        SnapshotAddTimestamp(builder, timestamp)
+        SnapshotAddZb1BarsC9(builder, snapshot.get('zb1BarsC9', 0.0))
+        SnapshotAddZb1SideC10(builder, snapshot.get('zb1SideC10', 0.0))
+        SnapshotAddZb1MarkC11(builder, snapshot.get('zb1MarkC11', 0.0))
+        SnapshotAddZb1PnlC12(builder, snapshot.get('zb1PnLC12', 0.0))
+        SnapshotAddSymbol(builder, symbol)
+        snapshot_offsets.append(SnapshotEnd(builder))
+
+    SnapshotListStartSnapshotsVector(builder, len(snapshot_offsets))
+    for offset in reversed(snapshot_offsets):
+        builder.PrependUOffsetTRelative(offset)
+    snapshots_vector = builder.EndVector()
+
+    key = builder.CreateString(snapshot_list.get('key', ''))
+    name = builder.CreateString(snapshot_list.get('name', ''))
+
+    SnapshotListStart(builder)
+    SnapshotListAddKey(builder, key)
+    SnapshotListAddTime(builder, snapshot_list.get('time', 0))
+    SnapshotListAddName(builder, name)
+    SnapshotListAddSnapshots(builder, snapshots_vector)
+    root = SnapshotListEnd(builder)
+
+    if size_prefixed:
+        builder.FinishSizePrefixed(root)
+    else:
+        builder.Finish(root)
+    return bytes(builder.Output())
+
+
+def decode_snapshot_list(buf, offset: int = 0) -> Dict[str, Any]:
+    """
+    Decode a FlatBuffers SnapshotList into the dictionary form used on Kafka.
+
+    Args:
+        buf (bytes or bytearray or memoryview): Buffer holding the SnapshotList.
+        offset (int): Position of the root table offset inside `buf`.
+
+    Returns:
+        dict: Dictionary with 'key', 'time', 'name' and 'snapshots'.
+    """
+    snapshot_list = SnapshotList.GetRootAs(buf, offset)
+
+    snapshots = []
+    for i in range(snapshot_list.SnapshotsLength()):
+        snapshot = snapshot_list.Snapshots(i)
+        timestamp = snapshot.Timestamp()
+        symbol = snapshot.Symbol()
+        snapshots.append({
+            'Timestamp': timestamp.decode('utf-8') if timestamp is not None else None,
+            'zb1BarsC9': snapshot.Zb1BarsC9(),
+            'zb1SideC10': snapshot.Zb1SideC10(),
+            'zb1MarkC11': snapshot.Zb1MarkC11(),
+            'zb1PnLC12': snapshot.Zb1PnlC12(),
+            'Symbol': symbol.decode('utf-8') if symbol is not None else None
+        })
+
+    key = snapshot_list.Key()
+    name = snapshot_list.Name()
+    return {
+        'key': key.decode('utf-8') if key is not None else None,
+        'time': snapshot_list.Time(),
+        'name': name.decode('utf-8') if name is not None else None,
+        'snapshots': snapshots
+    }
@@ -0,0 +1,269 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import flatbuffers
+import numpy as np
+
+from schemas.snapshot_v2.SnapshotListV2 import SnapshotListV2, SnapshotListV2Start, SnapshotListV2AddKey, \
+    SnapshotListV2AddTime, SnapshotListV2AddName, SnapshotListV2AddSymbols, SnapshotListV2AddRows, \
+    SnapshotListV2AddSymbolDictionaryVersion, SnapshotListV2StartSymbolsVector, SnapshotListV2StartRowsVector, \
+    SnapshotListV2End
+from schemas.snapshot_v2.SnapshotRow import SnapshotRow
+from zzv.msgcore.codecs.snapshot_flatbuffers import decode_snapshot_list
+
+if TYPE_CHECKING:
+    from zzv.msgcore.symbol_dictionary import SymbolDictionary
+
+FILE_IDENTIFIER = b'ZSL2'
+
+# Memory layout of schemas/snapshot_v2/SnapshotRow.py; the float columns keep the names of the v1 dictionary keys
+ROW_DTYPE = np.dtype({
+    'names': ['timestamp_ms', 'symbol_id', 'zb1BarsC9', 'zb1SideC10', 'zb1MarkC11', 'zb1PnLC12'],
+    'formats': ['<i8', '<u4', '<f4', '<f4', '<f4', '<f4'],
+    'offsets': [0, 8, 12, 16, 20, 24],
+    'itemsize': SnapshotRow.SizeOf()
+})
+FLOAT_FIELDS = ['zb1BarsC9', 'zb1SideC10', 'zb1MarkC11', 'zb1PnLC12']
+
+# SnapshotListV2 vtable offsets of the symbols and rows fields, see schemas/snapshot_v2/SnapshotListV2.py
+_SYMBOLS_FIELD = 10
+_ROWS_FIELD = 12
+_SYMBOL_DICTIONARY_VERSION_FIELD = 14
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def timestamp_to_epoch_ms(timestamp: Optional[str]) -> int:
+    """
+    Convert a v1 'Timestamp' string such as '2024-10-09T08:28:46.968Z' to epoch milliseconds. Timestamps without
+    a time zone are taken as UTC; a missing timestamp is 0.
+    """
+    if not timestamp:
+        return 0
+    value = datetime.fromisoformat(timestamp)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MILLISECOND
+
+
+def epoch_ms_to_timestamp(timestamp_ms: int) -> Optional[str]:
+    """Convert epoch milliseconds back to the v1 'Timestamp' form; 0 is a missing timestamp."""
+    if not timestamp_ms:
+        return None
+    value = _EPOCH + timedelta(milliseconds=int(timestamp_ms))
+    return f"{value:%Y-%m-%dT%H:%M:%S}.{value.microsecond // 1000:03d}Z"
+
+
+def is_snapshot_list_v2(buf, offset: int = 0) -> bool:
+    """Return whether the buffer at `offset` (past any size prefix) holds a v2 SnapshotList."""
+    return SnapshotListV2.SnapshotListV2BufferHasIdentifier(buf, offset)
+
+
+class SnapshotListV2View:
+    """
+    A decoded v2 SnapshotList whose rows are a NumPy structured array viewing the original buffer.
+
+    `rows['zb1MarkC11']` is a column of all the marks, without a copy or a call per row. The view is read-only
+    and only valid while the buffer is alive. `symbols` is the list's own symbols table, or the symbols of the
+    SymbolDictionary it was decoded with.
+    """
+
+    __slots__ = ('key', 'time', 'name', 'symbols', 'rows')
+
+    def __init__(self, key: Optional[str], time: int, name: Optional[str], symbols: List[str], rows: np.ndarray):
+        self.key = key
+        self.time = time
+        self.name = name
+        self.symbols = symbols
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def symbol_column(self) -> np.ndarray:
+        """Return the symbol of every row."""
+        return np.asarray(self.symbols, dtype=object)[self.rows['symbol_id']] if len(self.rows) else \
+            np.empty(0, dtype=object)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the v1 dictionary form used on Kafka, copying the rows out of the buffer."""
+        columns = {field: self.rows[field].tolist() for field in FLOAT_FIELDS}
+        timestamps = {}  # Rows of a list share a few timestamps; format each once
+        snapshots = []
+        for i, (timestamp_ms, symbol_id) in enumerate(zip(self.rows['timestamp_ms'].tolist(),
+                                                          self.rows['symbol_id'].tolist())):
+            timestamp = timestamps.get(timestamp_ms)
+            if timestamp is None:
+                timestamp = timestamps[timestamp_ms] = epoch_ms_to_timestamp(timestamp_ms)
+            snapshots.append({
+                'Timestamp': timestamp,
+                'zb1BarsC9': columns['zb1BarsC9'][i],
+                'zb1SideC10': columns['zb1SideC10'][i],
+                'zb1MarkC11': columns['zb1MarkC11'][i],
+                'zb1PnLC12': columns['zb1PnLC12'][i],
+                'Symbol': self.symbols[symbol_id]
+            })
+        return {'key': self.key, 'time': self.time, 'name': self.name, 'snapshots': snapshots}
+
+
+def snapshot_rows(snapshots: List[Dict[str, Any]],
+                  symbol_dictionary: Optional['SymbolDictionary'] = None) -> Tuple[np.ndarray, List[str]]:
+    """
+    Build the rows array and the symbols table of v1 snapshot dictionaries. Each distinct timestamp string is
+    parsed once. With a SymbolDictionary the rows carry its ids, assigned as needed, and the table is empty.
+    """
+    symbol_ids: Dict[str, int] = {}
+    id_of = symbol_dictionary.id_of if symbol_dictionary is not None else lambda _: len(symbol_ids)
+    timestamps: Dict[Optional[str], int] = {}
+    rows = np.zeros(len(snapshots), dtype=ROW_DTYPE)
+    timestamp_column = []
+    symbol_column = []
+    for snapshot in snapshots:
+        timestamp = snapshot.get('Timestamp')
+        timestamp_ms = timestamps.get(timestamp)
+        if timestamp_ms is None:
+            timestamp_ms = timestamps[timestamp] = timestamp_to_epoch_ms(timestamp)
+        timestamp_column.append(timestamp_ms)
+        symbol = snapshot.get('Symbol') or ''
+        symbol_id = symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = symbol_ids[symbol] = id_of(symbol)
+        symbol_column.append(symbol_id)
+    if snapshots:
+        rows['timestamp_ms'] = timestamp_column
+        rows['symbol_id'] = symbol_column
+        for field in FLOAT_FIELDS:
+            rows[field] = [snapshot.get(field) or 0.0 for snapshot in snapshots]
+    return rows, list(symbol_ids) if symbol_dictionary is None else []
+
+
+def _create_rows_vector(builder: flatbuffers.Builder, rows: np.ndarray) -> int:
+    """Copy the rows array into the builder as the rows vector, in one piece (CreateNumpyVector for structs)."""
+    SnapshotListV2StartRowsVector(builder, len(rows))
+    payload = np.ascontiguousarray(rows, dtype=ROW_DTYPE).tobytes()
+    builder.head = builder.head - len(payload)
+    builder.Bytes[builder.head:builder.head + len(payload)] = payload
+    return builder.EndVector()
+
+
+def encode_snapshot_list_v2(snapshot_list: Dict[str, Any], size_prefixed: bool = False,
+                            symbol_dictionary: Optional['SymbolDictionary'] = None) -> bytes:
+    """
+    Encode a SnapshotList dictionary (the JSON form used on Kafka) as a FlatBuffers SnapshotListV2.
+
+    Args:
+        snapshot_list (dict): Dictionary with 'key', 'time', 'name' and 'snapshots'.
+        size_prefixed (bool): Prepend the 4-byte little-endian buffer size, for streams of buffers.
+        symbol_dictionary (SymbolDictionary, optional): Write the dictionary's ids and version instead of a
+            symbols table. Decoding then needs the dictionary, at least at that version.
+
+    Returns:
+        bytes: The encoded buffer.
+    """
+    rows, symbols = snapshot_rows(snapshot_list.get('snapshots', []), symbol_dictionary)
+    builder = flatbuffers.Builder(256 + rows.nbytes + 16 * len(symbols))
+
+    rows_vector = _create_rows_vector(builder, rows)
+    symbols_vector = None
+    if symbol_dictionary is None:
+        symbol_offsets = [builder.CreateString(symbol) for symbol in symbols]
+        SnapshotListV2StartSymbolsVector(builder, len(symbol_offsets))
+        for offset in reversed(symbol_offsets):
+            builder.PrependUOffsetTRelative(offset)
+        symbols_vector = builder.EndVector()
+
+    key = builder.CreateString(snapshot_list.get('key', ''))
+    name = builder.CreateString(snapshot_list.get('name', ''))
+
+    SnapshotListV2Start(builder)
+    SnapshotListV2AddKey(builder, key)
+    SnapshotListV2AddTime(builder, snapshot_list.get('time', 0))
+    SnapshotListV2AddName(builder, name)
+    if symbols_vector is not None:
+        SnapshotListV2AddSymbols(builder, symbols_vector)
+    else:
+        SnapshotListV2AddSymbolDictionaryVersion(builder, symbol_dictionary.version)
+    SnapshotListV2AddRows(builder, rows_vector)
+    root = SnapshotListV2End(builder)
+
+    if size_prefixed:
+        builder.FinishSizePrefixed(root, FILE_IDENTIFIER)
+    else:
+        builder.Finish(root, FILE_IDENTIFIER)
+    return bytes(builder.Output())
+
+
+def _read_strings(buf, vector: int, count: int) -> List[str]:
+    """
+    Read a vector of strings, locating them all with NumPy instead of one SnapshotListV2.Symbols call per string.
+
+    Each element of the vector is the offset of its string from the element; a string is its uint32 length
+    followed by its UTF-8 bytes.
+    """
+    if not count:
+        return []
+    data = np.frombuffer(buf, dtype=np.uint8)
+    elements = vector + 4 * np.arange(count, dtype=np.int64)
+    positions = elements + np.frombuffer(buf, dtype='<u4', count=count, offset=vector)
+    lengths = data[positions].astype(np.int64) | data[positions + 1].astype(np.int64) << 8 | \
+        data[positions + 2].astype(np.int64) << 16 | data[positions + 3].astype(np.int64) << 24
+    view = memoryview(buf)
+    return [str(view[start:start + length], 'utf-8')
+            for start, length in zip((positions + 4).tolist(), lengths.tolist())]
+
+
+def decode_snapshot_list_v2(buf, offset: int = 0,
+                            symbol_dictionary: Optional['SymbolDictionary'] = None) -> SnapshotListV2View:
+    """
+    Decode a FlatBuffers SnapshotListV2 without copying its rows.
+
+    Args:
+        buf (bytes or bytearray or memoryview): Buffer holding the SnapshotListV2.
+        offset (int): Position of the root table offset inside `buf`.
+        symbol_dictionary (SymbolDictionary, optional): Resolves the symbol ids of lists encoded with one.
+
+    Returns:
+        SnapshotListV2View: The list, its rows being a structured array over `buf`.
+
+    Raises:
+        ValueError: If the buffer is not a SnapshotListV2, or needs a symbol dictionary and none is given.
+        SymbolDictionaryVersionError: If the list needs a newer version of the symbol dictionary.
+    """
+    if not is_snapshot_list_v2(buf, offset):
+        raise ValueError("Buffer does not hold a SnapshotListV2 (file identifier 'ZSL2' missing).")
+    snapshot_list = SnapshotListV2.GetRootAs(buf, offset)
+    table = snapshot_list._tab
+    field = table.Offset(_ROWS_FIELD)
+    if field:
+        rows = np.frombuffer(buf, dtype=ROW_DTYPE, count=table.VectorLen(field), offset=table.Vector(field))
+    else:
+        rows = np.empty(0, dtype=ROW_DTYPE)
+    field = table.Offset(_SYMBOL_DICTIONARY_VERSION_FIELD)
+    if field:
+        if symbol_dictionary is None:
+            raise ValueError("SnapshotListV2 carries symbol dictionary ids but no symbol dictionary was given.")
+        symbol_dictionary.require(snapshot_list.SymbolDictionaryVersion())
+        symbols = symbol_dictionary.symbols
+    else:
+        field = table.Offset(_SYMBOLS_FIELD)
+        symbols = _read_strings(buf, table.Vector(field), table.VectorLen(field)) if field else []
+    key = snapshot_list.Key()
+    name = snapshot_list.Name()
+    return SnapshotListV2View(key=key.decode('utf-8') if key is not None else None, time=snapshot_list.Time(),
+                              name=name.decode('utf-8') if name is not None else None, symbols=symbols, rows=rows)
+
+
+def convert_v1_to_v2(buf, offset: int = 0, size_prefixed: bool = False,
+                     symbol_dictionary: Optional['SymbolDictionary'] = None) -> bytes:
+    """
+    Re-encode a v1 FlatBuffers SnapshotList as a SnapshotListV2.
+
+    Args:
+        buf (bytes or bytearray or memoryview): Buffer holding the v1 SnapshotList.
+        offset (int): Position of the root table offset inside `buf`.
+        size_prefixed (bool): Prepend the 4-byte size to the v2 buffer.
+        symbol_dictionary (SymbolDictionary, optional): Write symbol ids of this dictionary.
+    """
+    return encode_snapshot_list_v2(decode_snapshot_list(buf, offset), size_prefixed=size_prefixed,
+                                   symbol_dictionary=symbol_dictionary)
@@ -0,0 +1,57 @@
+import queue
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class ConflatingQueue(queue.PriorityQueue):
+    """
+    Priority queue that keeps only the latest message per key while it waits to be sent.
+
+    Putting a message whose key is already queued replaces the queued message's data in place, so the message
+    keeps its original position (and priority) and queue depth stays bounded by the number of distinct keys.
+    Items are PrioritizedMessage objects; messages for which `key_func` returns None are never conflated.
+    """
+
+    def __init__(self, key_func: Callable[[Any], Optional[Hashable]]):
+        """
+        Initialize the ConflatingQueue. The queue is unbounded.
+
+        Args:
+            key_func (callable): Returns the conflation key of a message's data, or None.
+        """
+        super().__init__()
+        self.key_func = key_func
+        self._latest: Dict[Hashable, Any] = {}  # Key -> queued PrioritizedMessage
+        self.conflated = 0  # Messages that replaced a queued message
+
+    def put(self, item, block=True, timeout=None):
+        """Queue a message, or replace the queued message with the same key. Never blocks."""
+        key = self.key_func(item.message_data)
+        with self.mutex:
+            queued = self._latest.get(key) if key is not None else None
+            if queued is not None:
+                queued.message_data = item.message_data
+                self.conflated += 1
+                return
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def _put(self, item):
+        key = self.key_func(item.message_data)
+        if key is not None:
+            self._latest[key] = item
+        super()._put(item)
+
+    def _get(self):
+        item = super()._get()
+        key = self.key_func(item.message_data)
+        if key is not None and self._latest.get(key) is item:
+            del self._latest[key]
+        return item
+
+
+def field_key(field: str) -> Callable[[Any], Optional[Hashable]]:
+    """Return a key function reading `field` from dictionary messages."""
+    def key_func(message_data: Any) -> Optional[Hashable]:
+        return message_data.get(field) if isinstance(message_data, dict) else None
+    return key_func
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
+
+from zzv.common.constants import CONSUMER_LAG_MONITOR, MSG_MANAGER
+from zzv.common.latency import LatencyHistogram
+from zzv.engine.reconfigurable_manager import ReconfigurableManager
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+from zzv.models.message_types import MessageType
+from zzv.msgcore.handler_registry import HandlerKind
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+LATENCY_HANDLER_NAME = 'lag_monitor_latency'
+
+# Upper bounds in milliseconds of the end-to-end latency histogram buckets; the last bucket is unbounded
+DEFAULT_LATENCY_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+def _create_consumer(consumer_conf: Dict[str, Any]):
+    # Imported here so that the Kernel does not load librdkafka unless the monitor is configured
+    from confluent_kafka import Consumer
+    return Consumer(consumer_conf)
+
+
+class ConsumerLagMonitor(ReconfigurableManager):
+    """
+    Report consumer lag, throughput and end-to-end latency per partition.
+
+    Every `interval` seconds a worker thread reads, for each configured consumer group, the committed offset
+    and high watermark of every partition of its topics. Lag is the difference; rate is the committed offset's
+    progress per second since the previous sample; skew is the spread between the most and least lagging
+    partitions of a topic.
+
+    End-to-end latency is measured from the `time` field of the SnapshotLists routed through the MsgManager to
+    the moment the monitor's handler sees them, per sector. It is not recorded while the Kernel's clock is
+    simulated, since replayed times are in the past.
+
+    Lag, skew and p99 latency above their thresholds turn the health status to WARNING. The interval and
+    thresholds are re-read on configuration reloads.
+    """
+
+    config_section = 'lag_monitor'
+
+    def __init__(self, kernel, monitor_config: Dict[str, Any],
+                 consumer_factory: Callable[[Dict[str, Any]], Any] = _create_consumer):
+        """
+        Initialize the ConsumerLagMonitor.
+
+        Args:
+            kernel (Kernel): The kernel providing the MsgManager and the shared clock.
+            monitor_config (dict): The 'lag_monitor' configuration section:
+                groups (list): Consumer groups to watch, each with `group_id` and `topics`.
+                brokers (str, optional): Bootstrap servers. Defaults to the engine's kafka_brokers.
+                interval (float): Seconds between lag samples. Defaults to 10.
+                timeout (float): Seconds allowed for each broker request. Defaults to 5.
+                max_lag (int): Partition lag above which health is WARNING. Defaults to 10000.
+                max_skew (int): Lag spread within a topic above which health is WARNING. Defaults to max_lag.
+                max_latency_ms (float): p99 end-to-end latency above which health is WARNING. Defaults to 1000.
+                latency_buckets (list): Histogram bucket upper bounds in milliseconds.
+            consumer_factory (callable): Creates the consumers used to read offsets.
+        """
+        super().__init__(name="ConsumerLagMonitor")
+        self.kernel = kernel
+        self.groups: Dict[str, List[str]] = {group['group_id']: list(group.get('topics', []))
+                                             for group in monitor_config.get('groups', [])}
+        self.brokers = monitor_config.get('brokers') or kernel.config.get(
+            'kafka_brokers', '31.220.102.46:29092,31.220.102.46:29094')
+        self.apply_config(monitor_config)
+        self.latency_buckets = monitor_config.get('latency_buckets', DEFAULT_LATENCY_BUCKETS)
+        self._consumer_factory = consumer_factory
+        self._consumers: Dict[str, Any] = {}  # One offsets-only consumer per group, used by the worker thread
+
+        # (group, topic, partition) -> committed, high, lag, rate
+        self.partitions: Dict[Tuple[str, str, int], Dict[str, Any]] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}  # Sector -> end-to-end latency
+        self._latency_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_sample: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def apply_config(self, section_config: Mapping[str, Any]):
+        """Apply the sampling interval, broker timeout and warning thresholds; groups need a restart."""
+        self.interval = section_config.get('interval', 10.0)
+        self.timeout = section_config.get('timeout', 5.0)
+        self.max_lag = section_config.get('max_lag', 10000)
+        self.max_skew = section_config.get('max_skew', self.max_lag)
+        self.max_latency_ms = section_config.get('max_latency_ms', 1000.0)
+
+    async def start(self):
+        """Register the latency handler and start sampling offsets."""
+        logger.info(f"Starting {CONSUMER_LAG_MONITOR} for groups: {', '.join(self.groups) or 'none'}...")
+        msg_manager = self.kernel.get_service(MSG_MANAGER, caller=self)
+        msg_manager.register_handler(MessageType.SNAPSHOTS, self.record_latency, HandlerKind.SYNC,
+                                     name=LATENCY_HANDLER_NAME)
+        self._running = True
+        if self.groups:
+            self._task = asyncio.create_task(self._sample_periodically())
+
+    async def close(self):
+        """Stop sampling, unregister the latency handler and close the consumers."""
+        logger.info(f"Stopping {CONSUMER_LAG_MONITOR}...")
+        self._running = False
+        self.kernel.get_service(MSG_MANAGER, caller=self).unregister_handler(MessageType.SNAPSHOTS,
+                                                                            LATENCY_HANDLER_NAME)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        consumers, self._consumers = self._consumers, {}
+        for consumer in consumers.values():
+            await asyncio.to_thread(consumer.close)
+
+    def record_latency(self, message_data: Any):
+        """Record the end-to-end latency of a routed SnapshotList (dictionary, JSON string or model)."""
+        if self.kernel.clock.is_simulated():
+            return
+        if isinstance(message_data, str):
+            message_data = json.loads(message_data)
+        elif not isinstance(message_data, dict):
+            message_data = message_data.model_dump()
+        time_ms = message_data.get('time')
+        if not time_ms:
+            return
+        latency_ms = max(0.0, time.time() * 1000 - float(time_ms))
+        sector = message_data.get('name') or 'UNKNOWN'
+        with self._latency_lock:
+            histogram = self.latency.get(sector)
+            if histogram is None:
+                histogram = self.latency[sector] = LatencyHistogram(self.latency_buckets)
+            histogram.record(latency_ms)
+
+    async def _sample_periodically(self):
+        while self._running:
+            try:
+                await asyncio.to_thread(self.sample)
+            except Exception as e:
+                self.last_error = f"Failed to sample consumer offsets: {e}"
+                logger.error(self.last_error)
+            await asyncio.sleep(self.interval)
+
+    def sample(self):
+        """Read committed offsets and high watermarks of every watched partition. Blocking."""
+        from confluent_kafka import TopicPartition
+
+        now = time.monotonic()
+        elapsed = now - self.last_sample if self.last_sample is not None else None
+        partitions = {}
+        for group, topics in self.groups.items():
+            consumer = self._consumers.get(group)
+            if consumer is None:
+                consumer = self._consumers[group] = self._consumer_factory({
+                    'bootstrap.servers': self.brokers,
+                    'group.id': group,
+                    'enable.auto.commit': False
+                })
+            topic_partitions = []
+            for topic in topics:
+                metadata = consumer.list_topics(topic, timeout=self.timeout).topics.get(topic)
+                if metadata is None or metadata.error is not None:
+                    logger.warning(f"Topic '{topic}' of group '{group}' is not available.")
+                    continue
+                topic_partitions.extend(TopicPartition(topic, partition) for partition in metadata.partitions)
+            if not topic_partitions:
+                continue
+
+            for committed in consumer.committed(topic_partitions, timeout=self.timeout):
+                _, high = consumer.get_watermark_offsets(committed, timeout=self.timeout)
+                key = (group, committed.topic, committed.partition)
+                offset = committed.offset if committed.offset >= 0 else None  # Negative: nothing committed yet
+                previous = self.partitions.get(key, {}).get('committed')
+                rate = None
+                if elapsed and offset is not None and previous is not None:
+                    rate = (offset - previous) / elapsed
+                partitions[key] = {
+                    "committed": offset,
+                    "high": high,
+                    "lag": high - offset if offset is not None else high,
+                    "rate": rate
+                }
+        self.partitions = partitions
+        self.last_sample = now
+
+    def get_lag(self) -> Dict[str, Any]:
+        """Return lag, rate and skew per group and topic."""
+        report: Dict[str, Any] = {}
+        for (group, topic, partition), values in sorted(self.partitions.items()):
+            topic_report = report.setdefault(group, {}).setdefault(topic, {"partitions": {}})
+            topic_report["partitions"][partition] = values
+        for topics in report.values():
+            for topic_report in topics.values():
+                lags = [values["lag"] for values in topic_report["partitions"].values()]
+                rates = [values["rate"] for values in topic_report["partitions"].values()
+                         if values["rate"] is not None]
+                topic_report["total_lag"] = sum(lags)
+                topic_report["max_lag"] = max(lags)
+                topic_report["skew"] = max(lags) - min(lags)
+                topic_report["rate"] = sum(rates) if rates else None
+        return report
+
+    def get_latency(self) -> Dict[str, Dict[str, Any]]:
+        """Return the end-to-end latency histogram and percentiles per sector."""
+        with self._latency_lock:
+            histograms = dict(self.latency)
+        return {sector: histogram.to_dict() for sector, histogram in sorted(histograms.items())}
+
+    def get_health(self):
+        """
+        Return the health status of the ConsumerLagMonitor as a HealthReport object. Thresholds exceeded by lag,
+        skew or p99 latency are reported as warnings.
+        """
+        if not self._running:
+            return HealthReport(manager_name=self.name, status=Status.ERROR,
+                                details=["ConsumerLagMonitor is not running."])
+        warnings = []
+        for group, topics in self.get_lag().items():
+            for topic, topic_report in topics.items():
+                if topic_report["max_lag"] > self.max_lag:
+                    warnings.append(f"Group {group} lags {topic_report['max_lag']} messages on {topic}")
+                if topic_report["skew"] > self.max_skew:
+                    warnings.append(f"Group {group} has a lag skew of {topic_report['skew']} on {topic}")
+        for sector, latency in self.get_latency().items():
+            if latency["p99"] > self.max_latency_ms:
+                warnings.append(f"End-to-end p99 latency of {sector} is {latency['p99']:.0f} ms")
+        details = [f"ConsumerLagMonitor is watching {len(self.partitions)} partitions"] + warnings
+        if self.last_error:
+            details.append(f"Last error: {self.last_error}")
+        return HealthReport(manager_name=self.name, status=Status.WARNING if warnings else Status.OK,
+                            details=details)
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the ConsumerLagMonitor.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+
+        @app.get(f"/{self.name}/lag")
+        async def consumer_lag() -> Dict[str, Any]:
+            """Get lag, rate and skew per consumer group, topic and partition."""
+            return self.get_lag()
+
+        @app.get(f"/{self.name}/latency")
+        async def end_to_end_latency() -> Dict[str, Dict[str, Any]]:
+            """Get the end-to-end latency histogram and percentiles per sector."""
+            return self.get_latency()
+
+        print(f"Registered endpoints for {self.name}.")
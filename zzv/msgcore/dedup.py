@@ -0,0 +1,170 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from zzv.common.stats import StatsCounters
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Sized for `capacity` items at the given false-positive rate; positions come from double hashing of a
+    128-bit BLAKE2b digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        if capacity <= 0:
+            raise ValueError(f"Bloom filter capacity must be positive, got {capacity}.")
+        if not 0 < error_rate < 1:
+            raise ValueError(f"Bloom filter error rate must be between 0 and 1, got {error_rate}.")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0  # Items added
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RotatingBloomFilter:
+    """
+    Time-bounded, memory-capped seen-set made of two Bloom filter generations.
+
+    Items are added to the current generation and looked up in both. The current generation becomes the
+    previous one (and the old previous one is dropped) every `window_seconds`, or earlier once it holds
+    `capacity` items, so an item is remembered for one to two windows and memory stays at two filters.
+    """
+
+    def __init__(self, capacity: int = 1000000, error_rate: float = 0.001, window_seconds: float = 300.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.window_seconds = window_seconds
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous: Optional[BloomFilter] = None
+        self.rotated_at = time.monotonic()
+        self.rotations = 0
+
+    def _rotate_if_due(self):
+        if time.monotonic() - self.rotated_at >= self.window_seconds or self.current.count >= self.capacity:
+            self.previous, self.current = self.current, BloomFilter(self.capacity, self.error_rate)
+            self.rotated_at = time.monotonic()
+            self.rotations += 1
+
+    def add(self, item: str):
+        self._rotate_if_due()
+        self.current.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        self._rotate_if_due()
+        return item in self.current or (self.previous is not None and item in self.previous)
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.current.bits) + (len(self.previous.bits) if self.previous is not None else 0)
+
+
+class Deduplicator:
+    """
+    Drop messages whose key was already seen.
+
+    Keys seen within `exact_window_seconds` (at most `max_exact` of them) are kept exactly, so recent duplicates,
+    such as those of producer retries, are recognized with certainty. Older keys are only remembered by a
+    RotatingBloomFilter over `window_seconds`: a key it reports as seen is a duplicate with probability
+    1 - `error_rate`, so by default it is only counted and let through. Set `drop_probable` to drop it too.
+
+    Thread-safe.
+    """
+
+    def __init__(self, window_seconds: float = 300.0, exact_window_seconds: float = 10.0, max_exact: int = 100000,
+                 capacity: int = 1000000, error_rate: float = 0.001, drop_probable: bool = False):
+        """
+        Initialize the Deduplicator.
+
+        Args:
+            window_seconds (float): Time a key is remembered by the Bloom filter (one to two windows).
+            exact_window_seconds (float): Time a key is remembered exactly.
+            max_exact (int): Maximum number of exactly remembered keys.
+            capacity (int): Keys per Bloom filter generation before it rotates early.
+            error_rate (float): False-positive rate of each Bloom filter generation.
+            drop_probable (bool): Whether keys found only in the Bloom filter are reported as duplicates.
+        """
+        self.exact_window_seconds = exact_window_seconds
+        self.max_exact = max_exact
+        self.drop_probable = drop_probable
+        self.bloom = RotatingBloomFilter(capacity=capacity, error_rate=error_rate, window_seconds=window_seconds)
+        self._exact: 'OrderedDict[Hashable, float]' = OrderedDict()  # Key -> time first seen, oldest first
+        self._lock = threading.Lock()
+        self.stats = StatsCounters([
+            "checked",  # Keys checked
+            "duplicates",  # Keys found in the exact window
+            "probable_duplicates"  # Keys found only in the Bloom filter
+        ])
+
+    def is_duplicate(self, key: Any) -> bool:
+        """Record `key` and return whether it was seen before. None keys are never duplicates."""
+        if key is None:
+            return False
+        key = str(key)
+        now = time.monotonic()
+        with self._lock:
+            self.stats.incr("checked")
+            self._expire(now)
+            if key in self._exact:
+                self.stats.incr("duplicates")
+                return True
+            probable = key in self.bloom
+            self._exact[key] = now
+            if probable:
+                self.stats.incr("probable_duplicates")
+                return self.drop_probable
+            self.bloom.add(key)
+            return False
+
+    def _expire(self, now: float):
+        """Forget exact keys older than the exact window, and the oldest ones beyond `max_exact`."""
+        exact = self._exact
+        while exact and (len(exact) >= self.max_exact
+                         or now - next(iter(exact.values())) > self.exact_window_seconds):
+            exact.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the counters and the memory held by the seen-sets."""
+        with self._lock:
+            return {**self.stats.snapshot(), "exact_keys": len(self._exact), "bloom_rotations": self.bloom.rotations,
+                    "bloom_bytes": self.bloom.memory_bytes}
+
+
+def build_deduplicator(dedup_config: Optional[Dict[str, Any]]) -> Optional[Deduplicator]:
+    """Create a Deduplicator from a 'dedup' configuration section, or return None when it is not enabled."""
+    if not dedup_config or not dedup_config.get('enabled', False):
+        return None
+    return Deduplicator(window_seconds=dedup_config.get('window_seconds', 300.0),
+                        exact_window_seconds=dedup_config.get('exact_window_seconds', 10.0),
+                        max_exact=dedup_config.get('max_exact', 100000),
+                        capacity=dedup_config.get('capacity', 1000000),
+                        error_rate=dedup_config.get('error_rate', 0.001),
+                        drop_probable=dedup_config.get('drop_probable', False))
+
+
+def message_key(message_data: Any, field: str = 'key') -> Optional[Any]:
+    """Return the deduplication key of a dictionary or model message, or None."""
+    if isinstance(message_data, dict):
+        return message_data.get(field)
+    return getattr(message_data, field, None)
@@ -2,7 +2,7 @@ import flatbuffers
 from schemas.snapshot.Snapshot import Snapshot  # Adjust the import as per your structure
 from schemas.snapshot.SnapshotList import SnapshotList  # Adjust the import as per your structure
 
-from protocol_interface import ProtocolInterface
+from zzv.msgcore.protocol_interface import ProtocolInterface
 
 
 class FlatBuffersProtocol(ProtocolInterface):
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from zzv.models.message_types import MessageType
+
+
+class HandlerKind(Enum):
+    """How a message handler must be executed by the dispatcher."""
+    SYNC = "sync"  # Plain function, run inline on the shard's worker task
+    ASYNC = "async"  # Coroutine function, awaited on the shard's worker task
+    CPU_BOUND = "cpu_bound"  # Picklable function, run in a process pool
+
+
+class MessageHandler:
+    """A handler registered for one MessageType."""
+
+    __slots__ = ('name', 'message_type', 'callback', 'kind')
+
+    def __init__(self, name: str, message_type: MessageType, callback: Callable[[Any], Any], kind: HandlerKind):
+        self.name = name
+        self.message_type = message_type
+        self.callback = callback
+        self.kind = kind
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"name": self.name, "message_type": self.message_type.value, "kind": self.kind.value}
+
+
+class HandlerRegistry:
+    """
+    Registry of message handlers keyed by MessageType.
+
+    Several handlers may be registered for the same type; they run in registration order for each message.
+    Registration is thread-safe, and lookups return an immutable snapshot so dispatch never holds the lock.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[MessageType, tuple] = {}
+        self._lock = threading.Lock()
+
+    def register(self, message_type: Union[MessageType, str], callback: Callable[[Any], Any],
+                 kind: Optional[HandlerKind] = None, name: Optional[str] = None) -> MessageHandler:
+        """
+        Register a handler for a message type.
+
+        Args:
+            message_type (MessageType or str): The message type, its value, or the legacy 'SnapshotList' name.
+            callback (callable): Called with the message data.
+            kind (HandlerKind, optional): Execution kind. Coroutine functions default to ASYNC, others to SYNC.
+            name (str, optional): Unique handler name per type. Defaults to the callback's qualified name.
+
+        Returns:
+            MessageHandler: The registered handler.
+        """
+        message_type = MessageType.resolve(message_type)
+        if kind is None:
+            kind = HandlerKind.ASYNC if asyncio.iscoroutinefunction(callback) else HandlerKind.SYNC
+        name = name or getattr(callback, '__qualname__', repr(callback))
+        handler = MessageHandler(name, message_type, callback, kind)
+
+        with self._lock:
+            existing = self._handlers.get(message_type, ())
+            if any(h.name == name for h in existing):
+                raise ValueError(f"Handler '{name}' is already registered for '{message_type.value}'.")
+            self._handlers[message_type] = existing + (handler,)
+        return handler
+
+    def unregister(self, message_type: Union[MessageType, str], name: str) -> bool:
+        """
+        Remove a handler by name.
+
+        Returns:
+            bool: True if a handler was removed.
+        """
+        message_type = MessageType.resolve(message_type)
+        with self._lock:
+            existing = self._handlers.get(message_type, ())
+            remaining = tuple(h for h in existing if h.name != name)
+            if remaining:
+                self._handlers[message_type] = remaining
+            else:
+                self._handlers.pop(message_type, None)
+            return len(remaining) != len(existing)
+
+    def get_handlers(self, message_type: Union[MessageType, str]) -> tuple:
+        """Return the handlers registered for a message type, in registration order."""
+        return self._handlers.get(MessageType.resolve(message_type), ())
+
+    def describe(self) -> Dict[str, List[Dict[str, str]]]:
+        """Return the registered handlers grouped by message type value."""
+        return {message_type.value: [h.to_dict() for h in handlers]
+                for message_type, handlers in self._handlers.items()}
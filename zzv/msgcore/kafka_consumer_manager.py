@@ -0,0 +1,473 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
+
+from zzv.common.constants import KAFKA_CONSUMER_MANAGER, MSG_MANAGER, QUEUE_MANAGER, SNAPSHOT_LIST
+from zzv.engine.reconfigurable_manager import ReconfigurableManager
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+from zzv.msgcore.codecs.snapshot_delta import SnapshotDeltaDecoder, is_delta_encoded
+from zzv.msgcore.dedup import build_deduplicator, message_key
+from zzv.msgcore.symbol_dictionary import SymbolDictionary, SymbolDictionaryVersionError
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+def _create_consumer(consumer_conf: Dict[str, Any]):
+    # Imported here so that the Kernel does not load librdkafka unless a consumer is configured
+    from confluent_kafka import Consumer
+    return Consumer(consumer_conf)
+
+
+def _fetch_symbol_entries(url: str, version: int, timeout: float = 5.0) -> List[Tuple[int, str]]:
+    """Fetch the entries past `version` from a SymbolDictionaryManager's `/entries` endpoint."""
+    from urllib.request import urlopen
+
+    with urlopen(f"{url.rstrip('/')}/entries?since={version}", timeout=timeout) as response:
+        return [(symbol_id, symbol) for symbol_id, symbol in json.load(response)['entries']]
+
+
+def _post_resync(url: str, sector: str, timeout: float = 5.0):
+    """Ask a producer's QueueManager to send the next SnapshotList of `sector` in full."""
+    from urllib.parse import quote
+    from urllib.request import Request, urlopen
+
+    with urlopen(Request(f"{url.rstrip('/')}/{quote(sector, safe='')}", data=b'', method='POST'),
+                 timeout=timeout) as response:
+        response.read()
+
+
+class _ConsumerStopping(Exception):
+    """Raised in the consumer thread when it is stopped while a message waits to be decoded."""
+
+
+class KafkaConsumerManager(ReconfigurableManager):
+    """
+    Consume Kafka topics and route the messages into the MsgManager without blocking the event loop.
+
+    A dedicated thread owns the consumer: it fetches batches with `consume(num_messages=batch_size)`, decodes them
+    (JSON, or keyframes and deltas from SnapshotDeltaEncoder) and hands each batch to the event loop, which calls
+    `MsgManager.handle_message` for every message. Offsets of handed-over batches are committed asynchronously
+    every `commit_interval` seconds, and synchronously on revocation and shutdown (at-least-once delivery into the
+    MsgManager).
+
+    When the pipeline behind the MsgManager (dispatcher plus sending queue) holds `max_pending` messages, or
+    `max_pending_batches` batches wait for the loop, the assigned partitions are paused; they are resumed once the
+    pipeline is down to `resume_pending`.
+
+    Batch size, timeouts, intervals and backpressure thresholds are re-read on configuration reloads.
+    """
+
+    config_section = 'kafka_consumer'
+
+    def __init__(self, kernel, consumer_config: Dict[str, Any],
+                 consumer_factory: Callable[[Dict[str, Any]], Any] = _create_consumer):
+        """
+        Initialize the KafkaConsumerManager.
+
+        Args:
+            kernel (Kernel): The kernel providing the MsgManager and QueueManager.
+            consumer_config (dict): The 'kafka_consumer' configuration section:
+                topics (list): Topics to subscribe to.
+                group_id (str): Consumer group. Defaults to 'zzv-engine'.
+                brokers (str, optional): Bootstrap servers. Defaults to the engine's kafka_brokers.
+                message_type (str): Message type passed to MsgManager.handle_message. Defaults to 'SnapshotList'.
+                batch_size (int): Maximum messages per consume() call. Defaults to 500.
+                poll_timeout (float): Seconds each consume() call waits for messages. Defaults to 0.1.
+                commit_interval (float): Seconds between asynchronous offset commits. Defaults to 1.
+                max_pending (int): Pipeline depth at which consumption pauses. Defaults to 10000.
+                resume_pending (int): Pipeline depth at which consumption resumes. Defaults to max_pending / 2.
+                max_pending_batches (int): Batches waiting for the event loop at which consumption pauses.
+                lag_interval (float): Seconds between lag measurements. Defaults to 5.
+                consumer_conf (dict): Extra librdkafka settings.
+                dedup (dict): Drop messages whose `key_field` (default 'key') was already consumed, see
+                    build_deduplicator. Redelivery after a rebalance or restart is deduplicated too.
+                symbol_dictionary_path (str, optional): SymbolDictionary file of the producer, needed to decode
+                    keyframes that carry symbol ids. Reloaded when a keyframe needs a newer version.
+                symbol_dictionary_url (str, optional): Base URL of the producer's SymbolDictionaryManager
+                    endpoints, e.g. 'http://producer:8000/SymbolDictionaryManager'. The entries a keyframe
+                    needs are fetched from its `/entries` endpoint, ahead of the next save of the file.
+                symbol_dictionary_retry (float): Seconds between catch-up attempts while a keyframe waits for
+                    its symbols. Defaults to 0.5.
+                resync_url (str, optional): The producer's resync endpoint, e.g.
+                    'http://producer:8000/QueueManager/resync'. After a gap in a sector's deltas, the consumer
+                    POSTs to `{resync_url}/{sector}` so that the next message of the sector is a keyframe, rather
+                    than waiting for the periodic one.
+                resync_interval (float): Minimum seconds between two keyframe requests for a sector; requests
+                    are repeated at this pace while the sector waits. Defaults to 5.
+            consumer_factory (callable): Creates the consumer from the librdkafka settings.
+        """
+        super().__init__(name="KafkaConsumerManager")
+        self.kernel = kernel
+        self.topics: List[str] = list(consumer_config.get('topics', []))
+        self.message_type = consumer_config.get('message_type', SNAPSHOT_LIST)
+        self.apply_config(consumer_config)
+        self.consumer_conf = {
+            'bootstrap.servers': consumer_config.get('brokers') or kernel.config.get(
+                'kafka_brokers', '31.220.102.46:29092,31.220.102.46:29094'),
+            'group.id': consumer_config.get('group_id', 'zzv-engine'),
+            'auto.offset.reset': 'earliest',
+            'enable.auto.commit': False,  # Offsets are committed once batches reach the MsgManager
+            'socket.timeout.ms': 10000,
+            **consumer_config.get('consumer_conf', {})
+        }
+        self._consumer_factory = consumer_factory
+        self.consumer = None
+        self.symbol_dictionary_path: Optional[str] = consumer_config.get('symbol_dictionary_path')
+        self.symbol_dictionary_url: Optional[str] = consumer_config.get('symbol_dictionary_url')
+        self.symbol_dictionary_retry = consumer_config.get('symbol_dictionary_retry', 0.5)
+        symbol_dictionary = None
+        if self.symbol_dictionary_path:
+            symbol_dictionary = SymbolDictionary.load(self.symbol_dictionary_path)
+        elif self.symbol_dictionary_url:
+            symbol_dictionary = SymbolDictionary()
+        self.decoder = SnapshotDeltaDecoder(on_resync=self._on_resync, symbol_dictionary=symbol_dictionary)
+        dedup_config = consumer_config.get('dedup', {})
+        self.dedup_key_field = dedup_config.get('key_field', 'key')
+        self.deduplicator = build_deduplicator(dedup_config)
+        self.resync_url: Optional[str] = consumer_config.get('resync_url')
+        self.resync_interval = consumer_config.get('resync_interval', 5.0)
+        self._resync_requested: Dict[str, float] = {}  # Sector -> monotonic time of its last keyframe request
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._pending_batches = 0  # Batches handed to the loop and not routed yet
+        self._offsets_to_commit: Dict[Tuple[str, int], int] = {}  # Next offset per routed partition
+        self.paused = False
+        self.lag: Dict[str, int] = {}  # 'topic[partition]' -> messages behind the high watermark
+        self.last_error: Optional[str] = None
+        self.stats.declare(
+            "messages_consumed",  # Messages fetched from Kafka
+            "messages_routed",  # Messages handed to the MsgManager
+            "batches",  # Non-empty consume() results
+            "decode_errors",  # Values that could not be decoded
+            "symbol_dictionary_reloads",  # Catch-ups that brought new symbols for a keyframe
+            "symbol_dictionary_waits",  # Retries of a keyframe whose symbols were not available yet
+            "resync_requests",  # Keyframe requests sent to the producer after a gap
+            "resync_errors",  # Keyframe requests that failed
+            "duplicates_dropped",  # Messages dropped by deduplication
+            "consumer_errors",  # Errors reported by the consumer
+            "commits",  # Offset commits issued
+            "pauses"  # Times consumption was paused for backpressure
+        )
+
+    def validate_config(self, section_config: Mapping[str, Any]):
+        """Reject settings the consumer thread cannot work with."""
+        if section_config.get('batch_size', 500) <= 0:
+            raise ValueError("kafka_consumer.batch_size must be positive")
+        max_pending = section_config.get('max_pending', 10000)
+        if section_config.get('resume_pending', max_pending // 2) > max_pending:
+            raise ValueError("kafka_consumer.resume_pending must not exceed max_pending")
+
+    def apply_config(self, section_config: Mapping[str, Any]):
+        """
+        Apply batch size, timeouts, intervals and backpressure thresholds. The consumer thread reads them on its
+        next iteration; topics, group and librdkafka settings need a restart.
+        """
+        self.batch_size = section_config.get('batch_size', 500)
+        self.poll_timeout = section_config.get('poll_timeout', 0.1)
+        self.commit_interval = section_config.get('commit_interval', 1.0)
+        self.max_pending = section_config.get('max_pending', 10000)
+        self.resume_pending = section_config.get('resume_pending', self.max_pending // 2)
+        self.max_pending_batches = section_config.get('max_pending_batches', 10)
+        self.lag_interval = section_config.get('lag_interval', 5.0)
+
+    async def start(self):
+        """Start the consumer thread; returns immediately."""
+        if self._thread is not None and self._thread.is_alive():
+            logger.warning(f"{KAFKA_CONSUMER_MANAGER} is already running.")
+            return
+        logger.info(f"Starting {KAFKA_CONSUMER_MANAGER} for topics {self.topics}...")
+        self._loop = asyncio.get_running_loop()
+        self._msg_manager = self.kernel.get_service(MSG_MANAGER, caller=self)
+        self._queue_manager = self.kernel.get_service(QUEUE_MANAGER, caller=self)
+        self._stop.clear()
+        self._running = True
+        self._thread = threading.Thread(target=self._consume_loop, name="kafka-consumer", daemon=True)
+        self._thread.start()
+
+    async def close(self):
+        """Stop the consumer thread, commit the routed offsets and close the consumer."""
+        logger.info(f"Stopping {KAFKA_CONSUMER_MANAGER}...")
+        self._running = False
+        self._stop.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, 10)
+            self._thread = None
+
+    def _consume_loop(self):
+        """Body of the consumer thread: the only thread that touches the consumer."""
+        try:
+            self.consumer = self._consumer_factory(self.consumer_conf)
+            self.consumer.subscribe(self.topics, on_revoke=self._on_revoke)
+        except Exception as e:
+            self.last_error = f"Failed to start consumer: {e}"
+            logger.error(self.last_error)
+            self._running = False
+            return
+
+        last_commit = last_lag = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                self._apply_backpressure()
+                if self.paused:
+                    self._stop.wait(self.poll_timeout)
+                else:
+                    self._fetch_batch()
+
+                now = time.monotonic()
+                if now - last_commit >= self.commit_interval:
+                    self._commit(asynchronous=True)
+                    last_commit = now
+                if now - last_lag >= self.lag_interval:
+                    self._measure_lag()
+                    last_lag = now
+        except Exception as e:
+            self.last_error = f"Consumer thread failed: {e}"
+            logger.error(self.last_error)
+            self._running = False
+        finally:
+            self._wait_for_pending_batches()
+            self._commit(asynchronous=False)
+            self.consumer.close()
+            logger.info("Kafka consumer closed.")
+
+    def _fetch_batch(self):
+        messages = self.consumer.consume(num_messages=self.batch_size, timeout=self.poll_timeout)
+        if not messages:
+            return
+
+        batch = []
+        for message in messages:
+            error = message.error()
+            if error is not None:
+                if error.code() != getattr(error, '_PARTITION_EOF', -191):  # librdkafka's end-of-partition event
+                    self.stats.incr("consumer_errors")
+                    self.last_error = str(error)
+                    logger.error(f"Error consuming message: {error}")
+                continue
+            try:
+                data = self._decode(message.value())
+            except _ConsumerStopping:
+                # Neither routed nor committed: the message is consumed again after a restart
+                logger.warning(f"Consumer stopped while message {message.offset()} waited for its symbols.")
+                break
+            if data is not None and self.deduplicator is not None and self.deduplicator.is_duplicate(
+                    message_key(data, self.dedup_key_field)):
+                self.stats.incr("duplicates_dropped")
+            elif data is not None:
+                batch.append(data)
+            # Offsets advance past undecodable and duplicate messages too
+            with self._lock:
+                self._offsets_to_commit[(message.topic(), message.partition())] = message.offset() + 1
+        self.stats.incr("messages_consumed", len(messages))
+        self.stats.incr("batches")
+        for sector in list(self.decoder.pending_resyncs):  # Ask again for keyframes still awaited
+            self._on_resync(sector)
+
+        with self._lock:
+            self._pending_batches += 1
+        try:
+            self._loop.call_soon_threadsafe(self._route_batch, batch)
+        except RuntimeError:
+            # The loop is closed; the batch will be consumed again after a restart
+            with self._lock:
+                self._pending_batches -= 1
+
+    def _decode(self, value) -> Optional[Any]:
+        """Decode a message value; runs in the consumer thread so that parsing never blocks the loop."""
+        try:
+            if value is None:
+                return None
+            if is_delta_encoded(value):
+                return self._decode_delta(value)
+            return json.loads(value)
+        except _ConsumerStopping:
+            raise
+        except Exception as e:
+            self.stats.incr("decode_errors")
+            logger.error(f"Failed to decode message: {e}")
+            return None
+
+    def _decode_delta(self, value) -> Optional[Any]:
+        """
+        Decode a keyframe or delta. A keyframe needing symbols the consumer does not know yet waits for them,
+        catching up with the producer's dictionary every `symbol_dictionary_retry` seconds, rather than being
+        dropped and committed.
+        """
+        while True:
+            try:
+                return self.decoder.decode(value)  # None while the sector waits for a keyframe
+            except SymbolDictionaryVersionError as e:
+                if not (self.symbol_dictionary_path or self.symbol_dictionary_url):
+                    raise
+                if self._catch_up_symbols(e.required):
+                    continue
+                self.stats.incr("symbol_dictionary_waits")
+                logger.warning(f"{e} Retrying in {self.symbol_dictionary_retry} seconds.")
+                if self._stop.wait(self.symbol_dictionary_retry):
+                    raise _ConsumerStopping() from e
+
+    def _catch_up_symbols(self, version: int) -> bool:
+        """Apply the producer's newer symbols from its file, then its endpoint; return True once at `version`."""
+        dictionary = self.decoder.symbol_dictionary
+        added = 0
+        try:
+            if self.symbol_dictionary_path:
+                added += dictionary.reload(self.symbol_dictionary_path)
+            if self.symbol_dictionary_url and dictionary.version < version:
+                added += dictionary.apply(_fetch_symbol_entries(self.symbol_dictionary_url, dictionary.version))
+        except Exception as e:  # OSError for an unreadable file or endpoint, SymbolDictionaryError on a conflict
+            self.last_error = f"Failed to catch up with the symbol dictionary: {e}"
+            logger.error(self.last_error)
+        if added:
+            self.stats.incr("symbol_dictionary_reloads")
+        return dictionary.version >= version
+
+    def _route_batch(self, batch: List[Any]):
+        """Hand a batch to the MsgManager; runs on the event loop."""
+        try:
+            for data in batch:
+                self._msg_manager.handle_message(self.message_type, data)
+            self.stats.incr("messages_routed", len(batch))
+        finally:
+            with self._lock:
+                self._pending_batches -= 1
+
+    def get_pipeline_depth(self) -> int:
+        """Return the number of messages between the MsgManager and the transporter."""
+        return self._msg_manager.get_pending_count() + self._queue_manager.get_queue_size()
+
+    def _apply_backpressure(self):
+        """Pause the assigned partitions while the pipeline is full, resume them once it has drained."""
+        depth = self.get_pipeline_depth()
+        with self._lock:
+            pending_batches = self._pending_batches
+        if not self.paused and (depth >= self.max_pending or pending_batches >= self.max_pending_batches):
+            self.consumer.pause(self.consumer.assignment())
+            self.paused = True
+            self.stats.incr("pauses")
+            logger.info(f"Consumption paused: pipeline depth {depth}, {pending_batches} batches pending.")
+        elif self.paused and depth <= self.resume_pending and pending_batches == 0:
+            self.consumer.resume(self.consumer.assignment())
+            self.paused = False
+            logger.info(f"Consumption resumed: pipeline depth {depth}.")
+
+    def _wait_for_pending_batches(self, timeout: float = 5.0):
+        """Give the loop a chance to route the batches already handed over before the final commit."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._pending_batches == 0:
+                    return
+            time.sleep(0.01)
+
+    def _commit(self, asynchronous: bool):
+        """Commit the offsets of routed batches."""
+        from confluent_kafka import TopicPartition
+
+        with self._lock:
+            if self._pending_batches:
+                return  # Some fetched messages have not reached the MsgManager yet
+            offsets, self._offsets_to_commit = self._offsets_to_commit, {}
+        if not offsets:
+            return
+        try:
+            self.consumer.commit(offsets=[TopicPartition(topic, partition, offset)
+                                          for (topic, partition), offset in offsets.items()],
+                                 asynchronous=asynchronous)
+            self.stats.incr("commits")
+        except Exception as e:
+            self.last_error = f"Commit failed: {e}"
+            logger.error(self.last_error)
+
+    def _on_revoke(self, consumer, partitions):
+        """Commit what has been routed before the partitions move to another consumer."""
+        self._wait_for_pending_batches()
+        self._commit(asynchronous=False)
+
+    def _measure_lag(self):
+        """Compute the lag of every assigned partition from the cached high watermarks."""
+        try:
+            assignment = self.consumer.assignment()
+            if not assignment:
+                return
+            lag = {}
+            for position in self.consumer.position(assignment):
+                _, high = self.consumer.get_watermark_offsets(position, cached=True)
+                if position.offset >= 0 and high >= 0:
+                    lag[f"{position.topic}[{position.partition}]"] = max(0, high - position.offset)
+            self.lag = lag
+        except Exception as e:
+            logger.warning(f"Failed to measure consumer lag: {e}")
+
+    def _on_resync(self, sector: str):
+        """Request a keyframe of `sector` from the producer, at most once per `resync_interval`."""
+        if not self.resync_url:
+            return
+        now = time.monotonic()
+        if now - self._resync_requested.get(sector, -self.resync_interval) < self.resync_interval:
+            return
+        self._resync_requested[sector] = now
+        try:
+            _post_resync(self.resync_url, sector)
+            self.stats.incr("resync_requests")
+            logger.info(f"Requested a keyframe of sector '{sector}' from the producer.")
+        except Exception as e:  # OSError for an unreachable or failing endpoint
+            self.stats.incr("resync_errors")
+            self.last_error = f"Failed to request a keyframe of sector '{sector}': {e}"
+            logger.error(self.last_error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the consumer counters, pause state and lag."""
+        return {
+            **self.stats.snapshot(),
+            "paused": self.paused,
+            "pending_batches": self._pending_batches,
+            "total_lag": sum(self.lag.values()),
+            "lag": dict(self.lag),
+            "decoder": dict(self.decoder.stats),
+            "dedup": self.deduplicator.get_stats() if self.deduplicator is not None else None
+        }
+
+    def get_health(self):
+        """
+        Return the health status of the KafkaConsumerManager as a HealthReport object.
+        """
+        alive = self._running and self._thread is not None and self._thread.is_alive()
+        if not alive:
+            status = Status.ERROR
+        elif self.paused:
+            status = Status.WARNING
+        else:
+            status = Status.OK
+        details = [f"KafkaConsumerManager is {'consuming' if alive else 'not running'}"
+                   f"{' (paused for backpressure)' if self.paused else ''}",
+                   f"Messages consumed: {self.stats['messages_consumed']}",
+                   f"Total lag: {sum(self.lag.values())}"]
+        if self.last_error:
+            details.append(f"Last error: {self.last_error}")
+        return HealthReport(manager_name=self.name, status=status, details=details)
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the KafkaConsumerManager.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+
+        @app.get(f"/{self.name}/stats")
+        async def consumer_stats() -> Dict[str, Any]:
+            """Get consumer counters, backpressure state and lag."""
+            return self.get_stats()
+
+        print(f"Registered endpoints for {self.name}.")
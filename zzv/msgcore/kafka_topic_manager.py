@@ -1,19 +1,141 @@
+import logging
+import math
+from concurrent.futures import wait
 from typing import Dict, Any, Optional, List
-from .transporters.kafka_transporter import KafkaTransporter
+
+from confluent_kafka import KafkaException
+from confluent_kafka.admin import AdminClient, AlterConfigOpType, ConfigEntry, ConfigResource, ConfigSource, \
+    NewPartitions, NewTopic, ResourceType
+
+logger = logging.getLogger(__name__)
+
+SECTOR_PLACEHOLDER = '{sector}'
+
+
+class TopicSpec:
+    """Desired state of one topic."""
+
+    def __init__(self, name: str, num_partitions: int, replication_factor: int = 1,
+                 config: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.num_partitions = num_partitions
+        self.replication_factor = replication_factor
+        self.config = {key: str(value) for key, value in (config or {}).items()}  # Kafka expects strings
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "num_partitions": self.num_partitions,
+                "replication_factor": self.replication_factor, "config": dict(self.config)}
+
+
+class TopicPlan:
+    """Changes needed to bring the cluster to a list of TopicSpecs."""
+
+    def __init__(self):
+        self.creates: List[TopicSpec] = []
+        self.partition_increases: Dict[str, int] = {}  # Topic name -> new total partition count
+        self.config_changes: Dict[str, Dict[str, str]] = {}  # Topic name -> config entries to set
+        self.warnings: List[str] = []  # Differences that cannot be applied, such as fewer partitions
+
+    def is_empty(self) -> bool:
+        return not (self.creates or self.partition_increases or self.config_changes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "creates": [spec.to_dict() for spec in self.creates],
+            "partition_increases": dict(self.partition_increases),
+            "config_changes": {topic: dict(changes) for topic, changes in self.config_changes.items()},
+            "warnings": list(self.warnings)
+        }
+
+
+def topic_specs_from_config(topics_config: Dict[str, Any]) -> List[TopicSpec]:
+    """
+    Build TopicSpecs from the 'kafka_topics' configuration section.
+
+    The section has optional `defaults` (partitions, replication_factor, config) and a `topics` list. Each topic
+    entry overrides the defaults, and an entry whose name contains '{sector}' is expanded once per name in its
+    `sectors` list, with per-sector partition overrides in `sector_partitions`.
+
+    Args:
+        topics_config (dict): The 'kafka_topics' configuration section.
+
+    Returns:
+        list: The desired topics.
+    """
+    defaults = topics_config.get('defaults', {})
+    specs = []
+    for entry in topics_config.get('topics', []):
+        partitions = entry.get('partitions', defaults.get('partitions', 1))
+        replication_factor = entry.get('replication_factor', defaults.get('replication_factor', 1))
+        config = {**defaults.get('config', {}), **entry.get('config', {})}
+        name = entry['name']
+        if SECTOR_PLACEHOLDER in name:
+            sector_partitions = entry.get('sector_partitions', {})
+            for sector in entry.get('sectors', []):
+                specs.append(TopicSpec(name.replace(SECTOR_PLACEHOLDER, sector),
+                                       sector_partitions.get(sector, partitions), replication_factor, config))
+        else:
+            specs.append(TopicSpec(name, partitions, replication_factor, config))
+    return specs
+
+
+def recommend_partitions(partition_rates: List[float], target_rate_per_partition: float, headroom: float = 1.5,
+                         current_partitions: Optional[int] = None, max_partitions: int = 256) -> Dict[str, Any]:
+    """
+    Recommend a partition count from observed per-partition throughput.
+
+    The recommendation covers the total observed rate times `headroom` at `target_rate_per_partition` each.
+    It never goes below the current count, because Kafka cannot remove partitions. Skew (busiest partition over
+    the mean) is reported as well: a hot key is not fixed by more partitions but by a partitioner that spreads
+    it (see HotKeySplittingPartitioner).
+
+    Args:
+        partition_rates (list): Observed messages (or bytes) per second of each partition.
+        target_rate_per_partition (float): Rate one partition's consumers can sustain, in the same unit.
+        headroom (float): Multiplier applied to the observed total rate.
+        current_partitions (int, optional): Current partition count. Defaults to len(partition_rates).
+        max_partitions (int): Upper bound of the recommendation.
+
+    Returns:
+        dict: total_rate, max_partition_rate, skew, current, recommended and a short reason.
+    """
+    if target_rate_per_partition <= 0:
+        raise ValueError(f"target_rate_per_partition must be positive, got {target_rate_per_partition}.")
+    current = current_partitions if current_partitions is not None else len(partition_rates)
+    total_rate = float(sum(partition_rates))
+    max_rate = float(max(partition_rates)) if partition_rates else 0.0
+    mean_rate = total_rate / len(partition_rates) if partition_rates else 0.0
+    skew = max_rate / mean_rate if mean_rate else 0.0
+
+    needed = math.ceil(total_rate * headroom / target_rate_per_partition) if total_rate else 1
+    recommended = min(max(needed, current, 1), max(max_partitions, current))
+
+    if recommended > current:
+        reason = f"{total_rate:.1f}/s x {headroom} headroom needs {needed} partitions at " \
+                 f"{target_rate_per_partition:.1f}/s each"
+    elif max_rate > target_rate_per_partition:
+        reason = f"busiest partition runs at {max_rate:.1f}/s (skew {skew:.2f}); spread its hot keys"
+    else:
+        reason = "current partition count is sufficient"
+    return {"total_rate": total_rate, "max_partition_rate": max_rate, "skew": skew, "current": current,
+            "recommended": recommended, "reason": reason}
 
 
 class KafkaTopicManager:
-    def __init__(self, bootstrap_servers):
+    def __init__(self, bootstrap_servers, admin_client: Optional[AdminClient] = None, timeout: float = 30.0):
         """
         Initialize Kafka Admin client with the provided bootstrap servers.
 
         Args:
             bootstrap_servers (str): Comma-separated list of Kafka bootstrap servers.
+            admin_client (AdminClient, optional): Admin client to use instead of creating one.
+            timeout (float): Timeout in seconds for admin requests.
         """
-        self.admin_client = AdminClient({'bootstrap.servers': bootstrap_servers})
+        self.admin_client = admin_client or AdminClient({'bootstrap.servers': bootstrap_servers})
         self.default_num_partitions = 11
+        self.timeout = timeout
 
-    def create_topic(self, topic_name, num_partitions=None, replication_factor=1, retention_ms=None):
+    def create_topic(self, topic_name, num_partitions=None, replication_factor=1, retention_ms=None, config=None):
         """
         Create a Kafka topic.
 
@@ -22,16 +144,18 @@ class KafkaTopicManager:
             num_partitions (int): Number of partitions for the topic. Defaults to self.default_num_partitions.
             replication_factor (int): Replication factor for the topic.
             retention_ms (int): Message retention time in milliseconds. If None, the broker default is used.
+            config (dict, optional): Additional topic configuration, such as {'cleanup.policy': 'compact'}.
         """
         if num_partitions is None:
             num_partitions = self.default_num_partitions
 
-        config = {}
+        config = dict(config or {})
         if retention_ms is not None:
-            config['retention.ms'] = str(retention_ms)
+            config['retention.ms'] = retention_ms
 
-        new_topic = NewTopic(topic_name, num_partitions, replication_factor, config=config)
-        fs = self.admin_client.create_topics([new_topic])
+        spec = TopicSpec(topic_name, num_partitions, replication_factor, config)
+        fs = self.admin_client.create_topics([NewTopic(spec.name, spec.num_partitions, spec.replication_factor,
+                                                       config=spec.config)])
 
         for topic, f in fs.items():
             try:
@@ -40,6 +164,130 @@ class KafkaTopicManager:
             except Exception as e:
                 print(f"Failed to create topic '{topic}': {e}")
 
+    def plan(self, specs: List[TopicSpec]) -> TopicPlan:
+        """
+        Compare the desired topics with the cluster and return the changes needed.
+
+        Partition counts of all topics come from a single metadata request, and the configs of the existing
+        topics from a single batched describe_configs request.
+
+        Args:
+            specs (list): The desired topics.
+
+        Returns:
+            TopicPlan: Topics to create, partition counts to increase and config entries to set.
+        """
+        plan = TopicPlan()
+        metadata = self.admin_client.list_topics(timeout=self.timeout).topics
+
+        existing = []
+        for spec in specs:
+            topic = metadata.get(spec.name)
+            if topic is None or topic.error is not None:
+                plan.creates.append(spec)
+                continue
+            existing.append(spec)
+            current_partitions = len(topic.partitions)
+            if spec.num_partitions > current_partitions:
+                plan.partition_increases[spec.name] = spec.num_partitions
+            elif spec.num_partitions < current_partitions:
+                plan.warnings.append(f"Topic '{spec.name}' has {current_partitions} partitions, more than the "
+                                     f"{spec.num_partitions} requested; Kafka cannot remove partitions.")
+            replication = len(next(iter(topic.partitions.values())).replicas) if topic.partitions else 0
+            if replication and replication != spec.replication_factor:
+                plan.warnings.append(f"Topic '{spec.name}' has replication factor {replication}, not "
+                                     f"{spec.replication_factor}; reassign partitions to change it.")
+
+        configured = [spec for spec in existing if spec.config]
+        if configured:
+            current_configs = self._describe_configs([spec.name for spec in configured])
+            for spec in configured:
+                current = current_configs.get(spec.name, {})
+                changes = {key: value for key, value in spec.config.items() if current.get(key) != value}
+                if changes:
+                    plan.config_changes[spec.name] = changes
+        return plan
+
+    def apply(self, plan: TopicPlan) -> Dict[str, Any]:
+        """
+        Apply a TopicPlan: creates, partition increases and config changes are each sent as one batched request,
+        all three are in flight at the same time, and the results are collected once they complete.
+
+        Returns:
+            dict: Topic names per applied action, plus an 'errors' mapping of '<action>:<topic>' to messages.
+        """
+        pending = {}  # Future -> (action, topic)
+        if plan.creates:
+            new_topics = [NewTopic(spec.name, spec.num_partitions, spec.replication_factor, config=spec.config)
+                          for spec in plan.creates]
+            for topic, f in self.admin_client.create_topics(new_topics, operation_timeout=self.timeout).items():
+                pending[f] = ("created", topic)
+        if plan.partition_increases:
+            new_partitions = [NewPartitions(topic, count) for topic, count in plan.partition_increases.items()]
+            for topic, f in self.admin_client.create_partitions(new_partitions,
+                                                                operation_timeout=self.timeout).items():
+                pending[f] = ("partitions_increased", topic)
+        if plan.config_changes:
+            resources = [ConfigResource(ResourceType.TOPIC, topic, incremental_configs=[
+                ConfigEntry(key, value, incremental_operation=AlterConfigOpType.SET)
+                for key, value in changes.items()]) for topic, changes in plan.config_changes.items()]
+            for resource, f in self.admin_client.incremental_alter_configs(resources).items():
+                pending[f] = ("configs_altered", resource.name)
+
+        wait(list(pending), timeout=self.timeout)
+
+        results = {"created": [], "partitions_increased": [], "configs_altered": [], "errors": {}}
+        for f, (action, topic) in pending.items():
+            try:
+                f.result(timeout=0)
+                results[action].append(topic)
+                logger.info(f"Topic '{topic}': {action.replace('_', ' ')}.")
+            except Exception as e:
+                results["errors"][f"{action}:{topic}"] = str(e)
+                logger.error(f"Topic '{topic}': {action.replace('_', ' ')} failed: {e}")
+        return results
+
+    def provision(self, specs: List[TopicSpec], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Bring the cluster to the desired topics. See plan and apply.
+
+        Args:
+            specs (list): The desired topics, for example from topic_specs_from_config.
+            dry_run (bool): Only compute the plan.
+
+        Returns:
+            dict: The plan, and the results unless `dry_run` is set or there is nothing to do.
+        """
+        plan = self.plan(specs)
+        for warning in plan.warnings:
+            logger.warning(warning)
+        report = {"plan": plan.to_dict()}
+        if not dry_run and not plan.is_empty():
+            report["results"] = self.apply(plan)
+        return report
+
+    def recommend_partitions(self, topic_name: str, partition_rates: List[float],
+                             target_rate_per_partition: float, headroom: float = 1.5) -> Dict[str, Any]:
+        """
+        Recommend a partition count for an existing topic from observed per-partition rates, such as the
+        transporter's partition counts over an interval. See recommend_partitions.
+        """
+        topic = self.admin_client.list_topics(topic=topic_name, timeout=self.timeout).topics.get(topic_name)
+        current = len(topic.partitions) if topic is not None and topic.error is None else None
+        return recommend_partitions(partition_rates, target_rate_per_partition, headroom=headroom,
+                                    current_partitions=current)
+
+    def _describe_configs(self, topic_names: List[str]) -> Dict[str, Dict[str, str]]:
+        """Return the current config values of several topics with one describe_configs request."""
+        fs = self.admin_client.describe_configs([ConfigResource(ResourceType.TOPIC, name) for name in topic_names])
+        configs = {}
+        for resource, f in fs.items():
+            try:
+                configs[resource.name] = {entry.name: entry.value for entry in f.result(timeout=self.timeout).values()}
+            except KafkaException as e:
+                logger.error(f"Failed to get config for topic '{resource.name}': {e}")
+        return configs
+
     def delete_topics(self, topic_names):
         """
         Delete multiple Kafka topics.
@@ -89,25 +337,19 @@ class KafkaTopicManager:
 
 
 if __name__ == "__main__":
-    # Use localhost if connecting from the host machine
-    kafka_servers = '31.220.102.46:29092,31.220.102.46:29094'
-    manager = KafkaTopicManager(kafka_servers)
-
-    # Create a topic for strategy data with 30-day retention
-    manager.create_topic('strategy_data',
-                         num_partitions=11,
-                         replication_factor=1,
-                         retention_ms=2592000000,  # 30 days
-                         config={
-                             "cleanup.policy": "delete",
-                             "segment.ms": 86400000,  # 1 day segment size
-                             "min.compaction.lag.ms": 3600000  # 1 hour minimum message age before compaction
-                         })
+    import json
+    from zzv.common.utility import load_config
+
+    engine_config = load_config('config/basic_usage_config.yaml')
+    manager = KafkaTopicManager(engine_config.get('kafka_brokers', '31.220.102.46:29092,31.220.102.46:29094'))
+
+    # Show, then apply, the changes needed for the topics declared in the engine config
+    desired_topics = topic_specs_from_config(engine_config.get('kafka_topics', {}))
+    print("Plan:", json.dumps(manager.provision(desired_topics, dry_run=True), indent=2))
+    print("Provisioning:", json.dumps(manager.provision(desired_topics), indent=2))
+
     # List topics
     print("Topics:", manager.list_topics())
 
     # Get topic config
     print("Snapshots config:", manager.get_topic_config('snapshots'))
-
-    # Delete multiple topics
-    # manager.delete_topics(['snapshots', 'another_topic'])
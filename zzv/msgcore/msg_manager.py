@@ -1,73 +1,170 @@
 import logging
-from typing import Any, Dict, List
+from collections import deque
+from functools import partial
+from typing import Any, Callable, Deque, Dict, List, Optional, Union, TYPE_CHECKING
 
-from fastapi import FastAPI
 from zzv.common.constants import QUEUE_MANAGER, SNAPSHOT_LIST, MSG_MANAGER
 from zzv.engine.manager import Manager
 from zzv.health.health_report import HealthReport
 from zzv.health.status import Status
-from zzv.models.snapshot import SnapshotList
+from zzv.models.message_types import MessageType
+from zzv.msgcore.dedup import build_deduplicator, message_key
+from zzv.msgcore.handler_registry import HandlerKind, HandlerRegistry, MessageHandler
+from zzv.msgcore.sharded_dispatcher import ShardedDispatcher
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from zzv.models.snapshot import SnapshotList
 
 logger = logging.getLogger(__name__)
 
 
 class MsgManager(Manager):
-    def __init__(self, kernel):
-        """Initialize the MsgManager with a reference to the Kernel."""
+    def __init__(self, kernel, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the MsgManager with a reference to the Kernel.
+
+        Args:
+            kernel (Kernel): The kernel providing access to the other managers.
+            config (dict, optional): The 'msg_manager' configuration section. Its 'dispatch' entry sets
+                num_shards, key_field (message field used as the sharding key) and cpu_pool (the Kernel executor
+                pool running CPU-bound handlers). Its 'dedup' entry enables dropping messages whose `key_field`
+                (default 'key') was already handled, see build_deduplicator. `recent_messages` is the number of
+                handled messages kept for the recent-messages endpoint (default 100).
+        """
         super().__init__(name="MsgManager")  # Initialize the base Manager class with the name attribute
         self.kernel = kernel
         self._services: Dict[str, Any] = {}
         self._running = False
 
-        # Add attributes to track message statistics
-        self.stats = {
-            "messages_handled": 0,  # Number of messages handled
-            "messages_routed": 0,  # Number of messages routed to other managers
-            "error_count": 0  # Number of errors encountered during message handling
-        }
+        # Counters incremented from every thread calling handle_message
+        self.stats.declare(
+            "messages_handled",  # Number of messages handled
+            "messages_routed",  # Number of messages routed to other managers
+            "error_count",  # Number of errors encountered during message handling
+            "duplicates_dropped"  # Number of messages dropped as duplicates
+        )
+
+        # Time of the last handled message according to the Kernel's shared clock
+        self.last_message_time = None
 
-        # Maintain a list of recently processed messages (for debugging or auditing)
-        self.recent_messages: List[Any] = []
+        # Keep the most recently processed messages (for debugging or auditing); bounded, so that it cannot grow
+        # with the traffic
+        self.recent_messages: Deque[Any] = deque(maxlen=(config or {}).get('recent_messages', 100))
+
+        # Handlers per MessageType, run by a dispatcher sharded on the message key
+        dispatch_config = (config or {}).get('dispatch', {})
+        self.key_field = dispatch_config.get('key_field', 'name')
+        self.registry = HandlerRegistry()
+        offload = None
+        if hasattr(kernel, 'offload'):
+            offload = partial(kernel.offload, dispatch_config.get('cpu_pool', 'cpu'))
+        self.dispatcher = ShardedDispatcher(num_shards=dispatch_config.get('num_shards', 4), offload=offload)
+
+        # Optional deduplication on the message key, e.g. against producer retries
+        dedup_config = (config or {}).get('dedup', {})
+        self.dedup_key_field = dedup_config.get('key_field', 'key')
+        self.deduplicator = build_deduplicator(dedup_config)
 
         # Define message handlers for specific message types
-        self.message_handlers = {
-            'SnapshotList': self.handle_snapshot_list_message,
-            # Add other message types and their handlers here
-        }
+        self.register_handler(MessageType.SNAPSHOTS, self.handle_snapshot_list_message, HandlerKind.SYNC)
+        # Add other message types and their handlers here
 
     async def start(self):
         """Start the MsgManager service asynchronously."""
         logger.info(f"Starting {MSG_MANAGER}...")
+        await self.dispatcher.start()
         self._running = True
 
     async def close(self):
         """Stop the MsgManager service asynchronously."""
         logger.info(f"Stopping {MSG_MANAGER}...")
         self._running = False
+        await self.dispatcher.stop()
 
-    def handle_message(self, message_type: str, message_data: Any):
-        """Handle incoming messages based on their type."""
-        handler = self.message_handlers.get(message_type)
-        if handler:
-            handler(message_data)
-            self.stats["messages_handled"] += 1  # Update message handled count
-            self.recent_messages.append(message_data)  # Store message for auditing
-            logger.info(f"Handled message of type: {message_type}")
-        else:
-            self.stats["error_count"] += 1  # Update error count if no handler found
+    def register_handler(self, message_type: Union[MessageType, str], callback: Callable[[Any], Any],
+                         kind: Optional[HandlerKind] = None, name: Optional[str] = None) -> MessageHandler:
+        """
+        Register a handler for a message type. See HandlerRegistry.register.
+
+        SYNC handlers must be quick, ASYNC handlers may await I/O, and CPU_BOUND handlers must be picklable
+        module-level functions because they run in a process pool.
+        """
+        handler = self.registry.register(message_type, callback, kind=kind, name=name)
+        logger.info(f"Registered {handler.kind.value} handler '{handler.name}' for {handler.message_type.value}.")
+        return handler
+
+    def unregister_handler(self, message_type: Union[MessageType, str], name: str) -> bool:
+        """Remove a handler by name."""
+        return self.registry.unregister(message_type, name)
+
+    def handle_message(self, message_type: Union[MessageType, str], message_data: Any, key: Optional[str] = None):
+        """
+        Handle incoming messages based on their type. Safe to call from any thread.
+
+        Once the MsgManager has started, handlers run on the dispatcher shard owning the message key, so
+        messages with the same key are handled in order. Before that, SYNC handlers run inline. When
+        deduplication is enabled, messages whose dedup key was already handled are dropped.
+
+        Args:
+            message_type (MessageType or str): The message type, its value, or the legacy 'SnapshotList' name.
+            message_data: The message.
+            key (str, optional): Sharding key. Defaults to the message's `key_field` value, or the type.
+        """
+        handlers = self.registry.get_handlers(message_type)
+        if not handlers:
+            self.stats.incr("error_count")  # Update error count if no handler found
             logger.warning(f"No handler found for message type: {message_type}")
+            return
+
+        if self.deduplicator is not None and self.deduplicator.is_duplicate(
+                message_key(message_data, self.dedup_key_field)):
+            self.stats.incr("duplicates_dropped")
+            logger.debug(f"Dropped duplicate message of type: {message_type}")
+            return
+
+        if self.dispatcher.is_running:
+            self.dispatcher.dispatch(key or self._get_message_key(message_type, message_data), handlers,
+                                     message_data)
+        else:
+            for handler in handlers:
+                if handler.kind != HandlerKind.SYNC:
+                    self.stats.incr("error_count")
+                    logger.warning(f"Skipping {handler.kind.value} handler '{handler.name}': "
+                                   f"{MSG_MANAGER} is not started.")
+                    continue
+                handler.callback(message_data)
+
+        self.stats.incr("messages_handled")  # Update message handled count
+        self.last_message_time = self.kernel.clock.now()
+        self.recent_messages.append(message_data)  # Store message for auditing
+        logger.debug(f"Handled message of type: {message_type}")
+
+    def _get_message_key(self, message_type: Union[MessageType, str], message_data: Any) -> str:
+        """Extract the sharding key from a message."""
+        if isinstance(message_data, dict):
+            key = message_data.get(self.key_field)
+        else:
+            key = getattr(message_data, self.key_field, None)
+        if key is None:
+            return MessageType.resolve(message_type).value
+        return str(key)
+
+    def get_pending_count(self) -> int:
+        """Return the number of messages waiting for their handlers."""
+        return self.dispatcher.get_pending_count()
 
-    def handle_snapshot_list_message(self, message_data: SnapshotList):
+    def handle_snapshot_list_message(self, message_data: 'SnapshotList'):
         """Handle SnapshotList messages and route them to the QueueManager."""
         try:
             # Access QueueManager through the Kernel with access validation
             queue_manager = self.kernel.get_service(QUEUE_MANAGER, caller=self)
             if queue_manager:
                 queue_manager.handle_message(SNAPSHOT_LIST, message_data)
-                self.stats["messages_routed"] += 1  # Update message routed count
-                logger.info(f"{SNAPSHOT_LIST} message routed to {QUEUE_MANAGER}.")
+                self.stats.incr("messages_routed")  # Update message routed count
+                logger.debug(f"{SNAPSHOT_LIST} message routed to {QUEUE_MANAGER}.")
             else:
-                self.stats["error_count"] += 1  # Update error count if QueueManager is not accessible
+                self.stats.incr("error_count")  # Update error count if QueueManager is not accessible
                 logger.error(f"{QUEUE_MANAGER} is not accessible.")
         except Exception as e:
             logger.error(f"Error handle_snapshot_list_message: {e}")
@@ -83,7 +180,7 @@ class MsgManager(Manager):
             details=["MsgManager is healthy" if self._running else "MsgManager is not running."]
         )
 
-    def register_endpoints(self, app: FastAPI):
+    def register_endpoints(self, app: 'FastAPI'):
         """
         Register custom endpoints for the MsgManager.
 
@@ -94,19 +191,29 @@ class MsgManager(Manager):
         # Register an endpoint to get statistics of MsgManager
         @app.get(f"/{self.name}/stats")
         async def msg_manager_stats() -> Dict[str, Any]:
-            """Get statistical information of the MsgManager."""
-            return self.stats
+            """Get statistical information of the MsgManager, with rates over 1, 10 and 60 seconds."""
+            return {
+                **self.stats.to_dict(),
+                "last_message_time": self.last_message_time.isoformat() if self.last_message_time else None,
+                "dedup": self.deduplicator.get_stats() if self.deduplicator is not None else None
+            }
 
         # Register an endpoint to get recent messages handled by the MsgManager
         @app.get(f"/{self.name}/recent-messages")
         async def recent_messages() -> List[Any]:
             """Get the list of recently handled messages."""
-            return self.recent_messages
+            return list(self.recent_messages)
 
         # Register an endpoint to list message handlers and their status
         @app.get(f"/{self.name}/handlers")
-        async def message_handlers_info() -> Dict[str, bool]:
-            """Get information about active message handlers."""
-            return {handler_name: True for handler_name in self.message_handlers}
+        async def message_handlers_info() -> Dict[str, List[Dict[str, str]]]:
+            """Get the registered message handlers per message type."""
+            return self.registry.describe()
+
+        # Register an endpoint to get the dispatcher shards' depth and counters
+        @app.get(f"/{self.name}/dispatch")
+        async def dispatch_stats() -> Dict[str, Any]:
+            """Get per-shard queue depth and counters of the dispatcher."""
+            return self.dispatcher.get_stats()
 
         print(f"Registered endpoints for {self.name}.")
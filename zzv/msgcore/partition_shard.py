@@ -0,0 +1,71 @@
+import asyncio
+import queue
+from typing import Any, Dict, Optional
+
+from zzv.common.latency import LatencyTracker
+from zzv.common.stats import StatsCounters
+
+
+class PartitionShard:
+    """
+    Sending queue of one destination partition, drained by its own task.
+
+    The shard limits how many of its messages may await a delivery report, so a partition whose leader is slow
+    fills its own window instead of the transporter's shared one, and the other shards keep sending.
+    """
+
+    def __init__(self, partition: int, sending_queue: queue.Queue, max_in_flight: int):
+        """
+        Initialize the PartitionShard.
+
+        Args:
+            partition (int): Destination partition.
+            sending_queue (queue.Queue): The shard's thread-safe queue of PrioritizedMessage.
+            max_in_flight (int): Messages of this shard that may await a delivery report at once.
+        """
+        self.partition = partition
+        self.queue = sending_queue
+        self.max_in_flight = max_in_flight
+        self.window: Optional[asyncio.Semaphore] = None  # Created by the drain task, on the running loop
+        self._window_debt = 0  # Slots to retire as deliveries complete after the window was shrunk
+        self.wakeup: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+        self.in_flight = 0  # Only changed on the event loop
+        # "enqueued" is incremented by the threads calling handle_message, the others on the event loop
+        self.stats = StatsCounters(["enqueued", "sent", "failed"])
+        self.latency = LatencyTracker(max_samples=2000)  # Enqueue-to-acknowledgement latency in milliseconds
+
+    def release_slot(self):
+        """Return a window slot, or retire it while the window is larger than `max_in_flight`."""
+        if self._window_debt:
+            self._window_debt -= 1
+        else:
+            self.window.release()
+
+    def set_max_in_flight(self, max_in_flight: int):
+        """
+        Resize the shard's window; must be called on the event loop. Growing frees slots immediately, shrinking
+        retires slots as messages are delivered, like KafkaTransporter.set_max_in_flight.
+        """
+        if max_in_flight <= 0:
+            raise ValueError(f"max_in_flight must be positive, got {max_in_flight}.")
+        delta = max_in_flight - self.max_in_flight
+        self.max_in_flight = max_in_flight
+        if self.window is None or delta == 0:
+            return
+        if delta > 0:
+            repaid = min(delta, self._window_debt)
+            self._window_debt -= repaid
+            for _ in range(delta - repaid):
+                self.window.release()
+        else:
+            self._window_debt -= delta
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "partition": self.partition,
+            "depth": self.queue.qsize(),
+            "in_flight": self.in_flight,
+            **self.stats.snapshot(),
+            "latency_ms": self.latency.summary()
+        }
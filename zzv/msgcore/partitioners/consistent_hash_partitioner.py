@@ -0,0 +1,63 @@
+import struct
+
+from zzv.msgcore.partitioners.partitioner import Partitioner
+
+MURMUR2_SEED = 0x9747b28c
+MURMUR2_M = 0x5bd1e995
+MURMUR2_R = 24
+
+
+def murmur2(data: bytes) -> int:
+    """
+    Compute the 32-bit murmur2 hash of `data` exactly as Kafka's Java client does.
+
+    Args:
+        data (bytes): The bytes to hash.
+
+    Returns:
+        int: The hash as a signed 32-bit integer, matching org.apache.kafka.common.utils.Utils.murmur2.
+    """
+    length = len(data)
+    h = (MURMUR2_SEED ^ length) & 0xffffffff
+    length4 = length // 4
+
+    for k in struct.unpack_from(f'<{length4}I', data):
+        k = (k * MURMUR2_M) & 0xffffffff
+        k ^= k >> MURMUR2_R
+        k = (k * MURMUR2_M) & 0xffffffff
+        h = (h * MURMUR2_M) & 0xffffffff
+        h ^= k
+
+    # Handle the last few bytes of the input (Java switch with fall-through)
+    index = length4 * 4
+    extra = length - index
+    if extra == 3:
+        h ^= data[index + 2] << 16
+    if extra >= 2:
+        h ^= data[index + 1] << 8
+    if extra >= 1:
+        h ^= data[index]
+        h = (h * MURMUR2_M) & 0xffffffff
+
+    h ^= h >> 13
+    h = (h * MURMUR2_M) & 0xffffffff
+    h ^= h >> 15
+
+    return h - 0x100000000 if h & 0x80000000 else h
+
+
+def to_positive(number: int) -> int:
+    """Mask a signed 32-bit integer to a non-negative value, like Kafka's Utils.toPositive."""
+    return number & 0x7fffffff
+
+
+class ConsistentHashPartitioner(Partitioner):
+    """
+    Stable partitioner compatible with Kafka's default (murmur2) partitioner.
+
+    Unlike Python's built-in `hash`, the result does not change between processes or restarts, and it matches
+    the partition the Java client and librdkafka's `murmur2_random` partitioner choose for the same key.
+    """
+
+    def select_partition(self, key: str) -> int:
+        return to_positive(murmur2(key.encode('utf-8'))) % self.num_partitions
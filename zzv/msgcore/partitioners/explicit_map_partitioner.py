@@ -0,0 +1,32 @@
+from typing import Dict, Optional
+
+from zzv.msgcore.partitioners.consistent_hash_partitioner import ConsistentHashPartitioner
+from zzv.msgcore.partitioners.partitioner import Partitioner
+
+
+class ExplicitMapPartitioner(Partitioner):
+    """
+    Partitioner that routes configured keys to fixed partitions and everything else to a fallback partitioner.
+    """
+
+    def __init__(self, num_partitions: int, partition_map: Dict[str, int], fallback: Optional[Partitioner] = None):
+        """
+        Initialize the ExplicitMapPartitioner.
+
+        Args:
+            num_partitions (int): Number of partitions of the destination topic.
+            partition_map (dict): Mapping of key to partition number.
+            fallback (Partitioner, optional): Partitioner for unmapped keys. Defaults to ConsistentHashPartitioner.
+        """
+        super().__init__(num_partitions)
+        for key, partition in partition_map.items():
+            if not 0 <= partition < num_partitions:
+                raise ValueError(f"Partition {partition} for key '{key}' is outside [0, {num_partitions}).")
+        self.partition_map = dict(partition_map)
+        self.fallback = fallback or ConsistentHashPartitioner(num_partitions)
+
+    def select_partition(self, key: str) -> int:
+        partition = self.partition_map.get(key)
+        if partition is not None:
+            return partition
+        return self.fallback.select_partition(key)
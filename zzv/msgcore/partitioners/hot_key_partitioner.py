@@ -0,0 +1,89 @@
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+from zzv.msgcore.partitioners.partitioner import Partitioner
+
+
+class HotKeySplittingPartitioner(Partitioner):
+    """
+    Wrap another partitioner and spread hot keys over several sub-partitions.
+
+    Traffic is counted per key over fixed windows. When a window closes, every key that carried at least
+    `share_threshold` of the window's messages (and at least `min_messages`) is treated as hot during the
+    next window, and its messages are spread round-robin over `split_factor` consecutive partitions starting
+    at the key's base partition. Keys listed in `ordered_keys` always stay on their base partition because
+    splitting them would break per-key ordering.
+    """
+
+    def __init__(self, inner: Partitioner, split_factor: int = 4, share_threshold: float = 0.25,
+                 window_seconds: float = 10.0, min_messages: int = 100, ordered_keys: Optional[Iterable[str]] = None,
+                 clock=time.monotonic):
+        """
+        Initialize the HotKeySplittingPartitioner.
+
+        Args:
+            inner (Partitioner): Partitioner that provides each key's base partition.
+            split_factor (int): Number of partitions a hot key is spread over.
+            share_threshold (float): Share of a window's messages above which a key becomes hot.
+            window_seconds (float): Length of the detection window in seconds.
+            min_messages (int): Minimum messages a key needs in a window to be considered hot.
+            ordered_keys (Iterable[str], optional): Keys that require per-key ordering and are never split.
+            clock (callable): Monotonic time source, injectable for tests.
+        """
+        super().__init__(inner.num_partitions)
+        self.inner = inner
+        self.split_factor = max(1, min(split_factor, inner.num_partitions))
+        self.share_threshold = share_threshold
+        self.window_seconds = window_seconds
+        self.min_messages = min_messages
+        self.ordered_keys: Set[str] = set(ordered_keys or [])
+        self._clock = clock
+
+        self.hot_keys: Set[str] = set()
+        self._window_start = clock()
+        self._window_counts: Dict[str, int] = {}
+        self._window_total = 0
+        self._round_robin: Dict[str, int] = {}
+        self.split_messages = 0  # Messages that were moved off their base partition
+
+    def select_partition(self, key: str) -> int:
+        base = self.inner.select_partition(key)
+        if key in self.ordered_keys:
+            return base
+
+        self._roll_window()
+        self._window_counts[key] = self._window_counts.get(key, 0) + 1
+        self._window_total += 1
+
+        if key not in self.hot_keys:
+            return base
+
+        offset = self._round_robin.get(key, 0)
+        self._round_robin[key] = (offset + 1) % self.split_factor
+        if offset:
+            self.split_messages += 1
+        return (base + offset) % self.num_partitions
+
+    def _roll_window(self):
+        """Close the current window if it has expired and recompute the hot key set."""
+        now = self._clock()
+        if now - self._window_start < self.window_seconds:
+            return
+
+        hot_keys = set()
+        if self._window_total:
+            for key, count in self._window_counts.items():
+                if count >= self.min_messages and count / self._window_total >= self.share_threshold:
+                    hot_keys.add(key)
+        self.hot_keys = hot_keys
+        self._round_robin = {key: offset for key, offset in self._round_robin.items() if key in hot_keys}
+        self._window_counts = {}
+        self._window_total = 0
+        self._window_start = now
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["hot_keys"] = sorted(self.hot_keys)
+        stats["split_messages"] = self.split_messages
+        stats["base_partitioner"] = self.inner.__class__.__name__
+        return stats
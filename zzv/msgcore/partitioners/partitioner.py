@@ -0,0 +1,72 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+
+class Partitioner(ABC):
+    """
+    Abstract base class for Kafka partitioners.
+
+    Subclasses implement `select_partition`; callers use `get_partition`, which also records
+    how many messages went to each partition so that skew can be reported. `get_partition` may be
+    called from any thread: it holds a lock around `select_partition`, so stateful partitioners
+    (see HotKeySplittingPartitioner) need no locking of their own.
+    """
+
+    def __init__(self, num_partitions: int):
+        """
+        Initialize the Partitioner.
+
+        Args:
+            num_partitions (int): Number of partitions of the destination topic.
+        """
+        if num_partitions <= 0:
+            raise ValueError(f"num_partitions must be positive, got {num_partitions}.")
+        self.num_partitions = num_partitions
+        self.partition_counts: List[int] = [0] * num_partitions
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def select_partition(self, key: str) -> int:
+        """
+        Select the partition for the given key.
+
+        Args:
+            key (str): The message key.
+
+        Returns:
+            int: Partition number in the range [0, num_partitions).
+        """
+        pass
+
+    def get_partition(self, key: str) -> int:
+        """Select the partition for the key and record it for the skew metric."""
+        with self._lock:
+            partition = self.select_partition(key)
+            self.partition_counts[partition] += 1
+            return partition
+
+    def get_skew(self) -> float:
+        """
+        Return the partition skew: the busiest partition's count divided by the mean count.
+
+        1.0 means a perfectly even spread; num_partitions means everything went to a single partition.
+        """
+        total = sum(self.partition_counts)
+        if total == 0:
+            return 0.0
+        return max(self.partition_counts) / (total / self.num_partitions)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the per-partition message counts and the skew metric."""
+        return {
+            "partitioner": self.__class__.__name__,
+            "num_partitions": self.num_partitions,
+            "partition_counts": list(self.partition_counts),
+            "skew": self.get_skew()
+        }
+
+    def reset_stats(self):
+        """Reset the per-partition message counts."""
+        with self._lock:
+            self.partition_counts = [0] * self.num_partitions
@@ -0,0 +1,60 @@
+from typing import Any, Dict, Optional
+
+from zzv.msgcore.partitioners.consistent_hash_partitioner import ConsistentHashPartitioner
+from zzv.msgcore.partitioners.explicit_map_partitioner import ExplicitMapPartitioner
+from zzv.msgcore.partitioners.hot_key_partitioner import HotKeySplittingPartitioner
+from zzv.msgcore.partitioners.partitioner import Partitioner
+
+PARTITIONER_CONSISTENT_HASH = 'consistent_hash'
+PARTITIONER_EXPLICIT_MAP = 'explicit_map'
+
+
+def build_partitioner(config: Optional[Dict[str, Any]], num_partitions: int,
+                      default_map: Optional[Dict[str, int]] = None) -> Partitioner:
+    """
+    Build a partitioner from the `partitioner` section of the transporter configuration.
+
+    Example configuration:
+
+        partitioner:
+          type: explicit_map          # or consistent_hash
+          partition_map: {XLK: 0, XLV: 1}
+          hot_keys:
+            enabled: true
+            split_factor: 4
+            share_threshold: 0.25
+            window_seconds: 10
+            min_messages: 100
+            ordered_keys: [XLF]
+
+    Args:
+        config (dict, optional): Partitioner configuration. Defaults to an explicit map over `default_map`.
+        num_partitions (int): Number of partitions of the destination topic.
+        default_map (dict, optional): Partition map used when the configuration does not provide one.
+
+    Returns:
+        Partitioner: The configured partitioner.
+    """
+    config = config or {}
+    partitioner_type = config.get('type', PARTITIONER_EXPLICIT_MAP)
+
+    if partitioner_type == PARTITIONER_CONSISTENT_HASH:
+        partitioner = ConsistentHashPartitioner(num_partitions)
+    elif partitioner_type == PARTITIONER_EXPLICIT_MAP:
+        partition_map = config.get('partition_map', default_map or {})
+        partitioner = ExplicitMapPartitioner(num_partitions, partition_map)
+    else:
+        raise ValueError(f"Unsupported partitioner type '{partitioner_type}'. "
+                         f"Supported types: '{PARTITIONER_CONSISTENT_HASH}', '{PARTITIONER_EXPLICIT_MAP}'.")
+
+    hot_keys = config.get('hot_keys', {})
+    if hot_keys.get('enabled', False):
+        partitioner = HotKeySplittingPartitioner(
+            partitioner,
+            split_factor=hot_keys.get('split_factor', 4),
+            share_threshold=hot_keys.get('share_threshold', 0.25),
+            window_seconds=hot_keys.get('window_seconds', 10.0),
+            min_messages=hot_keys.get('min_messages', 100),
+            ordered_keys=hot_keys.get('ordered_keys', [])
+        )
+    return partitioner
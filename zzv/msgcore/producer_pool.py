@@ -0,0 +1,237 @@
+import logging
+import threading
+from typing import Any, Dict, Mapping, Optional, Tuple, TYPE_CHECKING
+
+from zzv.common.constants import PRODUCER_POOL
+from zzv.engine.reconfigurable_manager import ReconfigurableManager
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_KAFKA = 'kafka'
+CLUSTER_LOCAL = 'local'
+
+DEFAULT_CLUSTER = 'default'
+DEFAULT_PROFILE = 'default'
+
+# Cluster settings that configure the pool rather than librdkafka
+_CLUSTER_OPTIONS = ('type', 'max_retained')
+
+
+def _create_producer(cluster_type: str, conf: Dict[str, Any], cluster_config: Dict[str, Any]):
+    if cluster_type == CLUSTER_LOCAL:
+        from zzv.msgcore.transporters.local_transporter import LocalProducer
+        return LocalProducer(max_retained=cluster_config.get('max_retained', 1000))
+    # Imported here so that importing the pool (and the Kernel) does not load librdkafka
+    from confluent_kafka import Producer
+    return Producer(conf)
+
+
+class PooledProducer:
+    """One shared producer with the thread serving its delivery callbacks and the count of its borrowers."""
+
+    def __init__(self, key: Tuple, producer, poll_interval: float):
+        self.key = key
+        self.producer = producer
+        self.poll_interval = poll_interval
+        self.borrowers = 0
+        self.leases_granted = 0
+        self._stop = threading.Event()
+        self._poller = threading.Thread(target=self._poll_loop, name=f"producer-pool-{key[0]}-{key[1]}",
+                                        daemon=True)
+        self._poller.start()
+
+    def _poll_loop(self):
+        """Serve the delivery callbacks of every borrower."""
+        while not self._stop.is_set():
+            try:
+                self.producer.poll(self.poll_interval)
+            except Exception as e:
+                logger.error(f"Error while polling pooled Kafka Producer {self.key[:2]}: {e}")
+
+    def close(self, timeout: float = 10.0):
+        """Flush the producer and stop its poller."""
+        try:
+            self.producer.flush(timeout=timeout)
+        finally:
+            self._stop.set()
+            self._poller.join(timeout=max(1.0, self.poll_interval * 10))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"cluster": self.key[0], "profile": self.key[1], "borrowers": self.borrowers,
+                "leases_granted": self.leases_granted, "queued": len(self.producer)}
+
+
+class ProducerLease:
+    """A borrower's handle on a pooled producer. Release it once, when the borrower stops producing."""
+
+    def __init__(self, pool: 'ProducerPool', entry: PooledProducer, borrower: str):
+        self._pool = pool
+        self._entry = entry
+        self.borrower = borrower
+        self.producer = entry.producer
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self._pool._release(self._entry)
+
+
+class ProducerPool(ReconfigurableManager):
+    """
+    Producers shared by every manager and transporter of the Kernel.
+
+    librdkafka producers are expensive: each holds broker connections, a message buffer and background threads.
+    The pool keeps one producer per (cluster, profile, borrower settings), polled by a single thread that serves
+    the delivery callbacks of all its borrowers, and closes it when the last borrower releases it.
+    """
+
+    config_section = 'producer_pool'
+
+    def __init__(self, pool_config: Optional[Dict[str, Any]] = None,
+                 default_cluster: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the ProducerPool.
+
+        Args:
+            pool_config (dict, optional): The 'producer_pool' configuration section:
+                clusters (dict): Named clusters, each with a `type` ('kafka' or 'local') and librdkafka settings
+                    such as `bootstrap.servers`.
+                profiles (dict): Named librdkafka settings (linger.ms, acks, compression.type...) applied on top
+                    of the cluster's.
+                poll_interval (float): Timeout in seconds of each poll() of the pooled producers. Defaults to 0.1.
+            default_cluster (dict, optional): The 'default' cluster, used when the configuration does not define
+                one; the Kernel derives it from `kafka_brokers` and the transporter type.
+        """
+        super().__init__(name="ProducerPool")
+        pool_config = pool_config or {}
+        self.clusters: Dict[str, Dict[str, Any]] = dict(pool_config.get('clusters') or {})
+        if default_cluster is not None:
+            self.clusters.setdefault(DEFAULT_CLUSTER, default_cluster)
+        self.profiles: Dict[str, Dict[str, Any]] = {DEFAULT_PROFILE: {}, **(pool_config.get('profiles') or {})}
+        self.poll_interval = pool_config.get('poll_interval', 0.1)
+        self._producers: Dict[Tuple, PooledProducer] = {}
+        self._lock = threading.Lock()
+        self.stats.declare(
+            "producers_created",  # Producers built by the pool
+            "producers_closed",  # Producers closed after their last borrower released them
+            "leases"  # Leases granted, shared or not
+        )
+
+    def validate_config(self, section_config: Mapping[str, Any]):
+        """Reject a non-positive poll interval."""
+        if section_config.get('poll_interval', 0.1) <= 0:
+            raise ValueError("producer_pool.poll_interval must be positive")
+
+    def apply_config(self, section_config: Mapping[str, Any]):
+        """
+        Apply the poll interval to the pool and its producers, from their next poll() on. Cluster and profile
+        settings need a restart: the producers built from them are already shared.
+        """
+        with self._lock:
+            self.poll_interval = section_config.get('poll_interval', 0.1)
+            for entry in self._producers.values():
+                entry.poll_interval = self.poll_interval
+        logger.info(f"{PRODUCER_POOL} applied poll_interval={self.poll_interval}.")
+
+    async def start(self):
+        """Producers are created by the first borrower of each (cluster, profile)."""
+        logger.info(f"Starting {PRODUCER_POOL} with clusters: {', '.join(self.clusters) or 'none'}...")
+        self._running = True
+
+    async def close(self):
+        """Flush and close the producers that borrowers did not release."""
+        logger.info(f"Stopping {PRODUCER_POOL}...")
+        self._running = False
+        with self._lock:
+            entries, self._producers = list(self._producers.values()), {}
+        for entry in entries:
+            entry.close()
+
+    def acquire(self, cluster: str = DEFAULT_CLUSTER, profile: str = DEFAULT_PROFILE,
+                settings: Optional[Dict[str, Any]] = None, borrower: str = 'anonymous') -> ProducerLease:
+        """
+        Borrow the shared producer of a cluster and profile, creating it on first use.
+
+        Args:
+            cluster (str): Name of a configured cluster.
+            profile (str): Name of a configured profile.
+            settings (dict, optional): The borrower's librdkafka defaults, such as acks or enable.idempotence.
+                The cluster and profile settings take precedence. Borrowers whose settings differ get
+                different producers.
+            borrower (str): Name of the borrower, for logs.
+
+        Raises:
+            KeyError: If the cluster or profile is not configured.
+        """
+        cluster_config = self.clusters.get(cluster)
+        if cluster_config is None:
+            raise KeyError(f"Unknown producer cluster '{cluster}'. Configured clusters: {', '.join(self.clusters)}.")
+        profile_config = self.profiles.get(profile)
+        if profile_config is None:
+            raise KeyError(f"Unknown producer profile '{profile}'. Configured profiles: {', '.join(self.profiles)}.")
+
+        settings = {name: value for name, value in (settings or {}).items()
+                    if name not in ('bootstrap.servers', 'client.id')}
+        key = (cluster, profile, tuple(sorted(settings.items())))
+        with self._lock:
+            entry = self._producers.get(key)
+            if entry is None:
+                conf = {'client.id': f"zzv-{cluster}-{profile}", **settings,
+                        **{name: value for name, value in cluster_config.items() if name not in _CLUSTER_OPTIONS},
+                        **profile_config}
+                producer = _create_producer(cluster_config.get('type', CLUSTER_KAFKA), conf, cluster_config)
+                entry = self._producers[key] = PooledProducer(key, producer, self.poll_interval)
+                self.stats.incr("producers_created")
+                logger.info(f"Created pooled producer for cluster '{cluster}', profile '{profile}'.")
+            entry.borrowers += 1
+            entry.leases_granted += 1
+            self.stats.incr("leases")
+        logger.debug(f"{borrower} borrowed the producer of cluster '{cluster}', profile '{profile}'.")
+        return ProducerLease(self, entry, borrower)
+
+    def _release(self, entry: PooledProducer):
+        with self._lock:
+            entry.borrowers -= 1
+            if entry.borrowers > 0 or self._producers.get(entry.key) is not entry:
+                return
+            del self._producers[entry.key]
+            self.stats.incr("producers_closed")
+        entry.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the pool counters and every pooled producer's borrowers and queue length."""
+        with self._lock:
+            producers = [entry.get_stats() for entry in self._producers.values()]
+        return {**self.stats.snapshot(), "producers": producers}
+
+    def get_health(self):
+        """
+        Return the health status of the ProducerPool as a HealthReport object.
+        """
+        if not self._running:
+            return HealthReport(manager_name=self.name, status=Status.ERROR,
+                                details=["ProducerPool is not running."])
+        details = [f"Producer {stats['cluster']}/{stats['profile']}: {stats['borrowers']} borrowers, "
+                   f"{stats['queued']} queued" for stats in self.get_stats()["producers"]]
+        return HealthReport(manager_name=self.name, status=Status.OK, details=details or ["No pooled producers."])
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the ProducerPool.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+
+        @app.get(f"/{self.name}/stats")
+        async def producer_pool_stats() -> Dict[str, Any]:
+            """Get the pooled producers and their borrowers."""
+            return self.get_stats()
+
+        print(f"Registered endpoints for {self.name}.")
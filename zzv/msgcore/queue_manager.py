@@ -1,49 +1,146 @@
 import asyncio
+import itertools
 import logging
 import queue
-from typing import Any, Optional, Dict
-
-from fastapi import FastAPI
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, List, Mapping, Optional, Dict, TYPE_CHECKING
 
 from zzv.common.constants import QUEUE_MANAGER
-from zzv.engine.manager import Manager
+from zzv.engine.reconfigurable_manager import ReconfigurableManager
 from zzv.health.health_report import HealthReport
 from zzv.health.status import Status
+from zzv.msgcore.codecs.snapshot_delta import SECTOR_FIELD
+from zzv.msgcore.conflating_queue import ConflatingQueue, field_key
+from zzv.msgcore.partition_shard import PartitionShard
 from zzv.msgcore.transporters.kafka_transporter import KafkaTransporter
+from zzv.msgcore.transporters.local_transporter import LocalTransporter
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+TRANSPORTER_KAFKA = 'kafka'
+TRANSPORTER_LOCAL = 'local'
 
 logger = logging.getLogger(__name__)
 
 class PrioritizedMessage:
     """Custom class to hold priority and message data for queue processing."""
-    def __init__(self, priority: int, message_data: Any):
+    def __init__(self, priority: int, message_data: Any, sequence: int = 0, partition: Optional[int] = None):
         self.priority = priority
         self.message_data = message_data
+        self.sequence = sequence  # Arrival order, so that equal priorities are sent first in, first out
+        self.partition = partition  # Destination partition chosen at enqueue time, if sharded
+        self.enqueued_at = time.perf_counter()
 
     def __lt__(self, other):
-        return self.priority < other.priority
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class QueueManager(ReconfigurableManager):
+    config_section = 'kafka_transporter'
 
+    def __init__(self, kernel, kafka_brokers: str, transporter_config: Optional[Dict[str, Any]] = None,
+                 queue_config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the QueueManager and KafkaTransporter.
 
-class QueueManager(Manager):
-    def __init__(self, kernel, kafka_brokers: str):
-        """Initialize the QueueManager and KafkaTransporter."""
+        Args:
+            kernel (Kernel): The kernel owning this manager.
+            kafka_brokers (str): Comma-separated list of Kafka bootstrap servers.
+            transporter_config (dict, optional): The 'kafka_transporter' configuration section.
+            queue_config (dict, optional): The 'queue_manager' configuration section. With `conflation.enabled`,
+                only the latest queued message per `conflation.key_field` value (default 'name') is kept. With
+                `sharding.enabled`, messages are queued per destination partition (see _drain_shard), each
+                partition having at most `sharding.max_in_flight_per_shard` messages awaiting delivery and
+                sending at most `sharding.quantum` messages before the other partitions get their turn. The
+                partition is chosen from `sharding.key_field`, which must be the sector field 'name' (its
+                default then) when SnapshotLists are delta-encoded.
+                `close_timeout` (default 5) bounds the seconds close() waits for queued messages to be delivered.
+        """
         super().__init__(name="QueueManager")  # Initialize the base Manager class with the name attribute
         self.kernel = kernel
-        self.sending_queue = queue.PriorityQueue()  # Priority queue for messages to be processed
+        queue_config = queue_config or {}
+        conflation_config = queue_config.get('conflation', {})
+        if conflation_config.get('enabled', False):
+            # Latest message per key only, in the position of the first one queued
+            key_func = field_key(conflation_config.get('key_field', 'name'))
+            create_queue: Callable[[], queue.Queue] = lambda: ConflatingQueue(key_func)
+        else:
+            create_queue = queue.PriorityQueue  # Priority queue for messages to be processed
+        self.sending_queue = create_queue()
+        self.close_timeout = queue_config.get('close_timeout', 5.0)
+        self._sequence = itertools.count()
         self._running = False
-        self.kafka_transporter = KafkaTransporter(kafka_brokers)  # Initialize KafkaTransporter
+        transporter_config = transporter_config or {}
+        symbols = getattr(kernel, 'symbols', None)  # The Kernel's SymbolDictionaryManager, when enabled
+        transporter_type = transporter_config.get('type', TRANSPORTER_KAFKA)
+        if transporter_type == TRANSPORTER_LOCAL:
+            transporter_class = LocalTransporter  # In-process stand-in, no broker required
+        elif transporter_type == TRANSPORTER_KAFKA:
+            transporter_class = KafkaTransporter
+        else:
+            raise ValueError(f"Unsupported transporter type '{transporter_type}'. "
+                             f"Supported types: '{TRANSPORTER_KAFKA}', '{TRANSPORTER_LOCAL}'.")
+        self.kafka_transporter = transporter_class(
+            kafka_brokers,
+            max_in_flight=transporter_config.get('max_in_flight', 10000),
+            poll_interval=transporter_config.get('poll_interval', 0.1),
+            partitioner_config=transporter_config.get('partitioner'),
+            num_partitions=transporter_config.get('num_partitions', 11),
+            snapshot_encoding=transporter_config.get('snapshot_encoding'),
+            offload_min_snapshots=transporter_config.get('offload_min_snapshots', 200),
+            offload_min_bytes=transporter_config.get('offload_min_bytes', 65536),
+            enable_idempotence=transporter_config.get('enable_idempotence', False),
+            producer_pool=getattr(kernel, 'producers', None),  # The Kernel's shared producers, when there is one
+            cluster=transporter_config.get('cluster', 'default'),
+            profile=transporter_config.get('profile', 'default'),
+            symbol_dictionary=symbols.dictionary if symbols is not None else None
+        )  # Initialize KafkaTransporter
 
-        # Add attributes to track statistics
-        self.stats = {
-            "messages_enqueued": 0,  # Number of messages added to the queue
-            "messages_processed": 0,  # Number of messages processed
-            "messages_sent": 0  # Number of messages successfully sent
-        }
+        # Serialize large messages in a Kernel executor pool instead of on the event loop
+        offload_pool = transporter_config.get('offload_pool')
+        if offload_pool:
+            self.kafka_transporter.offload = partial(kernel.offload, offload_pool)
+
+        # Queues per destination partition, each drained by its own task
+        sharding_config = queue_config.get('sharding', {})
+        self.shards: Optional[List[PartitionShard]] = None
+        # Shard windows follow kafka_transporter.max_in_flight on reload unless they are configured explicitly
+        self._shard_windows_derived = 'max_in_flight_per_shard' not in sharding_config
+        if sharding_config.get('enabled', False):
+            num_partitions = self.kafka_transporter.num_partitions
+            max_in_flight_per_shard = sharding_config.get(
+                'max_in_flight_per_shard', max(1, self.kafka_transporter.max_in_flight // num_partitions))
+            self.shards = [PartitionShard(partition, create_queue(), max_in_flight_per_shard)
+                           for partition in range(num_partitions)]
+        self.shard_quantum = sharding_config.get('quantum', 32)
+        # Delta-encoded sectors must stay on one shard, whose drain task encodes and sends them in order
+        delta_encoded = self.kafka_transporter.snapshot_encoder is not None
+        self.shard_key_field = sharding_config.get('key_field', SECTOR_FIELD if delta_encoded else 'key')
+        if self.shards is not None and delta_encoded and self.shard_key_field != SECTOR_FIELD:
+            raise ValueError(f"queue_manager.sharding.key_field must be '{SECTOR_FIELD}' with delta snapshot "
+                             f"encoding, got '{self.shard_key_field}': a sector's deltas would span shards.")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+
+        # Counters incremented from the threads calling handle_message and from the event loop
+        self.stats.declare(
+            "messages_enqueued",  # Number of messages added to the queue
+            "messages_processed",  # Number of messages processed
+            "messages_sent",  # Number of messages acknowledged by the broker
+            "messages_failed"  # Number of messages whose delivery failed
+        )
 
     async def start(self):
         """Start the QueueManager and KafkaTransporter services asynchronously."""
         logger.info(f"Starting {QUEUE_MANAGER}...")
         self.kafka_transporter.start()  # Start KafkaTransporter
         self._running = True
+        if self.shards is not None:
+            await self._run_shards()
+            return
         while self._running:
             try:
                 # Process messages from the queue with a high-frequency timer
@@ -53,82 +150,267 @@ class QueueManager(Manager):
                 logger.error(f"Error in {QUEUE_MANAGER}: {e}")
 
     async def close(self):
-        """Stop the QueueManager and KafkaTransporter services asynchronously."""
+        """
+        Send the queued messages and wait for their delivery reports, for up to `close_timeout` seconds, then stop
+        the QueueManager and KafkaTransporter services.
+        """
         logger.info(f"Stopping {QUEUE_MANAGER}...")
+        deadline = time.monotonic() + self.close_timeout
+        while self._running and not self._is_drained() and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        if not self._is_drained():
+            logger.warning(f"{QUEUE_MANAGER} stopped with {self.get_queue_size()} messages still queued.")
         self._running = False
+        for shard in self.shards or []:
+            if shard.task is not None:
+                shard.task.cancel()
         self.kafka_transporter.stop()  # Stop KafkaTransporter
 
+    def _is_drained(self) -> bool:
+        """Return True once nothing is queued and every message taken from the queues has a delivery report."""
+        stats = self.stats.snapshot()
+        return self.get_queue_size() == 0 and \
+            stats["messages_processed"] <= stats["messages_sent"] + stats["messages_failed"]
+
     def handle_message(self, message_type: str, message_data: Any):
         """Handle incoming messages and add them to the queue."""
+        if self.shards is not None:
+            self._enqueue_sharded(message_data)
+            return
         # Add the message to the queue with a default priority of 0 for non-priority messages
-        self.sending_queue.put(PrioritizedMessage(priority=0, message_data=message_data))
-        self.stats["messages_enqueued"] += 1  # Update message enqueued count
-        logger.info("Message added to the sending queue.")
+        self.sending_queue.put(PrioritizedMessage(priority=0, message_data=message_data,
+                                                  sequence=next(self._sequence)))
+        self.stats.incr("messages_enqueued")  # Update message enqueued count
+        logger.debug("Message added to the sending queue.")
+
+    def _enqueue_sharded(self, message_data: Any):
+        """
+        Queue a message on the shard of its destination partition. The partition is chosen here, once, from the
+        message's key; messages that are not dictionaries with a key go to partition 0's shard and are
+        partitioned by the transporter when sent.
+        """
+        key = message_data.get(self.shard_key_field) if isinstance(message_data, dict) else None
+        partition = self.kafka_transporter.get_partition(key) if key else None
+        shard = self.shards[partition or 0]
+        shard.queue.put(PrioritizedMessage(priority=0, message_data=message_data, sequence=next(self._sequence),
+                                           partition=partition))
+        shard.stats.incr("enqueued")
+        self.stats.incr("messages_enqueued")
+        if shard.wakeup is not None and not shard.wakeup.is_set():
+            if threading.get_ident() == self._loop_thread_id:
+                shard.wakeup.set()
+            else:
+                try:
+                    self._loop.call_soon_threadsafe(shard.wakeup.set)
+                except RuntimeError:
+                    pass  # The loop is closed; the message stays queued
+
+    async def _run_shards(self):
+        """Start one drain task per shard and wait until they are cancelled by close()."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        for shard in self.shards:
+            shard.window = asyncio.Semaphore(shard.max_in_flight)
+            shard.wakeup = asyncio.Event()
+            shard.wakeup.set()  # Drain what was queued before the start
+            shard.task = asyncio.create_task(self._drain_shard(shard))
+        await asyncio.gather(*(shard.task for shard in self.shards), return_exceptions=True)
+
+    async def _drain_shard(self, shard: PartitionShard):
+        """
+        Send a shard's messages in order. Each pass sends at most `shard_quantum` messages and then yields, so
+        busy shards take turns fairly; a shard whose window is full waits for its own deliveries only.
+        """
+        while self._running:
+            if shard.queue.empty():
+                shard.wakeup.clear()
+                if shard.queue.empty():
+                    await shard.wakeup.wait()
+                    continue
+            for _ in range(self.shard_quantum):
+                # Take a slot before the message, so that waiting messages stay queued (and can be conflated)
+                await shard.window.acquire()
+                try:
+                    message_item = shard.queue.get_nowait()
+                except queue.Empty:
+                    shard.release_slot()
+                    break
+                shard.in_flight += 1
+                self.stats.incr("messages_processed")
+                try:
+                    delivery = await self.route_message(message_item.message_data, partition=message_item.partition)
+                    delivery.add_done_callback(partial(self._on_shard_delivery, shard, message_item.enqueued_at))
+                except Exception as e:
+                    self.stats.incr("messages_failed")
+                    self._on_shard_delivery(shard, message_item.enqueued_at, None)
+                    logger.error(f"Error processing message for partition {shard.partition}: {e}")
+            await asyncio.sleep(0)  # Let the other shards take their turn
+
+    def _on_shard_delivery(self, shard: PartitionShard, enqueued_at: float, delivery: Optional[asyncio.Future]):
+        """Release the shard's window slot and record the delivery outcome."""
+        shard.in_flight -= 1
+        shard.release_slot()
+        if delivery is None or delivery.cancelled() or delivery.exception() is not None:
+            shard.stats.incr("failed")
+        else:
+            shard.stats.incr("sent")
+            latency_ms = (time.perf_counter() - enqueued_at) * 1000
+            shard.latency.record(latency_ms)
+            self.stats.observe("enqueue_to_ack", latency_ms)
+
+    def _observe_latency(self, enqueued_at: float, delivery: asyncio.Future):
+        """Record the time from enqueueing to the broker's acknowledgement of a delivered message."""
+        if not delivery.cancelled() and delivery.exception() is None:
+            self.stats.observe("enqueue_to_ack", (time.perf_counter() - enqueued_at) * 1000)
+
+    def get_shard_stats(self) -> Optional[List[Dict[str, Any]]]:
+        """Return depth, in-flight count, counters and latency per partition shard, or None if not sharded."""
+        if self.shards is None:
+            return None
+        return [shard.get_stats() for shard in self.shards]
+
+    def get_conflation_stats(self) -> Dict[str, Any]:
+        """
+        Return the number of conflated messages and the conflation ratio: messages enqueued per message kept
+        for sending (1.0 without conflation).
+        """
+        conflated = sum(getattr(sending_queue, 'conflated', 0) for sending_queue in self._queues())
+        enqueued = self.stats["messages_enqueued"]
+        kept = enqueued - conflated
+        return {
+            "conflation_enabled": isinstance(self.sending_queue, ConflatingQueue),
+            "messages_conflated": conflated,
+            "conflation_ratio": enqueued / kept if kept else 1.0
+        }
+
+    def validate_config(self, section_config: Mapping[str, Any]):
+        """Reject a non-positive in-flight window."""
+        if section_config.get('max_in_flight', 10000) <= 0:
+            raise ValueError("kafka_transporter.max_in_flight must be positive")
+
+    def apply_config(self, section_config: Mapping[str, Any]):
+        """
+        Apply the transporter settings that can change while messages flow: max_in_flight and the offload
+        thresholds, and poll_interval when the transporter owns its producer. A producer borrowed from the
+        ProducerPool, as under the Kernel, polls at `producer_pool.poll_interval`, which the pool reloads itself.
+        Producer and partitioner settings need a restart.
+
+        The shard windows are resized with max_in_flight when they default to their share of it; an explicit
+        `queue_manager.sharding.max_in_flight_per_shard`, like the rest of the queue_manager section, needs a
+        restart to change.
+        """
+        transporter = self.kafka_transporter
+        transporter.set_max_in_flight(section_config.get('max_in_flight', 10000))
+        if self.shards is not None and self._shard_windows_derived:
+            for shard in self.shards:
+                shard.set_max_in_flight(max(1, transporter.max_in_flight // len(self.shards)))
+        if transporter.producer_pool is None:
+            transporter.poll_interval = section_config.get('poll_interval', 0.1)
+        transporter.offload_min_snapshots = section_config.get('offload_min_snapshots', 200)
+        transporter.offload_min_bytes = section_config.get('offload_min_bytes', 65536)
+        logger.info(f"{QUEUE_MANAGER} applied the new transporter settings.")
+
+    def _queues(self) -> List[queue.Queue]:
+        if self.shards is None:
+            return [self.sending_queue]
+        return [shard.queue for shard in self.shards]
+
+    def get_queue_size(self) -> int:
+        """Return the number of messages waiting in the sending queue, or in all shards."""
+        return sum(sending_queue.qsize() for sending_queue in self._queues())
 
     async def process_messages(self):
         """Process messages in the sending queue."""
         while not self.sending_queue.empty():
             try:
                 message_item = self.sending_queue.get()
-                self.stats["messages_processed"] += 1  # Update message processed count
-                await self.route_message(message_item.message_data)
+                self.stats.incr("messages_processed")  # Update message processed count
+                delivery = await self.route_message(message_item.message_data)
+                delivery.add_done_callback(partial(self._observe_latency, message_item.enqueued_at))
             except Exception as e:
+                self.stats.incr("messages_failed")
                 logger.error(f"Error processing message: {e}")
 
-    async def route_message(self, message: Any):
-        """Route the message to the appropriate destination."""
-        await self.kafka_transporter.route_message(message)  # Send to Kafka
-        self.stats["messages_sent"] += 1  # Update message sent count
-        logger.info("Routed message to Kafka...")
-
-
-def _register_service(self, name: str, service: Any) -> None:
-    """Register a service with the given name."""
-    self._services[name] = service
-
-
-def get_service(self, name: str) -> Optional[Any]:
-    """Retrieve a registered service by name."""
-    return self._services.get(name)
-
-
-def get_health(self):
-    """
-    Return the health status of the QueueManager as a HealthReport object.
-    """
-    status = Status.OK if self._running else Status.ERROR
-    return HealthReport(
-        manager_name=self.name,
-        status=status,
-        details=[
-            "QueueManager is healthy" if self._running else "QueueManager is not running.",
-            f"Messages in queue: {self.sending_queue.qsize()}",
-            f"Messages enqueued: {self.stats['messages_enqueued']}",
-            f"Messages processed: {self.stats['messages_processed']}",
-            f"Messages sent: {self.stats['messages_sent']}"
-        ]
-    )
-
-
-def register_endpoints(self, app: FastAPI):
-    """
-    Register custom endpoints for the QueueManager.
-
-    Args:
-        app (FastAPI): The main FastAPI application where endpoints should be registered.
-    """
-    print("Registering endpoints for QueueManager...")
-
-    # Register an endpoint to get QueueManager statistics
-    @app.get(f"/{self.name}/stats")
-    async def queue_manager_stats() -> Dict[str, Any]:
-        """Get statistical information of the QueueManager."""
-        return {
-            "queue_size": self.sending_queue.qsize(),
-            "messages_enqueued": self.stats["messages_enqueued"],
-            "messages_processed": self.stats["messages_processed"],
-            "messages_sent": self.stats["messages_sent"]
-        }
+    async def route_message(self, message: Any, partition: Optional[int] = None) -> asyncio.Future:
+        """
+        Route the message to the appropriate destination.
+
+        Waits for a free slot in the transporter's in-flight window and returns the delivery future.
+        `messages_sent` is only incremented once the broker has acknowledged the message.
+        """
+        delivery = await self.kafka_transporter.route_message(message, partition=partition)  # Send to Kafka
+        delivery.add_done_callback(self._on_delivery)
+        logger.debug("Routed message to Kafka...")
+        return delivery
+
+    def _on_delivery(self, delivery: asyncio.Future):
+        """Update the delivery counters once a delivery future completes."""
+        if delivery.cancelled() or delivery.exception() is not None:
+            self.stats.incr("messages_failed")
+        else:
+            self.stats.incr("messages_sent")
+
+    def _register_service(self, name: str, service: Any) -> None:
+        """Register a service with the given name."""
+        self._services[name] = service
+
+    def get_service(self, name: str) -> Optional[Any]:
+        """Retrieve a registered service by name."""
+        return self._services.get(name)
+
+    def get_health(self):
+        """
+        Return the health status of the QueueManager as a HealthReport object.
+        """
+        status = Status.OK if self._running else Status.ERROR
+        stats = self.stats.snapshot()
+        return HealthReport(
+            manager_name=self.name,
+            status=status,
+            details=[
+                "QueueManager is healthy" if self._running else "QueueManager is not running.",
+                f"Messages in queue: {self.get_queue_size()}",
+                f"Partition shards: {len(self.shards) if self.shards is not None else 'disabled'}",
+                f"Messages enqueued: {stats['messages_enqueued']}",
+                f"Messages processed: {stats['messages_processed']}",
+                f"Messages sent: {stats['messages_sent']}",
+                f"Messages failed: {stats['messages_failed']}",
+                f"Messages in flight: {self.kafka_transporter.in_flight}",
+                f"Conflation ratio: {self.get_conflation_stats()['conflation_ratio']:.2f}"
+            ]
+        )
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the QueueManager.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+        print("Registering endpoints for QueueManager...")
+
+        # Register an endpoint to get QueueManager statistics
+        @app.get(f"/{self.name}/stats")
+        async def queue_manager_stats() -> Dict[str, Any]:
+            """Get statistical information of the QueueManager: counters, rates over 1, 10 and 60 seconds and
+            enqueue-to-acknowledgement latency."""
+            return {
+                "queue_size": self.get_queue_size(),
+                **self.stats.to_dict(),
+                **self.get_conflation_stats(),
+                "transporter": self.kafka_transporter.get_stats()
+            }
+
+        # Register an endpoint to get the depth and latency of every partition shard
+        @app.get(f"/{self.name}/shards")
+        async def shard_stats() -> Optional[List[Dict[str, Any]]]:
+            """Get per-partition queue depth, in-flight count and enqueue-to-acknowledgement latency."""
+            return self.get_shard_stats()
 
-    print(f"Registered endpoints for {self.name}.")
+        # Register an endpoint for consumers to request a keyframe after a gap in a delta-encoded sector
+        @app.post(f"/{self.name}/resync/{{sector}}")
+        async def request_keyframe(sector: str) -> Dict[str, Any]:
+            """Send the next SnapshotList of a sector in full."""
+            return {"sector": sector, "keyframe_requested": self.kafka_transporter.request_keyframe(sector)}
 
+        print(f"Registered endpoints for {self.name}.")
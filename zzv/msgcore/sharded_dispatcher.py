@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from zzv.common.stats import StatsCounters
+from zzv.msgcore.handler_registry import HandlerKind, MessageHandler
+from zzv.msgcore.partitioners.consistent_hash_partitioner import murmur2, to_positive
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchShard:
+    """One worker task and its queue; messages with the same key always land on the same shard."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        # "dispatched" is incremented by the threads calling dispatch, the others by the shard's task
+        self.stats = StatsCounters(["dispatched", "processed", "errors"])
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "shard": self.index,
+            "depth": self.queue.qsize() if self.queue is not None else 0,
+            **self.stats.snapshot()
+        }
+
+
+class ShardedDispatcher:
+    """
+    Run message handlers on a fixed set of worker tasks, sharded by message key.
+
+    Each key hashes (murmur2) to one shard, and each shard processes its messages one at a time, so messages
+    with the same key are handled in order while different keys progress independently. SYNC handlers run
+    inline on the shard's task, ASYNC handlers are awaited, and CPU_BOUND handlers are offloaded (to a Kernel
+    executor pool, or to the dispatcher's own process pool) so that they do not hold the event loop.
+    """
+
+    def __init__(self, num_shards: int = 4, process_pool_workers: Optional[int] = None,
+                 cpu_executor: Optional[Executor] = None, offload: Optional[Callable[..., Awaitable[Any]]] = None):
+        """
+        Initialize the ShardedDispatcher.
+
+        Args:
+            num_shards (int): Number of worker tasks.
+            process_pool_workers (int, optional): Size of the process pool created for CPU_BOUND handlers
+                when no `cpu_executor` is supplied. Defaults to the number of CPUs.
+            cpu_executor (Executor, optional): Executor to use for CPU_BOUND handlers.
+            offload (callable, optional): Coroutine function `offload(fn, *args)` used for CPU_BOUND handlers
+                instead of an executor, such as a partial of Kernel.offload.
+        """
+        if num_shards <= 0:
+            raise ValueError(f"num_shards must be positive, got {num_shards}.")
+        self.shards: List[DispatchShard] = [DispatchShard(i) for i in range(num_shards)]
+        self.process_pool_workers = process_pool_workers
+        self._cpu_executor = cpu_executor
+        self._owns_cpu_executor = False
+        self.offload = offload
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop is not None
+
+    async def start(self):
+        """Create the shard queues and worker tasks on the running event loop."""
+        if self.is_running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        for shard in self.shards:
+            shard.queue = asyncio.Queue()
+            shard.task = asyncio.create_task(self._run_shard(shard))
+
+    async def stop(self, timeout: float = 5.0):
+        """Let the shards drain for up to `timeout` seconds, then stop the worker tasks."""
+        if not self.is_running:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*(shard.queue.join() for shard in self.shards)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dispatcher stopped with {self.get_pending_count()} messages still queued.")
+        for shard in self.shards:
+            shard.task.cancel()
+        await asyncio.gather(*(shard.task for shard in self.shards), return_exceptions=True)
+        self._loop = None
+        self._loop_thread_id = None
+        if self._owns_cpu_executor:
+            self._cpu_executor.shutdown(wait=False)
+            self._cpu_executor = None
+            self._owns_cpu_executor = False
+
+    def shard_for(self, key: str) -> DispatchShard:
+        """Return the shard responsible for a key."""
+        return self.shards[to_positive(murmur2(key.encode('utf-8'))) % len(self.shards)]
+
+    def dispatch(self, key: str, handlers: Sequence[MessageHandler], message_data: Any):
+        """
+        Queue a message for its handlers on the shard owning `key`. Safe to call from any thread.
+
+        Raises:
+            RuntimeError: If the dispatcher has not been started.
+        """
+        if not self.is_running:
+            raise RuntimeError("Dispatcher is not running.")
+        shard = self.shard_for(key)
+        shard.stats.incr("dispatched")
+        item = (handlers, message_data)
+        if threading.get_ident() == self._loop_thread_id:
+            shard.queue.put_nowait(item)
+        else:
+            self._loop.call_soon_threadsafe(shard.queue.put_nowait, item)
+
+    async def _run_shard(self, shard: DispatchShard):
+        """Process one shard's messages in order."""
+        while True:
+            handlers, message_data = await shard.queue.get()
+            try:
+                for handler in handlers:
+                    try:
+                        await self.run_handler(handler, message_data)
+                    except Exception as e:
+                        shard.stats.incr("errors")
+                        logger.error(f"Handler '{handler.name}' failed on shard {shard.index}: {e}")
+                shard.stats.incr("processed")
+            finally:
+                shard.queue.task_done()
+
+    async def run_handler(self, handler: MessageHandler, message_data: Any):
+        """Run a single handler according to its kind."""
+        if handler.kind == HandlerKind.SYNC:
+            return handler.callback(message_data)
+        if handler.kind == HandlerKind.ASYNC:
+            return await handler.callback(message_data)
+        if self.offload is not None:
+            return await self.offload(handler.callback, message_data)
+        return await self._loop.run_in_executor(self._get_cpu_executor(), handler.callback, message_data)
+
+    def _get_cpu_executor(self) -> Executor:
+        """Return the executor for CPU_BOUND handlers, creating a process pool on first use."""
+        if self._cpu_executor is None:
+            self._cpu_executor = ProcessPoolExecutor(max_workers=self.process_pool_workers)
+            self._owns_cpu_executor = True
+        return self._cpu_executor
+
+    def get_pending_count(self) -> int:
+        """Return the number of messages queued across all shards."""
+        return sum(shard.queue.qsize() for shard in self.shards if shard.queue is not None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return per-shard depth and counters."""
+        return {
+            "num_shards": len(self.shards),
+            "pending": self.get_pending_count(),
+            "shards": [shard.get_stats() for shard in self.shards]
+        }
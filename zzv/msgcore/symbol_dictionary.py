@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (symbol id, symbol), the unit in which dictionaries are published and applied
+Entry = Tuple[int, str]
+
+
+class SymbolDictionaryError(ValueError):
+    """Raised when entries conflict with a dictionary, or skip ids it does not know yet."""
+
+
+class SymbolDictionaryVersionError(LookupError):
+    """Raised when a payload needs a newer dictionary than the one available to decode it."""
+
+    def __init__(self, required: int, available: int):
+        super().__init__(f"Payload needs symbol dictionary version {required}, only version {available} is known.")
+        self.required = required
+        self.available = available
+
+
+class SymbolDictionary:
+    """
+    Append-only map from symbols to compact integer ids, shared by producers and consumers of snapshot payloads.
+
+    Ids are assigned in order from 0 and never reused or reassigned, so the version of a dictionary is simply
+    its number of symbols: a payload encoded against version N can be decoded with any dictionary of version N
+    or more. Consumers catch up with `entries_since(their version)` and `apply`, without a full resync.
+
+    `id_of` assigns ids on first use and may be called from several threads. Listeners added with `subscribe`
+    are called with the new entries, in id order, before `id_of` returns, so that the entries can be published
+    ahead of the payload that uses them.
+    """
+
+    def __init__(self, symbols: Iterable[str] = ()):
+        """
+        Initialize the SymbolDictionary.
+
+        Args:
+            symbols (iterable of str): Symbols of ids 0, 1, 2... such as the `symbols` of a saved dictionary.
+        """
+        self._symbols: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[List[Entry]], None]] = []
+        self.apply(enumerate(symbols))
+
+    @property
+    def version(self) -> int:
+        return len(self._symbols)
+
+    @property
+    def symbols(self) -> List[str]:
+        """The symbols by id. Append-only, read it but do not modify it."""
+        return self._symbols
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._ids
+
+    def subscribe(self, listener: Callable[[List[Entry]], None]):
+        """Call `listener(entries)` with every batch of new entries, assigned or applied."""
+        self._listeners.append(listener)
+
+    def lookup(self, symbol: str) -> Optional[int]:
+        """Return the id of a symbol, or None if it has none yet."""
+        return self._ids.get(symbol)
+
+    def id_of(self, symbol: str) -> int:
+        """Return the id of a symbol, assigning the next one if it is new."""
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is not None:
+            return symbol_id
+        with self._lock:
+            symbol_id = self._ids.get(symbol)
+            if symbol_id is None:
+                symbol_id = len(self._symbols)
+                self._append([(symbol_id, symbol)])
+            return symbol_id
+
+    def symbol(self, symbol_id: int) -> str:
+        """
+        Return the symbol of an id.
+
+        Raises:
+            SymbolDictionaryVersionError: If the id is beyond this version of the dictionary.
+        """
+        if not 0 <= symbol_id < len(self._symbols):
+            raise SymbolDictionaryVersionError(symbol_id + 1, len(self._symbols))
+        return self._symbols[symbol_id]
+
+    def require(self, version: int):
+        """Raise SymbolDictionaryVersionError unless this dictionary is at least at `version`."""
+        if version > len(self._symbols):
+            raise SymbolDictionaryVersionError(version, len(self._symbols))
+
+    def entries_since(self, version: int) -> List[Entry]:
+        """Return the entries a consumer at `version` is missing."""
+        version = max(version, 0)
+        return list(enumerate(self._symbols[version:], start=version))
+
+    def apply(self, entries: Iterable[Entry]) -> int:
+        """
+        Add entries published by another dictionary, such as records of the compacted topic. Entries already
+        known are skipped, in any order.
+
+        Returns:
+            int: The number of entries added.
+
+        Raises:
+            SymbolDictionaryError: If an entry gives a known id another symbol, or an id beyond the next one.
+        """
+        with self._lock:
+            added = []
+            added_symbols = set()
+            for symbol_id, symbol in sorted(entries):
+                version = len(self._symbols) + len(added)
+                if symbol_id < version:
+                    known = self._symbols[symbol_id] if symbol_id < len(self._symbols) \
+                        else added[symbol_id - len(self._symbols)][1]
+                    if known != symbol:
+                        raise SymbolDictionaryError(f"Symbol id {symbol_id} is '{known}', not '{symbol}'.")
+                elif symbol_id > version:
+                    raise SymbolDictionaryError(f"Symbol id {symbol_id} skips ids from {version}.")
+                elif symbol in self._ids or symbol in added_symbols:
+                    raise SymbolDictionaryError(f"Symbol '{symbol}' already has an id, it cannot take {symbol_id}.")
+                else:
+                    added.append((symbol_id, symbol))
+                    added_symbols.add(symbol)
+            if added:
+                self._append(added)
+            return len(added)
+
+    def _append(self, entries: List[Entry]):
+        """
+        Append entries that follow the current version; the lock is held. The ids are published to the lock-free
+        lookups last, so no thread can use an id before its entry is in `symbols` and the listeners have run.
+        """
+        self._symbols.extend(symbol for _, symbol in entries)
+        for listener in self._listeners:
+            try:
+                listener(entries)
+            except Exception as e:
+                logger.error(f"Symbol dictionary listener failed: {e}")
+        for symbol_id, symbol in entries:
+            self._ids[symbol] = symbol_id
+
+    def to_dict(self) -> Dict:
+        return {'version': len(self._symbols), 'symbols': list(self._symbols)}
+
+    def save(self, path: str):
+        """Write the dictionary to a JSON file, atomically so that readers never see a partial file."""
+        data = json.dumps(self.to_dict())
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.symbols-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def reload(self, path: str) -> int:
+        """
+        Apply the entries of a file written by `save`, typically by a newer producer.
+
+        Returns:
+            int: The number of entries added.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return self.apply(enumerate(data.get('symbols', [])))
+
+    @classmethod
+    def load(cls, path: str) -> 'SymbolDictionary':
+        """Create a dictionary from a file written by `save`; an empty one if the file does not exist."""
+        dictionary = cls()
+        if os.path.exists(path):
+            dictionary.reload(path)
+        return dictionary
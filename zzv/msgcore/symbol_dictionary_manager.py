@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from zzv.common.constants import SYMBOL_DICTIONARY
+from zzv.engine.manager import Manager
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+from zzv.msgcore.symbol_dictionary import Entry, SymbolDictionary
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from zzv.msgcore.producer_pool import ProducerLease
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolDictionaryManager(Manager):
+    """
+    Own the engine's SymbolDictionary and publish it to the consumers of id-encoded snapshot payloads.
+
+    The dictionary is loaded from `path` at construction, so that ids survive restarts, and saved back every
+    `save_interval` seconds when it grew and on close. New entries are produced to the compacted `topic` as
+    they are assigned, keyed by id with the symbol as value, ahead of the payload that needs them; the whole
+    dictionary is produced again on start, which also repopulates a topic that was lost. Consumers without
+    access to the topic or file fetch the entries past their version from the `/entries` endpoint; the
+    KafkaConsumerManager does so through `symbol_dictionary_url`, rather than waiting for the next save.
+    """
+
+    def __init__(self, kernel, dictionary_config: Dict[str, Any]):
+        """
+        Initialize the SymbolDictionaryManager.
+
+        Args:
+            kernel (Kernel): The kernel providing the ProducerPool.
+            dictionary_config (dict): The 'symbol_dictionary' configuration section:
+                path (str, optional): JSON file the dictionary is loaded from and saved to.
+                save_interval (float): Seconds between saves of a grown dictionary. Defaults to 5.
+                topic (str, optional): Compacted topic the entries are produced to. Not published when unset.
+                cluster (str): producer_pool cluster to produce with. Defaults to 'default'.
+                profile (str): producer_pool profile to produce with. Defaults to 'default'.
+        """
+        super().__init__(name="SymbolDictionaryManager")
+        self.kernel = kernel
+        self.path: Optional[str] = dictionary_config.get('path')
+        self.save_interval = dictionary_config.get('save_interval', 5.0)
+        self.topic: Optional[str] = dictionary_config.get('topic')
+        self.cluster = dictionary_config.get('cluster', 'default')
+        self.profile = dictionary_config.get('profile', 'default')
+        self.dictionary = SymbolDictionary.load(self.path) if self.path else SymbolDictionary()
+        self.saved_version = self.dictionary.version
+        self.last_error: Optional[str] = None
+        self._lease: Optional['ProducerLease'] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats.declare(
+            "symbols_added",  # Entries assigned or applied since construction
+            "entries_published",  # Entries handed to the producer
+            "publish_errors",  # Entries that failed to produce or were not delivered
+            "saves"  # Writes of the dictionary file
+        )
+        self.dictionary.subscribe(self._on_entries)
+
+    async def start(self):
+        """Borrow a producer, publish the whole dictionary and start the periodic save."""
+        logger.info(f"Starting {SYMBOL_DICTIONARY} at version {self.dictionary.version}...")
+        if self.topic:
+            try:
+                self._lease = self.kernel.producers.acquire(self.cluster, self.profile, {'acks': 'all'},
+                                                            borrower=self.name)
+            except Exception as e:  # KeyError for an unknown cluster or profile, KafkaException otherwise
+                self.last_error = f"Failed to borrow a producer for '{self.topic}': {e}"
+                logger.error(self.last_error)
+            self._publish(self.dictionary.entries_since(0))
+        self._running = True
+        if self.path:
+            self._task = asyncio.create_task(self._save_periodically())
+
+    async def close(self):
+        """Save the dictionary and release the producer."""
+        logger.info(f"Stopping {SYMBOL_DICTIONARY}...")
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.path:
+            await asyncio.to_thread(self.save)
+        if self._lease is not None:
+            self._lease.release()
+            self._lease = None
+
+    def _on_entries(self, entries: List[Entry]):
+        """Publish new entries; runs in the thread that assigned them, before the payload using them is sent."""
+        self.stats.incr("symbols_added", len(entries))
+        self._publish(entries)
+
+    def _publish(self, entries: List[Entry]):
+        if self._lease is None:
+            return
+        for symbol_id, symbol in entries:
+            try:
+                self._lease.producer.produce(self.topic, key=str(symbol_id).encode('utf-8'),
+                                             value=symbol.encode('utf-8'), callback=self._on_delivery)
+                self.stats.incr("entries_published")
+            except Exception as e:  # BufferError when the local queue is full, KafkaException otherwise
+                self.stats.incr("publish_errors")
+                self.last_error = f"Failed to publish symbol id {symbol_id}: {e}"
+                logger.error(self.last_error)
+
+    def _on_delivery(self, err, msg):
+        if err is not None:
+            self.stats.incr("publish_errors")
+            self.last_error = f"Symbol dictionary entry not delivered: {err}"
+            logger.error(self.last_error)
+
+    def save(self):
+        """Write the dictionary file if the dictionary grew since the last save. Blocking."""
+        version = self.dictionary.version
+        if not self.path or version == self.saved_version:
+            return
+        self.dictionary.save(self.path)
+        self.saved_version = version
+        self.stats.incr("saves")
+
+    async def _save_periodically(self):
+        while self._running:
+            await asyncio.sleep(self.save_interval)
+            try:
+                await asyncio.to_thread(self.save)
+            except Exception as e:
+                self.last_error = f"Failed to save the symbol dictionary to '{self.path}': {e}"
+                logger.error(self.last_error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the dictionary version and the publishing counters."""
+        return {"version": self.dictionary.version, "saved_version": self.saved_version, "topic": self.topic,
+                **self.stats.snapshot()}
+
+    def get_health(self):
+        """
+        Return the health status of the SymbolDictionaryManager as a HealthReport object.
+        """
+        if not self._running:
+            status = Status.ERROR
+        elif self.last_error:
+            status = Status.WARNING
+        else:
+            status = Status.OK
+        details = [f"SymbolDictionaryManager is {'running' if self._running else 'not running'}",
+                   f"Version: {self.dictionary.version}"]
+        if self.last_error:
+            details.append(f"Last error: {self.last_error}")
+        return HealthReport(manager_name=self.name, status=status, details=details)
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the SymbolDictionaryManager.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+
+        @app.get(f"/{self.name}/stats")
+        async def symbol_dictionary_stats() -> Dict[str, Any]:
+            """Get the dictionary version and the publishing counters."""
+            return self.get_stats()
+
+        @app.get(f"/{self.name}/entries")
+        async def symbol_dictionary_entries(since: int = 0) -> Dict[str, Any]:
+            """Get the entries past version `since`, for consumers catching up without the topic."""
+            entries = self.dictionary.entries_since(since)
+            return {"version": entries[-1][0] + 1 if entries else self.dictionary.version,
+                    "entries": [[symbol_id, symbol] for symbol_id, symbol in entries]}
+
+        print(f"Registered endpoints for {self.name}.")
@@ -1,18 +1,71 @@
+import asyncio
 import json
-from typing import Dict, Any, Optional
-from confluent_kafka import Producer, Consumer, KafkaException
+import threading
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TYPE_CHECKING
 import logging
 
+from zzv.common.constants import SECTOR_PARTITION_MAP
+from zzv.common.latency import LatencyTracker
+from zzv.common.stats import StatsCounters
+from zzv.msgcore.codecs.snapshot_delta import SECTOR_FIELD, SnapshotDeltaEncoder
+from zzv.msgcore.partitioners.hot_key_partitioner import HotKeySplittingPartitioner
+from zzv.msgcore.partitioners.partitioner import Partitioner
+from zzv.msgcore.partitioners.partitioner_factory import build_partitioner
+
+if TYPE_CHECKING:
+    from zzv.msgcore.producer_pool import ProducerLease, ProducerPool
+    from zzv.msgcore.symbol_dictionary import SymbolDictionary
+
+SNAPSHOT_ENCODING_JSON = 'json'
+SNAPSHOT_ENCODING_DELTA = 'delta'
+
 logger = logging.getLogger(__name__)
 
 
+class DeliveryError(Exception):
+    """Raised through a delivery future when a message could not be delivered to Kafka."""
+
+
 class KafkaTransporter:
-    def __init__(self, kafka_brokers: str):
-        self.sector_map = {
-            'XLK': 0, 'XLV': 1, 'XLF': 2, 'XLY': 3, 'XLI': 4,
-            'XLP': 5, 'XLE': 6, 'XLU': 7, 'XLB': 8, 'XLC': 9, 'XLRE': 10
-        }
-        self.num_partitions = 11  # Total number of partitions
+    def __init__(self, kafka_brokers: str, max_in_flight: int = 10000, poll_interval: float = 0.1,
+                 partitioner_config: Optional[Dict[str, Any]] = None, num_partitions: int = 11,
+                 snapshot_encoding: Optional[Dict[str, Any]] = None,
+                 offload: Optional[Callable[..., Awaitable[Any]]] = None, offload_min_snapshots: int = 200,
+                 offload_min_bytes: int = 65536, enable_idempotence: bool = False,
+                 producer_pool: Optional['ProducerPool'] = None, cluster: str = 'default', profile: str = 'default',
+                 symbol_dictionary: Optional['SymbolDictionary'] = None):
+        """
+        Initialize the KafkaTransporter.
+
+        Args:
+            kafka_brokers (str): Comma-separated list of Kafka bootstrap servers.
+            max_in_flight (int): Maximum number of messages awaiting a delivery report at any time.
+            poll_interval (float): Timeout in seconds for each producer.poll() call of the poller thread. Unused
+                with a `producer_pool`, whose own poll_interval applies.
+            partitioner_config (dict, optional): Partitioner settings, see build_partitioner.
+                Defaults to the sector map with a murmur2 fallback for other keys.
+            num_partitions (int): Number of partitions of the destination topics.
+            snapshot_encoding (dict, optional): SnapshotList value encoding. `mode` is 'json' (the default) or
+                'delta' for keyframes and deltas per sector (see SnapshotDeltaEncoder), with `keyframe_interval`.
+            offload (callable, optional): Coroutine function `offload(fn, *args)` running `fn` off the event loop,
+                such as a partial of Kernel.offload. Used to parse and serialize large messages.
+            offload_min_snapshots (int): SnapshotList size from which dictionary messages are offloaded.
+            offload_min_bytes (int): Length from which JSON string messages are offloaded.
+            enable_idempotence (bool): Enable the idempotent producer, so that retries never write a message
+                twice and per-partition order is kept.
+            producer_pool (ProducerPool, optional): Pool to borrow the producer from instead of creating one. The
+                pool's thread then serves the delivery callbacks, and `kafka_brokers` is replaced by the cluster's.
+            cluster (str): Pool cluster to borrow from.
+            profile (str): Pool profile to borrow with.
+            symbol_dictionary (SymbolDictionary, optional): In 'delta' mode, keyframes carry the dictionary's symbol
+                ids instead of the symbol strings.
+        """
+        self.sector_map = dict(SECTOR_PARTITION_MAP)
+        self.num_partitions = num_partitions  # Total number of partitions
+        self.partitioner: Partitioner = build_partitioner(partitioner_config, self.num_partitions,
+                                                          default_map=self.sector_map)
 
         self.producer_conf = {
             'bootstrap.servers': kafka_brokers,
@@ -22,51 +75,167 @@ class KafkaTransporter:
             'retry.backoff.ms': 500,
             'socket.timeout.ms': 10000,
         }
+        if enable_idempotence:
+            self.producer_conf['enable.idempotence'] = True  # Requires acks=all, which is already set
         self.producer = None
+        self.producer_pool = producer_pool
+        self.cluster = cluster
+        self.profile = profile
+        self._lease: Optional['ProducerLease'] = None
+
+        snapshot_encoding = snapshot_encoding or {}
+        encoding_mode = snapshot_encoding.get('mode', SNAPSHOT_ENCODING_JSON)
+        if encoding_mode == SNAPSHOT_ENCODING_DELTA:
+            self.snapshot_encoder: Optional[SnapshotDeltaEncoder] = SnapshotDeltaEncoder(
+                keyframe_interval=snapshot_encoding.get('keyframe_interval', 100), symbol_dictionary=symbol_dictionary)
+        elif encoding_mode == SNAPSHOT_ENCODING_JSON:
+            self.snapshot_encoder = None
+        else:
+            raise ValueError(f"Unsupported snapshot encoding '{encoding_mode}'. "
+                             f"Supported encodings: '{SNAPSHOT_ENCODING_JSON}', '{SNAPSHOT_ENCODING_DELTA}'.")
+        if self.snapshot_encoder is not None and isinstance(self.partitioner, HotKeySplittingPartitioner):
+            # A split sector would reach its consumers out of order, which breaks its sequence of deltas
+            raise ValueError("partitioner.hot_keys cannot be enabled with delta snapshot encoding: a hot sector "
+                             "would be spread over several partitions.")
+
+        # Parsing and serialization of large messages off the event loop
+        self.offload = offload
+        self.offload_min_snapshots = offload_min_snapshots
+        self.offload_min_bytes = offload_min_bytes
+
+        # Delivery tracking
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self._window: Optional[asyncio.Semaphore] = None  # Bounded in-flight window, bound to the running loop
+        self._window_debt = 0  # Slots to retire as deliveries complete after the window was shrunk
+        self._poller_thread: Optional[threading.Thread] = None
+        self._poller_stop = threading.Event()
+        self.in_flight = 0
+        # Incremented from the event loop and from the poller threads running delivery callbacks
+        self.stats = StatsCounters([
+            "messages_produced",  # Messages handed to librdkafka
+            "messages_delivered",  # Messages acknowledged by the broker
+            "messages_failed"  # Messages rejected locally or by the broker
+        ])
+        self.delivery_latency = LatencyTracker()  # Produce-to-acknowledgement latency in milliseconds
 
     def start(self):
+        if self.producer_pool is not None:
+            self._borrow_producer()
+            return
+
+        # Imported here so that importing the transporter (and the Kernel) does not load librdkafka
+        from confluent_kafka import Producer, KafkaException
+
         try:
             self.producer = Producer(self.producer_conf)
+            self._start_poller()
             logger.info("Kafka Producer started successfully.")
         except KafkaException as e:
             logger.error(f"Failed to start Kafka Producer: {e}")
 
     def stop(self):
-        if self.producer:
+        self._stop_poller()
+        if self.producer is not None:
             self.producer.flush(timeout=10)
             logger.info("Kafka Producer stopped.")
         else:
             logger.warning("Kafka Producer is not initialized.")
+        if self._lease is not None:
+            self._lease.release()
+            self._lease = None
 
-    def get_partition(self, key: str):
-        if key in self.sector_map:
-            return self.sector_map[key]
-        return hash(key) % self.num_partitions
+    def _borrow_producer(self):
+        """Borrow the shared producer of the configured cluster and profile from the pool."""
+        try:
+            self._lease = self.producer_pool.acquire(self.cluster, self.profile, self.producer_conf,
+                                                     borrower=self.producer_conf['client.id'])
+            self.producer = self._lease.producer
+            logger.info(f"Kafka Producer borrowed from cluster '{self.cluster}', profile '{self.profile}'.")
+        except Exception as e:  # KeyError for an unknown cluster or profile, KafkaException otherwise
+            logger.error(f"Failed to borrow Kafka Producer: {e}")
 
-    def send_to_kafka(self, topic: str, key: str, message: str):
-        if not self.producer:
-            logger.error("Kafka Producer is not initialized.")
+    def _start_poller(self):
+        """Start the background thread that serves delivery callbacks via producer.poll()."""
+        if self._poller_thread and self._poller_thread.is_alive():
             return
+        self._poller_stop.clear()
+        self._poller_thread = threading.Thread(target=self._poll_loop, name="kafka-transporter-poller", daemon=True)
+        self._poller_thread.start()
+
+    def _stop_poller(self):
+        """Stop the poller thread and wait for it to exit."""
+        self._poller_stop.set()
+        if self._poller_thread:
+            self._poller_thread.join(timeout=max(1.0, self.poll_interval * 10))
+            self._poller_thread = None
+
+    def _poll_loop(self):
+        """Drive producer.poll() so the event loop never has to."""
+        while not self._poller_stop.is_set():
+            producer = self.producer
+            if producer is None:
+                self._poller_stop.wait(self.poll_interval)
+                continue
+            try:
+                producer.poll(self.poll_interval)
+            except Exception as e:
+                logger.error(f"Error while polling Kafka Producer: {e}")
+
+    def get_partition(self, key: str) -> int:
+        return self.partitioner.get_partition(key)
+
+    def send_to_kafka(self, topic: str, key: str, message, on_delivery=None, partition: Optional[int] = None) -> bool:
+        """
+        Produce a message to Kafka.
+
+        Args:
+            topic (str): Destination topic.
+            key (str): Message key, also used to select the partition.
+            message (str or bytes): Serialized message value; strings are sent UTF-8 encoded.
+            on_delivery (callable, optional): Called as on_delivery(err, msg, latency_ms) from the poller thread.
+            partition (int, optional): Destination partition, when already chosen; selected from the key otherwise.
+
+        Returns:
+            bool: True if the message was handed to librdkafka, False otherwise.
+        """
+        if self.producer is None:
+            logger.error("Kafka Producer is not initialized.")
+            return False
 
         try:
-            partition = self.get_partition(key)
+            if partition is None:
+                partition = self.get_partition(key)
             self.producer.produce(
                 topic,
                 key=key.encode('utf-8'),
-                value=message.encode('utf-8'),
+                value=message if isinstance(message, bytes) else message.encode('utf-8'),
                 partition=partition,
-                callback=self.delivery_report
+                callback=partial(self._on_delivery, time.perf_counter_ns(), on_delivery)
             )
-            self.producer.poll(0)
-        except KafkaException as e:
+            self.stats.incr("messages_produced")
+            return True
+        except Exception as e:  # BufferError when the local queue is full, KafkaException otherwise
             logger.error(f"Error while sending to Kafka: {e}")
+            self.stats.incr("messages_failed")
+            return False
+
+    def _on_delivery(self, sent_at_ns: int, on_delivery, err, msg):
+        """Record the delivery outcome; runs on the poller thread."""
+        latency_ms = (time.perf_counter_ns() - sent_at_ns) / 1_000_000
+        self.stats.incr("messages_failed" if err is not None else "messages_delivered")
+        if err is None:
+            self.delivery_latency.record(latency_ms)
+        self.delivery_report(err, msg)
+        if on_delivery is not None:
+            on_delivery(err, msg, latency_ms)
 
     @staticmethod
     def delivery_report(err, msg):
         if err is not None:
-            logger.error(Fore.RED + f"Message delivery failed: {err}")
+            logger.error(f"Message delivery failed: {err}")
         else:
-            logger.info(Fore.GREEN + f"Message delivered to {msg.topic()} [{msg.partition()}]")
+            logger.debug(f"Message delivered to {msg.topic()} [{msg.partition()}]")
 
     def serialize_snapshot_list(self, snapshots, key, timestamp, name):
         snapshot_list = {
@@ -113,26 +282,163 @@ class KafkaTransporter:
 
         return True, ""
 
-    async def route_message(self, message):
+    async def route_message(self, message, partition: Optional[int] = None) -> asyncio.Future:
         """
-        Process the message after ensuring it's a dict and validating its contents.
+        Process the message after ensuring it's a dict and validating its contents, then produce it.
+
+        The coroutine returns once the message has been handed to librdkafka, waiting first for a free slot
+        in the in-flight window. The returned future resolves with a delivery dict when the broker acknowledges
+        the message, or fails with DeliveryError.
+
+        Delta-encoded SnapshotLists are partitioned by their sector rather than their key, which is unique per
+        list: a sector's keyframes and deltas must reach its consumers in order, through one partition.
 
         :param message: The input message (could be dict or str)
+        :param partition: Destination partition, when the caller already chose it
+        :return: asyncio.Future tied to the librdkafka delivery callback
+        """
+        loop = asyncio.get_running_loop()
+        delivery = loop.create_future()
+
+        # Parse, validate and serialize, in the offload pool for large messages
+        if self.offload is not None and self._is_large(message):
+            parsed_message, error, value = await self.offload(self.prepare_message, message)
+        else:
+            parsed_message, error, value = self.prepare_message(message)
+        if error:
+            logger.error(error)
+            self._reject(delivery, error)
+            return delivery
+
+        # If we're here, we have a valid dictionary with required fields
+        topic = parsed_message['topic']
+        key = parsed_message['key']
+        if partition is None and self.snapshot_encoder is not None and 'snapshots' in parsed_message \
+                and parsed_message.get(SECTOR_FIELD):
+            partition = self.get_partition(parsed_message[SECTOR_FIELD])
+
+        window = self._get_window()
+        await window.acquire()
+        self.in_flight += 1
+
+        def on_delivery(err, msg, latency_ms):
+            try:
+                loop.call_soon_threadsafe(self._resolve_delivery, delivery, err, msg, latency_ms)
+            except RuntimeError:
+                # The loop has been closed; nobody is waiting for this delivery anymore
+                pass
+
+        if not self.send_to_kafka(topic, key, value, on_delivery=on_delivery, partition=partition):
+            self._release_window()
+            if not delivery.done():
+                delivery.set_exception(DeliveryError(f"Failed to produce message with key '{key}' to '{topic}'"))
+        return delivery
+
+    def prepare_message(self, message) -> Tuple[Optional[Dict[str, Any]], str, Any]:
+        """
+        Parse, validate and serialize a message. Runs on the event loop or in the offload pool, possibly for
+        several messages at once; the delta encoder serializes the messages of a sector, and their sequences
+        are in production order as long as each sector is sent by one task (the QueueManager drain task, or
+        the shard of its sector when sharded).
+
+        :param message: The input message (could be dict or str)
+        :return: tuple (dict or None, str, str or bytes or None), (parsed_message, error_message, value)
         """
         # First, ensure the message is a dictionary
         parsed_message, parse_error = self.ensure_dict(message)
         if parsed_message is None:
-            logging.error(f"Failed to parse message: {parse_error}")
-            return
+            return None, f"Failed to parse message: {parse_error}", None
 
         # Now validate the contents
         is_valid, error_message = self.validate_message(parsed_message)
         if not is_valid:
-            logging.error(f"Invalid message: {error_message}")
+            return parsed_message, f"Invalid message: {error_message}", None
+
+        if self.snapshot_encoder is not None and 'snapshots' in parsed_message:
+            return parsed_message, "", self.snapshot_encoder.encode(parsed_message)
+        return parsed_message, "", message if isinstance(message, str) else json.dumps(message)
+
+    def _is_large(self, message) -> bool:
+        """Return True if preparing the message is worth a trip to the offload pool."""
+        if isinstance(message, str):
+            return len(message) >= self.offload_min_bytes
+        if isinstance(message, dict):
+            return len(message.get('snapshots') or ()) >= self.offload_min_snapshots
+        return False
+
+    def request_keyframe(self, sector: str) -> bool:
+        """
+        Send the next SnapshotList of `sector` in full, so that a consumer that detected a gap can resync.
+
+        Returns:
+            bool: False if SnapshotLists are not delta-encoded.
+        """
+        if self.snapshot_encoder is None:
+            return False
+        self.snapshot_encoder.request_keyframe(sector)
+        return True
+
+    def _get_window(self) -> asyncio.Semaphore:
+        """Return the in-flight window semaphore, creating it on first use."""
+        if self._window is None:
+            self._window = asyncio.Semaphore(self.max_in_flight)
+        return self._window
+
+    def _release_window(self):
+        self.in_flight -= 1
+        if self._window_debt:
+            self._window_debt -= 1
+        else:
+            self._window.release()
+
+    def set_max_in_flight(self, max_in_flight: int):
+        """
+        Resize the in-flight window; must be called on the event loop. Growing frees slots immediately, shrinking
+        retires slots as messages are delivered, so the window converges within `old - new` deliveries.
+        """
+        if max_in_flight <= 0:
+            raise ValueError(f"max_in_flight must be positive, got {max_in_flight}.")
+        delta = max_in_flight - self.max_in_flight
+        self.max_in_flight = max_in_flight
+        if self._window is None or delta == 0:
             return
+        if delta > 0:
+            repaid = min(delta, self._window_debt)
+            self._window_debt -= repaid
+            for _ in range(delta - repaid):
+                self._window.release()
+        else:
+            self._window_debt -= delta
 
-        # If we're here, we have a valid dictionary with required fields
-        topic = parsed_message['topic']
-        key = parsed_message['key']
-        self.send_to_kafka(topic, key, json.dumps(message))
+    def _resolve_delivery(self, delivery: asyncio.Future, err, msg, latency_ms: float):
+        """Complete a delivery future on the event loop thread."""
+        self._release_window()
+        if delivery.done():
+            return
+        if err is not None:
+            delivery.set_exception(DeliveryError(str(err)))
+        else:
+            delivery.set_result({
+                "topic": msg.topic(),
+                "partition": msg.partition(),
+                "offset": msg.offset(),
+                "latency_ms": latency_ms
+            })
+
+    def _reject(self, delivery: asyncio.Future, reason: str):
+        self.stats.incr("messages_failed")
+        delivery.set_exception(DeliveryError(reason))
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return delivery counters and their rates, the current in-flight count and delivery latency percentiles.
+        """
+        stats = self.stats.snapshot()
+        stats["rates"] = self.stats.rates()
+        stats["in_flight"] = self.in_flight
+        stats["max_in_flight"] = self.max_in_flight
+        stats["delivery_latency_ms"] = self.delivery_latency.summary()
+        stats["partitioner"] = self.partitioner.get_stats()
+        if self.snapshot_encoder is not None:
+            stats["snapshot_encoder"] = dict(self.snapshot_encoder.stats)
+        return stats
@@ -0,0 +1,103 @@
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from zzv.msgcore.transporters.kafka_transporter import KafkaTransporter
+
+
+class LocalMessage:
+    """Delivered message handed to delivery callbacks, mirroring confluent_kafka.Message accessors."""
+
+    __slots__ = ('_topic', '_partition', '_offset', '_key', '_value')
+
+    def __init__(self, topic: str, partition: int, offset: int, key: bytes, value: bytes):
+        self._topic = topic
+        self._partition = partition
+        self._offset = offset
+        self._key = key
+        self._value = value
+
+    def topic(self):
+        return self._topic
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+    def key(self):
+        return self._key
+
+    def value(self):
+        return self._value
+
+
+class LocalProducer:
+    """
+    In-memory producer with the subset of the confluent_kafka.Producer API used by KafkaTransporter.
+
+    Messages are acknowledged on the next poll(), so delivery callbacks run on the transporter's poller
+    thread exactly as they would with librdkafka.
+    """
+
+    def __init__(self, max_retained: int = 1000):
+        """
+        Initialize the LocalProducer.
+
+        Args:
+            max_retained (int): Number of most recently delivered messages kept for inspection.
+        """
+        self._pending: List[tuple] = []
+        self._condition = threading.Condition()
+        self._offsets: Dict[tuple, int] = {}
+        self.delivered = deque(maxlen=max_retained)
+
+    def produce(self, topic, key=None, value=None, partition=0, callback=None):
+        with self._condition:
+            self._pending.append((topic, key, value, partition, callback))
+            self._condition.notify()
+
+    def poll(self, timeout: float = 0) -> int:
+        with self._condition:
+            if not self._pending and timeout:
+                self._condition.wait(timeout)
+            pending, self._pending = self._pending, []
+
+        for topic, key, value, partition, callback in pending:
+            offset = self._offsets.get((topic, partition), 0)
+            self._offsets[(topic, partition)] = offset + 1
+            message = LocalMessage(topic, partition, offset, key, value)
+            self.delivered.append(message)
+            if callback is not None:
+                callback(None, message)
+        return len(pending)
+
+    def flush(self, timeout: Optional[float] = None) -> int:
+        self.poll(0)
+        return 0
+
+    def __len__(self):
+        with self._condition:
+            return len(self._pending)
+
+
+class LocalTransporter(KafkaTransporter):
+    """
+    Drop-in replacement for KafkaTransporter that delivers to an in-memory LocalProducer.
+
+    Used by benchmarks, soak tests and replays that exercise the full pipeline without a broker.
+    Select it with `kafka_transporter: {type: local}` in the engine configuration.
+    """
+
+    def __init__(self, kafka_brokers: str = 'local', max_retained: int = 1000, **kwargs: Any):
+        super().__init__(kafka_brokers, **kwargs)
+        self.producer_conf['client.id'] = 'vvs-local-transporter'
+        self.max_retained = max_retained
+
+    def start(self):
+        if self.producer_pool is not None:
+            super().start()
+            return
+        self.producer = LocalProducer(max_retained=self.max_retained)
+        self._start_poller()
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from zzv.common.constants import MSG_MANAGER, QUEUE_MANAGER, SNAPSHOT_LIST, REPLAY_MANAGER
+from zzv.engine.manager import Manager
+from zzv.health.health_report import HealthReport
+from zzv.health.status import Status
+from zzv.replay.snapshot_readers import read_snapshot_recording
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+REPLAY_SPEED_MAX = 'max'
+REPLAY_SPEED_REALTIME = 'realtime'
+
+
+def parse_replay_speed(speed: Any) -> Optional[float]:
+    """
+    Parse the configured replay speed.
+
+    Args:
+        speed: 'max' (as fast as possible), 'realtime', a multiplier such as 60, or a string such as '60x'.
+
+    Returns:
+        Optional[float]: The speed multiplier, or None to replay as fast as possible.
+    """
+    if speed is None or speed == REPLAY_SPEED_MAX:
+        return None
+    if speed == REPLAY_SPEED_REALTIME:
+        return 1.0
+    if isinstance(speed, str):
+        speed = speed.lower().rstrip('x')
+    multiplier = float(speed)
+    if multiplier <= 0:
+        raise ValueError(f"Replay speed must be positive, got {speed}.")
+    return multiplier
+
+
+class ReplayManager(Manager):
+    """
+    Replay recorded SnapshotList streams through the MsgManager and QueueManager on a virtual clock.
+
+    The Kernel's shared clock is switched to SIMULATED mode and follows the `time` field of the replayed
+    SnapshotLists, so every manager reading `kernel.clock` sees the recorded time. Replay runs in real time,
+    at N times real time, or as fast as the pipeline accepts messages.
+    """
+
+    def __init__(self, kernel, replay_config: Dict[str, Any]):
+        """
+        Initialize the ReplayManager.
+
+        Args:
+            kernel (Kernel): The kernel providing the shared clock and the message managers.
+            replay_config (dict): The 'replay' configuration section:
+                files (list): Recordings to replay, in order (.jsonl or size-prefixed FlatBuffers .fb).
+                format (str, optional): Force 'jsonl' or 'flatbuffers' instead of detecting by extension.
+                speed: 'max', 'realtime' or a multiplier. Defaults to 'max'.
+                topic (str): Topic set on replayed messages that do not carry one. Defaults to 'snapshots'.
+                max_queue_depth (int): Pipeline depth (dispatcher plus sending queue) at which a full-speed
+                    replay waits for the pipeline to drain.
+                yield_every (int): Messages replayed between yields to the event loop at full speed.
+        """
+        super().__init__(name="ReplayManager")
+        self.kernel = kernel
+        self.files: List[str] = list(replay_config.get('files', []))
+        self.format = replay_config.get('format')
+        self.speed = parse_replay_speed(replay_config.get('speed', REPLAY_SPEED_MAX))
+        self.topic = replay_config.get('topic', 'snapshots')
+        self.max_queue_depth = replay_config.get('max_queue_depth', 10000)
+        self.yield_every = max(1, replay_config.get('yield_every', 100))
+
+        self._task: Optional[asyncio.Task] = None
+        self.finished = False
+        self.stats.declare(
+            "messages_replayed",  # SnapshotLists handed to the MsgManager
+            "files_replayed",  # Recordings fully replayed
+            "error_count"  # Records that could not be replayed
+        )
+        self._since_yield = 0  # Records replayed at full speed since the task last yielded
+        self.virtual_start_ms: Optional[int] = None
+        self.virtual_time_ms: Optional[int] = None
+        self._wall_start: Optional[float] = None
+        self._wall_end: Optional[float] = None
+
+    async def start(self):
+        """Start the replay in a background task; returns immediately."""
+        if self._task is not None and not self._task.done():
+            logger.warning(f"{REPLAY_MANAGER} is already replaying.")
+            return
+        logger.info(f"Starting {REPLAY_MANAGER} for {len(self.files)} recording(s)...")
+        self._running = True
+        self.finished = False
+        self._task = asyncio.create_task(self.replay())
+
+    async def close(self):
+        """Stop the replay."""
+        logger.info(f"Stopping {REPLAY_MANAGER}...")
+        self._running = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def replay(self):
+        """Replay every configured recording in order."""
+        msg_manager = self.kernel.get_service(MSG_MANAGER, caller=self)
+        queue_manager = self.kernel.get_service(QUEUE_MANAGER, caller=self)
+        self._wall_start = time.perf_counter()
+        self._wall_end = None
+
+        for path in self.files:
+            if not self._running:
+                break
+            logger.info(f"Replaying {path}...")
+            for record in read_snapshot_recording(path, self.format):
+                if not self._running:
+                    break
+                await self._replay_record(record, msg_manager, queue_manager)
+            else:
+                self.stats.incr("files_replayed")
+
+        self._wall_end = time.perf_counter()
+        self.finished = True
+        logger.info(f"{REPLAY_MANAGER} finished: {self.stats['messages_replayed']} messages replayed "
+                    f"at {self.get_speedup():.1f}x real time.")
+
+    async def _replay_record(self, record: Dict[str, Any], msg_manager, queue_manager):
+        """Advance the virtual clock to the record's time, pace the replay and hand the record over."""
+        record_time_ms = record.get('time')
+        if record_time_ms is not None:
+            self._advance_clock(record_time_ms)
+            if self.speed is not None:
+                await self._pace(record_time_ms)
+
+        message = dict(record)
+        message.setdefault('topic', self.topic)
+        if not message.get('key'):
+            message['key'] = message.get('name') or 'replay'
+
+        try:
+            msg_manager.handle_message(SNAPSHOT_LIST, message)
+            self.stats.incr("messages_replayed")
+        except Exception as e:
+            self.stats.incr("error_count")
+            logger.error(f"Error replaying record: {e}")
+
+        if self.speed is None:
+            # Full speed: let the pipeline drain, and wait for it when it falls too far behind
+            if self._get_pipeline_depth(msg_manager, queue_manager) > self.max_queue_depth:
+                while self._running and \
+                        self._get_pipeline_depth(msg_manager, queue_manager) > self.max_queue_depth // 2:
+                    await asyncio.sleep(0.001)
+            else:
+                self._since_yield += 1
+                if self._since_yield >= self.yield_every:
+                    self._since_yield = 0
+                    await asyncio.sleep(0)
+
+    @staticmethod
+    def _get_pipeline_depth(msg_manager, queue_manager) -> int:
+        """Return the number of replayed messages not yet handed to the transporter."""
+        return msg_manager.get_pending_count() + queue_manager.get_queue_size()
+
+    def _advance_clock(self, record_time_ms: int):
+        """Move the Kernel's shared clock to the record's time."""
+        clock = self.kernel.clock
+        if self.virtual_start_ms is None:
+            self.virtual_start_ms = record_time_ms
+            clock.simulate(datetime.fromtimestamp(record_time_ms / 1000))
+        elif record_time_ms > self.virtual_time_ms:
+            clock.advance_time(timedelta(milliseconds=record_time_ms - self.virtual_time_ms))
+        if self.virtual_time_ms is None or record_time_ms > self.virtual_time_ms:
+            self.virtual_time_ms = record_time_ms
+
+    async def _pace(self, record_time_ms: int):
+        """Sleep until the wall-clock time at which the record is due at the configured speed."""
+        due = self._wall_start + (record_time_ms - self.virtual_start_ms) / 1000 / self.speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def get_speedup(self) -> float:
+        """Return virtual time elapsed divided by wall time elapsed."""
+        if self._wall_start is None or self.virtual_start_ms is None:
+            return 0.0
+        wall_elapsed = (self._wall_end or time.perf_counter()) - self._wall_start
+        if wall_elapsed <= 0:
+            return 0.0
+        return (self.virtual_time_ms - self.virtual_start_ms) / 1000 / wall_elapsed
+
+    def get_progress(self) -> Dict[str, Any]:
+        """Return the replay progress, virtual time and achieved speed-up."""
+        return {
+            "files": self.files,
+            "speed": self.speed if self.speed is not None else REPLAY_SPEED_MAX,
+            "finished": self.finished,
+            "virtual_time": self.kernel.clock.now().isoformat() if self.virtual_time_ms is not None else None,
+            "speedup": self.get_speedup(),
+            **self.stats.snapshot()
+        }
+
+    def get_health(self):
+        """
+        Return the health status of the ReplayManager as a HealthReport object.
+        """
+        status = Status.OK if self._running or self.finished else Status.ERROR
+        state = "finished" if self.finished else ("replaying" if self._running else "not running")
+        return HealthReport(
+            manager_name=self.name,
+            status=status,
+            details=[f"ReplayManager is {state}",
+                     f"Messages replayed: {self.stats['messages_replayed']}"]
+        )
+
+    def register_endpoints(self, app: 'FastAPI'):
+        """
+        Register custom endpoints for the ReplayManager.
+
+        Args:
+            app (FastAPI): The main FastAPI application where endpoints should be registered.
+        """
+
+        @app.get(f"/{self.name}/progress")
+        async def replay_progress() -> Dict[str, Any]:
+            """Get the replay progress and virtual clock."""
+            return self.get_progress()
+
+        print(f"Registered endpoints for {self.name}.")
@@ -0,0 +1,133 @@
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from zzv.msgcore.codecs.snapshot_flatbuffers import decode_snapshot_list, encode_snapshot_list
+from zzv.msgcore.codecs.snapshot_v2_flatbuffers import decode_snapshot_list_v2, encode_snapshot_list_v2, \
+    is_snapshot_list_v2
+
+FORMAT_JSON_LINES = 'jsonl'
+FORMAT_FLATBUFFERS = 'flatbuffers'
+FORMAT_FLATBUFFERS_V2 = 'flatbuffers_v2'  # Written as SnapshotListV2; read by the 'flatbuffers' reader
+
+# File extensions recognised when no explicit format is given
+_EXTENSION_FORMATS = {
+    '.jsonl': FORMAT_JSON_LINES,
+    '.ndjson': FORMAT_JSON_LINES,
+    '.json': FORMAT_JSON_LINES,
+    '.fb': FORMAT_FLATBUFFERS,
+    '.fbs': FORMAT_FLATBUFFERS,
+    '.bin': FORMAT_FLATBUFFERS,
+}
+
+_SIZE_PREFIX = struct.Struct('<I')
+
+
+def detect_format(path: str) -> str:
+    """
+    Detect the recording format from the file extension.
+
+    Raises:
+        ValueError: If the extension is not recognised.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _EXTENSION_FORMATS:
+        raise ValueError(f"Cannot detect recording format of '{path}'. "
+                         f"Supported extensions: {sorted(_EXTENSION_FORMATS)}.")
+    return _EXTENSION_FORMATS[extension]
+
+
+def read_json_lines(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield SnapshotList dictionaries from a JSON lines file, one object per line."""
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def read_flatbuffers(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield SnapshotList dictionaries from a stream of size-prefixed FlatBuffers SnapshotLists, v1 or v2 (told
+    apart per record by the v2 file identifier).
+
+    The file is memory-mapped and each buffer is decoded in place, without copying it out of the map.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        position = 0
+        end = len(data)
+        while position + _SIZE_PREFIX.size <= end:
+            (size,) = _SIZE_PREFIX.unpack_from(data, position)
+            start = position + _SIZE_PREFIX.size
+            if start + size > end:
+                raise ValueError(f"Truncated FlatBuffers record at byte {position} of '{path}'.")
+            yield _decode_record(data, start)
+            position = start + size
+
+
+def _decode_record(data, start: int) -> Dict[str, Any]:
+    """Decode one record to a dictionary; no view into the map outlives the call, so the map can be closed."""
+    if is_snapshot_list_v2(data, start):
+        return decode_snapshot_list_v2(data, start).to_dict()
+    return decode_snapshot_list(data, start)
+
+
+def read_snapshot_recording(path: str, format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the SnapshotLists recorded in a file.
+
+    Args:
+        path (str): Path of the recording.
+        format (str, optional): 'jsonl' or 'flatbuffers'. Detected from the extension if not given.
+    """
+    format = format or detect_format(path)
+    if format == FORMAT_JSON_LINES:
+        return read_json_lines(path)
+    if format in (FORMAT_FLATBUFFERS, FORMAT_FLATBUFFERS_V2):
+        return read_flatbuffers(path)
+    raise ValueError(f"Unsupported recording format '{format}'. Supported formats: "
+                     f"'{FORMAT_JSON_LINES}', '{FORMAT_FLATBUFFERS}', '{FORMAT_FLATBUFFERS_V2}'.")
+
+
+def write_snapshot_recording(path: str, snapshot_lists: Iterable[Dict[str, Any]], format: Optional[str] = None) -> int:
+    """
+    Write SnapshotLists to a recording file that read_snapshot_recording can replay.
+
+    A v1 FlatBuffers recording converts to v2 with
+    `write_snapshot_recording(target, read_snapshot_recording(source), format='flatbuffers_v2')`.
+
+    Args:
+        path (str): Path of the recording.
+        snapshot_lists (Iterable[dict]): SnapshotList dictionaries in time order.
+        format (str, optional): 'jsonl', 'flatbuffers' or 'flatbuffers_v2'. Detected from the extension if not
+            given, FlatBuffers extensions meaning v1.
+
+    Returns:
+        int: Number of SnapshotLists written.
+    """
+    format = format or detect_format(path)
+    count = 0
+    if format == FORMAT_JSON_LINES:
+        with open(path, 'w', encoding='utf-8') as file:
+            for snapshot_list in snapshot_lists:
+                file.write(json.dumps(snapshot_list))
+                file.write('\n')
+                count += 1
+    elif format == FORMAT_FLATBUFFERS:
+        with open(path, 'wb') as file:
+            for snapshot_list in snapshot_lists:
+                file.write(encode_snapshot_list(snapshot_list, size_prefixed=True))
+                count += 1
+    elif format == FORMAT_FLATBUFFERS_V2:
+        with open(path, 'wb') as file:
+            for snapshot_list in snapshot_lists:
+                file.write(encode_snapshot_list_v2(snapshot_list, size_prefixed=True))
+                count += 1
+    else:
+        raise ValueError(f"Unsupported recording format '{format}'. Supported formats: "
+                         f"'{FORMAT_JSON_LINES}', '{FORMAT_FLATBUFFERS}', '{FORMAT_FLATBUFFERS_V2}'.")
+    return count